@@ -0,0 +1,115 @@
+"""
+Schema catalog refresh benchmark.
+
+Builds a synthetic dataset of --tables tables (copies of Mock_Data/*.csv in a
+temporary directory) behind the DuckDB connector, with every metadata call
+and profiling query delayed by --metadata-ms / --query-ms to stand in for
+BigQuery round trips, and times
+
+    full, serial      – every table profiled, one at a time (the old script's shape)
+    full, parallel    – every table profiled, --workers at a time
+    incremental       – after --touch tables changed: only those are re-profiled
+    no-op             – nothing changed: metadata only, no query, no new version
+
+Usage:
+    python benchmarks/bench_catalog_refresh.py [--tables 40 --workers 8 --touch 2]
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import Catalog
+from src.agents.EchoQL_Agent.catalog.refresh import refresh_catalog
+from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors.duckdb_local import DuckDBConnector
+
+logging.getLogger("sqlglot").setLevel(logging.ERROR)   # APPROX_TOP_COUNT transpiles with a warning
+
+DATASET = "Mock_KPIs"
+
+
+class SlowConnector(DuckDBConnector):
+    """DuckDB with a fixed delay per metadata call and per query (a remote warehouse's round trip)."""
+
+    def __init__(self, data_dir: Path, metadata_s: float, query_s: float) -> None:
+        super().__init__(data_dir, DATASET)
+        self.metadata_s, self.query_s = metadata_s, query_s
+        self.queries = 0
+
+    def table_metadata(self, table_id: str):
+        time.sleep(self.metadata_s)
+        return super().table_metadata(table_id)
+
+    def execute_arrow(self, sql: str, timeout_s=None):
+        time.sleep(self.query_s)
+        self.queries += 1
+        return super().execute_arrow(sql, timeout_s)
+
+
+def make_dataset(directory: Path, tables: int) -> list[Path]:
+    sources = sorted((project_root / "Mock_Data").glob("*.csv"))
+    paths = []
+    for i in range(tables):
+        source = sources[i % len(sources)]
+        path = directory / f"{source.stem}_{i:03d}.csv"
+        shutil.copyfile(source, path)
+        paths.append(path)
+    return paths
+
+
+def run(label: str, connector: SlowConnector, current: Catalog, workers: int):
+    connector.queries = 0
+    start = time.perf_counter()
+    report = refresh_catalog(connector, current, workers=workers)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label:<18} {elapsed:7.2f} s   {connector.queries:3d} queries   "
+        f"{len(report.profiled):3d} profiled  {len(report.unchanged):3d} unchanged   "
+        f"v{report.catalog.version}{'' if report.changed else ' (unchanged)'}"
+    )
+    if report.failed:
+        print(f"    failed: {report.failed}")
+    return report, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--touch", type=int, default=2, help="tables changed before the incremental run")
+    parser.add_argument("--metadata-ms", type=float, default=50.0)
+    parser.add_argument("--query-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_dataset(Path(tmp), args.tables)
+        connector = SlowConnector(Path(tmp), args.metadata_ms / 1000, args.query_ms / 1000)
+        connector.list_tables(DATASET)                  # load the CSVs outside the timings
+        empty = Catalog(DATASET, [], version=0)
+        print(
+            f"{args.tables} tables, {args.metadata_ms:g} ms per metadata call, "
+            f"{args.query_ms:g} ms per profiling query"
+        )
+
+        _, serial = run("full, serial", connector, empty, workers=1)
+        full, parallel = run(f"full, {args.workers} workers", connector, empty, workers=args.workers)
+
+        later = time.time() + 60
+        for path in paths[: args.touch]:
+            os.utime(path, (later, later))
+        touched, incremental = run("incremental", connector, full.catalog, workers=args.workers)
+        run("no-op", connector, touched.catalog, workers=args.workers)
+
+        print(f"\n  parallel speed-up   {serial / parallel:5.1f}x")
+        print(f"  incremental vs full {parallel / incremental:5.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Data availability checker: output size and latency, before vs. after.
+
+    legacy – the checker echoed the whole schema back as `raw_schema_text`
+             inside a JSON string that the generator had to regex + json.loads
+    verdict – AvailabilityVerdict {available, tables_needed, reason}
+
+Offline (default) the script reports output characters and estimated output
+tokens (≈ 4 characters per token) for a set of questions, plus the decode
+time those tokens cost at --decode-tps. With --live it runs both checker
+variants against Gemini (credentials from .env) and reports the real
+`candidates_token_count` and wall time per call.
+
+Usage:
+    python benchmarks/bench_checker_output.py [--live --repeats 3]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.agents.EchoQL_Agent.subagents.data_availability_checker_agent.agent import (
+    AvailabilityVerdict,
+    data_availability_checker_agent,
+)
+
+QUESTIONS = [
+    ("How many users signed up?", ["mock_users"]),
+    ("What is the daily number of active users over the last 30 days?", ["mock_user_sessions"]),
+    ("Which 10 users posted the most answers? Show their names.", ["mock_answers", "mock_users"]),
+    ("Average number of answers per question last month", ["mock_answers", "mock_questions"]),
+    ("What is the average session length per user birthday decade?", ["mock_user_sessions", "mock_users"]),
+    ("What is our monthly revenue by country?", []),
+]
+
+LEGACY_INSTRUCTIONS = """
+    Instructions:
+    1. Parse the schema and check it with the user_query if it can be answered or not with the available tables and fields.
+    2. Return a JSON-formatted string with the following structure:
+
+    {
+      "available": true/false,
+      "user_query": "<same as input>",
+      "raw_schema_text": "<entire schema text used>"
+    }
+
+    Guidelines:
+    - Output must be **bare JSON**
+    – absolutely no ``` fences, no language tags, no extra commentary.
+    - Returning anything else will break downstream parsing.
+    - If the query cannot be answered, set `"available": false and still return the schema.
+"""
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, round(len(text) / 4))
+
+
+def offline(decode_tps: float) -> None:
+    schema = load_catalog().render()
+    print(f"{'question':<62} {'legacy tok':>10} {'verdict tok':>11}")
+    legacy_total = verdict_total = 0
+    for question, tables in QUESTIONS:
+        legacy = json.dumps(
+            {"available": bool(tables), "user_query": question, "raw_schema_text": schema}, indent=2
+        )
+        verdict = AvailabilityVerdict(
+            available=bool(tables),
+            tables_needed=tables,
+            reason="All required columns exist." if tables else "No revenue or country data.",
+        ).model_dump_json()
+        lt, vt = _estimate_tokens(legacy), _estimate_tokens(verdict)
+        legacy_total += lt
+        verdict_total += vt
+        print(f"{question[:60]:<62} {lt:>10} {vt:>11}")
+    n = len(QUESTIONS)
+    print(
+        f"\nmean output tokens (estimated): legacy {legacy_total / n:.0f} → verdict {verdict_total / n:.0f} "
+        f"({1 - verdict_total / legacy_total:.0%} fewer)"
+    )
+    print(
+        f"decode time at {decode_tps:.0f} tok/s: legacy {legacy_total / n / decode_tps * 1000:.0f} ms → "
+        f"verdict {verdict_total / n / decode_tps * 1000:.0f} ms per call"
+    )
+
+
+async def _run_once(agent, question: str) -> tuple[int, float]:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    runner = InMemoryRunner(agent=agent, app_name="bench_checker")
+    session = await runner.session_service.create_session(app_name="bench_checker", user_id="bench")
+    tokens = 0
+    start = time.perf_counter()
+    async for event in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=question)]),
+    ):
+        if event.usage_metadata and event.usage_metadata.candidates_token_count:
+            tokens += event.usage_metadata.candidates_token_count
+    return tokens, time.perf_counter() - start
+
+
+def live(repeats: int) -> None:
+    from google.adk.agents import LlmAgent
+
+    schema = load_catalog().render()
+    legacy_agent = LlmAgent(
+        name="LegacyDataAvailabilityCheckerAgent",
+        model=data_availability_checker_agent.model,
+        instruction=(
+            "You are the Data Availability Checker Agent.\n\n"
+            "These are the available tables and fields in the database:\n\n" + schema + LEGACY_INSTRUCTIONS
+        ),
+        output_key="availability_result",
+    )
+    for label, agent in (("legacy", legacy_agent), ("verdict", data_availability_checker_agent)):
+        tokens, latencies = [], []
+        for _ in range(repeats):
+            for question, _tables in QUESTIONS:
+                t, s = asyncio.run(_run_once(agent, question))
+                tokens.append(t)
+                latencies.append(s * 1000)
+        print(
+            f"{label:<8} output tokens mean {statistics.mean(tokens):7.1f}   "
+            f"latency ms mean {statistics.mean(latencies):8.0f}  p50 {statistics.median(latencies):8.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Checker output tokens / latency, legacy vs. verdict")
+    parser.add_argument("--live", action="store_true", help="call Gemini with both checker variants")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--decode-tps", type=float, default=150.0, help="assumed output tokens per second")
+    args = parser.parse_args()
+    offline(args.decode_tps)
+    if args.live:
+        print()
+        live(args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cold-start (import time) benchmark.
+
+Imports the agent package in fresh interpreters under `python -X importtime`
+– what a Cloud Run instance does on scale-from-zero before it can answer –
+and reports
+
+    • framework import – google.adk / google.genai, paid by any ADK agent
+    • agent import     – what `import src.agents` adds on top of it
+    • the most expensive modules (self time) and the total per top-level package
+    • deferred modules (pandas, pyarrow, numpy, sqlglot, BigQuery, DuckDB, …)
+      that were imported eagerly anyway
+
+Exits with status 1 when the median agent import exceeds --budget-ms or a
+deferred module is imported at startup, so it can gate a CI job.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5 --budget-ms 250 --top 15]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+MARKER = "-- agent import --"
+EAGER_OK = ("requests",)                  # deferred in our code, but google.adk imports it anyway
+ALSO_DEFERRED = ("google.cloud.bigquery", "duckdb", "bs4")
+
+_CHILD = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import google.adk.agents, google.adk.events, google.adk.tools, google.genai.types
+t1 = time.perf_counter()
+sys.stderr.write({MARKER!r} + "\\n"); sys.stderr.flush()
+import src.agents
+t2 = time.perf_counter()
+from src.agents.EchoQL_Agent.lazy_imports import DEFERRED_MODULES
+deferred = list(DEFERRED_MODULES) + {list(ALSO_DEFERRED)!r}
+print(json.dumps({{
+    "framework_ms": (t1 - t0) * 1000,
+    "agent_ms": (t2 - t1) * 1000,
+    "eager": [m for m in deferred if m in sys.modules],
+}}))
+"""
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import after the marker."""
+    rows, started = [], False
+    for line in stderr.splitlines():
+        if line.strip() == MARKER:
+            started = True
+        elif started and line.startswith("import time:") and "|" in line:
+            self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+            if self_us.isdigit():
+                rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once() -> tuple[dict, list[tuple[str, int, int]]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=project_root, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), _parse_importtime(proc.stderr)
+
+
+def _package(module: str) -> str:
+    parts = module.split(".")
+    if parts[:3] == ["src", "agents", "EchoQL_Agent"]:
+        return ".".join(parts[2:4])         # EchoQL_Agent.<subpackage>
+    return parts[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="max median agent import time")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results, self_us, eager = [], Counter(), set()
+    for _ in range(args.runs):
+        timing, rows = run_once()
+        results.append(timing)
+        eager.update(m for m in timing["eager"] if m not in EAGER_OK)
+        for name, self_time, _ in rows:
+            self_us[name.strip()] += self_time
+
+    framework = statistics.median(r["framework_ms"] for r in results)
+    agent = statistics.median(r["agent_ms"] for r in results)
+    print(f"{args.runs} fresh interpreters, median")
+    print(f"  framework import   {framework:9.1f} ms   (google.adk, google.genai)")
+    print(f"  agent import       {agent:9.1f} ms   (budget {args.budget_ms:g} ms)")
+
+    print(f"\ntop {args.top} modules by self time (agent import, mean ms)")
+    for name, us in self_us.most_common(args.top):
+        print(f"  {us / args.runs / 1000:9.2f}  {name}")
+
+    packages = Counter()
+    for name, us in self_us.items():
+        packages[_package(name)] += us
+    print("\nper package (agent import, mean ms)")
+    for name, us in packages.most_common(args.top):
+        print(f"  {us / args.runs / 1000:9.2f}  {name}")
+
+    failed = False
+    if eager:
+        print(f"\nFAIL: deferred modules imported at startup: {', '.join(sorted(eager))}")
+        failed = True
+    if agent > args.budget_ms:
+        print(f"\nFAIL: agent import {agent:.1f} ms is over the {args.budget_ms:g} ms budget")
+        failed = True
+    if not failed:
+        print("\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Concurrency benchmark for the fetcher's BigQuery path.
+
+Runs N simultaneous "sessions" against a local fake BigQuery client (every
+job takes --latency seconds, each HTTP round trip --rtt seconds) and compares
+
+    blocking – fetch_data() called straight from the coroutine (old behaviour)
+    async    – fetch_data_async() on the pooled client + bounded executor
+
+Usage:
+    python benchmarks/bench_fetch_concurrency.py --sessions 1 4 16 64
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import pyarrow as pa
+
+from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent import bigquery_connector as bq
+
+
+class FakeRowIterator:
+    def __init__(self, rows: int) -> None:
+        self._rows = rows
+
+    def to_arrow(self) -> pa.Table:
+        return pa.table({"day": range(self._rows), "dau": range(self._rows)})
+
+    def to_arrow_iterable(self):
+        return iter(self.to_arrow().to_batches())
+
+
+class FakeJob:
+    def __init__(self, latency: float, rtt: float, rows: int) -> None:
+        self.job_id = f"fake_{id(self):x}"
+        self._ends_at = time.monotonic() + latency
+        self._rtt = rtt
+        self._rows = rows
+        self.cancelled = False
+
+    def done(self) -> bool:
+        time.sleep(self._rtt)
+        return time.monotonic() >= self._ends_at
+
+    def result(self) -> FakeRowIterator:
+        time.sleep(max(0.0, self._ends_at - time.monotonic()) + self._rtt)
+        return FakeRowIterator(self._rows)
+
+    def cancel(self) -> bool:
+        self.cancelled = True
+        return True
+
+
+class FakeClient:
+    def __init__(self, latency: float, rtt: float, rows: int) -> None:
+        self._latency, self._rtt, self._rows = latency, rtt, rows
+
+    def query(self, sql: str) -> FakeJob:
+        time.sleep(self._rtt)
+        return FakeJob(self._latency, self._rtt, self._rows)
+
+
+async def _blocking_session(sql: str) -> None:
+    bq.fetch_data(sql, use_cache=False)
+
+
+async def _async_session(sql: str) -> None:
+    await bq.fetch_data_async(sql, use_cache=False)
+
+
+async def _run(mode: str, sessions: int) -> float:
+    session = _blocking_session if mode == "blocking" else _async_session
+    start = time.perf_counter()
+    await asyncio.gather(*(session(f"SELECT {i}") for i in range(sessions)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--latency", type=float, default=0.5, help="job runtime (s)")
+    parser.add_argument("--rtt", type=float, default=0.01, help="HTTP round trip (s)")
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--pool-size", type=int, default=bq.BQ_POOL_SIZE)
+    args = parser.parse_args()
+
+    bq.use_client_factory(
+        lambda: FakeClient(args.latency, args.rtt, args.rows), size=args.pool_size
+    )
+
+    print(f"{'sessions':>8} {'mode':>9} {'wall_s':>8} {'queries/s':>10}")
+    for n in args.sessions:
+        for mode in ("blocking", "async"):
+            wall = asyncio.run(_run(mode, n))
+            print(f"{n:>8} {mode:>9} {wall:>8.2f} {n / wall:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
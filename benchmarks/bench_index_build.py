@@ -0,0 +1,106 @@
+"""
+Table index build benchmark: rebuild time vs. number of changed tables.
+
+Builds the table retriever's index over synthetic catalogs (the same
+generator as bench_table_retriever.py) with an embedder that costs
+--call-ms per embed() call plus --text-ms per text – a model's overhead
+and per-item cost – and times
+
+    per table    – one embed() call per table (the old upload script; only
+                   up to --per-table-max tables)
+    full         – every table embedded, in batches
+    incremental  – after editing --edit table descriptions: only those
+    no change    – a rebuild with nothing to embed
+    publish      – upload of the index to LocalStorage, then a skipped re-publish
+
+Usage:
+    python benchmarks/bench_index_build.py [--sizes 1000 50000 --edit 10]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from bench_table_retriever import synthetic_catalog
+from src.agents.EchoQL_Agent.catalog import Catalog
+from src.agents.EchoQL_Agent.retrievers.table_retriever import (
+    HashingEmbedder,
+    LocalStorage,
+    build_index,
+    publish_index,
+)
+
+
+class SlowEmbedder(HashingEmbedder):
+    """Hashing embedder with a model's cost profile: fixed overhead per call, plus per text."""
+
+    def __init__(self, call_s: float, text_s: float) -> None:
+        super().__init__()
+        self.call_s, self.text_s = call_s, text_s
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        time.sleep(self.call_s + self.text_s * len(texts))
+        return super().embed(texts)
+
+
+def edited(catalog: Catalog, count: int) -> Catalog:
+    tables = list(catalog.tables.values())
+    step = max(1, len(tables) // max(count, 1))
+    for i in range(0, min(count * step, len(tables)), step):
+        tables[i] = replace(tables[i], description=tables[i].description + " Edited.")
+    return Catalog(catalog.dataset, tables, catalog.version + 1)
+
+
+def timed(label: str, embedder: SlowEmbedder, fn):
+    embedder.calls = 0
+    start = time.perf_counter()
+    result = fn()
+    print(f"    {label:<13} {time.perf_counter() - start:8.2f} s   {embedder.calls:6d} embed calls")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 50000])
+    parser.add_argument("--edit", type=int, default=10)
+    parser.add_argument("--call-ms", type=float, default=20.0)
+    parser.add_argument("--text-ms", type=float, default=0.2)
+    parser.add_argument("--per-table-max", type=int, default=1000)
+    args = parser.parse_args()
+
+    embedder = SlowEmbedder(args.call_ms / 1000, args.text_ms / 1000)
+    print(f"embedder: {args.call_ms:g} ms per call + {args.text_ms:g} ms per text")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size, seed=size)
+        print(f"\n  {size:,} tables")
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            if size <= args.per_table_max:
+                timed("per table", embedder, lambda: [embedder.embed([catalog.render([n])]) for n in catalog.tables])
+            full = timed("full", embedder, lambda: build_index(catalog, embedder, tmp / "index"))
+            changed = edited(catalog, args.edit)
+            inc = timed("incremental", embedder, lambda: build_index(changed, embedder, tmp / "index", full.index))
+            timed("no change", embedder, lambda: build_index(changed, embedder, tmp / "index", inc.index))
+            print(f"    {'':13} incremental: {inc.embedded} embedded, {inc.reused:,} reused")
+
+            storage = LocalStorage(tmp / "published")
+            start = time.perf_counter()
+            publish_index(inc.index, storage)
+            uploaded = time.perf_counter() - start
+            start = time.perf_counter()
+            skipped = not publish_index(inc.index, storage)
+            print(
+                f"    publish       {uploaded:8.2f} s   re-publish {time.perf_counter() - start:.3f} s"
+                f"{' (skipped)' if skipped else ''}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Bulk ingestion benchmark.
+
+Generates --files CSVs totalling --size-mb (rows of Mock_Data/mock_answers.csv
+repeated: integers, a timestamp and free text) and loads them with the local
+stand-in loader, whose every load job takes --load-ms, reporting
+
+    hash / convert    – single-file throughput (MB/s, rows/s) and the Arrow
+                        memory high-water mark, which stays at a few parse blocks
+    serial            – one file at a time (the old script's shape)
+    parallel          – --workers files at a time
+    re-run            – nothing changed: every file skipped by content hash
+    append            – --append-rows rows added to one file: only those load
+
+Usage:
+    python benchmarks/bench_ingestion.py [--size-mb 2048 --files 8 --workers 4]
+"""
+import argparse
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import pyarrow as pa
+
+from src.agents.EchoQL_Agent.catalog import Catalog, load_catalog
+from src.ingestion import LocalLoader, Manifest, bulk_load, csv_to_parquet, scan_file
+
+SOURCE = project_root / "Mock_Data" / "mock_answers.csv"
+
+
+def make_csvs(directory: Path, files: int, size_mb: float) -> list[Path]:
+    header, *rows = SOURCE.read_bytes().splitlines(keepends=True)
+    body = b"".join(rows)
+    repeats = max(1, int(size_mb * 1e6 / files / len(body)))
+    paths = []
+    for i in range(files):
+        path = directory / f"bulk_{i:02d}.csv"
+        with open(path, "wb") as f:
+            f.write(header)
+            for _ in range(repeats):
+                f.write(body)
+        paths.append(path)
+    return paths
+
+
+def bench_catalog(paths: list[Path]) -> Catalog:
+    """The catalog plus one copy of mock_answers per generated file."""
+    catalog = load_catalog()
+    template = catalog.table(SOURCE.stem)
+    copies = [
+        type(template)(p.stem, template.description, template.columns, template.primary_key)
+        for p in paths
+    ]
+    return Catalog(catalog.dataset, list(catalog.tables.values()) + copies, catalog.version)
+
+
+def run(label: str, paths, catalog, loader, manifest_path: Path, workers: int, **kwargs):
+    report = bulk_load(paths, catalog, loader, Manifest(manifest_path), workers=workers, **kwargs)
+    mb = report.bytes / 1e6
+    print(
+        f"  {label:<14} {report.seconds:7.2f} s   {mb:9.1f} MB   {report.rows:>11,} rows   "
+        f"{mb / report.seconds if report.bytes else 0:7.1f} MB/s   "
+        f"{report.count('replaced')} replaced {report.count('appended')} appended "
+        f"{report.count('skipped')} skipped {report.count('failed')} failed"
+    )
+    for result in report.results:
+        if result.error:
+            print(f"    {result.table}: {result.error}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=2048)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--load-ms", type=float, default=2000.0, help="simulated load job time per file")
+    parser.add_argument("--append-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-ingest-") as tmp:
+        tmp = Path(tmp)
+        (tmp / "csv").mkdir()
+        paths = make_csvs(tmp / "csv", args.files, args.size_mb)
+        catalog = bench_catalog(paths)
+        loader = LocalLoader(tmp / "loaded", latency_s=args.load_ms / 1000)
+        total = sum(p.stat().st_size for p in paths) / 1e6
+        print(f"{args.files} files, {total:,.0f} MB of CSV, {args.load_ms:g} ms per load job\n")
+
+        one, size = paths[0], paths[0].stat().st_size / 1e6
+        start = time.perf_counter()
+        scan_file(one)
+        hashed = time.perf_counter() - start
+        pool = pa.default_memory_pool()
+        start = time.perf_counter()
+        rows = csv_to_parquet(one, tmp / "one.parquet", catalog.table(one.stem))
+        converted = time.perf_counter() - start
+        print(f"  single file    {size:,.0f} MB, {rows:,} rows")
+        print(f"    hash         {size / hashed:7.1f} MB/s")
+        print(f"    convert      {size / converted:7.1f} MB/s   {rows / converted:,.0f} rows/s   "
+              f"Parquet {(tmp / 'one.parquet').stat().st_size / 1e6:,.0f} MB   "
+              f"Arrow peak {pool.max_memory() / 1e6:,.0f} MB\n")
+        (tmp / "one.parquet").unlink()
+
+        serial = run("serial", paths, catalog, loader, tmp / "serial.json", workers=1)
+        parallel = run(f"{args.workers} workers", paths, catalog, loader, tmp / "manifest.json", workers=args.workers)
+        run("re-run", paths, catalog, loader, tmp / "manifest.json", workers=args.workers, append=True)
+
+        header, first, *_ = SOURCE.read_bytes().splitlines(keepends=True)
+        with open(paths[-1], "ab") as f:
+            f.write(first * args.append_rows)
+        run("append", paths, catalog, loader, tmp / "manifest.json", workers=args.workers, append=True)
+
+        print(f"\n  parallel speed-up {serial.seconds / parallel.seconds:5.1f}x")
+        print(f"  peak RSS          {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
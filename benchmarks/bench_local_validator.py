@@ -0,0 +1,198 @@
+"""
+Local vs. LLM SQL validation benchmark.
+
+Builds a seeded corpus of generated queries over the schema catalog – valid
+ones plus mutated copies with a known defect (unqualified table, misspelt
+column, unknown table, unbalanced parentheses, bare UNION, output alias in
+WHERE, unqualified column two joined tables have) – and reports
+
+    • local validator latency (mean / p50 / p95 / p99)
+    • how often the local engine is definitive vs. defers to the LLM
+    • agreement with the corpus labels
+    • with --llm: the same for the Gemini validator, plus local↔LLM agreement
+      (needs model credentials in .env)
+
+Usage:
+    python benchmarks/bench_local_validator.py --queries 500 [--llm --llm-sample 50]
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.agents.EchoQL_Agent.subagents.sql_validator_agent.local_validator import validate_sql
+
+def _valid_queries(rng: random.Random, catalog) -> list[str]:
+    ds = catalog.dataset
+    out = []
+    for table in catalog.tables.values():
+        cols = list(table.columns.values())
+        names = [c.name for c in cols]
+        dated = [c.name for c in cols if c.type in ("DATE", "TIMESTAMP")]
+        numeric = [c.name for c in cols if c.type in ("INT64", "FLOAT64")]
+        key = rng.choice(names)
+        out.append(f"SELECT COUNT(*) AS num_rows FROM {ds}.{table.name}")
+        out.append(f"SELECT {', '.join(rng.sample(names, k=min(3, len(names))))} FROM {ds}.{table.name} LIMIT 100")
+        out.append(f"SELECT {key}, COUNT(*) AS n FROM {ds}.{table.name} GROUP BY {key} ORDER BY n DESC LIMIT 10")
+        if numeric:
+            m = rng.choice(numeric)
+            out.append(f"SELECT AVG({m}) AS avg_{m}, MAX({m}) AS max_{m} FROM {ds}.{table.name}")
+        for d in dated:
+            trunc = f"DATE({d})" if table.column(d).type == "TIMESTAMP" else d
+            out.append(
+                f"SELECT DATE_TRUNC({trunc}, WEEK) AS week, COUNT(*) AS n FROM {ds}.{table.name} "
+                f"WHERE {trunc} >= DATE_SUB(CURRENT_DATE(), INTERVAL {rng.randint(7, 90)} DAY) "
+                f"GROUP BY week ORDER BY week"
+            )
+            out.append(
+                f"WITH t AS (SELECT {trunc} AS day, COUNT(*) AS n FROM {ds}.{table.name} GROUP BY day) "
+                f"SELECT day, n, AVG(n) OVER (ORDER BY day ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) AS avg_7d FROM t"
+            )
+    for fk in catalog.foreign_keys:
+        left, lcol, right, rcol = fk.table, fk.column, fk.ref_table, fk.ref_column
+        rname = rng.choice(list(catalog.table(right).columns.values())).name
+        out.append(
+            f"SELECT r.{rname}, COUNT(l.{lcol}) AS n FROM {ds}.{left} AS l "
+            f"JOIN {ds}.{right} AS r ON l.{lcol} = r.{rcol} GROUP BY r.{rname} ORDER BY n DESC LIMIT 10"
+        )
+        out.append(
+            f"SELECT COUNT(*) AS n FROM {ds}.{right} r WHERE r.{rcol} NOT IN "
+            f"(SELECT {lcol} FROM {ds}.{left})"
+        )
+    return out
+
+
+def _mutations(sql: str, rng: random.Random, catalog) -> list[tuple[str, str]]:
+    ds = catalog.dataset
+    table = next(t for t in catalog.tables if f"{ds}.{t}" in sql)
+    col = next((c for c in catalog.table(table).columns if c in sql), None)
+    out = [
+        (sql.replace(f"{ds}.", "", 1), "unqualified_table"),
+        (sql.replace(f"{ds}.{table}", f"{ds}.{table}_v2", 1), "unknown_table"),
+        (sql.replace("(", "", 1) if "(" in sql else sql + ")", "unbalanced_parens"),
+        (f"{sql} UNION SELECT 1", "bare_union"),
+    ]
+    if col:
+        out.append((sql.replace(col, col[:-1] + "x", 1), "column_typo"))
+    if " AS n FROM " in sql and " GROUP BY " in sql and " WHERE " not in sql:
+        out.append((sql.replace(" GROUP BY ", " WHERE n > 1 GROUP BY ", 1), "alias_in_where"))
+    joined = re.search(rf"FROM {ds}\.(\w+) AS l JOIN {ds}\.(\w+) AS r", sql)
+    picked = re.match(r"SELECT r\.(\w+),", sql)
+    if joined and picked and picked[1] in catalog.table(joined[1]).columns:
+        out.append((sql.replace(f"r.{picked[1]}", picked[1], 1), "ambiguous_column"))
+    return [rng.choice(out)]
+
+
+def build_corpus(n: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    catalog = load_catalog()
+    valid = _valid_queries(rng, catalog)
+    corpus = []
+    while len(corpus) < n:
+        sql = rng.choice(valid)
+        if rng.random() < 0.7:
+            corpus.append({"sql": sql, "label": "valid", "defect": None})
+        else:
+            bad, defect = _mutations(sql, rng, catalog)[0]
+            corpus.append({"sql": bad, "label": "invalid", "defect": defect})
+    return corpus
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def _report(name: str, latencies_ms: list[float]) -> None:
+    print(
+        f"{name:<6} latency ms  mean {statistics.mean(latencies_ms):8.3f}  "
+        f"p50 {_pct(latencies_ms, .5):8.3f}  p95 {_pct(latencies_ms, .95):8.3f}  "
+        f"p99 {_pct(latencies_ms, .99):8.3f}"
+    )
+
+
+async def _llm_validate(sql: str) -> str:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from src.agents.EchoQL_Agent.subagents.sql_validator_agent.agent import _validator_llm
+
+    runner = InMemoryRunner(agent=_validator_llm, app_name="bench_validator")
+    session = await runner.session_service.create_session(
+        app_name="bench_validator", user_id="bench", state={"sql_query": sql}
+    )
+    async for _ in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text="Validate the SQL.")]),
+    ):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="bench_validator", user_id="bench", session_id=session.id
+    )
+    return str(session.state.get("validation_status", "")).strip().lower()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local vs. LLM SQL validation benchmark")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm", action="store_true", help="also run the Gemini validator")
+    parser.add_argument("--llm-sample", type=int, default=50)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.queries, args.seed)
+    validate_sql("SELECT 1")                           # warm catalog + sqlglot
+
+    latencies, decided, agree = [], 0, 0
+    by_defect: dict[str, list[int]] = {}
+    for item in corpus:
+        start = time.perf_counter()
+        verdict = validate_sql(item["sql"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        item["local"] = verdict.status
+        if verdict.definitive:
+            decided += 1
+            agree += verdict.status == item["label"]
+        stats = by_defect.setdefault(item["defect"] or "none (valid)", [0, 0, 0])
+        stats[0] += 1
+        stats[1] += verdict.definitive
+        stats[2] += verdict.status == item["label"]
+
+    n = len(corpus)
+    print(f"corpus: {n} queries ({sum(i['label'] == 'valid' for i in corpus)} valid)")
+    _report("local", latencies)
+    print(f"local definitive: {decided / n:.1%}  (LLM calls avoided)")
+    print(f"local agreement with labels (definitive only): {agree / max(decided, 1):.1%}")
+    print(f"\n{'defect':<18} {'n':>5} {'definitive':>11} {'correct':>8}")
+    for defect, (count, definitive, correct) in sorted(by_defect.items()):
+        print(f"{defect:<18} {count:>5} {definitive / count:>11.1%} {correct / count:>8.1%}")
+
+    if args.llm:
+        sample = random.Random(args.seed).sample(corpus, min(args.llm_sample, n))
+        llm_latencies, llm_agree_label, llm_agree_local, compared = [], 0, 0, 0
+        for item in sample:
+            start = time.perf_counter()
+            status = asyncio.run(_llm_validate(item["sql"]))
+            llm_latencies.append((time.perf_counter() - start) * 1000)
+            llm = "valid" if status == "valid" else "invalid"
+            llm_agree_label += llm == item["label"]
+            if item["local"] != "inconclusive":
+                compared += 1
+                llm_agree_local += llm == item["local"]
+        print()
+        _report("llm", llm_latencies)
+        print(f"llm agreement with labels: {llm_agree_label / len(sample):.1%}")
+        print(f"local↔llm agreement (local definitive): {llm_agree_local / max(compared, 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
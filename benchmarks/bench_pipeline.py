@@ -0,0 +1,451 @@
+"""
+Offline end-to-end benchmark of the full EchoQL pipeline (root_agent).
+
+Runs every question of benchmarks/harness/pipeline_corpus.json through
+root_agent with
+
+    • LLM stand-ins – each LLM agent's model is swapped for a ScriptedLlm that
+      answers from the corpus script (or from a --replay recording of a live
+      run); --ttft-ms / --prefill-tps / --decode-tps simulate model latency
+    • the local execution backend – DuckDBConnector over Mock_Data/*.csv
+      (GoogleSQL transpiled with sqlglot); with --engine-latency-ms the same
+      engine sits behind a fake BigQuery client, so the job path is measured
+
+and reports per-stage wall time (planner, checker, generator, validator,
+repair, optimizer, cost gate, fetcher), end-to-end p50 / p95 / p99, prompt and output
+tokens per LLM role and accuracy against the expected result sets. Repair
+time includes the re-validations it triggers. --validation serial runs the
+validator's local check, dry run and LLM one after another instead of racing
+them (the dry run only takes time with --engine-latency-ms), so the two can
+be compared. Compound questions (c*) are split by the query planner and
+their sub-queries run concurrently; --planner-parallel 1 runs them one after
+another and --planner off sends the whole question down one chain. The
+semantic and result caches are off unless --with-caches is given; tracing is
+off unless --trace FILE is given (compare runs with and without it to see
+the tracing overhead).
+
+Results are written as JSON (--out); --compare prints the deltas against a
+previous run, so regressions can be tracked across commits.
+
+    --record FILE   call the real models (credentials in .env) and record their
+                    answers, to --replay them offline later
+    --refresh-expected
+                    recompute the corpus' expected rows from its reference SQL
+
+Usage:
+    python benchmarks/bench_pipeline.py [--repeats 3 --out results.json --compare baseline.json]
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import pandas as pd
+
+from harness.stub_llm import RecordingLlm, ScriptedLlm
+
+CORPUS_PATH = Path(__file__).with_name("harness") / "pipeline_corpus.json"
+RESULTS_DIR = Path(__file__).with_name("results")
+APP_NAME = "bench_pipeline"
+STAGES = {
+    "QueryPlannerLlm": "planner",
+    "DataAvailabilityCheckerAgent": "checker",
+    "SqlGeneratorAgent": "generator",
+    "SqlValidatorAgent": "validator",
+    "SqlRepairAgent": "repair",
+    "SqlOptimizerAgent": "optimizer",
+    "CostGateAgent": "cost_gate",
+    "SqlFetcherAgent": "fetcher",
+}
+ROLE_DEFAULTS = {
+    "planner": json.dumps({"sub_questions": [], "reason": "not scripted"}),
+    "checker": json.dumps({"available": False, "tables_needed": [], "reason": "not scripted"}),
+    "generator": "",
+    "validator": "valid",
+    "repair": "",
+}
+
+
+# ─── corpus ─────────────────────────────────────────────────
+def _value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):                        # numpy scalar
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, (int, str, bool)):
+        return value
+    if isinstance(value, dt.datetime):                # pandas / Arrow / engine agnostic
+        midnight = value.time() == dt.time(0) and value.tzinfo is None
+        return value.date().isoformat() if midnight else value.isoformat(sep=" ")
+    if isinstance(value, dt.date):
+        return value.isoformat()
+    return str(value)                                 # decimals and the rest
+
+
+def normalise_rows(df: pd.DataFrame) -> list[list]:
+    return [[_value(v) for v in row] for row in df.itertuples(index=False, name=None)]
+
+
+def load_corpus() -> dict:
+    return json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+
+
+def refresh_expected() -> None:
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+
+    corpus = load_corpus()
+    engine = DuckDBConnector()
+    for item in corpus["questions"]:
+        sql = item["expected"]["sql"]
+        item["expected"]["rows"] = normalise_rows(engine.execute(sql)) if sql else []
+    CORPUS_PATH.write_text(json.dumps(corpus, indent=2) + "\n", encoding="utf-8")
+    print(f"expected rows refreshed for {len(corpus['questions'])} questions → {CORPUS_PATH}")
+
+
+def build_script(corpus: dict, replay: Path | None) -> dict:
+    script = {}
+    for item in corpus["questions"]:
+        for question, llm in [(item["question"], item["llm"]), *item.get("sub_questions", {}).items()]:
+            roles = dict(llm)
+            for role in ("checker", "planner"):
+                if role in roles:
+                    roles[role] = json.dumps(roles[role])
+            script[question] = roles
+    if replay:
+        for question, roles in json.loads(replay.read_text(encoding="utf-8")).items():
+            script.setdefault(question, {}).update(roles)
+    return script
+
+
+# ─── instrumentation ────────────────────────────────────────
+class StageTimer:
+    """
+    before/after agent callbacks → wall time per (invocation, stage); captures the final result.
+
+    Runs are keyed by branch as well, so a planned question's concurrent
+    sub-queries are timed separately; their stage times add up.
+    """
+
+    def __init__(self) -> None:
+        self._started: dict[tuple[str, str], float] = {}
+        self.stages: dict[str, dict[str, float]] = {}
+        self.results: dict[str, tuple] = {}
+
+    @staticmethod
+    def _key(callback_context) -> tuple[str, str | None, str]:
+        branch = callback_context._invocation_context.branch
+        return callback_context.invocation_id, branch, callback_context.agent_name
+
+    def before(self, callback_context):
+        self._started[self._key(callback_context)] = time.perf_counter()
+        return None
+
+    def after(self, callback_context):
+        key = self._key(callback_context)
+        elapsed = time.perf_counter() - self._started.pop(key)
+        stage = STAGES[callback_context.agent_name]
+        per_stage = self.stages.setdefault(callback_context.invocation_id, {})
+        per_stage[stage] = per_stage.get(stage, 0.0) + elapsed * 1000
+        return None
+
+    def capture(self, callback_context):
+        """After the planner: the question's result – one query's, or the merged sub-query results."""
+        from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.agent import load_result
+
+        state = callback_context.state
+        ref = state.get("query_result")
+        sql = state.get("sql_query") or [sub["sql_query"] for sub in state.get("sub_queries") or []]
+        self.results[callback_context.invocation_id] = (
+            load_result(ref).to_pandas() if ref is not None else None,
+            sql,
+            state.get("validation_status"),
+        )
+        return None
+
+
+def _pipeline_agents():
+    from src.agents import root_agent
+    from src.agents.EchoQL_Agent.subagents.data_availability_checker_agent.agent import (
+        data_availability_checker_agent,
+    )
+    from src.agents.EchoQL_Agent.subagents.query_planner_agent.agent import _planner_llm
+    from src.agents.EchoQL_Agent.subagents.sql_generator_agent.agent import _sql_llm
+    from src.agents.EchoQL_Agent.subagents.sql_repair_agent.agent import _repair_llm
+    from src.agents.EchoQL_Agent.subagents.sql_validator_agent.agent import _validator_llm
+
+    llm_agents = {
+        "planner": _planner_llm,
+        "checker": data_availability_checker_agent,
+        "generator": _sql_llm,
+        "validator": _validator_llm,
+        "repair": _repair_llm,
+    }
+    return root_agent, llm_agents
+
+
+def _stage_agents(root):
+    found, stack = [], [root]
+    while stack:
+        agent = stack.pop()
+        if agent.name in STAGES:
+            found.append(agent)
+        stack.extend(agent.sub_agents)
+    return found
+
+
+def _callbacks(callback) -> list:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def install(args, script: dict, ledger: list, recording: dict, timer: StageTimer):
+    from harness.local_bigquery import LocalBigQueryClient
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent import bigquery_connector
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+
+    root, llm_agents = _pipeline_agents()
+    for role, agent in llm_agents.items():
+        if args.record:
+            from google.adk.models.registry import LLMRegistry
+
+            inner = LLMRegistry.new_llm(agent.model)
+            agent.model = RecordingLlm(
+                model=f"recording:{inner.model}", role=role, inner=inner, recording=recording, ledger=ledger
+            )
+        else:
+            agent.model = ScriptedLlm(
+                model=f"scripted-{role}", role=role, script=script, ledger=ledger,
+                default=ROLE_DEFAULTS[role], ttft_s=args.ttft_ms / 1000,
+                prefill_tps=args.prefill_tps, decode_tps=args.decode_tps,
+            )
+    for agent in [*_stage_agents(root), llm_agents["planner"]]:   # keep the tracing callbacks, if any
+        agent.before_agent_callback = [*_callbacks(agent.before_agent_callback), timer.before]
+        agent.after_agent_callback = [*_callbacks(agent.after_agent_callback), timer.after]
+    planner = root.find_agent("QueryPlannerAgent")
+    planner.after_agent_callback = [*_callbacks(planner.after_agent_callback), timer.capture]
+
+    engine = DuckDBConnector()
+    engine.connection()                               # load the CSVs before the clock starts
+    if args.engine_latency_ms:                        # go through the BigQuery job path
+        bigquery_connector.use_client_factory(lambda: LocalBigQueryClient(engine, args.engine_latency_ms / 1000))
+    else:
+        bigquery_connector.use_connector(engine)
+    return root
+
+
+# ─── scoring ────────────────────────────────────────────────
+def score(item: dict, df, validation_status) -> str:
+    expected = item["expected"]
+    ran = df is not None
+    if not expected["answerable"]:
+        return "correct_refusal" if not ran else "wrong_answer"
+    if not ran:
+        return "no_result" if str(validation_status).strip().lower() == "valid" else "refused_or_invalid"
+    rows, want = normalise_rows(df), expected["rows"]
+    if not expected["ordered"]:
+        rows, want = sorted(rows, key=repr), sorted(want, key=repr)
+    return "correct" if rows == want else "wrong_result"
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def _dist(values: list[float]) -> dict:
+    return {
+        "n": len(values),
+        "mean": round(statistics.mean(values), 3) if values else 0.0,
+        "p50": round(_pct(values, .50), 3),
+        "p95": round(_pct(values, .95), 3),
+        "p99": round(_pct(values, .99), 3),
+    }
+
+
+# ─── run ────────────────────────────────────────────────────
+async def run_corpus(root, corpus: dict, repeats: int, ledger: list, timer: StageTimer) -> list[dict]:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    runner = InMemoryRunner(agent=root, app_name=APP_NAME)
+    records = []
+    for repeat in range(repeats):
+        for item in corpus["questions"]:
+            session = await runner.session_service.create_session(app_name=APP_NAME, user_id="bench")
+            calls_before = len(ledger)
+            invocation_id = None
+            start = time.perf_counter()
+            async for event in runner.run_async(
+                user_id="bench",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=item["question"])]),
+            ):
+                invocation_id = invocation_id or event.invocation_id
+            e2e_ms = (time.perf_counter() - start) * 1000
+
+            df, sql, status = timer.results.pop(invocation_id, (None, None, None))
+            calls = ledger[calls_before:]
+            records.append({
+                "id": item["id"],
+                "repeat": repeat,
+                "outcome": score(item, df, status),
+                "e2e_ms": round(e2e_ms, 3),
+                "stages_ms": {k: round(v, 3) for k, v in timer.stages.pop(invocation_id, {}).items()},
+                "llm_calls": [
+                    {"role": c.role, "prompt_tokens": c.prompt_tokens, "output_tokens": c.output_tokens}
+                    for c in calls
+                ],
+                "sql": sql,
+            })
+    return records
+
+
+def summarise(records: list[dict], ledger: list) -> dict:
+    first = [r for r in records if r["repeat"] == 0]
+    outcomes: dict[str, int] = {}
+    for r in first:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    good = outcomes.get("correct", 0) + outcomes.get("correct_refusal", 0)
+
+    stages = {
+        stage: _dist([r["stages_ms"][stage] for r in records if stage in r["stages_ms"]])
+        for stage in STAGES.values()
+    }
+    tokens: dict[str, dict] = {}
+    for call in ledger:
+        t = tokens.setdefault(call.role, {"calls": 0, "prompt": 0, "output": 0})
+        t["calls"] += 1
+        t["prompt"] += call.prompt_tokens
+        t["output"] += call.output_tokens
+    runs = max(1, len({r["repeat"] for r in records}))
+    for t in tokens.values():
+        t.update({k: round(v / runs, 1) for k, v in t.items()})   # per corpus pass
+    return {
+        "questions": len(first),
+        "accuracy": round(good / len(first), 4) if first else 0.0,
+        "outcomes": outcomes,
+        "e2e_ms": _dist([r["e2e_ms"] for r in records]),
+        "stages_ms": stages,
+        "tokens_per_pass": tokens,
+        "tokens_estimated": any(c.estimated for c in ledger),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(summary: dict) -> None:
+    print(f"questions {summary['questions']}  accuracy {summary['accuracy']:.1%}  outcomes {summary['outcomes']}")
+    e2e = summary["e2e_ms"]
+    print(f"\n{'stage':<10} {'n':>5} {'mean ms':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, d in list(summary["stages_ms"].items()) + [("e2e", e2e)]:
+        print(f"{name:<10} {d['n']:>5} {d['mean']:>9.2f} {d['p50']:>9.2f} {d['p95']:>9.2f} {d['p99']:>9.2f}")
+    label = "estimated" if summary["tokens_estimated"] else "reported"
+    print(f"\n{'llm role':<10} {'calls':>6} {'prompt tok':>11} {'output tok':>11}   (per corpus pass, {label})")
+    for role, t in summary["tokens_per_pass"].items():
+        print(f"{role:<10} {t['calls']:>6.0f} {t['prompt']:>11.0f} {t['output']:>11.0f}")
+
+
+def compare(summary: dict, baseline_path: Path) -> None:
+    base = json.loads(baseline_path.read_text(encoding="utf-8"))
+    old = base["summary"]
+    rows = [("accuracy", old["accuracy"], summary["accuracy"])]
+    for q in ("p50", "p95", "p99"):
+        rows.append((f"e2e {q} ms", old["e2e_ms"][q], summary["e2e_ms"][q]))
+    for stage, d in summary["stages_ms"].items():
+        if stage in old["stages_ms"]:
+            rows.append((f"{stage} p95 ms", old["stages_ms"][stage]["p95"], d["p95"]))
+    for role, t in summary["tokens_per_pass"].items():
+        o = old["tokens_per_pass"].get(role, {"prompt": 0, "output": 0})
+        rows.append((f"{role} prompt tok", o["prompt"], t["prompt"]))
+        rows.append((f"{role} output tok", o["output"], t["output"]))
+    print(f"\ncompared with {baseline_path} (commit {base.get('commit')})")
+    for name, a, b in rows:
+        delta = f"{(b - a) / a:+.1%}" if a else "n/a"
+        print(f"  {name:<22} {a:>10.3f} → {b:>10.3f}  {delta:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", type=Path, default=None, help="JSON results (default benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="previous JSON results to diff against")
+    parser.add_argument("--replay", type=Path, default=None, help="recorded LLM answers to use instead of the script")
+    parser.add_argument("--record", type=Path, default=None, help="call the real models and record their answers")
+    parser.add_argument("--ttft-ms", type=float, default=0.0, help="simulated time to first token per LLM call")
+    parser.add_argument("--prefill-tps", type=float, default=0.0, help="simulated prompt tokens / s (0 = free)")
+    parser.add_argument("--decode-tps", type=float, default=0.0, help="simulated output tokens / s (0 = free)")
+    parser.add_argument("--engine-latency-ms", type=float, default=0.0, help="run through the BigQuery job path with this simulated job latency")
+    parser.add_argument("--validation", choices=("parallel", "serial"), default="parallel", help="validator paths raced or one after another")
+    parser.add_argument("--llm-hedge-ms", type=float, default=-1.0, help="parallel validation: start the LLM validator after this many ms without a verdict (<0 = last resort)")
+    parser.add_argument("--planner", choices=("auto", "off"), default="auto", help="split compound questions into concurrent sub-queries")
+    parser.add_argument("--planner-parallel", type=int, default=4, help="sub-queries in flight at once (1 = one after another)")
+    parser.add_argument("--with-caches", action="store_true", help="keep the semantic and result caches on")
+    parser.add_argument("--trace", type=Path, default=None, help="trace the run to this JSON-lines file")
+    parser.add_argument("--refresh-expected", action="store_true")
+    args = parser.parse_args()
+
+    if args.refresh_expected:
+        refresh_expected()
+        return
+
+    # caches, tracing and the validation mode are read from the environment at import time
+    os.environ["ECHOQL_VALIDATION_MODE"] = args.validation
+    os.environ["ECHOQL_VALIDATION_LLM_HEDGE_MS"] = str(args.llm_hedge_ms)
+    os.environ["ECHOQL_PLANNER"] = args.planner
+    os.environ["ECHOQL_PLANNER_MAX_PARALLEL"] = str(args.planner_parallel)
+    os.environ["ECHOQL_SEMANTIC_CACHE"] = "1" if args.with_caches else "0"
+    os.environ["ECHOQL_RESULT_CACHE"] = "1" if args.with_caches else "0"
+    os.environ["ECHOQL_TRACE"] = "1" if args.trace else "0"
+    if args.trace:
+        os.environ["ECHOQL_TRACE_PATH"] = str(args.trace)
+
+    corpus = load_corpus()
+    ledger, recording, timer = [], {}, StageTimer()
+    root = install(args, build_script(corpus, args.replay), ledger, recording, timer)
+    records = asyncio.run(run_corpus(root, corpus, 1 if args.record else args.repeats, ledger, timer))
+    summary = summarise(records, ledger)
+    print_summary(summary)
+
+    commit = _git_commit()
+    result = {
+        "benchmark": "pipeline",
+        "commit": commit,
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "summary": summary,
+        "questions": records,
+    }
+    out = args.out or RESULTS_DIR / f"pipeline-{commit or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"\nresults → {out}")
+    if args.record:
+        args.record.write_text(json.dumps(recording, indent=2) + "\n", encoding="utf-8")
+        print(f"recorded LLM answers → {args.record}")
+    if args.compare:
+        compare(summary, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Write benchmark for the fetcher's result artifacts.
+
+Encodes a synthetic result (id, day, region, value) of N rows, arriving as
+64k-row Arrow batches, with
+
+    text     – DataFrame rendered with to_string() (the old chat paste)
+    csv      – DataFrame.to_csv(), uncompressed (a pandas CSV export)
+    csv.gz   – ArtifactWriter: CSV through gzip, batch by batch
+    csv.zst  – ArtifactWriter: CSV through zstd, batch by batch
+    parquet  – ArtifactWriter: Parquet row groups, zstd
+
+and reports write throughput, output size and peak RSS growth. Each
+(format, rows) pair runs in its own subprocess so the peak is that run's alone.
+
+Usage:
+    python benchmarks/bench_result_artifact.py --rows 100000 1000000
+"""
+import argparse
+import datetime as dt
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+FORMATS = ("text", "csv", "csv.gz", "csv.zst", "parquet")
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _batches(rows: int):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors.base import ARROW_BATCH_ROWS
+
+    for start in range(0, rows, ARROW_BATCH_ROWS):
+        ids = pa.array(range(start, min(start + ARROW_BATCH_ROWS, rows)), pa.int64())
+        days = pc.cast(pc.add(pc.cast(pc.remainder(ids, 365), pa.int32()), 19723), pa.int32())
+        yield pa.record_batch({
+            "id": ids,
+            "day": days.cast(pa.date32()),
+            "region": pc.binary_join_element_wise("region_", pc.cast(pc.remainder(ids, 17), pa.string()), ""),
+            "value": pc.divide(pc.cast(pc.remainder(ids, 1000), pa.float64()), 7.0),
+        })
+
+
+def run_one(fmt: str, rows: int) -> dict:
+    import pyarrow as pa
+
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.result_artifact import ArtifactWriter
+
+    batches = list(_batches(rows))                    # the fetched result, already in memory
+    schema = batches[0].schema
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+    if fmt in ("text", "csv"):
+        df = pa.Table.from_batches(batches, schema=schema).to_pandas()
+        out = df.to_string(index=False) if fmt == "text" else df.to_csv(index=False)
+        size = len(out.encode())
+    else:
+        writer = ArtifactWriter(fmt)
+        for batch in batches:
+            writer.write(batch)
+        size = len(writer.part(schema).inline_data.data)
+    seconds = time.perf_counter() - start
+    return {
+        "format": fmt,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds),
+        "size_mb": round(size / 2**20, 2),
+        "peak_mb": round(_max_rss_mb() - baseline, 1),
+    }
+
+
+def spawn(fmt: str, rows: int, timeout_s: float) -> dict:
+    cmd = [sys.executable, __file__, "--child", fmt, str(rows)]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        return {"format": fmt, "rows": rows, "status": f"timeout > {timeout_s:g}s"}
+    if proc.returncode != 0:
+        status = "killed (OOM?)" if proc.returncode < 0 else proc.stderr.strip().splitlines()[-1]
+        return {"format": fmt, "rows": rows, "status": status}
+    return {**json.loads(proc.stdout.strip().splitlines()[-1]), "status": "ok"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--timeout-s", type=float, default=600)
+    parser.add_argument("--child", nargs=2, metavar=("FORMAT", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child[0], int(args.child[1]))))
+        return
+
+    print(f"{'rows':>11}  {'format':>8}  {'seconds':>8}  {'rows/s':>11}  {'size MB':>8}  {'peak MB':>8}")
+    for rows in args.rows:
+        for fmt in args.formats:
+            r = spawn(fmt, rows, args.timeout_s)
+            if r["status"] != "ok":
+                print(f"{rows:>11,}  {fmt:>8}  {r['status']}")
+                continue
+            print(f"{rows:>11,}  {fmt:>8}  {r['seconds']:>8.2f}  {r['rows_per_s']:>11,}  "
+                  f"{r['size_mb']:>8.2f}  {r['peak_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Peak-memory benchmark for the fetcher's result path.
+
+Each (mode, rows) pair runs in its own subprocess against an in-process
+DuckDB stand-in (a view over range(N): id, day, region, value), so the peak
+RSS reported is that run's alone:
+
+    legacy – DataFrame straight from the engine, whole frame rendered to text
+             for the chat message (the pre-Arrow fetcher)
+    arrow  – fetch_arrow_async(): record batches summarised as they stream,
+             chat message rendered from the preview + column stats
+
+"peak MB" is the growth of max RSS over the process baseline (interpreter,
+imports and the empty engine); runs that exceed --timeout-s or die (OOM) are
+reported as such.
+
+Usage:
+    python benchmarks/bench_result_memory.py --rows 100000 1000000 10000000
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+MODES = ("legacy", "arrow")
+
+VIEW_SQL = """
+CREATE OR REPLACE VIEW "Mock_KPIs"."big_result" AS
+SELECT range AS id,
+       DATE '2024-01-01' + CAST(range % 365 AS INTEGER) AS day,
+       'region_' || CAST(range % 17 AS VARCHAR) AS region,
+       (range % 1000) / 7.0 AS value
+FROM range({rows})
+"""
+QUERY = "SELECT id, day, region, value FROM `mock-project.Mock_KPIs.big_result`"
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _engine(rows: int):
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+
+    engine = DuckDBConnector(data_dir=tempfile.mkdtemp(), dataset="Mock_KPIs")
+    engine.connection().execute(VIEW_SQL.format(rows=rows))
+    return engine
+
+
+def run_one(mode: str, rows: int) -> dict:
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent import bigquery_connector as bq
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.arrow_result import ResultSummary
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors.duckdb_local import to_duckdb
+
+    engine = _engine(rows)
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+    if mode == "legacy":
+        df = engine.connection().cursor().execute(to_duckdb(QUERY, engine.dataset)).df()
+        text = f"✅ Query returned **{len(df):,} rows**\n\n```\n{df.to_string(index=False)}\n```"
+        returned = len(df)
+    else:
+        bq.use_connector(engine)
+        summary = ResultSummary()
+        asyncio.run(bq.fetch_arrow_async(QUERY, use_cache=False, on_batch=summary.update))
+        text = summary.render()
+        returned = summary.rows
+    return {
+        "mode": mode,
+        "rows": returned,
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_mb": round(_max_rss_mb() - baseline, 1),
+        "message_kb": round(len(text.encode()) / 1024, 1),
+    }
+
+
+def spawn(mode: str, rows: int, timeout_s: float) -> dict:
+    cmd = [sys.executable, __file__, "--child", mode, str(rows)]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        return {"mode": mode, "rows": rows, "status": f"timeout > {timeout_s:g}s"}
+    if proc.returncode != 0:
+        status = "killed (OOM?)" if proc.returncode < 0 else proc.stderr.strip().splitlines()[-1]
+        return {"mode": mode, "rows": rows, "status": status}
+    return {**json.loads(proc.stdout.strip().splitlines()[-1]), "status": "ok"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--timeout-s", type=float, default=600)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child[0], int(args.child[1]))))
+        return
+
+    print(f"{'rows':>11}  {'mode':>6}  {'peak MB':>8}  {'seconds':>8}  {'message KB':>10}")
+    for rows in args.rows:
+        for mode in args.modes:
+            r = spawn(mode, rows, args.timeout_s)
+            if r["status"] != "ok":
+                print(f"{rows:>11,}  {mode:>6}  {r['status']}")
+                continue
+            print(f"{rows:>11,}  {mode:>6}  {r['peak_mb']:>8.1f}  {r['seconds']:>8.2f}  {r['message_kb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
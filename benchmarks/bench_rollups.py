@@ -0,0 +1,227 @@
+"""
+Rollup benchmark: advice, rewrites, and refresh cost on the local DuckDB backend.
+
+Generates Mock_KPIs-shaped CSVs (--sessions / --answers / --questions rows over
+2024) and a synthetic executed-query log – daily active users over several
+ranges, answers per question, questions per user per week, plus statements no
+rollup answers – then
+
+    advise       – the rollups the advisor proposes from the log, built in full
+    per query    – bytes (dry run) and best-of---repeat latency of the statement
+                   as generated vs. rewritten onto its rollup, and whether both
+                   return the same rows
+    stale        – after rows land in a base table, its rollups are not used
+    refresh      – time of the incremental refresh after --append rows for the
+                   latest days, vs. a full rebuild; a row for an old day forces
+                   a full one
+
+Usage:
+    python benchmarks/bench_rollups.py [--sessions 2000000 --answers 1000000 --questions 1000000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.agents.EchoQL_Agent.rollups import RollupRegistry, propose_rollups, refresh_rollup, rewrite_to_rollups
+from src.agents.EchoQL_Agent.subagents.cost_gate_agent.budget import format_bytes
+from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+
+START = date(2024, 1, 1)
+WORDS = "decision book resource whether chance always reflect firm between deep save may".split()
+
+QUERIES = {
+    "DAU, all of 2024": (
+        "SELECT session_date, COUNT(DISTINCT user_id) AS dau FROM Mock_KPIs.mock_user_sessions "
+        "GROUP BY session_date ORDER BY session_date"
+    ),
+    "DAU, since June": (
+        "SELECT session_date, COUNT(DISTINCT user_id) AS dau FROM Mock_KPIs.mock_user_sessions "
+        "WHERE session_date >= '2024-06-01' GROUP BY session_date ORDER BY session_date"
+    ),
+    "DAU, December": (
+        "SELECT session_date AS day, COUNT(DISTINCT user_id) AS dau FROM Mock_KPIs.mock_user_sessions "
+        "WHERE session_date BETWEEN '2024-12-01' AND '2024-12-31' GROUP BY day"
+    ),
+    "answers per question": (
+        "SELECT question_id, COUNT(*) AS answers FROM Mock_KPIs.mock_answers "
+        "GROUP BY question_id ORDER BY answers DESC, question_id LIMIT 20"
+    ),
+    "answers per question, Q4": (
+        "SELECT question_id, COUNT(*) AS answers FROM Mock_KPIs.mock_answers "
+        "WHERE DATE(created_at) >= '2024-10-01' GROUP BY question_id ORDER BY answers DESC, question_id LIMIT 20"
+    ),
+    "questions per user per week": (
+        "SELECT user_id, DATE_TRUNC(DATE(created_at), WEEK) AS week, COUNT(*) AS questions "
+        "FROM Mock_KPIs.mock_questions GROUP BY 1, 2"
+    ),
+    "questions per user per week, H2": (
+        "SELECT user_id, DATE_TRUNC(DATE(created_at), WEEK) AS week, COUNT(*) AS questions "
+        "FROM Mock_KPIs.mock_questions WHERE created_at >= '2024-07-01' GROUP BY 1, 2"
+    ),
+}
+NOISE = {
+    "sessions over 30 min": "SELECT COUNTIF(duration_min > 30) AS long_sessions FROM Mock_KPIs.mock_user_sessions",
+    "answers with their question": (
+        "SELECT q.question_id, COUNT(a.id) AS answers FROM Mock_KPIs.mock_questions q "
+        "LEFT JOIN Mock_KPIs.mock_answers a ON a.question_id = q.question_id GROUP BY q.question_id"
+    ),
+    "latest sessions": "SELECT * FROM Mock_KPIs.mock_user_sessions ORDER BY session_date DESC LIMIT 10",
+}
+
+
+def timestamp(rng: random.Random) -> str:
+    return (datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(366 * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def make_data(directory: Path, sessions: int, answers: int, questions: int, users: int) -> None:
+    rng = random.Random(7)
+    with open(directory / "mock_users.csv", "w") as f:
+        f.write("id,name,email,birthday\n")
+        for i in range(1, users + 1):
+            f.write(f"{i},User {i},user{i}@example.com,{START - timedelta(days=rng.randrange(7000, 25000))}\n")
+    with open(directory / "mock_user_sessions.csv", "w") as f:
+        f.write("session_id,user_id,duration_min,session_date\n")
+        for i in range(sessions):
+            f.write(f"s{i},{rng.randrange(1, users + 1)},{rng.uniform(1, 120):.2f},"
+                    f"{START + timedelta(days=rng.randrange(366))}\n")
+    with open(directory / "mock_questions.csv", "w") as f:
+        f.write("question_id,user_id,created_at,content\n")
+        for i in range(1, questions + 1):
+            f.write(f"{i},{rng.randrange(1, users + 1)},{timestamp(rng)},{' '.join(rng.sample(WORDS, 6))}?\n")
+    with open(directory / "mock_answers.csv", "w") as f:
+        f.write("id,question_id,user_id,created_at,content\n")
+        for i in range(1, answers + 1):
+            question = int(questions * rng.random() ** 3) + 1          # a few popular questions get most answers
+            f.write(f"{i},{question},{rng.randrange(1, users + 1)},{timestamp(rng)},"
+                    f"{' '.join(rng.sample(WORDS, 8))}.\n")
+
+
+def query_log(rng: random.Random) -> list[dict]:
+    entries = [{"sql": sql} for sql in QUERIES.values() for _ in range(rng.randrange(3, 12))]
+    entries += [{"sql": sql} for sql in NOISE.values() for _ in range(rng.randrange(1, 6))]
+    rng.shuffle(entries)
+    return entries
+
+
+def rows(connector: DuckDBConnector, sql: str) -> list:
+    table = connector.execute_arrow(sql).read_all().to_pylist()
+    return sorted(tuple(round(v, 6) if isinstance(v, float) else v for v in row.values()) for row in table)
+
+
+def best_ms(connector: DuckDBConnector, sql: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connector.execute_arrow(sql).read_all()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def refresh_all(connector, registry, catalog, full: bool = False) -> dict[str, tuple[str, float]]:
+    out = {}
+    for rollup in registry.rollups():
+        result = refresh_rollup(connector, rollup, registry.state(rollup.name), catalog, full=full)
+        if result.action == "failed":
+            sys.exit(f"{rollup.name}: {result.error}")
+        registry.set_state(rollup.name, result.state)
+        out[rollup.name] = (result.action, result.seconds)
+    return out
+
+
+def usable(connector, registry, catalog) -> list:
+    return [r for r in registry.rollups() if registry.usable(r, connector.table_modified, catalog)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2_000_000)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--append", type=int, default=20_000, help="session rows appended before the refresh")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        start = time.perf_counter()
+        make_data(tmp, args.sessions, args.answers, args.questions, args.users)
+        connector = DuckDBConnector(data_dir=tmp, dataset=catalog.dataset)
+        connector.connection()
+        print(f"data: {args.sessions:,} sessions, {args.answers:,} answers, {args.questions:,} questions "
+              f"({time.perf_counter() - start:.1f}s to generate and load)")
+
+        entries = query_log(random.Random(11))
+        proposals = propose_rollups(entries, catalog)
+        registry = RollupRegistry(tmp / "rollups.json")
+        print(f"\nadvise: {len(entries)} logged statements → {len(proposals)} rollups")
+        for proposal in proposals:
+            registry.add(proposal.rollup)
+        for name, (action, seconds) in refresh_all(connector, registry, catalog).items():
+            state = registry.state(name)
+            print(f"  {name:<48} {state.rows:>9,} rows  built in {seconds:.2f}s "
+                  f"(answers {next(p.queries for p in proposals if p.rollup.name == name)} statements)")
+
+        rollups = usable(connector, registry, catalog)
+        print(f"\n{'statement':<34} {'bytes before':>12} {'after':>10} {'ms before':>10} {'after':>8}  same rows")
+        total_before = total_after = 0
+        for name, sql in (QUERIES | NOISE).items():
+            rewrite = rewrite_to_rollups(sql, rollups, catalog)
+            if not rewrite.rollups:
+                print(f"{name:<34} not rewritten")
+                continue
+            before, after = connector.dry_run(sql), connector.dry_run(rewrite.sql)
+            total_before += before.bytes_processed
+            total_after += after.bytes_processed
+            same = rows(connector, sql) == rows(connector, rewrite.sql)
+            print(
+                f"{name:<34} {format_bytes(before.bytes_processed):>12} {format_bytes(after.bytes_processed):>10} "
+                f"{best_ms(connector, sql, args.repeat):10.1f} {best_ms(connector, rewrite.sql, args.repeat):8.1f}"
+                f"  {'yes' if same else 'NO'}"
+            )
+        print(f"rewritten statements scan {format_bytes(total_after)} instead of {format_bytes(total_before)}")
+
+        rng = random.Random(13)
+        latest = date.fromisoformat(registry.state(rollups[0].name).watermark or "2024-12-31")
+        values = ", ".join(
+            f"('n{i}', {rng.randrange(1, args.users + 1)}, {rng.uniform(1, 120):.2f}, "
+            f"DATE '{latest + timedelta(days=rng.randrange(0, 2))}')"
+            for i in range(args.append)
+        )
+        connector.run_statements([f"INSERT INTO {catalog.dataset}.mock_user_sessions VALUES {values}"])
+        stale = {r.name for r in rollups} - {r.name for r in usable(connector, registry, catalog)}
+        print(f"\nstale: {args.append:,} sessions appended → {len(stale)} rollups no longer used until refreshed")
+
+        print("refresh:")
+        for name, (action, seconds) in refresh_all(connector, registry, catalog).items():
+            if action != "fresh":
+                print(f"  {name:<48} {action:<12} {seconds:.2f}s")
+        for name, (action, seconds) in refresh_all(connector, registry, catalog, full=True).items():
+            if name in stale:
+                print(f"  {name:<48} {action:<12} {seconds:.2f}s")
+        connector.run_statements([
+            f"INSERT INTO {catalog.dataset}.mock_user_sessions VALUES ('late', 1, 10.0, DATE '2024-03-01')"
+        ])
+        for name, (action, seconds) in refresh_all(connector, registry, catalog).items():
+            if action != "fresh":
+                print(f"  {name:<48} {action:<12} {seconds:.2f}s  (row for an old day)")
+
+        rollups = usable(connector, registry, catalog)
+        same = all(
+            rows(connector, sql) == rows(connector, rewrite_to_rollups(sql, rollups, catalog).sql)
+            for sql in QUERIES.values()
+        )
+        print(f"after the refreshes every rewrite returns the same rows: {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Semantic NL→SQL cache: hit rate and end-to-end latency from a replayed question log.
+
+A seeded question log is generated over the schema catalog: ~60 intents
+(question → SQL), drawn with a Zipf-like popularity, each occurrence phrased
+with a random surface variant (case, punctuation, filler words, spacing).
+Several intents differ only in a number ("last 7 / 30 / 90 days",
+"top 5 / 10") or a name ("users named Alice / Bob") and must *not* be
+served each other's SQL.
+
+The log is replayed through SemanticCache. On a miss the authoring chain
+(checker → generator → validator) is charged --chain-ms (default from
+typical Gemini Flash timings) and the SQL is stored; on a hit only the
+measured lookup time is charged. Execution time is identical on both paths
+and left out.
+
+Reported:
+    • hit rate (exact / semantic), false hits (cached SQL ≠ intent SQL)
+    • end-to-end authoring latency with vs. without the cache
+    • lookup latency with --fill synthetic entries already cached
+
+Usage:
+    python benchmarks/bench_semantic_cache.py [--log-size 2000 --chain-ms 3200 --fill 100000]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.agents.EchoQL_Agent.retrievers.table_retriever import make_embedder
+from src.agents.EchoQL_Agent.subagents.semantic_cache_agent.semantic_cache import SemanticCache
+
+FILLERS = ["", "please ", "can you tell me ", "please show ", "I'd like to know "]
+SUFFIXES = ["?", "", ".", " ?", "??"]
+
+
+def build_intents(rng: random.Random) -> list[tuple[str, str]]:
+    catalog = load_catalog()
+    ds = catalog.dataset
+    intents = []
+    for table in catalog.tables.values():
+        noun = table.name.replace("mock_", "").replace("_", " ")
+        intents.append((f"how many {noun} are there", f"SELECT COUNT(*) FROM {ds}.{table.name}"))
+        for col in table.columns.values():
+            if col.type in ("TIMESTAMP", "DATE"):
+                for days in (7, 30, 90):
+                    intents.append((
+                        f"how many {noun} were created in the last {days} days",
+                        f"SELECT COUNT(*) FROM {ds}.{table.name} "
+                        f"WHERE DATE({col.name}) >= DATE_SUB(CURRENT_DATE(), INTERVAL {days} DAY)",
+                    ))
+                for grain in ("day", "week", "month"):
+                    intents.append((
+                        f"number of {noun} per {grain}",
+                        f"SELECT DATE_TRUNC(DATE({col.name}), {grain.upper()}) AS {grain}, COUNT(*) "
+                        f"FROM {ds}.{table.name} GROUP BY 1 ORDER BY 1",
+                    ))
+            elif col.name.endswith("_id"):
+                for top in (5, 10):
+                    intents.append((
+                        f"top {top} {col.name.replace('_id', '')}s by number of {noun}",
+                        f"SELECT {col.name}, COUNT(*) AS n FROM {ds}.{table.name} "
+                        f"GROUP BY 1 ORDER BY n DESC LIMIT {top}",
+                    ))
+    if catalog.table("mock_users"):
+        for name in ("Alice", "Bob", "Carol"):
+            intents.append((
+                f"how many users are named {name}",
+                f"SELECT COUNT(*) FROM {ds}.mock_users WHERE name = '{name}'",
+            ))
+    rng.shuffle(intents)
+    return intents
+
+
+def phrase(question: str, rng: random.Random) -> str:
+    text = rng.choice(FILLERS) + question + rng.choice(SUFFIXES)
+    if rng.random() < 0.3:
+        text = text.capitalize()
+    if rng.random() < 0.2:
+        text = text.replace(" ", "  ", 1)
+    return text
+
+
+def build_log(intents, n: int, rng: random.Random) -> list[tuple[str, str]]:
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(intents))]
+    return [
+        (phrase(question, rng), sql)
+        for question, sql in rng.choices(intents, weights=weights, k=n)
+    ]
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def replay(log, chain_ms: float, threshold: float, model: str) -> None:
+    embedder = make_embedder(model)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SemanticCache(
+            path=f"{tmp}/semantic_cache.sqlite3",
+            embed=embedder.embed,
+            model=embedder.name,
+            fingerprint=lambda: load_catalog().fingerprint,
+            threshold=threshold,
+        )
+        with_cache, false_hits = [], 0
+        for question, sql in log:
+            start = time.perf_counter()
+            hit = cache.get(question)
+            lookup_ms = (time.perf_counter() - start) * 1000
+            if hit:
+                false_hits += hit.sql != sql
+                with_cache.append(lookup_ms)
+            else:
+                with_cache.append(lookup_ms + chain_ms)
+                cache.put(question, sql)
+        stats = cache.stats()
+
+    n = len(log)
+    print(f"log: {n} questions, threshold {threshold}")
+    print(
+        f"hit rate {stats.hit_rate:6.1%}  (exact {stats.exact_hits / n:6.1%}, "
+        f"semantic {stats.semantic_hits / n:6.1%})   false hits {false_hits}"
+    )
+    print(
+        f"authoring latency ms   no cache: mean {chain_ms:8.1f}   "
+        f"cache: mean {statistics.mean(with_cache):8.1f}  p50 {_pct(with_cache, .5):8.2f}  "
+        f"p95 {_pct(with_cache, .95):8.1f}"
+    )
+
+
+def lookup_at_scale(fill: int, model: str, rng: random.Random) -> None:
+    embedder = make_embedder(model)
+    words = "users answers questions sessions signed posted daily weekly average count top per by last days country device".split()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SemanticCache(
+            path=f"{tmp}/semantic_cache.sqlite3",
+            embed=embedder.embed,
+            model=embedder.name,
+            fingerprint=lambda: "bench",
+            max_entries=fill + 1,
+        )
+        start = time.perf_counter()
+        for i in range(fill):
+            cache.put(" ".join(rng.choices(words, k=6)) + f" {i}", f"SELECT {i}")
+        fill_s = time.perf_counter() - start
+        probes = [" ".join(rng.choices(words, k=7)) for _ in range(200)]
+        latencies = []
+        for probe in probes:
+            start = time.perf_counter()
+            cache.get(probe)
+            latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"\nlookup with {fill:,} entries (filled in {fill_s:.1f}s): "
+        f"p50 {_pct(latencies, .5):6.2f} ms  p95 {_pct(latencies, .95):6.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Semantic cache hit rate / latency replay")
+    parser.add_argument("--log-size", type=int, default=2000)
+    parser.add_argument("--chain-ms", type=float, default=3200.0, help="cost of checker→generator→validator")
+    parser.add_argument("--threshold", type=float, default=0.95)
+    parser.add_argument("--model", default="hashing")
+    parser.add_argument("--fill", type=int, default=100_000, help="entries for the lookup-at-scale test (0 skips)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    intents = build_intents(rng)
+    replay(build_log(intents, args.log_size, rng), args.chain_ms, args.threshold, args.model)
+    if args.fill:
+        lookup_at_scale(args.fill, args.model, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+SQL optimizer benchmark: bytes scanned before and after the rewrites.
+
+Runs the optimizer (src/agents/EchoQL_Agent/subagents/sql_optimizer_agent/)
+over the generated SQL of the pipeline corpus plus the query shapes below –
+function-wrapped partition predicates, filters above joins, SELECT * in
+CTEs, a day in a named time zone – and, on the local DuckDB backend, reports
+for each rewritten statement (and every shape, rewritten or not)
+
+    rewrites   – the passes that applied
+    before     – dry-run bytes of the SQL as generated
+    after      – dry-run bytes of the rewritten SQL (partition-aware estimate)
+    same rows  – both statements return the same rows (on DuckDB, which
+                 counts TIMESTAMP_DIFF in unit boundaries crossed where
+                 BigQuery truncates the elapsed time, so such shapes may
+                 differ here and not on BigQuery)
+    ms         – time spent in optimize()
+
+Usage:
+    python benchmarks/bench_sql_optimizer.py [--corpus-only]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.subagents.cost_gate_agent.budget import format_bytes
+from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+from src.agents.EchoQL_Agent.subagents.sql_optimizer_agent.optimizer import optimize
+
+CORPUS_PATH = Path(__file__).with_name("harness") / "pipeline_corpus.json"
+
+SHAPES = {
+    "day of timestamp": (
+        "SELECT COUNT(*) AS questions FROM Mock_KPIs.mock_questions WHERE DATE(created_at) = '2024-05-01'"
+    ),
+    "day of timestamp, zoned": (
+        "SELECT COUNT(*) AS questions FROM Mock_KPIs.mock_questions "
+        "WHERE DATE(created_at, 'America/Los_Angeles') = '2024-05-01'"
+    ),
+    "quarter of answers": (
+        "SELECT COUNT(*) AS answers FROM Mock_KPIs.mock_answers "
+        "WHERE DATE(created_at) BETWEEN '2024-01-01' AND '2024-03-31'"
+    ),
+    "DAU, last 30 days": (
+        "SELECT session_date, COUNT(DISTINCT user_id) AS dau FROM Mock_KPIs.mock_user_sessions "
+        "WHERE DATE_DIFF(DATE '2024-12-31', session_date, DAY) < 30 GROUP BY session_date"
+    ),
+    "answers, last 24 hours": (
+        "SELECT COUNT(*) AS answers FROM Mock_KPIs.mock_answers "
+        "WHERE TIMESTAMP_DIFF(TIMESTAMP '2024-12-31 23:59:59', created_at, HOUR) < 24"
+    ),
+    "filter above join": (
+        "WITH s AS (SELECT * FROM Mock_KPIs.mock_user_sessions) "
+        "SELECT u.name, COUNT(*) AS sessions FROM s JOIN Mock_KPIs.mock_users u ON s.user_id = u.id "
+        "WHERE s.session_date >= '2024-12-01' GROUP BY u.name"
+    ),
+    "unanswered since June": (
+        "SELECT q.user_id, COUNT(*) AS unanswered FROM (SELECT * FROM Mock_KPIs.mock_questions) q "
+        "LEFT JOIN (SELECT * FROM Mock_KPIs.mock_answers) a ON a.question_id = q.question_id "
+        "WHERE DATE(q.created_at) >= '2024-06-01' AND a.id IS NULL GROUP BY q.user_id"
+    ),
+    "weekly questions per user": (
+        "SELECT user_id, week, n FROM (SELECT user_id, DATE_TRUNC(DATE(created_at), WEEK) AS week, "
+        "COUNT(*) AS n FROM Mock_KPIs.mock_questions GROUP BY 1, 2) WHERE user_id < 100"
+    ),
+}
+
+
+def corpus_sql() -> dict[str, str]:
+    questions = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))["questions"]
+    return {q["id"]: q["llm"]["generator"] for q in questions if q["llm"].get("generator")}
+
+
+def rows(connector: DuckDBConnector, sql: str) -> list:
+    return sorted(map(repr, connector.execute_arrow(sql).read_all().to_pylist()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus-only", action="store_true")
+    args = parser.parse_args()
+
+    statements = corpus_sql() | ({} if args.corpus_only else SHAPES)
+    connector = DuckDBConnector()
+    total_before = total_after = rewritten = 0
+    print(f"{'statement':<28} {'rewrites':<44} {'before':>10} {'after':>10}  same rows     ms")
+    for name, sql in statements.items():
+        start = time.perf_counter()
+        result = optimize(sql)
+        ms = (time.perf_counter() - start) * 1000
+        before = connector.dry_run(sql)
+        after = connector.dry_run(result.sql) if result.rewrites else before
+        if before.error or after.error:
+            print(f"{name:<28} skipped, dry run failed: {(before.error or after.error)[:60]}")
+            continue
+        total_before += before.bytes_processed
+        total_after += after.bytes_processed
+        if not result.rewrites and name not in SHAPES:
+            continue
+        rewritten += bool(result.rewrites)
+        same = rows(connector, sql) == rows(connector, result.sql)
+        print(
+            f"{name:<28} {', '.join(sorted(set(result.rewrites))) or '(none)':<44} {format_bytes(before.bytes_processed):>10} "
+            f"{format_bytes(after.bytes_processed):>10}  {'yes' if same else 'NO':<9} {ms:6.2f}"
+        )
+    print(
+        f"\n{rewritten} of {len(statements)} statements rewritten; all statements scan "
+        f"{format_bytes(total_after)} instead of {format_bytes(total_before)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Table retriever: recall@k and latency at 4, 1k and 50k tables.
+
+    4      – the real schema catalog with hand-labelled questions
+    1k/50k – synthetic catalogs: each table has a domain, an entity and a
+             few attribute columns; each question names the domain, the
+             entity and two attributes of exactly one target table
+
+For every catalog size the script reports index build time, recall@k
+(fraction of needed tables found in the top k), single-question latency
+(embed + search, p50 / p95) and batched throughput.
+
+Usage:
+    python benchmarks/bench_table_retriever.py [--sizes 4 1000 50000 --queries 200 --model hashing]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import Catalog, Column, Table, load_catalog
+from src.agents.EchoQL_Agent.retrievers.table_retriever import TableRetriever, make_embedder
+
+REAL_QUESTIONS = [
+    ("How many users signed up?", ["mock_users"]),
+    ("What is the daily number of active users over the last 30 days?", ["mock_user_sessions"]),
+    ("Which 10 users posted the most answers? Show their names.", ["mock_answers", "mock_users"]),
+    ("Average number of answers per question last month", ["mock_answers", "mock_questions"]),
+    ("What is the average session length per user birthday decade?", ["mock_user_sessions", "mock_users"]),
+    ("How many questions were posted each week?", ["mock_questions"]),
+    ("Average session duration per day", ["mock_user_sessions"]),
+    ("Which questions received no answers?", ["mock_questions", "mock_answers"]),
+]
+
+DOMAINS = """billing marketing support logistics inventory payroll sales finance security
+    analytics shipping warehouse procurement compliance recruiting training legal risk
+    fraud loyalty pricing catalog content search ads mobile web email sms partner""".split()
+ENTITIES = """invoice payment refund customer account subscription order shipment parcel
+    ticket agent campaign lead contact product sku supplier contract employee salary
+    device session click impression coupon review rating return carrier route vehicle
+    driver store region branch claim policy quote budget forecast transaction ledger
+    audit alert incident event message notification deal opportunity visit page""".split()
+ATTRIBUTES = """amount currency status created_at updated_at country city channel source
+    priority score duration cost margin discount tax quantity weight distance category
+    segment tier language platform version browser referrer owner team manager balance
+    revenue fee rate count latency error_code reason outcome stage deadline""".split()
+
+
+def synthetic_catalog(n: int, seed: int) -> Catalog:
+    rng = random.Random(seed)
+    tables = []
+    for i in range(n):
+        domain, entity = rng.choice(DOMAINS), rng.choice(ENTITIES)
+        attrs = rng.sample(ATTRIBUTES, 4)
+        name = f"{domain}_{entity}_{i}"
+        columns = {"id": Column("id", "INT64", f"Unique identifier for the {entity}", name)}
+        for attr in attrs:
+            columns[attr] = Column(attr, "STRING", f"{attr.replace('_', ' ')} of the {entity}", name)
+        tables.append(
+            Table(
+                name=name,
+                description=f"{entity.title()} records of the {domain} team, with {', '.join(attrs)}.",
+                columns=columns,
+                primary_key=("id",),
+            )
+        )
+    return Catalog("Synthetic", tables)
+
+
+def synthetic_questions(catalog: Catalog, n: int, seed: int) -> list[tuple[str, list[str]]]:
+    rng = random.Random(seed + 1)
+    tables = list(catalog.tables.values())
+    out = []
+    for _ in range(n):
+        table = rng.choice(tables)
+        domain, entity = table.name.split("_")[:2]
+        a, b = rng.sample([c for c in table.columns if c != "id"], 2)
+        template = rng.choice([
+            "What is the average {a} of {entity}s in {domain}, by {b}?",
+            "Show {domain} {entity} {a} per {b}",
+            "How many {entity}s in {domain} have a {a} above the {b}?",
+        ])
+        out.append((template.format(a=a.replace("_", " "), b=b.replace("_", " "), entity=entity, domain=domain), [table.name]))
+    return out
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(label: str, catalog: Catalog, questions, model: str, ks: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        retriever = TableRetriever(catalog, make_embedder(model), tmp, top_k=max(ks))
+        start = time.perf_counter()
+        retriever.build()
+        build_s = time.perf_counter() - start
+        retriever.index                                    # open the memory-mapped index
+
+        texts = [q for q, _ in questions]
+        latencies = []
+        hits = []
+        for text in texts:
+            start = time.perf_counter()
+            hits.append(retriever.scored([text], max(ks))[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        for i in range(0, len(texts), 64):
+            retriever.scored(texts[i:i + 64], max(ks))
+        batched_qps = len(texts) / (time.perf_counter() - start)
+
+    recalls = []
+    for k in ks:
+        found = [
+            len(set(needed) & {name for name, _ in top[:k]}) / len(needed)
+            for (_, needed), top in zip(questions, hits)
+        ]
+        recalls.append(f"R@{k} {statistics.mean(found):6.1%}")
+    print(
+        f"{label:>7} tables  build {build_s:7.2f}s  {'  '.join(recalls)}  "
+        f"latency ms p50 {_pct(latencies, .5):6.2f} p95 {_pct(latencies, .95):6.2f}  "
+        f"batched {batched_qps:8.0f} q/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Table retriever recall@k / latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 1000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--model", default="hashing")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        if size == 4:
+            run("4", load_catalog(), REAL_QUESTIONS, args.model, ks=[1, 2, 3])
+        else:
+            catalog = synthetic_catalog(size, args.seed)
+            questions = synthetic_questions(catalog, args.queries, args.seed)
+            run(f"{size:,}", catalog, questions, args.model, ks=[1, 5, 10])
+
+
+if __name__ == "__main__":
+    main()
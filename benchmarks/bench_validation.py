@@ -0,0 +1,168 @@
+"""
+Serial vs. parallel SQL validation benchmark.
+
+Runs the validator followed by the cost gate – the stretch between SQL
+authoring and execution – over the seeded corpus of bench_local_validator.py
+plus UNNEST queries the local engine cannot decide (some with a misspelt
+struct field), with the dry run behind the fake BigQuery client
+(--dry-run-latency-ms) and a scripted LLM validator (--llm-ms). Modes:
+
+    serial    – local check → dry run → LLM, one after another
+    parallel  – local check and dry run raced, LLM as last resort (default)
+    hedged    – parallel, plus the LLM started after --hedge-ms without a verdict
+
+and reports validator + cost gate latency (mean / p50 / p95 / p99), dry runs
+and LLM calls issued, and agreement with the corpus labels.
+
+Usage:
+    python benchmarks/bench_validation.py --queries 200 [--dry-run-latency-ms 150 --llm-ms 800]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+os.environ.setdefault("ECHOQL_TRACE", "0")
+os.environ["ECHOQL_COST_GATE_ACTION"] = "reject"      # no repair LLM in the loop
+
+from bench_local_validator import build_corpus
+from harness.local_bigquery import LocalBigQueryClient
+from harness.stub_llm import ScriptedLlm
+
+MODES = ("serial", "parallel", "hedged")
+APP_NAME = "bench_validation"
+
+
+def _opaque_queries(rng: random.Random, n: int) -> list[dict]:
+    """UNNEST'ed sources the local engine reports as inconclusive; a third reference a missing field."""
+    from src.agents.EchoQL_Agent.catalog import load_catalog
+
+    catalog = load_catalog()
+    out = []
+    for _ in range(n):
+        table = rng.choice(list(catalog.tables.values()))
+        col = rng.choice(list(table.columns))
+        field, label = ("b", "invalid") if rng.random() < 1 / 3 else ("a", "valid")
+        out.append({
+            "sql": f"SELECT t.{col}, s.{field} FROM {catalog.dataset}.{table.name} t, "
+                   f"UNNEST([STRUCT(1 AS a), STRUCT(2 AS a)]) AS s LIMIT 10",
+            "label": label,
+            "defect": "struct_field" if label == "invalid" else None,
+        })
+    return out
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def run_mode(mode: str, corpus: list[dict], engine, ledger: list, args) -> dict:
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from src.agents.EchoQL_Agent.subagents.cost_gate_agent.agent import CostGateAgent
+    from src.agents.EchoQL_Agent.subagents.sql_validator_agent import agent as validator
+
+    validator.VALIDATION_MODE = "serial" if mode == "serial" else "parallel"
+    validator.LLM_HEDGE_MS = args.hedge_ms if mode == "hedged" else -1
+    validator.VALIDATION_COUNTERS.clear()
+    verdict: dict[str, str] = {}
+
+    def capture(callback_context):                    # state as the fetcher would see it
+        verdict["status"] = str(callback_context.state.get("validation_status", ""))
+
+    pair = SequentialAgent(
+        name="ValidateThenGate",
+        sub_agents=[validator.SqlValidatorWrapper(), CostGateAgent()],
+        after_agent_callback=capture,
+    )
+    runner = InMemoryRunner(agent=pair, app_name=APP_NAME)
+
+    latencies, agree, calls_before, dry_runs_before = [], 0, len(ledger), engine.dry_runs
+    for item in corpus:
+        session = await runner.session_service.create_session(
+            app_name=APP_NAME, user_id="bench", state={"sql_query": item["sql"]}
+        )
+        start = time.perf_counter()
+        async for _ in runner.run_async(
+            user_id="bench",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="Validate the SQL.")]),
+        ):
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+        status = verdict.pop("status", "").strip().lower()
+        agree += ("valid" if status == "valid" else "invalid") == item["label"]
+
+    await asyncio.sleep(2 * args.dry_run_latency_ms / 1000 + 0.1)  # let abandoned dry runs finish before counting
+    return {
+        "mode": mode,
+        "mean": statistics.mean(latencies),
+        "p50": _pct(latencies, .50),
+        "p95": _pct(latencies, .95),
+        "p99": _pct(latencies, .99),
+        "dry_runs": engine.dry_runs - dry_runs_before,
+        "llm_calls": len(ledger) - calls_before,
+        "agreement": agree / len(corpus),
+        "counters": dict(validator.VALIDATION_COUNTERS),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--opaque-share", type=float, default=0.25, help="share of locally undecidable queries")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dry-run-latency-ms", type=float, default=150.0)
+    parser.add_argument("--llm-ms", type=float, default=800.0, help="scripted LLM validator latency")
+    parser.add_argument("--hedge-ms", type=float, default=300.0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent import bigquery_connector
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+    from src.agents.EchoQL_Agent.subagents.sql_validator_agent.agent import _validator_llm
+
+    rng = random.Random(args.seed)
+    opaque = int(args.queries * args.opaque_share)
+    corpus = build_corpus(args.queries - opaque, args.seed) + _opaque_queries(rng, opaque)
+    rng.shuffle(corpus)
+
+    engine = DuckDBConnector()
+    engine.connection()                               # load the CSVs before the clock starts
+    engine.dry_runs = 0
+    dry_run = engine.dry_run
+
+    def counted_dry_run(sql: str):
+        engine.dry_runs += 1
+        return dry_run(sql)
+
+    engine.dry_run = counted_dry_run
+    bigquery_connector.use_client_factory(lambda: LocalBigQueryClient(engine, args.dry_run_latency_ms / 1000))
+    ledger: list = []
+    _validator_llm.model = ScriptedLlm(
+        model="scripted-validator", role="validator", script={}, ledger=ledger, default="valid",
+        ttft_s=args.llm_ms / 1000,
+    )
+
+    print(f"corpus: {len(corpus)} queries ({opaque} locally undecidable), "
+          f"dry run {args.dry_run_latency_ms:g} ms, LLM {args.llm_ms:g} ms")
+    print(f"\n{'mode':<9} {'mean ms':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'dry runs':>9} {'llm calls':>10} {'agree':>7}")
+    for mode in args.modes:
+        r = asyncio.run(run_mode(mode, corpus, engine, ledger, args))
+        print(f"{r['mode']:<9} {r['mean']:>9.2f} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f} "
+              f"{r['dry_runs']:>9} {r['llm_calls']:>10} {r['agreement']:>7.1%}")
+        print(f"{'':<9} {r['counters']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Fake BigQuery client backed by the local DuckDB connector.
+
+The pipeline benchmark normally routes the fetcher straight to
+`DuckDBConnector` (no job overhead). To exercise the BigQuery code path –
+job submission, polling, simulated job latency – this client mimics the part
+of the google-cloud-bigquery surface the BigQuery connector uses (query → job
+with done / result / cancel, result().to_arrow_iterable(), get_table().modified,
+dry-run jobs with total_bytes_processed / referenced_tables) and plugs in
+through `bigquery_connector.use_client_factory`. Dry runs take the engine's
+estimate from table column sizes after the same simulated latency, and
+compile errors raise BadRequest.
+"""
+import datetime as dt
+import time
+from types import SimpleNamespace
+
+import pyarrow as pa
+from google.api_core.exceptions import BadRequest
+
+from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+
+
+class LocalRowIterator:
+    def __init__(self, table: pa.Table) -> None:
+        self._table = table
+
+    def to_arrow(self) -> pa.Table:
+        return self._table
+
+    def to_arrow_iterable(self):
+        return iter(self._table.to_batches())
+
+
+class LocalJob:
+    """Runs eagerly; errors surface from result(), as with a BigQuery job."""
+
+    def __init__(self, engine: DuckDBConnector, sql: str, latency_s: float) -> None:
+        self.job_id = f"local_{id(self):x}"
+        self._table: pa.Table | None = None
+        self._error: Exception | None = None
+        try:
+            self._table = engine.execute_arrow(sql).read_all()
+        except Exception as exc:                      # surfaced like a BigQuery 400
+            self._error = RuntimeError(f"400 {exc}")
+        self._ends_at = time.monotonic() + latency_s
+
+    def done(self) -> bool:
+        return time.monotonic() >= self._ends_at
+
+    def result(self) -> LocalRowIterator:
+        time.sleep(max(0.0, self._ends_at - time.monotonic()))
+        if self._error is not None:
+            raise self._error
+        return LocalRowIterator(self._table)
+
+    def cancel(self) -> bool:
+        return True
+
+
+class LocalBigQueryClient:
+    _modified = dt.datetime.now(dt.timezone.utc)
+
+    def __init__(self, engine: DuckDBConnector, latency_s: float = 0.0) -> None:
+        self._engine = engine
+        self._latency_s = latency_s
+
+    def query(self, sql: str, *args, job_config=None, **kwargs):
+        if job_config is not None and job_config.dry_run:
+            return self._dry_run(sql)
+        return LocalJob(self._engine, sql, self._latency_s)
+
+    def _dry_run(self, sql: str) -> SimpleNamespace:
+        time.sleep(self._latency_s)
+        result = self._engine.dry_run(sql)
+        if result.error is not None:
+            raise BadRequest(result.error)
+        tables = [t.split(".")[-2:] for t in result.tables]
+        return SimpleNamespace(
+            total_bytes_processed=result.bytes_processed,
+            referenced_tables=[SimpleNamespace(dataset_id=d, table_id=t) for d, t in tables],
+        )
+
+    def get_table(self, table_id: str):
+        return SimpleNamespace(modified=self._modified)
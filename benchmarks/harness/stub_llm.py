@@ -0,0 +1,105 @@
+"""
+LLM stand-ins for the offline pipeline benchmark.
+
+    ScriptedLlm  – answers from a script {question: {role: text}}; the role
+                   (checker / generator / validator / repair) is fixed per
+                   instance, the question is the first user message of the
+                   request. Optional simulated latency: ttft + prefill + decode.
+    RecordingLlm – wraps a real model and records every answer in the same
+                   script format, so a live run can be replayed offline later.
+
+Both append one LlmCall per request to a shared ledger (prompt / output tokens
+– real usage metadata when recording, chars/4 estimates when scripted).
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+@dataclass
+class LlmCall:
+    role: str
+    question: str
+    prompt_tokens: int
+    output_tokens: int
+    estimated: bool
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, round(len(text) / 4))
+
+
+def request_question(llm_request: LlmRequest) -> str:
+    """Text of the first user message – the NL question the invocation started with."""
+    for content in llm_request.contents:
+        if content.role == "user" and content.parts:
+            return " ".join(p.text for p in content.parts if p.text).strip()
+    return ""
+
+
+def request_text(llm_request: LlmRequest) -> str:
+    system = llm_request.config.system_instruction if llm_request.config else ""
+    parts = [system if isinstance(system, str) else str(system or "")]
+    for content in llm_request.contents:
+        parts.extend(p.text for p in content.parts or [] if p.text)
+    return "\n".join(parts)
+
+
+class ScriptedLlm(BaseLlm):
+    role: str
+    script: dict
+    ledger: Any                                       # shared list – Any keeps pydantic from copying it
+    default: str = ""
+    ttft_s: float = 0.0
+    prefill_tps: float = 0.0
+    decode_tps: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        question = request_question(llm_request)
+        text = self.script.get(question, {}).get(self.role, self.default)
+        prompt_tokens = estimate_tokens(request_text(llm_request))
+        output_tokens = estimate_tokens(text)
+        delay = self.ttft_s
+        if self.prefill_tps:
+            delay += prompt_tokens / self.prefill_tps
+        if self.decode_tps:
+            delay += output_tokens / self.decode_tps
+        if delay:
+            await asyncio.sleep(delay)
+        self.ledger.append(LlmCall(self.role, question, prompt_tokens, output_tokens, True))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=output_tokens
+            ),
+        )
+
+
+class RecordingLlm(BaseLlm):
+    role: str
+    inner: BaseLlm
+    recording: Any                                    # shared dict, filled in place
+    ledger: Any
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        question = request_question(llm_request)
+        chunks, usage = [], None
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            if response.content and response.content.parts:
+                chunks.extend(p.text for p in response.content.parts if p.text)
+            usage = response.usage_metadata or usage
+            yield response
+        text = "".join(chunks)
+        self.recording.setdefault(question, {})[self.role] = text
+        prompt = (usage and usage.prompt_token_count) or estimate_tokens(request_text(llm_request))
+        output = (usage and usage.candidates_token_count) or estimate_tokens(text)
+        self.ledger.append(LlmCall(self.role, question, prompt, output, usage is None))
@@ -1,52 +1,84 @@
 """
-This script generates LLM-friendly text descriptions for a BigQuery dataset schema.
+This script refreshes the schema catalog (src/agents/EchoQL_Agent/catalog/schema_catalog.json)
+from the warehouse, incrementally (see src/agents/EchoQL_Agent/catalog/refresh.py).
+
+Column types and the last modification of every table come from the backend's table metadata
+(for BigQuery, the tables API – no query job). Only tables that are new or changed since the
+catalog was last written are profiled – row count, null fraction, approximate distinct count,
+min / max of dates, timestamps and numbers, most frequent values – several at a time.
+Hand-written table/column descriptions, primary keys and foreign keys already present in the
+catalog are kept; new tables and columns are added with the description the backend has for them.
+
+Usage:
+    python scripts/generate_schema_catalog.py [--backend bigquery|duckdb] [--workers 8]
+                                              [--force] [--keep-versions 5] [--output PATH]
 """
-from google.cloud import bigquery
-
-def generate_schema_text(project_id: str, dataset_id: str, output_file: str = "../configs/mock_user_sessions_description.txt"):
-    client = bigquery.Client(project=project_id)
-
-    # Get table descriptions
-    tables_query = f"""
-        SELECT table_name, table_type
-        FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.TABLES`
-    """
-    tables = client.query(tables_query).result()
-
-    # Get column metadata
-    columns_query = f"""
-        SELECT table_name, column_name, data_type
-        FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.COLUMNS`
-    """
-    columns = client.query(columns_query).result()
-
-    # Organize metadata
-    schema = {}
-    for row in tables:
-        schema[row.table_name] = {
-            "description": f"{row.table_type} in {dataset_id}",
-            "columns": []
-        }
-
-    for row in columns:
-        if row.table_name in schema:
-            schema[row.table_name]["columns"].append((row.column_name, row.data_type))
-
-    # Format as plain text
-    output_lines = []
-    for table_name, data in schema.items():
-        output_lines.append(f"Table: {table_name}")
-        output_lines.append(f"Description: {data['description']}")
-        output_lines.append("Columns:")
-        for col_name, col_type in data["columns"]:
-            output_lines.append(f"- {col_name}: {col_type}")
-        output_lines.append("")  # Blank line between tables
-
-    # Write to a text file
-    with open(output_file, "w") as f:
-        f.write("\n".join(output_lines))
-
-    print(f"✅ Schema text saved to {output_file}")
-
-# Example usage:
-generate_schema_text("adk-hackathon-461216", "Mock_KPIs")
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import load_catalog, save_catalog
+from src.agents.EchoQL_Agent.catalog.refresh import refresh_catalog
+
+
+def make_connector(backend: str, project_id: str):
+    if backend == "duckdb":
+        from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors.duckdb_local import (
+            DuckDBConnector,
+        )
+        logging.getLogger("sqlglot").setLevel(logging.ERROR)   # APPROX_TOP_COUNT transpiles with a warning
+        return DuckDBConnector()
+
+    from google.cloud import bigquery
+
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors.bigquery import (
+        BigQueryConnector,
+    )
+    return BigQueryConnector(factory=lambda: bigquery.Client(project=project_id))
+
+
+def generate_schema_catalog(
+    project_id: str,
+    dataset_id: str,
+    output_file: str | None = None,
+    backend: str = "bigquery",
+    workers: int = 8,
+    force: bool = False,
+    keep_versions: int = 5,
+):
+    current = load_catalog()
+    if current.dataset != dataset_id:
+        sys.exit(f"catalog describes dataset {current.dataset!r}, not {dataset_id!r}")
+
+    report = refresh_catalog(make_connector(backend, project_id), current, workers=workers, force=force)
+    print(
+        f"metadata {report.metadata_s:.2f}s · profiling {report.profile_s:.2f}s — "
+        f"{len(report.profiled)} profiled, {len(report.unchanged)} unchanged, "
+        f"{len(report.removed)} removed, {len(report.failed)} failed"
+    )
+    for table, error in report.failed.items():
+        print(f"  ⚠️  {table}: {error}")
+    if not report.changed:
+        print(f"✅ Schema catalog v{current.version} is up to date")
+        return
+    path = save_catalog(report.catalog, output_file, keep_versions=keep_versions)
+    print(f"✅ Schema catalog v{report.catalog.version} saved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("bigquery", "duckdb"), default="bigquery")
+    parser.add_argument("--project", default="adk-hackathon-461216")
+    parser.add_argument("--dataset", default="Mock_KPIs")
+    parser.add_argument("--workers", type=int, default=8, help="tables read / profiled at a time")
+    parser.add_argument("--force", action="store_true", help="re-profile every table")
+    parser.add_argument("--keep-versions", type=int, default=5, help="versioned snapshots to keep (0: none)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    generate_schema_catalog(
+        args.project, args.dataset, args.output, args.backend, args.workers, args.force, args.keep_versions
+    )
@@ -0,0 +1,130 @@
+"""
+This script maintains the rollup tables the SQL optimizer rewrites aggregates onto
+(see src/agents/EchoQL_Agent/rollups/).
+
+    --advise    (default) mine the executed-query log for the aggregate shapes asked most
+                often and propose a rollup for each – the queries it would answer and the
+                bytes / time they took
+    --apply     register the proposals and build them
+    --refresh   bring every registered rollup up to date: incrementally (the last
+                ECHOQL_ROLLUP_LOOKBACK_DAYS days from the rollup's watermark), or in full
+                when the base table changed further back or with --full; run it on a
+                schedule, e.g. after each load
+    --report    per rollup: statements rewritten onto it, bytes saved, and the median
+                latency against the same statements run before it existed
+
+With --backend duckdb the rollups are built in the in-process database only (to try the
+advice); nothing is recorded in the registry.
+
+Usage:
+    python scripts/maintain_rollups.py [--backend bigquery|duckdb] [--advise | --apply |
+        --refresh [--full] | --report] [--min-queries 3] [--max-rollups 10] [--log PATH]
+"""
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.agents.EchoQL_Agent.rollups import QueryLog, get_query_log, get_rollup_registry, propose_rollups, refresh_rollup
+from src.agents.EchoQL_Agent.subagents.cost_gate_agent.budget import format_bytes
+
+
+def make_connector(backend: str, project_id: str):
+    if backend == "duckdb":
+        from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import DuckDBConnector
+        return DuckDBConnector()
+
+    from google.cloud import bigquery
+
+    from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors import BigQueryConnector
+    return BigQueryConnector(factory=lambda: bigquery.Client(project=project_id))
+
+
+def refresh(connector, registry, catalog, rollups, full: bool, persist: bool) -> bool:
+    ok = True
+    for rollup in rollups:
+        result = refresh_rollup(connector, rollup, registry.state(rollup.name), catalog, full=full)
+        if result.action == "failed":
+            ok = False
+            print(f"❌ {rollup.name}: {result.error}")
+            continue
+        if persist:
+            registry.set_state(rollup.name, result.state)
+        if result.action == "fresh":
+            print(f"⏭️  {rollup.name}: up to date")
+        else:
+            print(f"✅ {rollup.name}: {result.action}, {result.state.rows:,} rows through "
+                  f"{result.state.watermark or '–'} ({result.seconds:.1f}s)")
+    if persist:
+        registry.save()
+    return ok
+
+
+def report(entries: list[dict], registry) -> None:
+    baseline: dict[str, list[float]] = {}           # statement as generated → seconds, without a rollup
+    for entry in entries:
+        if not entry.get("rollups"):
+            baseline.setdefault(entry.get("original_sql") or entry["sql"], []).append(entry["seconds"])
+    for rollup in registry.rollups():
+        state = registry.state(rollup.name)
+        used = [e for e in entries if rollup.name in (e.get("rollups") or ())]
+        saved = sum(max(0, (e.get("bytes_before") or 0) - (e.get("bytes") or 0)) for e in used)
+        print(f"{rollup.table_id}  ({state.rows:,} rows through {state.watermark or '–'})")
+        print(f"    {len(used)} rewrites, {format_bytes(saved)} less scanned")
+        paired = [(statistics.median(baseline[e["original_sql"]]), e["seconds"])
+                  for e in used if e.get("original_sql") in baseline]
+        if paired:
+            before, after = (statistics.median(side) for side in zip(*paired))
+            print(f"    latency: median {after:.2f}s vs {before:.2f}s before "
+                  f"({sum(b - a for b, a in paired):+.1f}s saved over {len(paired)} comparable runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--advise", action="store_true")
+    mode.add_argument("--apply", action="store_true")
+    mode.add_argument("--refresh", action="store_true")
+    mode.add_argument("--report", action="store_true")
+    parser.add_argument("--full", action="store_true", help="with --refresh: rebuild every rollup")
+    parser.add_argument("--backend", choices=("bigquery", "duckdb"), default="bigquery")
+    parser.add_argument("--project", default="adk-hackathon-461216")
+    parser.add_argument("--min-queries", type=int, default=3, help="logged statements a proposal must answer")
+    parser.add_argument("--max-rollups", type=int, default=10)
+    parser.add_argument("--log", type=Path, default=None, help="query log (default: ECHOQL_QUERY_LOG_PATH)")
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    registry = get_rollup_registry()
+    entries = (QueryLog(args.log) if args.log else get_query_log()).entries()
+
+    if args.report:
+        report(entries, registry)
+        return
+    if args.refresh:
+        connector = make_connector(args.backend, args.project)
+        ok = refresh(connector, registry, catalog, registry.rollups(), args.full, args.backend == "bigquery")
+        sys.exit(0 if ok else 1)
+
+    proposals = propose_rollups(
+        entries, catalog, min_queries=args.min_queries, max_rollups=args.max_rollups, existing=registry.rollups()
+    )
+    print(f"{len(entries):,} logged statements → {len(proposals)} rollups proposed")
+    for proposal in proposals:
+        print(f"  {proposal.rollup.table_id}: answers {proposal.queries} statements "
+              f"({format_bytes(proposal.bytes)}, {proposal.seconds:.1f}s)")
+    if args.apply and proposals:
+        for proposal in proposals:
+            registry.add(proposal.rollup)
+        connector = make_connector(args.backend, args.project)
+        persist = args.backend == "bigquery"
+        ok = refresh(connector, registry, catalog, [p.rollup for p in proposals], True, persist)
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Summarise an EchoQL trace file (JSON lines, see src/agents/EchoQL_Agent/tracing)
+into per-stage latency percentiles.
+
+Rows: "trace" = whole invocations (root spans), "agent" = one row per agent,
+"llm" = model calls per agent, "io" = BigQuery jobs and other hot-path spans.
+Token, byte, slot-ms and row counts are summed per row.
+
+Usage:
+    python scripts/summarize_traces.py [TRACE_FILE] [--last-minutes 60] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.agents.EchoQL_Agent.tracing.summary import format_summary, read_spans, summarize
+from src.agents.EchoQL_Agent.tracing.tracer import TRACE_PATH
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-stage latency percentiles from a trace file")
+    parser.add_argument("trace_file", nargs="?", default=TRACE_PATH)
+    parser.add_argument("--last-minutes", type=float, default=None, help="only spans started this recently")
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON")
+    args = parser.parse_args()
+
+    since = time.time() - args.last_minutes * 60 if args.last_minutes else None
+    rows = summarize(read_spans(args.trace_file), since=since)
+    print(json.dumps(rows, indent=2) if args.json else format_summary(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,16 @@
-import os
+"""
+This script builds the table retriever's index from the schema catalog and publishes it to
+Cloud Storage (gs://<bucket>/schema_embeddings/), or to a local directory with --local.
+
+The build is incremental: the index in ECHOQL_TABLE_INDEX_DIR (downloaded from the storage if
+there is none locally) is reused for every table whose description and columns are unchanged,
+by content hash, and only the rest is embedded, in batches. The matrix and its manifest are
+uploaded in one bulk call, and not at all when the published manifest is already the same.
+
+Usage:
+    python scripts/upload_schema_embeddings.py [--index-dir DIR] [--local DIR] [--prefix schema_embeddings]
+"""
+import argparse
 import sys
 from pathlib import Path
 
@@ -6,80 +18,49 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from typing import List
-import json
-from google.cloud import storage
-from google.cloud import aiplatform
-from sentence_transformers import SentenceTransformer
-from src.retrievers.table_retriever.config import get_settings
-
-# Get settings from .env file
-settings = get_settings()
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.agents.EchoQL_Agent.retrievers.table_retriever import (
+    GCSStorage,
+    LocalStorage,
+    VectorIndex,
+    build_index,
+    fetch_index,
+    make_embedder,
+    publish_index,
+)
+from src.agents.EchoQL_Agent.settings import get_settings
 
-# Initialize the embedding model
-model = SentenceTransformer(settings.embedding_model)
 
-# Initialize GCS client
-storage_client = storage.Client(project=settings.project_id)
-bucket_name = settings.vertex_index_endpoint.split('/')[-1]  # Extract bucket name from endpoint
-bucket = storage_client.bucket(bucket_name)
-
-# Schema files to process
-SCHEMA_FILES = [
-    "mock_answers_description.txt",
-    "mock_questions_description.txt",
-    "mock_user_sessions_description.txt",
-    "mock_users_description.txt"
-]
+def main():
+    settings = get_settings()
 
-def read_schema_file(file_path: str) -> str:
-    """Read the content of a schema file."""
-    with open(file_path, 'r') as f:
-        return f.read()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index-dir", type=Path, default=settings.index_dir)
+    parser.add_argument("--local", type=Path, default=None, help="publish to this directory instead of GCS")
+    parser.add_argument("--prefix", default="schema_embeddings", help="object prefix in the bucket")
+    args = parser.parse_args()
 
-def generate_embedding(text: str) -> List[float]:
-    """Generate embedding for the given text."""
-    return model.encode(text).tolist()
+    if args.local:
+        storage = LocalStorage(args.local)
+    else:
+        bucket_name = settings.vertex_index_endpoint.split('/')[-1]  # Extract bucket name from endpoint
+        storage = GCSStorage(bucket_name, args.prefix, settings.project_id)
 
-def check_file_exists_in_bucket(file_name: str) -> bool:
-    """Check if the embedded file already exists in the bucket."""
-    blob = bucket.blob(f"schema_embeddings/{file_name}.json")
-    return blob.exists()
+    try:
+        previous = VectorIndex.open(args.index_dir)
+    except (FileNotFoundError, KeyError, ValueError):
+        previous = fetch_index(storage, args.index_dir)
 
-def upload_embedding_to_bucket(file_name: str, embedding: List[float], original_text: str):
-    """Upload the embedding to GCS bucket."""
-    data = {
-        "file_name": file_name,
-        "embedding": embedding,
-        "original_text": original_text
-    }
-    
-    blob = bucket.blob(f"schema_embeddings/{file_name}.json")
-    blob.upload_from_string(
-        json.dumps(data),
-        content_type='application/json'
+    report = build_index(load_catalog(), make_embedder(settings.embedding_model), args.index_dir, previous)
+    print(
+        f"Index of {len(report.index)} tables built in {report.seconds:.2f}s: "
+        f"{report.embedded} embedded, {report.reused} unchanged"
     )
+    if publish_index(report.index, storage):
+        print(f"Successfully uploaded the index ({storage.name})")
+    else:
+        print(f"Published index is up to date ({storage.name}). Skipping...")
 
-def main():
-    config_dir = project_root / "configs"
-    
-    for schema_file in SCHEMA_FILES:
-        file_path = config_dir / schema_file
-        
-        # Check if embedding already exists
-        if check_file_exists_in_bucket(schema_file):
-            print(f"Embedding for {schema_file} already exists in bucket. Skipping...")
-            continue
-        
-        print(f"Processing {schema_file}...")
-        
-        # Read and embed the schema
-        schema_text = read_schema_file(file_path)
-        embedding = generate_embedding(schema_text)
-        
-        # Upload to bucket
-        upload_embedding_to_bucket(schema_file, embedding, schema_text)
-        print(f"Successfully uploaded embedding for {schema_file}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,42 +1,79 @@
 """
-This is a script to upload CSV files from a local directory to Google BigQuery.
+This is a script to load the CSV files of a local directory into Google BigQuery
+(see src/ingestion/).
+
+Each CSV is converted to Parquet with the column types of the schema catalog, and
+several load jobs run at once. Files that haven't changed since their last load (by
+content hash, recorded in a manifest next to the data) are skipped. With --append, rows
+added at the end of a file are appended on their own instead of reloading the table.
+--local DIR loads into Parquet files under DIR instead of BigQuery.
+
+Usage:
+    python scripts/upload_to_bigquery.py [--workers 4] [--append]
+        [--partition mock_user_sessions=session_date] [--force] [--local DIR]
 """
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
 
-import os
-from google.cloud import bigquery
+from src.agents.EchoQL_Agent.catalog import load_catalog
+from src.ingestion import BigQueryLoader, LocalLoader, Manifest, bulk_load
 
 # === CONFIG ===
 PROJECT_ID = "adk-hackathon-461216"
 DATASET_ID = "Mock_KPIs"
-DATA_FOLDER = "../Mock_Data"  # relative to this script
-
-# === INIT BIGQUERY CLIENT ===
-client = bigquery.Client(project=PROJECT_ID)
-
-def upload_csv_to_bigquery(csv_file_path, table_name):
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.{table_name}"
+DATA_FOLDER = project_root / "Mock_Data"
+MANIFEST_NAME = ".load_manifest.json"
 
-    job_config = bigquery.LoadJobConfig(
-        source_format=bigquery.SourceFormat.CSV,
-        skip_leading_rows=1,
-        autodetect=True,
-        write_disposition="WRITE_TRUNCATE",  # Overwrites if table exists
-    )
 
-    with open(csv_file_path, "rb") as source_file:
-        job = client.load_table_from_file(source_file, table_id, job_config=job_config)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_FOLDER)
+    parser.add_argument("--project", default=PROJECT_ID)
+    parser.add_argument("--dataset", default=DATASET_ID)
+    parser.add_argument("--workers", type=int, default=4, help="files converted and loaded at a time")
+    parser.add_argument("--append", action="store_true", help="append rows added since the last load")
+    parser.add_argument("--partition", action="append", default=[], metavar="TABLE=COLUMN",
+                        help="day-partition TABLE on a DATE / TIMESTAMP column (repeatable; "
+                             "default: the catalog's partition_by)")
+    parser.add_argument("--force", action="store_true", help="reload every file in full")
+    parser.add_argument("--manifest", type=Path, default=None, help=f"default: <data-dir>/{MANIFEST_NAME}")
+    parser.add_argument("--local", type=Path, default=None, help="load into Parquet files here instead")
+    args = parser.parse_args()
 
-    job.result()  # Wait for the job to complete
-    print(f"✅ Uploaded {csv_file_path} to {table_id}")
+    catalog = load_catalog()
+    if catalog.dataset != args.dataset:
+        sys.exit(f"catalog describes dataset {catalog.dataset!r}, not {args.dataset!r}")
+    loader = LocalLoader(args.local) if args.local else BigQueryLoader(args.project, args.dataset)
+    manifest = Manifest(args.manifest or args.data_dir / MANIFEST_NAME)
 
-def main():
-    abs_data_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), DATA_FOLDER))
+    report = bulk_load(
+        sorted(args.data_dir.glob("*.csv")),
+        catalog,
+        loader,
+        manifest,
+        workers=args.workers,
+        append=args.append,
+        partition_by=dict(p.split("=", 1) for p in args.partition),
+        force=args.force,
+    )
+    for result in report.results:
+        if result.action == "failed":
+            print(f"❌ {result.table}: {result.error}")
+        elif result.action == "skipped":
+            print(f"⏭️  {result.table}: unchanged")
+        else:
+            print(f"✅ {result.table}: {result.action}, {result.rows:,} rows ({result.seconds:.1f}s)")
+    print(
+        f"{report.count('replaced') + report.count('appended')} loaded, {report.count('skipped')} skipped, "
+        f"{report.count('failed')} failed – {report.rows:,} rows, {report.bytes / 1e6:,.1f} MB "
+        f"in {report.seconds:.1f}s ({loader.name})"
+    )
+    sys.exit(1 if report.count("failed") else 0)
 
-    for file_name in os.listdir(abs_data_folder):
-        if file_name.endswith(".csv"):
-            table_name = file_name.replace(".csv", "")
-            full_path = os.path.join(abs_data_folder, file_name)
-            upload_csv_to_bigquery(full_path, table_name)
 
 if __name__ == "__main__":
     main()
@@ -1 +1,5 @@
-from .agent import root_agent
\ No newline at end of file
+from .settings import get_settings
+
+get_settings()                          # .env loaded once, before any agent module reads its settings
+
+from .agent import root_agent  # noqa: E402
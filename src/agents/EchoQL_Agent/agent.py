@@ -1,11 +1,16 @@
 """
 Root Agent
 ───────────────────────────────────────────────────────────────────────────────
-• Checks data availability
-• Generates SQL
-• Validates SQL
+• Splits compound questions into independent sub-queries, run concurrently and
+  merged locally (query planner); each one goes through the steps below
+• Reuses validated SQL for near-duplicate questions (semantic cache)
+• Otherwise: checks data availability, generates SQL, validates (and repairs) it
+• Rewrites it to scan less: filters pushed down, prunable partition predicates,
+  no SELECT * in derived tables – kept if its dry run scans fewer bytes
+• Dry-runs it and enforces per-query / per-user scan budgets (cost gate)
 • Executes SQL
-• Returns a CSV to the user
+• Returns a preview in chat and the rows as a compressed CSV / Parquet artifact
+• Every agent run and LLM call is traced (see tracing/; ECHOQL_TRACE=0 turns it off)
 """
 from google.adk.agents import SequentialAgent
 
@@ -14,6 +19,50 @@ from .subagents.sql_generator_agent.agent import sql_generator_agent
 from .subagents.sql_validator_agent.agent import sql_validator_agent
 from .subagents.sql_fetcher_agent.agent import sql_fetcher_agent
 from .subagents.sql_repair_agent.agent import sql_repair_agent
+from .subagents.semantic_cache_agent.agent import SemanticCacheAgent
+from .subagents.sql_optimizer_agent.agent import sql_optimizer_agent
+from .subagents.cost_gate_agent.agent import cost_gate_agent
+from .subagents.query_planner_agent.agent import QueryPlannerAgent, _planner_llm
+from .subagents.sql_generator_agent.agent import _sql_llm
+from .subagents.sql_validator_agent.agent import _validator_llm
+from .subagents.sql_repair_agent.agent import _repair_llm
+from .lazy_imports import warm_up
+from .tracing import instrument
+
+
+sql_authoring_agent = SequentialAgent(
+    name="SqlAuthoringAgent",
+    description="Checks data availability, then generates, validates and repairs SQL.",
+    sub_agents=[
+        data_availability_checker_agent,    # check data availability
+        sql_generator_agent,                # adds sql_query + user_request
+        sql_validator_agent,                # adds validation_status
+        sql_repair_agent,                   # adds sql_query + user_request
+    ],
+)
+
+semantic_cache_agent = SemanticCacheAgent(
+    name="SemanticCacheAgent",
+    description="Serves validated SQL for near-duplicate questions; runs the authoring chain otherwise.",
+    sub_agents=[sql_authoring_agent],
+)
+
+
+query_planner_agent = QueryPlannerAgent(
+    name="QueryPlannerAgent",
+    description="Runs the chain once per question, or concurrently per sub-question of a compound one.",
+    sub_agents=[
+        semantic_cache_agent,               # cached SQL, or checker → generator → validator → repair
+        sql_optimizer_agent,                # pushdown / partition pruning / column pruning, if cheaper
+        cost_gate_agent,                    # dry run: scan-byte budgets / timeout, repair or reject
+        sql_fetcher_agent,                  # consumes above and attaches CSV
+    ],
+)
+
+
+def _warm_up(callback_context):
+    warm_up()                               # pyarrow, sqlglot, … load while the first LLM call is in flight
+    return None
 
 
 root_agent = SequentialAgent(
@@ -23,10 +72,10 @@ root_agent = SequentialAgent(
         "executes the query, and returns a CSV to the user."
     ),
     sub_agents=[
-        data_availability_checker_agent,    # check data availability
-        sql_generator_agent,                # adds sql_query + user_request
-        sql_validator_agent,                # adds validation_status
-        sql_repair_agent,                   # adds sql_query + user_request
-        sql_fetcher_agent,                  # consumes above and attaches CSV
+        query_planner_agent,                # compound question → sub-queries in parallel, merged locally
     ],
+    before_agent_callback=_warm_up,
 )
+
+# Span per agent run and per LLM call; the wrapped LLM agents are not sub-agents, so pass them too
+instrument(root_agent, _planner_llm, _sql_llm, _validator_llm, _repair_llm)
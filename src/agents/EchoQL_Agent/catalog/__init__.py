@@ -0,0 +1,9 @@
+from .catalog import (
+    Catalog,
+    Column,
+    ForeignKey,
+    Table,
+    catalog_from_dict,
+    load_catalog,
+    save_catalog,
+)
@@ -0,0 +1,311 @@
+"""
+Schema Catalog
+───────────────────────────────────────────────────────────────────────────────
+Single source of truth for the tables of the Mock_KPIs dataset: tables,
+columns, types, primary / foreign keys and descriptions, stored in
+`schema_catalog.json` next to this module (override with ECHOQL_CATALOG_PATH).
+
+The catalog is loaded once per process (`load_catalog()`) into typed,
+indexed structures and renders compact prompt fragments for any subset of
+tables, so prompts grow with the tables a question touches – not with the
+size of the dataset.
+
+    Mock_KPIs.mock_answers — Contains user-submitted answers …
+      question_id INT64 → mock_questions.question_id — Foreign key to …
+
+Tables refreshed by refresh.py also carry a profile (row count, last
+modification, schema hash) and so do their columns (null fraction, approximate
+distinct count, min / max, most frequent values). `render(..., profiles=True)`
+adds them for the SQL generator:
+
+      created_at TIMESTAMP — Timestamp when … [2024-01-01 … 2024-12-31]
+
+The fingerprints cover the schema only, so a re-profile alone invalidates
+neither the semantic cache nor the table index.
+
+Tables also record their storage layout – the column they are partitioned
+on and up to four clustering columns – which the SQL optimizer uses to keep
+filters prunable. Rendered as column tags:
+
+      session_date DATE PARTITION — Date of the session
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+CATALOG_PATH = Path(
+    os.getenv("ECHOQL_CATALOG_PATH", Path(__file__).with_name("schema_catalog.json"))
+)
+
+
+# a column whose values all fit in its top values is listed value by value
+MAX_LISTED_VALUES = 10
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    null_fraction: float = 0.0
+    distinct: Optional[int] = None              # approximate
+    min: Optional[str] = None                   # dates, timestamps and numbers only
+    max: Optional[str] = None
+    top_values: tuple[str, ...] = ()            # most frequent first; STRING / BOOL only
+
+    def render(self) -> str:
+        parts = []
+        if self.min is not None and self.max is not None:
+            parts.append(f"{self.min} … {self.max}")
+        if self.top_values and self.distinct is not None and self.distinct <= MAX_LISTED_VALUES:
+            parts.append(", ".join(repr(v) for v in self.top_values))
+        elif self.distinct is not None:
+            parts.append(f"~{self.distinct:,} distinct")
+        if self.null_fraction >= 0.005:
+            parts.append(f"{self.null_fraction:.0%} null")
+        return f" [{'; '.join(parts)}]" if parts else ""
+
+
+@dataclass(frozen=True)
+class TableProfile:
+    row_count: int
+    schema_hash: str                            # of the (column, type) list the profile was taken for
+    last_modified: Optional[float] = None       # epoch seconds, from the backend's table metadata
+    profiled_at: float = 0.0
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str
+    description: str = ""
+    table: str = ""
+    profile: Optional[ColumnProfile] = None
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    table: str
+    column: str
+    ref_table: str
+    ref_column: str
+
+    def __str__(self) -> str:
+        return f"{self.table}.{self.column} -> {self.ref_table}.{self.ref_column}"
+
+
+@dataclass(frozen=True)
+class Table:
+    name: str
+    description: str = ""
+    columns: dict[str, Column] = field(default_factory=dict)   # keyed by lower-case name
+    primary_key: tuple[str, ...] = ()
+    foreign_keys: tuple[ForeignKey, ...] = ()
+    profile: Optional[TableProfile] = None
+    partition_by: Optional[str] = None                          # DATE / TIMESTAMP column, day partitions
+    cluster_by: tuple[str, ...] = ()
+
+    def column(self, name: str) -> Column | None:
+        """Case-insensitive column lookup (BigQuery column names are)."""
+        return self.columns.get(name.lower())
+
+    def render(self, dataset: str, profiles: bool = False) -> str:
+        """Compact prompt fragment: one header line plus one line per column."""
+        refs = {fk.column.lower(): f"{fk.ref_table}.{fk.ref_column}" for fk in self.foreign_keys}
+        pk = {c.lower() for c in self.primary_key}
+        cluster = {c.lower() for c in self.cluster_by}
+        header = f"{dataset}.{self.name} — {self.description}"
+        if profiles and self.profile is not None:
+            header += f" (~{self.profile.row_count:,} rows)"
+        lines = [header]
+        for key, col in self.columns.items():
+            tags = " PK" if key in pk else ""
+            tags += " PARTITION" if self.partition_by and key == self.partition_by.lower() else ""
+            tags += " CLUSTER" if key in cluster else ""
+            tags += f" → {refs[key]}" if key in refs else ""
+            stats = col.profile.render() if profiles and col.profile is not None else ""
+            lines.append(f"  {col.name} {col.type}{tags} — {col.description}{stats}")
+        return "\n".join(lines)
+
+
+class Catalog:
+    """Indexed view over the catalog: tables by name, columns by name, FK graph."""
+
+    def __init__(self, dataset: str, tables: Iterable[Table], version: int = 1) -> None:
+        self.dataset = dataset
+        self.version = version
+        self.tables: dict[str, Table] = {t.name: t for t in tables}
+        self._by_column: dict[str, list[Column]] = {}
+        self._neighbours: dict[str, set[str]] = {name: set() for name in self.tables}
+        for table in self.tables.values():
+            for key, col in table.columns.items():
+                self._by_column.setdefault(key, []).append(col)
+            for fk in table.foreign_keys:
+                if fk.ref_table in self._neighbours:
+                    self._neighbours[table.name].add(fk.ref_table)
+                    self._neighbours[fk.ref_table].add(table.name)
+
+    # ── lookups ─────────────────────────────────────────────
+    def table(self, name: str) -> Table | None:
+        return self.tables.get(name)
+
+    def resolve(self, names: Iterable[str]) -> list[str]:
+        """Known table names among `names` (accepts `Mock_KPIs.`-qualified names)."""
+        out = []
+        for name in names:
+            name = str(name).strip().strip("`").split(".")[-1]
+            if name in self.tables and name not in out:
+                out.append(name)
+        return out
+
+    def columns_named(self, name: str) -> list[Column]:
+        """Every column called `name` across all tables."""
+        return list(self._by_column.get(name.lower(), []))
+
+    @property
+    def foreign_keys(self) -> list[ForeignKey]:
+        return [fk for t in self.tables.values() for fk in t.foreign_keys]
+
+    def neighbours(self, name: str) -> set[str]:
+        """Tables joined to `name` by a foreign key (either direction)."""
+        return set(self._neighbours.get(name, ()))
+
+    def join_keys(self, left: str, right: str) -> list[ForeignKey]:
+        return [
+            fk for fk in self.foreign_keys
+            if {fk.table, fk.ref_table} == {left, right}
+        ]
+
+    # ── rendering ───────────────────────────────────────────
+    def render(self, names: Iterable[str] | None = None, profiles: bool = False) -> str:
+        """Prompt fragment for `names` (all tables when None); `profiles` adds row counts and value ranges."""
+        selected = self.resolve(names) if names is not None else list(self.tables)
+        return "\n\n".join(self.tables[n].render(self.dataset, profiles) for n in selected)
+
+    def summary(self, names: Iterable[str] | None = None) -> str:
+        """One line per table – for prompts that only need to know what exists."""
+        selected = self.resolve(names) if names is not None else list(self.tables)
+        return "\n".join(
+            f"{self.dataset}.{n}({', '.join(c.name for c in self.tables[n].columns.values())})"
+            for n in selected
+        )
+
+    # ── identity ────────────────────────────────────────────
+    def to_dict(self, profiles: bool = True) -> dict:
+        tables = []
+        for t in self.tables.values():
+            raw = {
+                "name": t.name,
+                "description": t.description,
+                "primary_key": list(t.primary_key),
+                "foreign_keys": [
+                    {"column": fk.column, "references": f"{fk.ref_table}.{fk.ref_column}"}
+                    for fk in t.foreign_keys
+                ],
+                "columns": [
+                    {"name": c.name, "type": c.type, "description": c.description}
+                    | ({"profile": _profile_dict(c.profile)} if profiles and c.profile else {})
+                    for c in t.columns.values()
+                ],
+            }
+            if t.partition_by:
+                raw["partition_by"] = t.partition_by
+            if t.cluster_by:
+                raw["cluster_by"] = list(t.cluster_by)
+            if profiles and t.profile is not None:
+                raw["profile"] = _profile_dict(t.profile)
+            tables.append(raw)
+        return {"dataset": self.dataset, "version": self.version, "tables": tables}
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Stable hash of the schema (changes whenever the schema does, not when profiles do)."""
+        blob = json.dumps(self.to_dict(profiles=False), sort_keys=True).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()[:16]
+
+    def table_fingerprint(self, name: str) -> str:
+        table = next(t for t in self.to_dict(profiles=False)["tables"] if t["name"] == name)
+        return hashlib.sha256(json.dumps(table, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+# ─── loading ────────────────────────────────────────────────
+def _profile_dict(profile: ColumnProfile | TableProfile) -> dict:
+    raw = asdict(profile)
+    if "top_values" in raw:
+        raw["top_values"] = list(raw["top_values"])
+    return raw
+
+
+def _column_profile(raw: dict | None) -> ColumnProfile | None:
+    if not raw:
+        return None
+    return ColumnProfile(**{**raw, "top_values": tuple(raw.get("top_values", ()))})
+
+
+def _table_from_dict(raw: dict) -> Table:
+    name = raw["name"]
+    foreign_keys = []
+    for fk in raw.get("foreign_keys", []):
+        ref_table, ref_column = fk["references"].split(".", 1)
+        foreign_keys.append(ForeignKey(name, fk["column"], ref_table, ref_column))
+    return Table(
+        name=name,
+        description=raw.get("description", ""),
+        columns={
+            c["name"].lower(): Column(
+                c["name"], c["type"], c.get("description", ""), name, _column_profile(c.get("profile"))
+            )
+            for c in raw["columns"]
+        },
+        primary_key=tuple(raw.get("primary_key", ())),
+        foreign_keys=tuple(foreign_keys),
+        profile=TableProfile(**raw["profile"]) if raw.get("profile") else None,
+        partition_by=raw.get("partition_by"),
+        cluster_by=tuple(raw.get("cluster_by", ())),
+    )
+
+
+def catalog_from_dict(raw: dict) -> Catalog:
+    return Catalog(
+        dataset=raw["dataset"],
+        tables=[_table_from_dict(t) for t in raw["tables"]],
+        version=raw.get("version", 1),
+    )
+
+
+@lru_cache(maxsize=1)
+def load_catalog(path: str | os.PathLike | None = None) -> Catalog:
+    path = Path(path) if path else CATALOG_PATH
+    return catalog_from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def save_catalog(
+    catalog: Catalog, path: str | os.PathLike | None = None, keep_versions: int = 0
+) -> Path:
+    """Write `catalog` to `path` atomically.
+
+    With `keep_versions`, it is also written as `<stem>.v<version>.json` next to
+    `path`, and only the newest `keep_versions` of those snapshots are kept.
+    """
+    path = Path(path) if path else CATALOG_PATH
+    text = json.dumps(catalog.to_dict(), indent=2) + "\n"
+    targets = [path]
+    if keep_versions > 0:
+        targets.insert(0, path.with_name(f"{path.stem}.v{catalog.version}{path.suffix}"))
+    for target in targets:
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, target)
+    if keep_versions > 0:
+        snapshot = re.compile(rf"{re.escape(path.stem)}\.v(\d+){re.escape(path.suffix)}")
+        versions = sorted(
+            (int(m.group(1)), p) for p in path.parent.iterdir() if (m := snapshot.fullmatch(p.name))
+        )
+        for _, old in versions[:-keep_versions]:
+            old.unlink(missing_ok=True)
+    return path
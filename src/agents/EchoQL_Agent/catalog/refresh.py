@@ -0,0 +1,207 @@
+"""
+Catalog Refresh
+───────────────────────────────────────────────────────────────────────────────
+Brings the schema catalog up to date with the warehouse, re-reading only what
+changed:
+
+1. Metadata – columns, description, last modification – is read for every
+   table through the execution connector, `workers` at a time. On BigQuery
+   that is the tables API: no query job and nothing billed.
+2. Each table is fingerprinted by its last modification and a hash of its
+   (column, type) list. A table whose fingerprint matches its stored profile
+   is kept as it is.
+3. New and changed tables are profiled concurrently, one aggregate query
+   each: the row count and, per column, the null fraction, the approximate
+   distinct count, min / max (dates, timestamps, numbers) and the most
+   frequent values (strings, booleans).
+4. Hand-written descriptions, primary and foreign keys are kept; new tables
+   and columns get the description the backend has for them. Partitioning
+   and clustering come from the backend when it reports them (BigQuery),
+   else the catalog's are kept.
+
+The catalog only gets a new version when a table was re-profiled or dropped,
+and a refresh costs what changed – not the size of the dataset.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from .catalog import Catalog, Column, ColumnProfile, Table, TableProfile
+
+if TYPE_CHECKING:
+    from ..subagents.sql_fetcher_agent.connectors import Connector, TableMetadata
+
+RANGE_TYPES = {"DATE", "DATETIME", "TIMESTAMP", "TIME", "INT64", "FLOAT64", "NUMERIC", "BIGNUMERIC"}
+TOP_VALUE_TYPES = {"STRING", "BOOL"}
+UNPROFILED_TYPES = {"ARRAY", "STRUCT", "JSON", "GEOGRAPHY", "BYTES"}   # no DISTINCT / MIN over them
+TOP_VALUES = 5
+MAX_VALUE_CHARS = 40
+
+
+def schema_hash(columns: Iterable[tuple[str, str]]) -> str:
+    """Hash of a (column name, type) list – names case-insensitive, order significant."""
+    blob = json.dumps([[name.lower(), type_.upper()] for name, type_ in columns])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def _base_type(type_: str) -> str:
+    return type_.split("<", 1)[0].strip().upper()
+
+
+def profile_sql(dataset: str, meta: TableMetadata) -> str:
+    """One GoogleSQL aggregate that profiles every column of the table."""
+    select = ["COUNT(*) AS row_count"]
+    for i, (name, type_, _) in enumerate(meta.columns):
+        column, base = f"`{name}`", _base_type(type_)
+        select.append(f"COUNTIF({column} IS NULL) AS c{i}_nulls")
+        if base in UNPROFILED_TYPES:
+            continue
+        select.append(f"APPROX_COUNT_DISTINCT({column}) AS c{i}_distinct")
+        if base in RANGE_TYPES:
+            select.append(f"CAST(MIN({column}) AS STRING) AS c{i}_min")
+            select.append(f"CAST(MAX({column}) AS STRING) AS c{i}_max")
+        if base in TOP_VALUE_TYPES:
+            select.append(f"APPROX_TOP_COUNT(CAST({column} AS STRING), {TOP_VALUES}) AS c{i}_top")
+    return f"SELECT {', '.join(select)} FROM {dataset}.{meta.name}"
+
+
+def _top_value(item: Any) -> Optional[str]:
+    value = item.get("value") if isinstance(item, dict) else item   # BigQuery: STRUCT<value, count>
+    if value is None:
+        return None
+    value = str(value)
+    return value if len(value) <= MAX_VALUE_CHARS else value[:MAX_VALUE_CHARS - 1] + "…"
+
+
+def _column_profiles(meta: TableMetadata, row: dict) -> tuple[int, dict[str, ColumnProfile]]:
+    rows = int(row.get("row_count") or 0)
+    profiles = {}
+    for i, (name, _, _) in enumerate(meta.columns):
+        distinct = row.get(f"c{i}_distinct")
+        top = [v for v in map(_top_value, row.get(f"c{i}_top") or ()) if v is not None]
+        profiles[name.lower()] = ColumnProfile(
+            null_fraction=round(int(row.get(f"c{i}_nulls") or 0) / rows, 4) if rows else 0.0,
+            distinct=min(int(distinct), rows) if distinct is not None else None,   # HLL can overshoot
+            min=row.get(f"c{i}_min"),
+            max=row.get(f"c{i}_max"),
+            top_values=tuple(top),
+        )
+    return rows, profiles
+
+
+def _is_fresh(known: Optional[Table], meta: TableMetadata) -> bool:
+    return (
+        known is not None
+        and known.profile is not None
+        and meta.modified is not None
+        and known.profile.last_modified == meta.modified
+        and known.profile.schema_hash == schema_hash((c[0], c[1]) for c in meta.columns)
+    )
+
+
+def _build_table(
+    known: Optional[Table],
+    meta: TableMetadata,
+    profile: Optional[TableProfile],
+    column_profiles: dict[str, ColumnProfile],
+) -> Table:
+    columns = {}
+    for name, type_, description in meta.columns:
+        known_col = known.column(name) if known else None
+        columns[name.lower()] = Column(
+            name=name,
+            type=type_,
+            description=(known_col.description if known_col else None) or description.strip(),
+            table=meta.name,
+            profile=column_profiles.get(name.lower()),
+        )
+    return Table(
+        name=meta.name,
+        description=(known.description if known else None) or meta.description.strip('"'),
+        columns=columns,
+        primary_key=known.primary_key if known else (),
+        foreign_keys=known.foreign_keys if known else (),
+        profile=profile,
+        partition_by=meta.partition_by or (known.partition_by if known else None),
+        cluster_by=meta.cluster_by or (known.cluster_by if known else ()),
+    )
+
+
+@dataclass
+class RefreshReport:
+    catalog: Catalog
+    profiled: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)        # table → error; schema kept, no profile
+    metadata_s: float = 0.0
+    profile_s: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.profiled or self.removed or self.failed)
+
+
+def refresh_catalog(
+    connector: Connector,
+    current: Catalog,
+    *,
+    workers: int = 8,
+    force: bool = False,
+    timeout_s: Optional[float] = None,
+) -> RefreshReport:
+    """Re-profile the tables of `current.dataset` that changed; see the module docstring."""
+    dataset = current.dataset
+    report = RefreshReport(catalog=current)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="catalog-refresh") as pool:
+        names = connector.list_tables(dataset)
+        metas: dict[str, TableMetadata] = dict(
+            zip(names, pool.map(lambda n: connector.table_metadata(f"{dataset}.{n}"), names))
+        )
+        stale = [n for n in names if force or not _is_fresh(current.table(n), metas[n])]
+        report.metadata_s = time.perf_counter() - start
+
+        def profile(name: str) -> tuple[TableProfile, dict[str, ColumnProfile]]:
+            meta = metas[name]
+            reader = connector.execute_arrow(profile_sql(dataset, meta), timeout_s)
+            rows, columns = _column_profiles(meta, reader.read_all().to_pylist()[0])
+            table_profile = TableProfile(
+                row_count=rows,
+                schema_hash=schema_hash((c[0], c[1]) for c in meta.columns),
+                last_modified=meta.modified,
+                profiled_at=round(time.time(), 3),
+            )
+            return table_profile, columns
+
+        futures = {name: pool.submit(profile, name) for name in stale}
+        rebuilt: dict[str, Table] = {}
+        for name, future in futures.items():
+            known = current.table(name)
+            try:
+                table_profile, columns = future.result()
+            except Exception as exc:                  # keep the schema current; profile on the next run
+                report.failed[name] = str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+                rebuilt[name] = _build_table(known, metas[name], None, {})
+                continue
+            rebuilt[name] = _build_table(known, metas[name], table_profile, columns)
+            report.profiled.append(name)
+        report.profile_s = time.perf_counter() - start - report.metadata_s
+
+    report.unchanged = [n for n in names if n not in rebuilt]
+    report.removed = [n for n in current.tables if n not in metas]
+    if report.changed:
+        order = [n for n in current.tables if n in metas] + [n for n in names if n not in current.tables]
+        report.catalog = Catalog(
+            dataset=dataset,
+            tables=[rebuilt.get(n) or current.tables[n] for n in order],
+            version=current.version + 1,
+        )
+    return report
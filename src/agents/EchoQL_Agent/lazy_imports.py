@@ -0,0 +1,67 @@
+"""
+Deferred Imports
+───────────────────────────────────────────────────────────────────────────────
+Importing `root_agent` used to pull in pandas, pyarrow, numpy and sqlglot –
+about half a second before the server could take its first request (on
+Cloud Run, every scale-from-zero). Modules that need them now bind a
+stand-in instead:
+
+    pa = lazy_import("pyarrow")
+
+which imports the real module on first attribute access and copies its
+namespace, so later lookups cost the same as with a plain import.
+
+`warm_up()` then imports all of them on a background thread – the root agent
+calls it when the first request arrives, so the imports overlap with the
+first LLM call instead of adding to it. ECHOQL_WARM_UP=0 turns that off.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import threading
+import types
+
+WARM_UP_ENABLED = os.getenv("ECHOQL_WARM_UP", "1") != "0"
+
+DEFERRED_MODULES = (
+    "pyarrow",
+    "pyarrow.compute",
+    "pyarrow.csv",
+    "pyarrow.parquet",
+    "numpy",
+    "sqlglot",
+    "sqlglot.optimizer.scope",
+    "pandas",                           # only behind .to_pandas() – last
+)
+
+_warm_up_started = threading.Event()
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Stand-in for module `name`, imported on first attribute access."""
+    return _LazyModule(name)
+
+
+def _import_all() -> None:
+    for name in DEFERRED_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass                        # optional backend not installed; its first use will say so
+
+
+def warm_up() -> None:
+    """Import DEFERRED_MODULES on a daemon thread; only the first call does anything."""
+    if not WARM_UP_ENABLED or _warm_up_started.is_set():
+        return
+    _warm_up_started.set()
+    threading.Thread(target=_import_all, name="echoql-warm-up", daemon=True).start()
@@ -0,0 +1,5 @@
+from .build import BuildReport, build_index, fetch_index, publish_index
+from .embedders import Embedder, HashingEmbedder, SentenceTransformerEmbedder, make_embedder
+from .index import VectorIndex
+from .retriever import TableRetriever, get_retriever
+from .storage import GCSStorage, IndexStorage, LocalStorage
@@ -0,0 +1,96 @@
+"""
+Incremental index build and publishing.
+
+Each table is embedded from its catalog render, and the manifest records a
+hash of that text next to every key. A rebuild embeds only the tables whose
+text hash is missing from the previous index built with the same model: new
+tables, or tables whose description or columns were edited. They are
+embedded EMBED_BATCH at a time; every other row is copied over from the
+previous matrix. Build time grows with the number of changed tables, not
+with the size of the catalog.
+
+`publish_index` uploads the matrix and the manifest in one bulk call
+through an IndexStorage (storage.py), and skips the upload when the stored
+manifest is already identical. `fetch_index` downloads a published index
+into a local directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from ...lazy_imports import lazy_import
+from ...catalog import Catalog
+from .embedders import Embedder
+from .index import MANIFEST_FILE, MATRIX_FILE, VectorIndex
+from .storage import IndexStorage
+
+np = lazy_import("numpy")
+
+EMBED_BATCH = 1024
+INDEX_FILES = (MATRIX_FILE, MANIFEST_FILE)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class BuildReport:
+    index: VectorIndex
+    embedded: int                       # tables (re-)embedded by this build
+    reused: int                         # rows copied from the previous index
+    seconds: float
+
+
+def build_index(
+    catalog: Catalog,
+    embedder: Embedder,
+    directory: str | os.PathLike,
+    previous: Optional[VectorIndex] = None,
+) -> BuildReport:
+    """Write the index of `catalog` to `directory`, re-using the unchanged rows of `previous`."""
+    start = time.perf_counter()
+    names = list(catalog.tables)
+    texts = [catalog.render([n]) for n in names]
+    hashes = [text_hash(t) for t in texts]
+
+    known: dict[str, int] = {}
+    if previous is not None and previous.model == embedder.name and previous.matrix.shape[1:] == (embedder.dim,):
+        known = {h: row for row, h in enumerate(previous.hashes)}
+    reused = [i for i, h in enumerate(hashes) if h in known]
+    changed = [i for i, h in enumerate(hashes) if h not in known]
+
+    matrix = np.empty((len(names), embedder.dim), dtype=np.float32)
+    if reused:
+        matrix[reused] = previous.matrix[[known[hashes[i]] for i in reused]]
+    for i in range(0, len(changed), EMBED_BATCH):
+        rows = changed[i:i + EMBED_BATCH]
+        matrix[rows] = embedder.embed([texts[r] for r in rows])
+
+    index = VectorIndex.write(
+        directory, names, matrix, model=embedder.name, fingerprint=catalog.fingerprint, hashes=hashes
+    )
+    return BuildReport(index, len(changed), len(reused), time.perf_counter() - start)
+
+
+def publish_index(index: VectorIndex, storage: IndexStorage) -> bool:
+    """Upload `index` unless `storage` already holds the same manifest; True if it uploaded."""
+    manifest = (index.directory / MANIFEST_FILE).read_bytes()
+    if storage.read(MANIFEST_FILE) == manifest:
+        return False
+    storage.upload_many(index.directory, INDEX_FILES)
+    return True
+
+
+def fetch_index(storage: IndexStorage, directory: str | os.PathLike) -> Optional[VectorIndex]:
+    """Download the published index into `directory` (None if nothing is published)."""
+    if storage.read(MANIFEST_FILE) is None:
+        return None
+    storage.download_many(Path(directory), INDEX_FILES)
+    return VectorIndex.open(directory)
@@ -0,0 +1,100 @@
+"""
+Pluggable text embedders.
+
+Every embedder maps a batch of texts to an L2-normalised float32 matrix, so a
+dot product is a cosine similarity.
+
+    HashingEmbedder        – deterministic feature hashing of word unigrams,
+                             bigrams and snake_case parts; no model download,
+                             works offline and is the default
+    SentenceTransformerEmbedder – any sentence-transformers model (lazy import)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Protocol, Sequence
+
+from ...lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can could d for from give has have how i in is it know like "
+    "many me much of on or per please show tell that the their this to want was what when "
+    "where which who with would you".split()
+)
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32, rows L2-normalised."""
+        ...
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ies", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+class HashingEmbedder:
+    """Signed feature hashing – same text, same vector, on every machine."""
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        words = [
+            _stem(w) for w in _WORD_RE.findall(text.lower().replace("_", " "))
+            if w not in _STOPWORDS
+        ]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _slot(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, (1.0 if value >> 63 else -1.0)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                slot, sign = self._slot(feature)
+                out[row, slot] += sign
+        return _normalise(out)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.name = model_name
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(list(texts), batch_size=64, convert_to_numpy=True)
+        return _normalise(np.asarray(vectors, dtype=np.float32))
+
+
+def make_embedder(name: str) -> Embedder:
+    """"hashing" / "hashing-<dim>" → HashingEmbedder, anything else → sentence-transformers."""
+    if name == "hashing":
+        return HashingEmbedder()
+    if name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]))
+    return SentenceTransformerEmbedder(name)
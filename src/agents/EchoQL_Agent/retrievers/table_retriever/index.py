@@ -0,0 +1,131 @@
+"""
+On-disk vector index: a memory-mapped float32 matrix plus a JSON manifest.
+
+    <dir>/embeddings.f32   row i = embedding of manifest["keys"][i]
+    <dir>/manifest.json    {"model", "dim", "count", "fingerprint", "keys", "hashes"}
+
+`hashes[i]` identifies the text row i was embedded from, so a rebuild can
+keep every row whose text didn't change (see build.py).
+
+Opening an index maps the matrix read-only, so N processes share one copy in
+the page cache. Search is a batched matrix product over fixed-size row
+chunks (bounded memory at any index size) with a running top-k per query.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Sequence
+
+from ...lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+MATRIX_FILE = "embeddings.f32"
+MANIFEST_FILE = "manifest.json"
+SEARCH_CHUNK_ROWS = 65_536
+
+
+class VectorIndex:
+    def __init__(self, directory: Path, manifest: dict, matrix: np.ndarray) -> None:
+        self.directory = directory
+        self.manifest = manifest
+        self.keys: list[str] = manifest["keys"]
+        self.matrix = matrix
+
+    @property
+    def model(self) -> str:
+        return self.manifest["model"]
+
+    @property
+    def fingerprint(self) -> str:
+        return self.manifest.get("fingerprint", "")
+
+    @property
+    def hashes(self) -> list[str]:
+        return self.manifest.get("hashes", [])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # ── persistence ─────────────────────────────────────────
+    @classmethod
+    def write(
+        cls,
+        directory: str | os.PathLike,
+        keys: Sequence[str],
+        vectors: np.ndarray,
+        model: str,
+        fingerprint: str = "",
+        hashes: Sequence[str] = (),
+    ) -> "VectorIndex":
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        count, dim = vectors.shape
+        if count != len(keys):
+            raise ValueError(f"{len(keys)} keys for {count} vectors")
+        if hashes and len(hashes) != count:
+            raise ValueError(f"{len(hashes)} hashes for {count} vectors")
+
+        tmp = directory / (MATRIX_FILE + ".tmp")
+        mm = np.memmap(tmp, dtype=np.float32, mode="w+", shape=(max(count, 1), dim))
+        mm[:count] = vectors
+        mm.flush()
+        del mm
+        os.replace(tmp, directory / MATRIX_FILE)
+
+        manifest = {
+            "model": model,
+            "dim": dim,
+            "count": count,
+            "fingerprint": fingerprint,
+            "keys": list(keys),
+            "hashes": list(hashes),
+        }
+        tmp = directory / (MANIFEST_FILE + ".tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, directory / MANIFEST_FILE)
+        return cls.open(directory)
+
+    @classmethod
+    def open(cls, directory: str | os.PathLike) -> "VectorIndex":
+        directory = Path(directory)
+        manifest = json.loads((directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+        count, dim = manifest["count"], manifest["dim"]
+        matrix = np.memmap(
+            directory / MATRIX_FILE, dtype=np.float32, mode="r", shape=(max(count, 1), dim)
+        )[:count]
+        return cls(directory, manifest, matrix)
+
+    # ── search ──────────────────────────────────────────────
+    def search(self, queries: np.ndarray, k: int) -> list[list[tuple[str, float]]]:
+        """Top-k (key, cosine) per query row. `queries` must be L2-normalised."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        n_queries, count = len(queries), len(self.keys)
+        k = min(k, count)
+        if k <= 0:
+            return [[] for _ in range(n_queries)]
+
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((n_queries, k), dtype=np.int64)
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            chunk = self.matrix[start:start + SEARCH_CHUNK_ROWS]
+            scores = queries @ chunk.T                                   # (q, chunk)
+            take = min(k, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            cand_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            cand_rows = np.concatenate([best_rows, top + start], axis=1)
+            keep = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(cand_scores, keep, axis=1)
+            best_rows = np.take_along_axis(cand_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [
+            [(self.keys[r], float(s)) for r, s in zip(rows, scores)]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
@@ -0,0 +1,85 @@
+"""
+Table retriever: question → the k catalog tables most likely to answer it.
+
+Each table is embedded from its catalog render (name, description, columns),
+stored in a VectorIndex and rebuilt automatically whenever the catalog
+fingerprint or the embedding model changes – incrementally: only tables
+whose render changed are embedded again (build.py). Questions are embedded with the
+same model and scored against every table in one vectorised pass.
+
+When the catalog has no more than k tables there is nothing to narrow and
+the retriever returns them all without embedding anything.
+"""
+
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+from ...catalog import Catalog, load_catalog
+from ...settings import get_settings
+from .build import build_index
+from .embedders import Embedder, make_embedder
+from .index import VectorIndex
+
+
+class TableRetriever:
+    def __init__(self, catalog: Catalog, embedder: Embedder, index_dir: str | Path, top_k: int = 8) -> None:
+        self.catalog = catalog
+        self.embedder = embedder
+        self.index_dir = Path(index_dir)
+        self.top_k = top_k
+        self._index: VectorIndex | None = None
+        self._lock = threading.Lock()
+
+    # ── index ───────────────────────────────────────────────
+    def _stale(self, index: VectorIndex) -> bool:
+        return index.model != self.embedder.name or index.fingerprint != self.catalog.fingerprint
+
+    def build(self, previous: VectorIndex | None = None) -> VectorIndex:
+        return build_index(self.catalog, self.embedder, self.index_dir, previous).index
+
+    @property
+    def index(self) -> VectorIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    try:
+                        index = VectorIndex.open(self.index_dir)
+                        if self._stale(index):
+                            index = self.build(index)
+                    except (FileNotFoundError, KeyError, ValueError):
+                        index = self.build()
+                    self._index = index
+        return self._index
+
+    # ── search ──────────────────────────────────────────────
+    def scored(self, questions: Sequence[str], k: int | None = None) -> list[list[tuple[str, float]]]:
+        """(table, cosine) top-k per question, best first."""
+        k = k or self.top_k
+        return self.index.search(self.embedder.embed(questions), k)
+
+    def search_batch(self, questions: Sequence[str], k: int | None = None) -> list[list[str]]:
+        k = k or self.top_k
+        if len(self.catalog.tables) <= k:
+            return [list(self.catalog.tables) for _ in questions]
+        return [[name for name, _ in hits] for hits in self.scored(questions, k)]
+
+    def search(self, question: str, k: int | None = None) -> list[str]:
+        """Names of the k tables most relevant to `question` (all tables if it is empty)."""
+        if not question.strip():
+            return list(self.catalog.tables)
+        return self.search_batch([question], k)[0]
+
+
+@lru_cache(maxsize=1)
+def get_retriever() -> TableRetriever:
+    settings = get_settings()
+    return TableRetriever(
+        catalog=load_catalog(),
+        embedder=make_embedder(settings.embedding_model),
+        index_dir=settings.index_dir,
+        top_k=settings.top_k,
+    )
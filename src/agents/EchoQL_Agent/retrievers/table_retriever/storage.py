@@ -0,0 +1,90 @@
+"""
+Where a built index is published.
+
+    LocalStorage   – a directory (shared volume, tests, benchmarks)
+    GCSStorage     – a Cloud Storage bucket prefix; uploads and downloads go
+                     through the transfer manager, one bulk call for all files
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Sequence
+
+
+class IndexStorage(ABC):
+    name: str = "storage"
+
+    @abstractmethod
+    def read(self, name: str) -> Optional[bytes]:
+        """Contents of a stored file (None if there is none)."""
+
+    @abstractmethod
+    def upload_many(self, directory: Path, names: Sequence[str]) -> None:
+        """Store `directory/<name>` for every name."""
+
+    @abstractmethod
+    def download_many(self, directory: Path, names: Sequence[str]) -> None:
+        """Write every stored `name` to `directory/<name>`."""
+
+
+class LocalStorage(IndexStorage):
+    name = "local"
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+
+    def read(self, name: str) -> Optional[bytes]:
+        path = self.root / name
+        return path.read_bytes() if path.exists() else None
+
+    @staticmethod
+    def _copy(names: Sequence[str], source: Path, target: Path) -> None:
+        target.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            tmp = target / (name + ".tmp")
+            shutil.copyfile(source / name, tmp)
+            os.replace(tmp, target / name)
+
+    def upload_many(self, directory: Path, names: Sequence[str]) -> None:
+        self._copy(names, directory, self.root)
+
+    def download_many(self, directory: Path, names: Sequence[str]) -> None:
+        self._copy(names, self.root, directory)
+
+
+class GCSStorage(IndexStorage):
+    name = "gcs"
+
+    def __init__(self, bucket: str, prefix: str = "schema_embeddings", project: str | None = None) -> None:
+        from google.cloud import storage
+
+        self._bucket = storage.Client(project=project or None).bucket(bucket)
+        self.prefix = prefix.strip("/") + "/"
+
+    def read(self, name: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._bucket.blob(self.prefix + name).download_as_bytes()
+        except NotFound:
+            return None
+
+    def upload_many(self, directory: Path, names: Sequence[str]) -> None:
+        from google.cloud.storage import transfer_manager
+
+        transfer_manager.upload_many_from_filenames(
+            self._bucket, list(names), source_directory=str(directory),
+            blob_name_prefix=self.prefix, worker_type="thread", raise_exception=True,
+        )
+
+    def download_many(self, directory: Path, names: Sequence[str]) -> None:
+        from google.cloud.storage import transfer_manager
+
+        transfer_manager.download_many_to_path(
+            self._bucket, list(names), destination_directory=str(directory),
+            blob_name_prefix=self.prefix, worker_type="thread", raise_exception=True,
+        )
@@ -0,0 +1,5 @@
+from .advisor import Proposal, propose_rollups
+from .querylog import QUERY_LOG_ENABLED, QueryLog, get_query_log
+from .refresh import RefreshResult, refresh_rollup
+from .rollup import Rollup, RollupRegistry, RollupState, get_rollup_registry, rollup_dataset
+from .shapes import AggregateShape, RollupRewrite, aggregate_shapes, rewrite_to_rollups
@@ -0,0 +1,80 @@
+"""
+Rollup advisor – which rollups would answer the most logged queries.
+
+Every logged statement (as generated, before any rewrite) is reduced to its
+aggregate shapes (shapes.py). Shapes are taken by demand, most frequent
+first: one a rollup already proposed or registered covers at the same
+grain adds to that rollup's demand, any other proposes the rollup of exactly
+that shape – day-grained on the table's partition column when the shape
+reads the day (such rollups refresh incrementally; the others are rebuilt).
+A shape that doesn't read the day is never folded into a day-grained
+rollup: that can hold nearly as many rows as the base table.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable
+
+from ..catalog import Catalog, load_catalog
+from .rollup import Rollup, rollup_dataset
+from .shapes import AggregateShape, aggregate_shapes
+
+
+@dataclass
+class Proposal:
+    rollup: Rollup
+    queries: int = 0                # logged statements it answers
+    bytes: int = 0                  # bytes they scanned
+    seconds: float = 0.0            # time they took
+
+
+def propose_rollups(
+    entries: Iterable[dict],
+    catalog: Catalog | None = None,
+    *,
+    min_queries: int = 3,
+    max_rollups: int = 10,
+    existing: Iterable[Rollup] = (),
+) -> list[Proposal]:
+    """New rollups for the query log `entries`, each answering at least `min_queries` of them."""
+    catalog = catalog or load_catalog()
+    demand: Counter[AggregateShape] = Counter()
+    cost: dict[AggregateShape, list] = {}
+    for entry in entries:
+        sql = entry.get("original_sql") or entry.get("sql")
+        if not sql:
+            continue
+        for shape in set(aggregate_shapes(sql, catalog)):
+            demand[shape] += 1
+            spent = cost.setdefault(shape, [0, 0.0])
+            spent[0] += int(entry.get("bytes_before") or entry.get("bytes") or 0)
+            spent[1] += float(entry.get("seconds") or 0.0)
+
+    def covers(rollup: Rollup, shape: AggregateShape) -> bool:
+        return shape.fits(rollup) and (rollup.day_column is not None) == shape.day
+
+    existing = list(existing)
+    proposals: list[Proposal] = []
+    for shape, queries in demand.most_common():
+        if any(covers(r, shape) for r in existing):
+            continue
+        target = next((p for p in proposals if covers(p.rollup, shape)), None)
+        if target is None:
+            table = catalog.table(shape.table)
+            target = Proposal(Rollup(
+                table=shape.table,
+                dataset=rollup_dataset(catalog),
+                day_column=table.partition_by.lower() if shape.day and table.partition_by else None,
+                dimensions=tuple(sorted(shape.dimensions)),
+                measures=tuple(sorted(shape.measures)),
+            ))
+            proposals.append(target)
+        target.queries += queries
+        target.bytes += cost[shape][0]
+        target.seconds += cost[shape][1]
+
+    proposals = [p for p in proposals if p.queries >= min_queries]
+    proposals.sort(key=lambda p: (-p.queries, -p.bytes))
+    return proposals[:max_rollups]
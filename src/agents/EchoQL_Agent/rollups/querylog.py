@@ -0,0 +1,59 @@
+"""
+Executed-query log – what the rollup advisor mines.
+
+The fetcher appends one JSON line per statement it ran: the SQL, when, how
+long it took, rows and bytes scanned, and – when the optimizer rewrote it –
+the SQL as generated and the rollups it reads. ECHOQL_QUERY_LOG=0 turns the
+log off; ECHOQL_QUERY_LOG_PATH moves it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+QUERY_LOG_ENABLED = os.getenv("ECHOQL_QUERY_LOG", "1") != "0"
+QUERY_LOG_PATH = os.getenv(
+    "ECHOQL_QUERY_LOG_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "echoql", "query_log.jsonl"),
+)
+
+
+class QueryLog:
+    """Append-only JSON lines file; safe to append to from several threads."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict[str, Any]) -> None:
+        line = json.dumps({"ts": time.time(), **entry}, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+    def entries(self, since: Optional[float] = None) -> list[dict[str, Any]]:
+        """Logged entries (from epoch seconds `since` on, if given); unreadable lines are skipped."""
+        if not self.path.exists():
+            return []
+        out = []
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue                              # a line cut short by a crash
+                if since is None or entry.get("ts", 0) >= since:
+                    out.append(entry)
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_query_log() -> QueryLog:
+    return QueryLog(QUERY_LOG_PATH)
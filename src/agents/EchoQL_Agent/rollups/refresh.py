@@ -0,0 +1,112 @@
+"""
+Rollup refresh – full rebuilds and incremental day-range refreshes.
+
+A rollup whose base table hasn't been modified since its last refresh is
+left alone. Otherwise, when it is day-grained and already built, only the
+days from its watermark (latest day it holds) minus ECHOQL_ROLLUP_LOOKBACK_DAYS
+on are recomputed – their rows deleted and re-inserted in one transaction –
+provided the base table still has exactly the rows the rollup counts before
+that day – same row count, and the same checksum of the day, dimensions and
+measures (Rollup.checksum_sql), so an UPDATE to old rows is caught too. Rows
+changed further back, a first build, or `full=True` rebuild the table
+(CREATE OR REPLACE TABLE … AS).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Optional
+
+from ..catalog import Catalog
+from .rollup import DAY, Rollup, RollupState
+
+if TYPE_CHECKING:
+    from ..subagents.sql_fetcher_agent.connectors import Connector
+
+ROLLUP_LOOKBACK_DAYS = int(os.getenv("ECHOQL_ROLLUP_LOOKBACK_DAYS", "2"))
+
+
+@dataclass(frozen=True)
+class RefreshResult:
+    rollup: str
+    action: str                     # "fresh" | "incremental" | "full" | "failed"
+    state: RollupState
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _row(connector: Connector, sql: str) -> list:
+    rows = connector.execute_arrow(sql).read_all().to_pylist()
+    return list(rows[0].values()) if rows else []
+
+
+def _same(a, b) -> bool:
+    a, b = (0 if a is None else a), (0 if b is None else b)      # SUM over no rows is NULL, COUNT 0
+    if isinstance(a, float) or isinstance(b, float):             # float sums depend on the order of addition
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+
+def _incremental_since(connector: Connector, rollup: Rollup, state: RollupState, catalog: Catalog,
+                       lookback_days: int) -> Optional[str]:
+    """First day to recompute, or None when the rollup has to be rebuilt."""
+    if rollup.day_column is None or not state.refreshed_at or state.watermark is None:
+        return None
+    since = (date.fromisoformat(state.watermark) - timedelta(days=lookback_days)).isoformat()
+    base_sql, rollup_sql = rollup.checksum_sql(catalog, since)
+    base, kept = _row(connector, base_sql), _row(connector, rollup_sql)
+    if len(base) != len(kept) or not all(_same(a, b) for a, b in zip(base, kept)):
+        return None
+    return since
+
+
+def refresh_rollup(
+    connector: Connector,
+    rollup: Rollup,
+    state: RollupState,
+    catalog: Catalog,
+    *,
+    full: bool = False,
+    lookback_days: int = ROLLUP_LOOKBACK_DAYS,
+) -> RefreshResult:
+    """Bring `rollup` up to date with its base table; the state to record comes back in the result."""
+    start = time.perf_counter()
+    modified = connector.table_modified(f"{catalog.dataset}.{rollup.table}")
+    if (not full and state.refreshed_at and modified is not None
+            and state.source_modified is not None and modified <= state.source_modified):
+        return RefreshResult(rollup.name, "fresh", state)
+
+    refreshed_at = time.time()
+    try:
+        since = None if full else _incremental_since(connector, rollup, state, catalog, lookback_days)
+        if since is not None:
+            connector.run_statements([
+                f"DELETE FROM {rollup.table_id} WHERE {DAY} >= DATE '{since}' OR {DAY} IS NULL",
+                f"INSERT INTO {rollup.table_id} ({', '.join(rollup.columns(catalog))}) "
+                + rollup.select_sql(catalog, since),
+            ], atomic=True)
+        else:
+            connector.run_statements([
+                f"CREATE SCHEMA IF NOT EXISTS {rollup.dataset}",
+                rollup.create_sql(catalog),
+            ])
+        summary = connector.execute_arrow(
+            f"SELECT {f'MAX({DAY})' if rollup.day_column else 'NULL'} AS watermark, COUNT(*) AS n "
+            f"FROM {rollup.table_id}"
+        ).read_all().to_pylist()[0]
+    except Exception as exc:
+        return RefreshResult(rollup.name, "failed", state, time.perf_counter() - start, str(exc).splitlines()[0])
+
+    watermark = summary["watermark"]
+    new_state = RollupState(
+        refreshed_at=refreshed_at,
+        source_modified=modified,               # as of before the refresh: later writes make it stale
+        watermark=watermark.isoformat() if watermark is not None else None,
+        rows=int(summary["n"]),
+    )
+    action = "incremental" if since is not None else "full"
+    return RefreshResult(rollup.name, action, new_state, time.perf_counter() - start)
@@ -0,0 +1,260 @@
+"""
+Rollup definitions and their registry.
+
+A rollup summarises one catalog table: one row per combination of
+dimension columns – and day of the partition column, for day-grained ones –
+with the number of rows and, per measure column, its non-NULL count, min and
+max – and sum, for numbers:
+
+    rollup_mock_user_sessions_by_day_user_id_with_duration_min
+        rollup_day DATE, user_id INT64, rollup_rows INT64,
+        count_duration_min INT64, min_duration_min FLOAT64,
+        max_duration_min FLOAT64, sum_duration_min FLOAT64
+
+Rollups live in their own dataset (ECHOQL_ROLLUP_DATASET, default
+`<catalog dataset>_rollups`), so the catalog refresh never picks them up;
+day-grained ones are partitioned by rollup_day.
+The registry (ECHOQL_ROLLUP_REGISTRY, a JSON file) holds the definitions
+and each one's refresh state; a rollup is only read while the base table
+hasn't been modified since its last refresh.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..catalog import Catalog
+
+ROLLUP_REGISTRY_PATH = os.getenv(
+    "ECHOQL_ROLLUP_REGISTRY",
+    os.path.join(os.path.expanduser("~"), ".cache", "echoql", "rollups.json"),
+)
+ROLLUP_DATASET = os.getenv("ECHOQL_ROLLUP_DATASET") or None
+# base tables whose last modification is unknown: how long a refresh is trusted
+ROLLUP_MAX_STALENESS_S = float(os.getenv("ECHOQL_ROLLUP_MAX_STALENESS_S", "900"))
+
+DAY = "rollup_day"
+ROWS = "rollup_rows"
+_NUMERIC = {"INT64", "FLOAT64", "NUMERIC", "BIGNUMERIC"}
+
+
+def rollup_dataset(catalog: Catalog) -> str:
+    return ROLLUP_DATASET or f"{catalog.dataset}_rollups"
+
+
+@dataclass(frozen=True)
+class Rollup:
+    table: str                                  # catalog table it summarises
+    dataset: str                                # where the rollup table lives
+    day_column: Optional[str] = None            # partition column, summarised by day
+    dimensions: tuple[str, ...] = ()            # group-by columns
+    measures: tuple[str, ...] = ()              # columns with count / min / max (/ sum)
+
+    @property
+    def name(self) -> str:
+        grain = (["day"] if self.day_column else []) + list(self.dimensions)
+        name = f"rollup_{self.table}_by_{'_'.join(grain) or 'all'}"
+        return name + (f"_with_{'_'.join(self.measures)}" if self.measures else "")
+
+    @property
+    def table_id(self) -> str:
+        return f"{self.dataset}.{self.name}"
+
+    def _type(self, column: str, catalog: Catalog) -> str:
+        table = catalog.table(self.table)
+        known = table.column(column) if table else None
+        return known.type.upper() if known else ""
+
+    def measure_aggregates(self, column: str, catalog: Catalog) -> tuple[str, ...]:
+        """Aggregates kept for a measure column: count / min / max, and sum for numbers."""
+        numeric = self._type(column, catalog) in _NUMERIC
+        return ("count", "min", "max") + (("sum",) if numeric else ())
+
+    def day_expression(self, catalog: Catalog) -> Optional[str]:
+        """The day of the partition column, as the rollup groups on it."""
+        if self.day_column is None:
+            return None
+        if self._type(self.day_column, catalog) == "DATE":
+            return self.day_column
+        return f"DATE({self.day_column})"
+
+    def columns(self, catalog: Catalog) -> list[str]:
+        columns = ([DAY] if self.day_column else []) + list(self.dimensions) + [ROWS]
+        for column in self.measures:
+            columns += [f"{kind}_{column}" for kind in self.measure_aggregates(column, catalog)]
+        return columns
+
+    def select_sql(self, catalog: Catalog, since: Optional[str] = None) -> str:
+        """The rollup's query over the base table – only the days from `since` (ISO date) on, if given."""
+        day = self.day_expression(catalog)
+        keys = ([f"{day} AS {DAY}"] if day else []) + list(self.dimensions)
+        values = [f"COUNT(*) AS {ROWS}"]
+        for column in self.measures:
+            values += [
+                f"{kind.upper()}({column}) AS {kind}_{column}" for kind in self.measure_aggregates(column, catalog)
+            ]
+        sql = f"SELECT {', '.join(keys + values)} FROM {catalog.dataset}.{self.table}"
+        if since is not None and day:
+            sql += f" WHERE {day} >= DATE '{since}' OR {day} IS NULL"
+        if keys:
+            sql += f" GROUP BY {', '.join(str(i) for i in range(1, len(keys) + 1))}"
+        return sql
+
+    def _as_number(self, column: str, catalog: Catalog) -> str:
+        kind = self._type(column, catalog)
+        if kind in _NUMERIC:
+            return column
+        if kind == "DATE":
+            return f"UNIX_DATE({column})"
+        if kind == "TIMESTAMP":
+            return f"UNIX_SECONDS({column})"
+        if kind == "DATETIME":
+            return f"UNIX_SECONDS(TIMESTAMP({column}))"
+        if kind == "BOOL":
+            return f"IF({column}, 1, 0)"
+        return f"LENGTH(CAST({column} AS STRING))"
+
+    def checksum_sql(self, catalog: Catalog, before: str) -> tuple[str, str]:
+        """
+        One-row queries over the base table and over the rollup, for the days
+        before `before` (ISO date), that return the same values while the
+        rollup still summarises exactly those base rows: row count, the day and
+        every dimension summed as numbers (weighted by the rollup's row count),
+        and each measure's count / sum / min / max.
+        """
+        day = self.day_expression(catalog)
+        pairs = [("COUNT(*)", f"SUM({ROWS})"), (f"SUM(UNIX_DATE({day}))", f"SUM(UNIX_DATE({DAY}) * {ROWS})")]
+        for column in self.dimensions:
+            value = self._as_number(column, catalog)
+            pairs += [
+                (f"COUNT({column})", f"SUM(IF({column} IS NULL, 0, {ROWS}))"),
+                (f"SUM({value})", f"SUM({value} * {ROWS})"),
+            ]
+        for column in self.measures:
+            for kind in self.measure_aggregates(column, catalog):
+                again = "SUM" if kind in ("count", "sum") else kind.upper()
+                pairs.append((f"{kind.upper()}({column})", f"{again}({kind}_{column})"))
+        base = (f"SELECT {', '.join(b for b, _ in pairs)} FROM {catalog.dataset}.{self.table} "
+                f"WHERE {day} < DATE '{before}'")
+        rolled = f"SELECT {', '.join(r for _, r in pairs)} FROM {self.table_id} WHERE {DAY} < DATE '{before}'"
+        return base, rolled
+
+    def create_sql(self, catalog: Catalog) -> str:
+        """CREATE OR REPLACE TABLE … AS the rollup's query (partitioned by day, if day-grained)."""
+        partition = f" PARTITION BY {DAY}" if self.day_column else ""
+        return f"CREATE OR REPLACE TABLE {self.table_id}{partition} AS {self.select_sql(catalog)}"
+
+    def to_dict(self) -> dict:
+        return {
+            "table": self.table,
+            "dataset": self.dataset,
+            "day_column": self.day_column,
+            "dimensions": list(self.dimensions),
+            "measures": list(self.measures),
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "Rollup":
+        return cls(
+            table=raw["table"],
+            dataset=raw["dataset"],
+            day_column=raw.get("day_column"),
+            dimensions=tuple(raw.get("dimensions", ())),
+            measures=tuple(raw.get("measures", ())),
+        )
+
+
+@dataclass
+class RollupState:
+    refreshed_at: float = 0.0                   # epoch seconds; 0 → never built
+    source_modified: Optional[float] = None     # base table's last modification, as of that refresh
+    watermark: Optional[str] = None             # latest day in the rollup (ISO date)
+    rows: int = 0
+
+
+@dataclass
+class _Entry:
+    rollup: Rollup
+    state: RollupState = field(default_factory=RollupState)
+
+
+class RollupRegistry:
+    """Registered rollups and their refresh state, kept in a JSON file (re-read when another process writes it)."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._entries: dict[str, _Entry] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._reload()
+
+    def _reload(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return                                      # nothing saved yet
+        if mtime == self._mtime:
+            return
+        raw = json.loads(self.path.read_text(encoding="utf-8"))
+        entries = {}
+        for item in raw.get("rollups", []):
+            rollup = Rollup.from_dict(item)
+            entries[rollup.name] = _Entry(rollup, RollupState(**item.get("state", {})))
+        self._entries, self._mtime = entries, mtime
+
+    def save(self) -> None:
+        with self._lock:
+            raw = {"rollups": [e.rollup.to_dict() | {"state": asdict(e.state)} for e in self._entries.values()]}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(raw, indent=2) + "\n", encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._mtime = self.path.stat().st_mtime
+
+    def rollups(self) -> list[Rollup]:
+        with self._lock:
+            self._reload()
+            return [e.rollup for e in self._entries.values()]
+
+    def state(self, name: str) -> RollupState:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.state if entry else RollupState()
+
+    def add(self, rollup: Rollup) -> bool:
+        """Register `rollup` (not built yet); False if it already is."""
+        with self._lock:
+            if rollup.name in self._entries:
+                return False
+            self._entries[rollup.name] = _Entry(rollup)
+            return True
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def set_state(self, name: str, state: RollupState) -> None:
+        with self._lock:
+            self._entries[name].state = state
+
+    def usable(self, rollup: Rollup, modified: Callable[[str], Optional[float]], catalog: Catalog) -> bool:
+        """True if `rollup` is built and the base table hasn't changed since (by `modified(table_id)`)."""
+        state = self.state(rollup.name)
+        if not state.refreshed_at:
+            return False
+        base_modified = modified(f"{catalog.dataset}.{rollup.table}")
+        if base_modified is None:
+            return time.time() - state.refreshed_at <= ROLLUP_MAX_STALENESS_S
+        return state.source_modified is not None and base_modified <= state.source_modified
+
+
+@lru_cache(maxsize=1)
+def get_rollup_registry() -> RollupRegistry:
+    return RollupRegistry(ROLLUP_REGISTRY_PATH)
@@ -0,0 +1,368 @@
+"""
+Aggregate shapes of a statement, and its rewrite onto rollups.
+
+A SELECT is a candidate when it reads exactly one catalog table – no joins,
+subqueries, window functions, ROLLUP / CUBE / GROUPING SETS or TABLESAMPLE –
+and aggregates (GROUP BY or aggregate functions). Its shape is what a rollup
+must keep to answer it: whether it reads the partition column only by its
+day, the columns it groups / filters on (dimensions), and the columns it
+aggregates (measures).
+
+A candidate is rewritten onto a rollup when every expression lifts:
+
+    DATE(created_at), CAST(… AS DATE), a DATE partition column  → rollup_day
+    created_at >= '2024-06-01' / created_at < '2024-06-01'       → on rollup_day
+    EXTRACT(YEAR FROM created_at) (units of a day or longer)     → EXTRACT(… FROM rollup_day)
+    other columns outside aggregates                             → the same dimension
+    COUNT(*)                     → SUM(rollup_rows)
+    COUNT(c) / SUM(c)            → SUM(count_c) / SUM(sum_c)
+    AVG(c)                       → SAFE_DIVIDE(SUM(sum_c), SUM(count_c))
+    MIN(c) / MAX(c)              → MIN(min_c) / MAX(max_c), or of the dimension
+    COUNT(DISTINCT …), APPROX_COUNT_DISTINCT(…) of dimensions    → unchanged
+
+(COUNT / SUM without GROUP BY are wrapped in COALESCE(…, 0) where the base
+query returns 0 on no rows.) Anything else – COUNTIF, a bare TIMESTAMP
+partition column, a column the rollup doesn't keep – leaves the SELECT as
+it is. Since every rollup row stands for base rows that agree on all its
+dimensions, filters on them select the same rows, and the rewritten
+statement returns what the original does.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from ..catalog import Catalog, Table, load_catalog
+from ..lazy_imports import lazy_import
+from .rollup import DAY, ROWS, Rollup
+
+sqlglot = lazy_import("sqlglot")
+exp = lazy_import("sqlglot.expressions")
+optimizer_scope = lazy_import("sqlglot.optimizer.scope")
+
+_DAY_TYPES = {"DATE", "DATETIME", "TIMESTAMP"}
+_DAY_UNITS = {"DAY", "DAYOFWEEK", "DAYOFYEAR", "WEEK", "ISOWEEK", "MONTH", "QUARTER", "YEAR", "ISOYEAR"}
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# SELECT clauses a rollup can't stand in for
+_UNSUPPORTED = ("joins", "laterals", "windows", "qualify", "connect", "match", "prewhere", "into")
+
+
+@dataclass(frozen=True)
+class AggregateShape:
+    table: str
+    day: bool                                   # reads the partition column by its day
+    dimensions: frozenset[str]
+    measures: frozenset[str]
+
+    def fits(self, rollup: Rollup) -> bool:
+        return (
+            rollup.table == self.table
+            and (rollup.day_column is not None or not self.day)
+            and self.dimensions <= set(rollup.dimensions)
+            and self.measures <= set(rollup.measures)
+        )
+
+
+@dataclass(frozen=True)
+class RollupRewrite:
+    sql: str
+    rollups: tuple[str, ...] = ()               # rollup per SELECT rewritten; () → sql is the input
+
+
+class _NoMatch(Exception):
+    pass
+
+
+class _Lift:
+    """
+    Rewrites one candidate SELECT onto `rollup` – or, with rollup=None, onto
+    whatever it needs, recording that as its shape. Raises _NoMatch where it can't.
+    """
+
+    def __init__(self, select, source, table: Table, catalog: Catalog, rollup: Optional[Rollup]) -> None:
+        self.select = select
+        self.source = source
+        self.table = table
+        self.catalog = catalog
+        self.rollup = rollup
+        self.partition = table.partition_by.lower() if table.partition_by else None
+        partition = table.column(self.partition) if self.partition else None
+        self.partition_type = partition.type.upper() if partition else None
+        self.grouped = select.args.get("group") is not None
+        self.aliases = {p.alias.lower(): p for p in select.expressions if p.alias}
+        self.day = False
+        self.dimensions: set[str] = set()
+        self.measures: set[str] = set()
+
+    @property
+    def shape(self) -> AggregateShape:
+        return AggregateShape(self.table.name, self.day, frozenset(self.dimensions), frozenset(self.measures))
+
+    # ── what the rollup keeps ───────────────────────────────
+    def _use_day(self) -> None:
+        if self.rollup is not None and self.rollup.day_column is None:
+            raise _NoMatch
+        self.day = True
+
+    def _use_dimension(self, name: str) -> None:
+        if self.rollup is not None and name not in self.rollup.dimensions:
+            raise _NoMatch
+        self.dimensions.add(name)
+
+    def _use_measure(self, name: str, kind: str) -> str:
+        if self.rollup is not None:
+            if name not in self.rollup.measures:
+                raise _NoMatch
+            if kind not in self.rollup.measure_aggregates(name, self.catalog):
+                raise _NoMatch
+        self.measures.add(name)
+        return f"{kind}_{name}"
+
+    # ── columns ─────────────────────────────────────────────
+    def _own(self, node) -> Optional[str]:
+        """Lower-case name of the table column `node` refers to (None if it's no column of the table)."""
+        if not isinstance(node, exp.Column) or isinstance(node.this, exp.Star):
+            return None
+        if node.table and node.table != self.source.alias_or_name:
+            return None
+        return node.name.lower() if self.table.column(node.name) else None
+
+    def _column(self, name: str, like) -> "exp.Column":
+        return exp.column(name, table=like.table or None)
+
+    def _day_of(self, node):
+        """rollup_day, if `node` is the day of the partition column."""
+        if self.partition_type not in _DAY_TYPES:
+            return None
+        if isinstance(node, exp.Date) and {k for k, v in node.args.items() if v} == {"this"}:
+            column = node.this
+        elif isinstance(node, exp.Cast) and node.to.is_type("date"):
+            column = node.this
+        elif self.partition_type == "DATE":
+            column = node
+        else:
+            return None
+        if self._own(column) != self.partition:
+            return None
+        self._use_day()
+        return self._column(DAY, column)
+
+    def _day_bound(self, node):
+        """`ts >= 'YYYY-MM-DD'` / `ts < 'YYYY-MM-DD'` on a TIMESTAMP / DATETIME partition column, by day."""
+        if self.partition_type not in {"DATETIME", "TIMESTAMP"}:
+            return None
+        mirrored = {exp.GTE: exp.LTE, exp.LT: exp.GT, exp.LTE: exp.GTE, exp.GT: exp.LT}
+        if type(node) not in mirrored:
+            return None
+        column, value, op = node.this, node.expression, type(node)
+        if self._own(column) != self.partition:                   # 'd' <= ts  ⇔  ts >= 'd'
+            column, value, op = value, column, mirrored[op]
+        if op not in (exp.GTE, exp.LT) or self._own(column) != self.partition:
+            return None
+        if not (isinstance(value, exp.Literal) and value.is_string and _ISO_DATE.match(value.this)):
+            return None
+        self._use_day()
+        return op(this=self._column(DAY, column), expression=value.copy())
+
+    # ── expressions ─────────────────────────────────────────
+    def key(self, node, clause: str = ""):
+        """`node` outside aggregates – over days and dimensions only."""
+        lifted = self._day_of(node)
+        if lifted is None:
+            lifted = self._day_bound(node)
+        if lifted is not None:
+            return lifted
+        if isinstance(node, exp.AggFunc):
+            return self.aggregate(node)
+        if isinstance(node, exp.Extract) and self.partition and self._own(node.expression) == self.partition:
+            if node.this.name.upper() not in _DAY_UNITS:
+                raise _NoMatch
+            self._use_day()
+            return exp.Extract(this=node.this.copy(), expression=self._column(DAY, node.expression))
+        if isinstance(node, exp.Column):
+            return self._key_column(node, clause)
+        if isinstance(node, (exp.Star, exp.Query, exp.Rand, exp.Window)):
+            raise _NoMatch
+        return _rebuild(node, lambda child: self.key(child, clause))
+
+    def _key_column(self, node, clause: str):
+        name = self._own(node)
+        alias = self.aliases.get(node.name.lower()) if clause and not node.table else None
+        if alias is not None:                                 # GROUP BY / HAVING / ORDER BY an output name
+            if name is not None and self._own(alias.this) != name:
+                raise _NoMatch                                # the name is ambiguous
+            return node.copy()
+        if name is None or name == self.partition:            # a bare TIMESTAMP partition column: no day
+            raise _NoMatch
+        self._use_dimension(name)
+        return self._column(name, node)
+
+    def aggregate(self, node):
+        total = (lambda e: e) if self.grouped else (lambda e: exp.Coalesce(this=e, expressions=[exp.Literal.number(0)]))
+        arg = node.this
+        if isinstance(node, exp.Count):
+            if arg is None or isinstance(arg, exp.Star):
+                return total(exp.Sum(this=exp.column(ROWS)))
+            if isinstance(arg, exp.Distinct):
+                return exp.Count(this=exp.Distinct(expressions=[self.key(e) for e in arg.expressions]))
+            return total(exp.Sum(this=exp.column(self._measure(arg, "count"))))
+        if isinstance(node, exp.ApproxDistinct) and {k for k, v in node.args.items() if v} == {"this"}:
+            return exp.ApproxDistinct(this=self.key(arg))
+        if isinstance(node, exp.Sum) and self._own(arg):
+            return exp.Sum(this=exp.column(self._measure(arg, "sum")))
+        if isinstance(node, exp.Avg) and self._own(arg):
+            return exp.SafeDivide(
+                this=exp.Sum(this=exp.column(self._measure(arg, "sum"))),
+                expression=exp.Sum(this=exp.column(self._measure(arg, "count"))),
+            )
+        if isinstance(node, (exp.Min, exp.Max)) and not node.expressions:
+            kind = "min" if isinstance(node, exp.Min) else "max"
+            name = self._own(arg)
+            if name is not None and self._day_of(arg) is None and (
+                self.rollup is None or name in self.rollup.measures or name == self.partition
+            ):
+                return node.__class__(this=exp.column(self._use_measure(name, kind)))
+            return node.__class__(this=self.key(arg))         # MIN / MAX ignore duplicates
+        raise _NoMatch
+
+    def _measure(self, arg, kind: str) -> str:
+        name = self._own(arg)
+        if name is None:
+            raise _NoMatch
+        return self._use_measure(name, kind)
+
+    # ── the SELECT ──────────────────────────────────────────
+    def lift(self):
+        select = self.select
+        projections = []
+        for projection in select.expressions:
+            if isinstance(projection, exp.Alias):
+                projections.append(exp.alias_(self.key(projection.this), projection.alias))
+                continue
+            lifted = self.key(projection)
+            if isinstance(projection, exp.Column):
+                if lifted.name.lower() != projection.name.lower():
+                    lifted = exp.alias_(lifted, projection.name)
+            elif isinstance(lifted, exp.Column):
+                raise _NoMatch                                # would change the output column name
+            projections.append(lifted)
+
+        new = select.copy()
+        new.set("expressions", projections)
+        if where := select.args.get("where"):
+            new.set("where", exp.Where(this=self.key(where.this)))
+        if group := select.args.get("group"):
+            new.set("group", group.copy())
+            new.args["group"].set("expressions", [self.key(e, "group") for e in group.expressions])
+        if having := select.args.get("having"):
+            new.set("having", exp.Having(this=self.key(having.this, "having")))
+        if order := select.args.get("order"):
+            new.set("order", exp.Order(expressions=[
+                o.__class__(**{**o.args, "this": self.key(o.this, "order")}) for o in order.expressions
+            ]))
+        if self.rollup is not None:
+            alias = self.source.alias_or_name
+            new.set("from_", exp.From(this=exp.table_(
+                self.rollup.name, db=self.rollup.dataset, catalog=self.source.catalog or None, alias=alias
+            )))
+        return new
+
+
+def _rebuild(node, lift: Callable):
+    """`node` with `lift` applied to every child that reads a column."""
+    if not any(isinstance(n, (exp.Column, exp.AggFunc, exp.Star)) for n in node.walk()):
+        return node.copy()
+    args = {}
+    for key, value in node.args.items():
+        if isinstance(value, list):
+            args[key] = [lift(v) if isinstance(v, exp.Expression) else v for v in value]
+        else:
+            args[key] = lift(value) if isinstance(value, exp.Expression) else value
+    return node.__class__(**args)
+
+
+def _candidates(tree, catalog: Catalog) -> Iterable[tuple]:
+    """(select, source table, catalog table) for every candidate SELECT, innermost first."""
+    for scope in optimizer_scope.traverse_scope(tree):
+        select = scope.expression
+        if not isinstance(select, exp.Select) or scope.subquery_scopes or len(scope.sources) != 1:
+            continue
+        from_ = select.args.get("from_")
+        source = from_.this if from_ else None
+        if not isinstance(source, exp.Table) or any(select.args.get(k) for k in _UNSUPPORTED):
+            continue
+        if set(k for k, v in source.args.items() if v) - {"this", "db", "catalog", "alias"}:
+            continue                                          # TABLESAMPLE, FOR SYSTEM_TIME AS OF, pivots …
+        if source.db and source.db.lower() != catalog.dataset.lower():
+            continue
+        table = catalog.table(source.name)
+        group = select.args.get("group")
+        if table is None or select.find(exp.Window):
+            continue
+        if group is None and not select.find(exp.AggFunc):
+            continue
+        if group is not None and (
+            any(group.args.get(k) for k in ("grouping_sets", "cube", "rollup", "totals"))
+            or any(isinstance(e, (exp.Rollup, exp.Cube, exp.GroupingSets)) for e in group.expressions)
+        ):
+            continue
+        yield select, source, table
+
+
+def aggregate_shapes(sql: str, catalog: Catalog | None = None) -> list[AggregateShape]:
+    """Shapes of the candidate SELECTs in `sql` (GoogleSQL) that a rollup could answer."""
+    catalog = catalog or load_catalog()
+    try:
+        tree = sqlglot.parse_one(sql, read="bigquery")
+        shapes = []
+        for select, source, table in _candidates(tree, catalog):
+            lift = _Lift(select, source, table, catalog, None)
+            try:
+                lift.lift()
+            except _NoMatch:
+                continue
+            shapes.append(lift.shape)
+    except sqlglot.errors.SqlglotError:
+        return []
+    return shapes
+
+
+def _size(rollup: Rollup) -> tuple:
+    """Sort key: coarser rollups (fewer dimensions, no day) first – they have fewer rows."""
+    return len(rollup.dimensions), rollup.day_column is not None, len(rollup.measures), rollup.name
+
+
+def rewrite_to_rollups(
+    sql: str,
+    rollups: Iterable[Rollup],
+    catalog: Catalog | None = None,
+) -> RollupRewrite:
+    """Every candidate SELECT of `sql` rewritten onto the smallest of `rollups` that answers it."""
+    catalog = catalog or load_catalog()
+    by_table: dict[str, list[Rollup]] = {}
+    for rollup in sorted(rollups, key=_size):
+        by_table.setdefault(rollup.table, []).append(rollup)
+    if not by_table:
+        return RollupRewrite(sql)
+    try:
+        tree = sqlglot.parse_one(sql, read="bigquery")
+        used = []
+        for select, source, table in list(_candidates(tree, catalog)):
+            for rollup in by_table.get(table.name, ()):
+                try:
+                    new = _Lift(select, source, table, catalog, rollup).lift()
+                except _NoMatch:
+                    continue
+                if select is tree:
+                    tree = new
+                else:
+                    select.replace(new)
+                used.append(rollup.name)
+                break
+    except sqlglot.errors.SqlglotError:
+        return RollupRewrite(sql)
+    if not used:
+        return RollupRewrite(sql)
+    return RollupRewrite(tree.sql(dialect="bigquery"), tuple(used))
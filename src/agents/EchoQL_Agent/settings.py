@@ -0,0 +1,62 @@
+"""
+Settings
+───────────────────────────────────────────────────────────────────────────────
+Configuration is loaded once per process: the first `get_settings()` call
+loads the nearest `.env` walking up from this package (real environment
+variables win over it), then freezes the settings shared by several agents
+into a `Settings`.
+
+The package's `__init__` calls it before importing any agent, so the
+per-module knobs (ECHOQL_*, read with os.getenv next to the code that uses
+them – see the README) already see the `.env` values.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    fast_llm_model: str                 # every LLM agent (checker, generator, validator, repair, planner)
+    gcp_project: str                    # BigQuery project queries are billed to
+    env_file: Optional[Path]            # the .env that was loaded, if any
+    # table retriever (and the semantic cache's question embeddings)
+    embedding_model: str                # "hashing" (deterministic, offline) or a sentence-transformers model
+    index_dir: Path                     # where the memory-mapped table index lives
+    top_k: int                          # tables handed to the checker / generator
+    # publishing the table index – scripts/upload_schema_embeddings.py only
+    project_id: str
+    vertex_index_endpoint: str
+
+
+def _load_env_file() -> Optional[Path]:
+    for parent in Path(__file__).resolve().parents:
+        env_file = parent / ".env"
+        if env_file.exists():
+            load_dotenv(env_file)       # never overrides variables already set
+            return env_file
+    return None
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    env_file = _load_env_file()
+    return Settings(
+        fast_llm_model=os.getenv("FAST_LLM_MODEL", "gemini-1.5-flash"),
+        gcp_project=os.getenv("ECHOQL_BQ_PROJECT") or os.getenv("GOOGLE_CLOUD_PROJECT", "adk-hackathon-461216"),
+        env_file=env_file,
+        embedding_model=os.getenv("EMBEDDING_MODEL", "hashing"),
+        index_dir=Path(
+            os.getenv("ECHOQL_TABLE_INDEX_DIR") or Path.home() / ".cache" / "echoql" / "table_index"
+        ),
+        top_k=int(os.getenv("ECHOQL_RETRIEVER_TOP_K", "8")),
+        project_id=os.getenv("PROJECT_ID", ""),
+        vertex_index_endpoint=os.getenv("VERTEX_INDEX_ENDPOINT", ""),
+    )
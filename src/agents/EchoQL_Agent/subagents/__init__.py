@@ -1 +1 @@
-from . import data_availability_checker_agent, sql_generator_agent, sql_repair_agent, sql_fetcher_agent, sql_validator_agent
\ No newline at end of file
+from . import data_availability_checker_agent, sql_generator_agent, sql_repair_agent, sql_fetcher_agent, sql_validator_agent, cost_gate_agent
\ No newline at end of file
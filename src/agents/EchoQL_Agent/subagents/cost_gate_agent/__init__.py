@@ -0,0 +1 @@
+from .agent import cost_gate_agent
@@ -0,0 +1,186 @@
+"""
+Cost Gate Agent
+───────────────────────────────────────────────────────────────────────────────
+Runs between SQL authoring (semantic cache → checker → generator → validator →
+repair) and the fetcher. Every valid statement is dry-run on the execution
+backend first – a BigQuery dry-run job, or the local DuckDB stand-in that
+sizes the columns read from table statistics – which yields the bytes it
+would scan and the tables it reads, for free.
+
+• Compile error in the dry run → validation_status "invalid: <error>" and the
+  repair agent gets a go, exactly as if the validator had caught it.
+• Over budget (per-query bytes, the user's rolling scan budget, or an
+  expected scan time beyond the query timeout – see budget.py) →
+  ECHOQL_COST_GATE_ACTION=repair (default) hands the SQL to the repair agent
+  with a "reduce scanned bytes" hint; =reject blocks it straight away.
+• Within budget → the estimate is charged to the user and the fetcher runs.
+  The budget check and the charge are one locked step (`try_charge`), so
+  concurrent planner branches can't overspend the user's budget together.
+  A preview's extra COUNT(*) is charged by the fetcher the same way.
+
+At most ECHOQL_COST_GATE_REPAIR_ROUNDS repair rounds; SQL that is still
+rejected leaves validation_status invalid, so the fetcher does nothing. A
+backend without a dry run (or a dry run that fails to reach the backend)
+lets the query through – the gate never takes the service down with it.
+
+Outputs written to session.state:
+- "dry_run":           {"sql", "bytes_processed", "tables", "estimated"} of the
+                       last statement dry-run (the validator writes it too)
+- "scan_bytes_estimate": bytes charged for the admitted query (None when the
+                       gate did not price it)
+- "sql_query" / "validation_status" when a repair round rewrote or rejected it
+
+COST_GATE_COUNTERS counts admitted / repaired / rejected / dry_run_error /
+unavailable.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.genai import types
+from pydantic import PrivateAttr
+
+from ...tracing import annotate
+from ..sql_fetcher_agent.bigquery_connector import BQ_QUERY_TIMEOUT_S, DryRun, dry_run_async
+from .budget import ByteBudget, format_bytes
+
+COST_GATE_ENABLED = os.getenv("ECHOQL_COST_GATE", "1") != "0"
+COST_GATE_ACTION = os.getenv("ECHOQL_COST_GATE_ACTION", "repair").strip().lower()   # repair | reject
+COST_GATE_REPAIR_ROUNDS = int(os.getenv("ECHOQL_COST_GATE_REPAIR_ROUNDS", "1"))
+COST_GATE_QUERY_GB = float(os.getenv("ECHOQL_COST_GATE_QUERY_GB", "10"))
+COST_GATE_USER_GB = float(os.getenv("ECHOQL_COST_GATE_USER_GB", "100"))
+COST_GATE_WINDOW_S = float(os.getenv("ECHOQL_COST_GATE_WINDOW_S", str(24 * 3600)))
+COST_GATE_SCAN_GBPS = float(os.getenv("ECHOQL_COST_GATE_SCAN_GBPS", "1"))    # expected scan rate
+
+REDUCE_BYTES_HINT = (
+    "reduce scanned bytes: select only the columns the question needs (no SELECT *), "
+    "filter on date / partition columns, and aggregate in SQL"
+)
+
+# admitted / repaired / rejected / dry_run_error / unavailable
+COST_GATE_COUNTERS: Counter = Counter()
+
+
+@lru_cache(maxsize=1)
+def get_byte_budget() -> ByteBudget:
+    return ByteBudget(
+        per_query_bytes=int(COST_GATE_QUERY_GB * 1024 ** 3),
+        per_user_bytes=int(COST_GATE_USER_GB * 1024 ** 3),
+        window_s=COST_GATE_WINDOW_S,
+    )
+
+
+def dry_run_state(sql: str, result: DryRun) -> dict[str, Any]:
+    return {
+        "sql": sql,
+        "bytes_processed": result.bytes_processed,
+        "tables": list(result.tables),
+        "estimated": result.estimated,
+    }
+
+
+def _make_event(author: str, text: str) -> Event:
+    return Event(author=author, content=types.Content(parts=[types.Part(text=text)]))
+
+
+class CostGateAgent(BaseAgent):
+    _repair: Any = PrivateAttr()
+
+    def __init__(self) -> None:
+        super().__init__(
+            name="CostGateAgent",
+            description="Dry-runs valid SQL and enforces per-query and per-user scan budgets.",
+        )
+        # Lazy import to avoid circular refs
+        from ..sql_repair_agent.agent import sql_repair_agent
+
+        self._repair = sql_repair_agent
+
+    async def _dry_run(self, state, sql: str) -> Optional[DryRun]:
+        cached = state.get("dry_run")
+        if isinstance(cached, dict) and cached.get("sql") == sql:
+            return DryRun(cached["bytes_processed"], tuple(cached["tables"]), None, cached["estimated"])
+        try:
+            result = await dry_run_async(sql)
+        except Exception:                             # no dry run on this backend / backend unreachable
+            return None
+        if result.error is None:
+            state["dry_run"] = dry_run_state(sql, result)
+        return result
+
+    def _problem(self, user_id: str, result: DryRun) -> Optional[str]:
+        """Why `result` may not run, or None – in which case its bytes have been charged to `user_id`."""
+        if result.error is not None:
+            return f"invalid: {result.error}"
+        expected_s = result.bytes_processed / (COST_GATE_SCAN_GBPS * 1024 ** 3)
+        if expected_s > BQ_QUERY_TIMEOUT_S:
+            return (f"invalid: query would scan {format_bytes(result.bytes_processed)} (~{expected_s:,.0f}s), "
+                    f"longer than the {BQ_QUERY_TIMEOUT_S:g}s query timeout – {REDUCE_BYTES_HINT}")
+        check = get_byte_budget().try_charge(user_id, result.bytes_processed)
+        if not check.allowed:
+            return f"invalid: {check.reason} – {REDUCE_BYTES_HINT}"
+        return None
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        state["scan_bytes_estimate"] = None           # never a previous turn's
+        sql = str(state.get("sql_query") or "").strip()
+        if not COST_GATE_ENABLED or not sql or str(state.get("validation_status", "")).strip().lower() != "valid":
+            return
+
+        original, rounds, problem = sql, 0, None
+        while True:
+            result = await self._dry_run(state, sql)
+            if result is None:
+                COST_GATE_COUNTERS["unavailable"] += 1
+                annotate(cost_gate="unavailable")
+                return
+            problem = self._problem(ctx.user_id, result)
+            if problem is None:
+                break
+            if result.error is not None:
+                COST_GATE_COUNTERS["dry_run_error"] += 1
+            if COST_GATE_ACTION != "repair" or rounds >= COST_GATE_REPAIR_ROUNDS:
+                break
+            rounds += 1
+            state["validation_status"] = problem
+            async for ev in self._repair.run_async(ctx):
+                yield ev                              # rewrites sql_query, re-validates
+            sql = str(state.get("sql_query") or "").strip()
+            if str(state.get("validation_status", "")).strip().lower() != "valid":
+                problem = str(state.get("validation_status"))
+                break
+
+        if sql != original or problem is not None:
+            # the semantic cache stored this SQL before the gate saw it – don't serve it again
+            from ..semantic_cache_agent.agent import SEMANTIC_CACHE_ENABLED, get_semantic_cache
+            if SEMANTIC_CACHE_ENABLED:
+                get_semantic_cache().invalidate_sql(original)
+
+        if problem is not None:
+            COST_GATE_COUNTERS["rejected"] += 1
+            state["validation_status"] = problem
+            annotate(cost_gate="rejected", bytes_processed=result.bytes_processed, repair_rounds=rounds)
+            yield _make_event(self.name, f"🛑 Query not run – {problem.removeprefix('invalid: ')}")
+            return
+
+        state["scan_bytes_estimate"] = result.bytes_processed
+        COST_GATE_COUNTERS["repaired" if rounds else "admitted"] += 1
+        annotate(
+            cost_gate="repaired" if rounds else "admitted",
+            bytes_processed=result.bytes_processed,
+            estimated=result.estimated,
+            repair_rounds=rounds,
+        )
+
+
+cost_gate_agent = CostGateAgent()
@@ -0,0 +1,95 @@
+"""
+Scan Budgets
+───────────────────────────────────────────────────────────────────────────────
+Per-query and per-user limits on the bytes a query may scan.
+
+• Per query – one statement may not scan more than `per_query_bytes`.
+• Per user  – the bytes a user's admitted queries scanned over the last
+              `window_s` seconds (a rolling window) may not exceed
+              `per_user_bytes`.
+
+Admitted queries are charged their dry-run estimate – an upper bound for
+on-demand billing (cached results and LIMIT never make it cheaper). Use
+`try_charge`, which checks and charges under one lock, so concurrent queries
+of a user (planner branches) can't all pass the check before any is charged.
+The ledger is in-process; a multi-replica deployment needs a shared one.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(n) < 1024 or unit == "TB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+@dataclass(frozen=True)
+class BudgetCheck:
+    allowed: bool
+    limit_bytes: int                          # what this query may scan right now
+    reason: Optional[str] = None              # why it may not (None if allowed)
+
+
+class ByteBudget:
+    """Thread-safe rolling-window ledger of scanned bytes per user."""
+
+    def __init__(self, *, per_query_bytes: int, per_user_bytes: int, window_s: float = 86_400.0) -> None:
+        self.per_query_bytes = per_query_bytes
+        self.per_user_bytes = per_user_bytes
+        self.window_s = window_s
+        self._lock = threading.Lock()
+        self._charges: dict[str, deque[tuple[float, int]]] = {}
+
+    def used(self, user_id: str) -> int:
+        with self._lock:
+            return self._used(user_id)
+
+    def check(self, user_id: str, bytes_processed: int) -> BudgetCheck:
+        """Whether `bytes_processed` fits the budgets now (charges nothing)."""
+        with self._lock:
+            return self._check(user_id, bytes_processed)
+
+    def try_charge(self, user_id: str, bytes_processed: int) -> BudgetCheck:
+        """`check`, and charge `bytes_processed` if it is allowed – in one step."""
+        with self._lock:
+            result = self._check(user_id, bytes_processed)
+            if result.allowed:
+                self._live(user_id).append((time.monotonic(), bytes_processed))
+            return result
+
+    def charge(self, user_id: str, bytes_processed: int) -> None:
+        """Charge unconditionally (bytes already scanned)."""
+        with self._lock:
+            self._live(user_id).append((time.monotonic(), bytes_processed))
+
+    def _used(self, user_id: str) -> int:
+        return sum(n for _, n in self._live(user_id))
+
+    def _check(self, user_id: str, bytes_processed: int) -> BudgetCheck:
+        remaining = max(0, self.per_user_bytes - self._used(user_id))
+        limit = min(self.per_query_bytes, remaining)
+        if bytes_processed <= limit:
+            return BudgetCheck(True, limit)
+        if limit == self.per_query_bytes:
+            reason = (f"query would scan {format_bytes(bytes_processed)}, over the per-query budget "
+                      f"of {format_bytes(self.per_query_bytes)}")
+        else:
+            reason = (f"query would scan {format_bytes(bytes_processed)}, but only {format_bytes(remaining)} "
+                      f"of this user's {format_bytes(self.per_user_bytes)} scan budget is left")
+        return BudgetCheck(False, limit, reason)
+
+    def _live(self, user_id: str) -> deque[tuple[float, int]]:
+        charges = self._charges.setdefault(user_id, deque())
+        cutoff = time.monotonic() - self.window_s
+        while charges and charges[0][0] < cutoff:
+            charges.popleft()
+        return charges
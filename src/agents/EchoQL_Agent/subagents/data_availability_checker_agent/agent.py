@@ -2,26 +2,62 @@
 Data Availability Checker Agent
 
 This agent is responsible for checking whether a user's natural-language query can be answered using the available tables and fields in the database.
+The schema in its prompt is rendered from the schema catalog (see EchoQL_Agent/catalog), limited to the
+tables the table retriever ranks highest for the question (see EchoQL_Agent/retrievers/table_retriever).
+
+It answers with a small structured verdict (AvailabilityVerdict) instead of echoing the schema back –
+the schema is already known locally, and output tokens are the slowest tokens we pay for.
 """
 
 
 from google.adk.agents import LlmAgent
-from pydantic import BaseModel
-from typing import List, Dict
-import os
-from dotenv import load_dotenv
-from pathlib import Path
+from google.adk.agents.readonly_context import ReadonlyContext
+from pydantic import BaseModel, Field
+from typing import List
 from google.adk.tools import FunctionTool
 
-current_path = Path(__file__).resolve()
-for parent in current_path.parents:
-    env_file = parent / ".env"
-    if env_file.exists():
-        load_dotenv(env_file)
-        break
+from ...settings import get_settings
+from ...catalog import load_catalog
+from ...retrievers.table_retriever import get_retriever
+
+GEMINI_MODEL = get_settings().fast_llm_model
+
+
+# ─── Structured Output ──────────────────────────────────────
+class AvailabilityVerdict(BaseModel):
+    available: bool = Field(description="True if the question can be answered with the tables below.")
+    tables_needed: List[str] = Field(
+        default_factory=list,
+        description="Names of the tables required to answer, e.g. [\"mock_answers\", \"mock_users\"].",
+    )
+    reason: str = Field(default="", description="One short sentence explaining the verdict.")
+
+
+# ─── Prompt ─────────────────────────────────────────────────
+def _question(ctx: ReadonlyContext) -> str:
+    content = ctx.user_content
+    if content and content.parts:
+        return " ".join(p.text for p in content.parts if p.text).strip()
+    return ""
+
+
+def _instruction(ctx: ReadonlyContext) -> str:
+    """Checker prompt with the schema of the retrieved tables rendered from the catalog."""
+    catalog = load_catalog()
+    tables = get_retriever().search(_question(ctx))
+    return f"""
+    You are the Data Availability Checker Agent.
+
+    These are the available tables and fields in the database
+    (PK = primary key, → = foreign key reference):
 
+{catalog.render(tables)}
 
-GEMINI_MODEL = os.getenv("FAST_LLM_MODEL", "gemini-1.5-flash")
+    Instructions:
+    1. Parse the schema and check it with the user_query if it can be answered or not with the available tables and fields.
+    2. List every table the answer needs in `tables_needed` (table names only, without dataset).
+    3. Give a one-sentence `reason`; when the query cannot be answered, say which data is missing.
+"""
 
 
 # ─── LLM Agent Definition ───────────────────────────────────
@@ -31,59 +67,9 @@ data_availability_checker_agent = LlmAgent(
         "Checks whether a user's natural-language query can be answered using the available tables and fields in the database."
     ),
     model=GEMINI_MODEL,
-    instruction="""
-    You are the Data Availability Checker Agent.
-
-    These are the available tables and fields in the database:
-    
-    Table: mock_answers
-    Description: Contains user-submitted answers to questions on the QA platform. Each answer is linked to a question and a user, and has a timestamp and textual content.
-    Columns:
-    - id: Unique identifier for the answer (INT64)
-    - question_id: Foreign key to the associated question (INT64)
-    - user_id: Foreign key to the user who answered (INT64)
-    - created_at: Timestamp when the answer was submitted (TIMESTAMP)
-    - content: Text content of the user's answer (STRING)
-
-    Table: mock_questions
-    Description: Stores user-generated questions posted on the platform. Each question is associated with a user and includes a timestamp and content.
-    Columns:
-    - question_id: Unique identifier for the question (INT64)
-    - user_id: ID of the user who posted the question (INT64)
-    - created_at: When the question was posted (TIMESTAMP)
-    - content: The text of the question (STRING)
-
-    Table: mock_users
-    Description: Contains user profiles for the QA platform. Each user has a unique ID, name, email, and birthday.
-    Columns:
-    - id: Unique identifier for the user (INT64)
-    - name: User's full name (STRING)
-    - email: User's email address (STRING)
-    - birthday: User's date of birth (DATE)
-
-    Table: mock_user_sessions
-    Description: Tracks user session activity such as session duration and date. Useful for engagement analysis and retention metrics.
-    Columns:
-    - session_id: Unique identifier for a user session (STRING)
-    - user_id: ID of the user who had the session (INT64)
-    - duration_min: Length of the session in minutes (FLOAT64)
-    - session_date: Date on which the session occurred (DATE)
-
-    Instructions:
-    1. Parse the schema and check it with the user_query if it can be answered or not with the available tables and fields.
-    2. Return a JSON-formatted string with the following structure:
-
-    {
-      "available": true/false,
-      "user_query": "<same as input>",
-      "raw_schema_text": "<entire schema text used>"
-    }
-
-    Guidelines:
-    - Output must be **bare JSON** 
-    – absolutely no ``` fences, no language tags, no extra commentary. 
-    - Returning anything else will break downstream parsing.
-    - If the query cannot be answered, set `"available": false and still return the schema.
-""",
+    instruction=_instruction,
+    output_schema=AvailabilityVerdict,
     output_key="availability_result",
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
 )
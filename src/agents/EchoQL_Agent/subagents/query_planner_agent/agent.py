@@ -0,0 +1,327 @@
+"""
+Query Planner Agent
+───────────────────────────────────────────────────────────────────────────────
+Wraps the single-query chain (semantic cache → authoring → cost gate →
+fetcher). Compound questions – several independent measures asked at once,
+e.g. "compare weekly active users with answers posted per week and average
+session length" – are not forced into one giant statement:
+
+1. A cheap lexical check (`looks_compound`) decides whether planning is worth
+   an LLM call; simple questions run the chain unchanged, at no extra cost.
+2. The planner LLM splits the question into self-contained sub-questions
+   (QueryPlan), phrasing shared groupings with the same output column name.
+   Fewer than two → the chain runs on the original question.
+3. Each sub-question runs the whole chain in its own branch – own
+   session.state and conversation, so the branches never see each other's
+   SQL – concurrently, at most ECHOQL_PLANNER_MAX_PARALLEL at a time (which
+   also bounds the queries in flight on the connector per question). Wall
+   time approaches the slowest sub-query instead of the sum.
+4. The branch results are merged locally in Arrow (see merge.py), stored,
+   previewed and saved as an artifact like a single query's result.
+
+Outputs written to session.state for a planned question:
+- "query_plan":   the planner's QueryPlan
+- "sub_queries":  per sub-question {"question", "sql_query", "validation_status",
+                  "query_result", "query_result_artifact"}
+- "query_result" / "query_result_artifact": the merged result (first table if
+  the results could not all be merged)
+- "validation_status": "valid" when every sub-query ran, else the first failure
+
+Configure with ECHOQL_PLANNER (auto | off), ECHOQL_PLANNER_MAX_SUBQUERIES and
+ECHOQL_PLANNER_MAX_PARALLEL. PLANNER_COUNTERS counts single / planned /
+not_split / partial.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from ...settings import get_settings
+from ...catalog import load_catalog
+from ...retrievers.table_retriever import get_retriever
+from ...tracing import annotate, get_tracer
+from ..sql_fetcher_agent.agent import PREVIEW_ROWS, get_result_store, load_result, save_artifact
+from ..sql_fetcher_agent.arrow_result import ResultSummary
+from ..sql_fetcher_agent.result_artifact import new_artifact_writer
+from ..sql_fetcher_agent.result_store import ResultExpiredError, result_ref
+from .merge import merge_results
+
+GEMINI_MODEL = get_settings().fast_llm_model
+PLANNER_MODE = os.getenv("ECHOQL_PLANNER", "auto").strip().lower()            # auto | off
+PLANNER_MAX_SUBQUERIES = int(os.getenv("ECHOQL_PLANNER_MAX_SUBQUERIES", "4"))
+PLANNER_MAX_PARALLEL = int(os.getenv("ECHOQL_PLANNER_MAX_PARALLEL", "4"))
+
+# single (not compound) / planned / not_split (planner kept it whole) / partial (a sub-query failed)
+PLANNER_COUNTERS: Counter = Counter()
+
+# Per-question keys a branch must not inherit from the parent's (previous turn's) state
+_RESULT_KEYS = ("query_result", "query_result_artifact", "sql_rewrites", "query_total_rows")
+
+
+# ─── compound-question check ────────────────────────────────
+_SEPARATOR_RE = re.compile(
+    r"[,;]|\b(?:and|as well as|along with|alongside|plus|versus|vs\.?|compared (?:to|with))\b", re.I
+)
+_MEASURE_RE = re.compile(
+    r"\b(?:how many|number of|count|average|avg|mean|median|total|sum|max(?:imum)?|min(?:imum)?|"
+    r"longest|shortest|share|rate|ratio|percent(?:age)?|per (?:day|week|month|year|user|question)|"
+    r"daily|weekly|monthly|active|posted|length|duration)\b",
+    re.I,
+)
+
+
+def looks_compound(question: str) -> bool:
+    """At least two separate clauses that each ask for a measure."""
+    parts = [p for p in _SEPARATOR_RE.split(question or "") if p.strip()]
+    return sum(bool(_MEASURE_RE.search(p)) for p in parts) >= 2
+
+
+# ─── planner LLM ────────────────────────────────────────────
+class QueryPlan(BaseModel):
+    sub_questions: List[str] = Field(
+        default_factory=list,
+        description="Self-contained sub-questions, each answerable by its own SQL query; empty to keep the question whole.",
+    )
+    reason: str = Field(default="", description="One short sentence explaining the split (or why not).")
+
+
+def _question(ctx: ReadonlyContext) -> str:
+    content = ctx.user_content
+    if content and content.parts:
+        return " ".join(p.text for p in content.parts if p.text).strip()
+    return ""
+
+
+def _instruction(ctx: ReadonlyContext) -> str:
+    catalog = load_catalog()
+    tables = get_retriever().search(_question(ctx))
+    return f"""
+    You are the Query Planner Agent.
+
+    Available tables (PK = primary key, → = foreign key reference):
+
+{catalog.render(tables)}
+
+    Decide whether the user's question asks for several independent measures that are each
+    answered by their own query (e.g. weekly active users, answers per week and average
+    session length). If so, list them in `sub_questions`:
+    - at most {PLANNER_MAX_SUBQUERIES}; each one self-contained and answerable on its own;
+    - when parts share a grouping (per week, per user …), state that grouping in every
+      sub-question with the same output column name, e.g. "… per week, as columns week and …",
+      so the results can be joined on it;
+    - keep the measure's meaning exactly as the user asked.
+    If the question needs a single query (one measure, or measures that depend on each other),
+    return an empty `sub_questions` list.
+"""
+
+
+_planner_llm = LlmAgent(
+    name="QueryPlannerLlm",
+    model=GEMINI_MODEL,
+    description="Splits a compound question into independent sub-questions.",
+    instruction=_instruction,
+    output_schema=QueryPlan,
+    output_key="query_plan",
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+)
+
+
+def _parse_plan(raw) -> list[str]:
+    if isinstance(raw, str):
+        raw = re.sub(r"^\s*```(?:json)?|\s*```\s*$", "", raw.strip())
+        try:
+            raw = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            return []
+    subs = (raw or {}).get("sub_questions") or []
+    return [str(q).strip() for q in subs if str(q).strip()][:PLANNER_MAX_SUBQUERIES]
+
+
+# ─── branches ───────────────────────────────────────────────
+def _make_event(author: str, text: str, actions: Optional[EventActions] = None) -> Event:
+    return Event(author=author, content=types.Content(parts=[types.Part(text=text)]), actions=actions or EventActions())
+
+
+@dataclass
+class SubQuery:
+    index: int
+    question: str
+    ctx: InvocationContext
+    error: Optional[str] = None
+    last_text: str = ""
+    artifacts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def state(self) -> dict:
+        return self.ctx.session.state
+
+    @property
+    def result(self) -> Optional[dict]:
+        return self.state.get("query_result")
+
+    def failure(self) -> str:
+        if self.error:
+            return self.error
+        status = str(self.state.get("validation_status", "")).strip()
+        if status and status.lower() != "valid":
+            return status
+        return self.last_text or "no result"
+
+
+def _branch(ctx: InvocationContext, index: int, question: str) -> SubQuery:
+    """A copy of the invocation whose question, conversation and state belong to one sub-question."""
+    content = types.Content(role="user", parts=[types.Part(text=question)])
+    state = {k: v for k, v in ctx.session.state.items() if k not in _RESULT_KEYS}
+    session = ctx.session.model_copy(update={
+        "state": state,
+        "events": [Event(invocation_id=ctx.invocation_id, author="user", content=content)],
+    })
+    branch = f"{ctx.branch}.q{index}" if ctx.branch else f"q{index}"
+    return SubQuery(index, question, ctx.model_copy(update={"session": session, "user_content": content, "branch": branch}))
+
+
+def _apply(sub: SubQuery, ev: Event) -> None:
+    """What the runner does with an event for the main session, done for the branch's own one."""
+    if ev.partial:
+        return
+    for key, value in (ev.actions.state_delta or {}).items():
+        if not key.startswith("temp:"):
+            sub.state[key] = value
+    sub.artifacts.update(ev.actions.artifact_delta or {})
+    sub.ctx.session.events.append(ev)
+    if ev.content and ev.content.parts and ev.content.parts[0].text:
+        sub.last_text = ev.content.parts[0].text
+
+
+class QueryPlannerAgent(BaseAgent):
+    """Runs its sub-agents in order – once per question, or once per sub-question of a compound one."""
+
+    async def _run_chain(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        for agent in self.sub_agents:
+            async for ev in agent.run_async(ctx):
+                yield ev
+
+    async def _run_branch(self, sub: SubQuery, gate: asyncio.Semaphore) -> None:
+        async with gate:
+            try:
+                async for ev in self._run_chain(sub.ctx):
+                    _apply(sub, ev)
+            except Exception as exc:                  # one failing sub-query must not sink the others
+                sub.error = f"{type(exc).__name__}: {exc}"
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        question = _question(ctx)
+        state["query_plan"] = None
+        state["sub_queries"] = None
+
+        if PLANNER_MODE == "off" or not looks_compound(question):
+            PLANNER_COUNTERS["single"] += 1
+            async for ev in self._run_chain(ctx):
+                yield ev
+            return
+
+        async for ev in _planner_llm.run_async(ctx):
+            yield ev                                  # writes query_plan
+        questions = _parse_plan(state.get("query_plan"))
+        if len(questions) < 2:
+            PLANNER_COUNTERS["not_split"] += 1
+            annotate(planner="not_split")
+            async for ev in self._run_chain(ctx):
+                yield ev
+            return
+
+        PLANNER_COUNTERS["planned"] += 1
+        annotate(planner="planned", sub_queries=len(questions))
+        listing = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+        yield _make_event(self.name, f"🧩 Split into {len(questions)} independent sub-queries:\n{listing}")
+
+        # 1️⃣ Every sub-question through the whole chain, concurrently (bounded)
+        subs = [_branch(ctx, i, q) for i, q in enumerate(questions, 1)]
+        gate = asyncio.Semaphore(max(1, PLANNER_MAX_PARALLEL))
+        with get_tracer().span("sub_queries", count=len(subs), max_parallel=PLANNER_MAX_PARALLEL):
+            await asyncio.gather(*(self._run_branch(sub, gate) for sub in subs))
+
+        # 2️⃣ Merge what ran, locally
+        tables, lines, failed = [], [], None
+        for sub in subs:
+            table = None
+            if sub.result is not None:
+                try:
+                    table = load_result(sub.result).table
+                except ResultExpiredError:
+                    pass
+            if table is None:
+                failed = failed or sub.failure()
+                lines.append(f"⚠️ Sub-query {sub.index} (“{sub.question}”) returned no result: {sub.failure()}")
+                continue
+            tables.append(table)
+            lines.extend(f"ℹ️ Sub-query {sub.index}: {note}" for note in sub.state.get("sql_rewrites") or [])
+
+        state["sub_queries"] = [
+            {
+                "question": sub.question,
+                "sql_query": sub.state.get("sql_query"),
+                "validation_status": sub.state.get("validation_status"),
+                "query_result": sub.result,
+                "query_result_artifact": sub.state.get("query_result_artifact"),
+            }
+            for sub in subs
+        ]
+        state["sql_query"] = ""                       # no single statement answers a planned question
+        state["validation_status"] = "valid" if failed is None else failed
+        actions = EventActions(artifact_delta={k: v for sub in subs for k, v in sub.artifacts.items()})
+        if failed is not None:
+            PLANNER_COUNTERS["partial"] += 1
+        if not tables:
+            yield _make_event(self.name, "\n".join(lines), actions)
+            return
+
+        merged = await asyncio.to_thread(merge_results, tables)
+        table = merged[0]
+        handle = await asyncio.to_thread(get_result_store().put, table)
+        state["query_result"] = result_ref(handle, table)
+        annotate(merged_tables=len(merged), rows=table.num_rows)
+
+        # 3️⃣ Preview + artifact of the merged result, as the fetcher does for one query
+        summary, writer = ResultSummary(PREVIEW_ROWS), new_artifact_writer()
+        for batch in table.to_batches():
+            summary.update(batch)
+            if writer is not None:
+                writer.write(batch)
+        summary.finish(table.schema)
+        text = f"🔗 {len(tables)} sub-query results merged locally\n\n{summary.render()}"
+        saved = await save_artifact(ctx, writer, table.schema, f"query_result_{ctx.invocation_id}")
+        if saved is not None:
+            filename, version = saved
+            actions.artifact_delta[filename] = version
+            state["query_result_artifact"] = filename
+            size_kb = len(writer.finish(table.schema)) / 1024
+            text += (
+                f"\n\n📎 {writer.rows:,} rows saved as artifact `{filename}` "
+                f"(version {version}, {size_kb:,.1f} KB {writer.description})"
+            )
+        if len(merged) > 1:
+            lines.append(
+                f"ℹ️ {len(merged) - 1} result(s) share no key with the first and are kept separately "
+                f"in state[\"sub_queries\"]."
+            )
+        if lines:
+            text += "\n\n" + "\n".join(lines)
+        yield _make_event(self.name, text, actions)
@@ -0,0 +1,84 @@
+"""
+Result Merging
+───────────────────────────────────────────────────────────────────────────────
+Folds the results of a plan's sub-queries into as few tables as possible,
+locally in Arrow – no join is pushed back to the warehouse.
+
+• Shared key columns – two results that share columns (e.g. `week`), where
+  those columns are a unique key in both and each side has columns of its
+  own, are full-outer-joined on them and sorted by the key.
+• One-row results – a scalar (e.g. the average session length) is
+  broadcast onto the other table's rows; colliding names get a suffix.
+• Anything else stays a separate table.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from ...lazy_imports import lazy_import
+
+pa = lazy_import("pyarrow")
+
+
+def _is_unique(table: pa.Table, keys: list[str]) -> bool:
+    return table.group_by(keys).aggregate([]).num_rows == table.num_rows
+
+
+def _align_keys(left: pa.Table, right: pa.Table, keys: list[str]) -> Optional[pa.Table]:
+    """`right` with its key columns cast to the left's types; None if they don't cast."""
+    for key in keys:
+        want = left.schema.field(key).type
+        index = right.schema.get_field_index(key)
+        if right.schema.field(index).type != want:
+            try:
+                right = right.set_column(index, key, right.column(index).cast(want))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                return None
+    return right
+
+
+def _join(left: pa.Table, right: pa.Table) -> Optional[pa.Table]:
+    keys = [name for name in left.column_names if name in right.column_names]
+    if not keys or len(keys) in (left.num_columns, right.num_columns):
+        return None
+    if not (_is_unique(left, keys) and _is_unique(right, keys)):
+        return None
+    right = _align_keys(left, right, keys)
+    if right is None:
+        return None
+    joined = left.join(right, keys=keys, join_type="full outer", coalesce_keys=True)
+    # join output order is arbitrary – restore the left's column order, then sort on the key
+    columns = left.column_names + [c for c in right.column_names if c not in keys]
+    return joined.select(columns).sort_by([(key, "ascending") for key in keys])
+
+
+def _broadcast(left: pa.Table, right: pa.Table) -> Optional[pa.Table]:
+    if 1 not in (left.num_rows, right.num_rows) or 0 in (left.num_rows, right.num_rows):
+        return None
+    rows = max(left.num_rows, right.num_rows)
+    left, right = (t if t.num_rows == rows else t.take(pa.array([0] * rows, pa.int64())) for t in (left, right))
+    out = left
+    for name, column in zip(right.column_names, right.columns):
+        unique, n = name, 2
+        while unique in out.column_names:
+            unique, n = f"{name}_{n}", n + 1
+        out = out.append_column(unique, column)
+    return out
+
+
+def merge_results(tables: Sequence[pa.Table]) -> list[pa.Table]:
+    """Merge sub-query results in plan order; one table when everything lines up."""
+    merged: list[pa.Table] = []
+    for table in tables:
+        for i, acc in enumerate(merged):
+            combined = _join(acc, table)
+            if combined is None:
+                combined = _broadcast(acc, table)
+            if combined is not None:
+                merged[i] = combined
+                break
+        else:
+            merged.append(table)
+    return merged
+
@@ -0,0 +1,120 @@
+"""
+Semantic Cache Agent
+───────────────────────────────────────────────────────────────────────────────
+Wraps the SQL authoring chain (checker → generator → validator → repair).
+
+• Hit  – a previously validated question is close enough to this one
+         (see semantic_cache.py): the cached SQL is written to state as
+         already valid and the whole authoring chain is skipped, so the next
+         agent (the fetcher) runs immediately.
+• Miss – the authoring chain runs as usual; if it ends with valid SQL the
+         (question, SQL) pair is stored for next time.
+
+Outputs written to session.state on a hit:
+- "sql_query", "user_request", "validation_status" = "valid"
+- "semantic_cache_hit": the question the SQL was originally validated for
+
+Configure with ECHOQL_SEMANTIC_CACHE (0 disables), ECHOQL_SEMANTIC_CACHE_THRESHOLD,
+ECHOQL_SEMANTIC_CACHE_PATH, ECHOQL_SEMANTIC_CACHE_MAX_ENTRIES and
+ECHOQL_SEMANTIC_CACHE_TTL_S.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from functools import lru_cache
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.genai import types
+
+from ...catalog import load_catalog
+from ...retrievers.table_retriever import make_embedder
+from ...settings import get_settings
+from ...tracing import annotate
+from .semantic_cache import SemanticCache
+
+SEMANTIC_CACHE_ENABLED = os.getenv("ECHOQL_SEMANTIC_CACHE", "1") != "0"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("ECHOQL_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("ECHOQL_SEMANTIC_CACHE_MAX_ENTRIES", "200000"))
+SEMANTIC_CACHE_TTL_S = float(os.getenv("ECHOQL_SEMANTIC_CACHE_TTL_S", str(30 * 24 * 3600)))
+SEMANTIC_CACHE_PATH = os.getenv(
+    "ECHOQL_SEMANTIC_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "echoql", "semantic_cache.sqlite3"),
+)
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    embedder = make_embedder(get_settings().embedding_model)
+    return SemanticCache(
+        path=SEMANTIC_CACHE_PATH,
+        embed=embedder.embed,
+        model=embedder.name,
+        fingerprint=lambda: load_catalog().fingerprint,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl_s=SEMANTIC_CACHE_TTL_S,
+    )
+
+
+# the cache embeds the question and reads / writes SQLite (and loads the embedder on first use): run off the event loop
+def _lookup(question: str):
+    return get_semantic_cache().get(question)
+
+
+def _store(question: str, sql: str) -> None:
+    get_semantic_cache().put(question, sql)
+
+
+def _make_event(author: str, text: str) -> Event:
+    return Event(author=author, content=types.Content(parts=[types.Part(text=text)]))
+
+
+def _user_question(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if content and content.parts:
+        return " ".join(p.text for p in content.parts if p.text).strip()
+    return ""
+
+
+class SemanticCacheAgent(BaseAgent):
+    """Runs its single sub-agent only when no cached SQL matches the question."""
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        question = _user_question(ctx)
+        state["semantic_cache_hit"] = None
+
+        if SEMANTIC_CACHE_ENABLED and question:
+            hit = await asyncio.to_thread(_lookup, question)
+            if hit:
+                state["user_request"] = question
+                state["sql_query"] = hit.sql
+                state["validation_status"] = "valid"
+                state["semantic_cache_hit"] = hit.question
+                annotate(semantic_cache="hit", similarity=round(hit.similarity, 4))
+                yield _make_event(
+                    self.name,
+                    f"♻️ Reusing SQL validated for a similar question "
+                    f"(“{hit.question}”, similarity {hit.similarity:.2f})",
+                )
+                return
+
+        if SEMANTIC_CACHE_ENABLED and question:
+            annotate(semantic_cache="miss")
+        # Clear the previous turn's SQL so a chain that stops early is never mistaken for a valid run
+        state["sql_query"] = ""
+        state["validation_status"] = ""
+        for agent in self.sub_agents:
+            async for ev in agent.run_async(ctx):
+                yield ev
+
+        sql = state.get("sql_query", "")
+        if SEMANTIC_CACHE_ENABLED and question and str(state.get("validation_status", "")).strip().lower() == "valid":
+            await asyncio.to_thread(_store, question, sql)
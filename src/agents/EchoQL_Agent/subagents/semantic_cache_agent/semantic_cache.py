@@ -0,0 +1,351 @@
+"""
+Semantic NL→SQL cache
+───────────────────────────────────────────────────────────────────────────────
+Persistent store of (question embedding, validated SQL, catalog fingerprint).
+
+• Lookup     – exact match on the normalised question first, then cosine
+               similarity of the question embedding against the cached ones.
+               Below IVF_MIN_ENTRIES that is one matrix-vector product over
+               every entry; above it the entries are partitioned into ~√n
+               k-means lists and only the IVF_PROBES lists nearest to the
+               question are scored, so lookups stay around a millisecond at
+               hundreds of thousands of entries. A hit needs similarity ≥
+               threshold, the same numbers in both questions
+               ("top 5" ≠ "top 10") and the same logical operators,
+               comparisons and sort directions ("and" ≠ "or", "before" ≠
+               "after", "highest" ≠ "lowest") – words the embedder may drop
+               as stopwords or weigh too lightly to separate the two. Every
+               string literal of the cached SQL that its question names
+               (`country = 'France'` for "… in France") must be named by the
+               new question too, so "France" never gets Germany's SQL;
+               literals the question doesn't spell out (codes, formats)
+               can't be checked this way.
+• Persistence – SQLite file (stdlib, one row per entry, embedding as a blob);
+               the in-memory matrix is rebuilt from it on first use.
+• Eviction   – entries unused for ttl_s are dropped; above max_entries the
+               least recently used 10 % are evicted in one batch.
+• Invalidation – every entry records the catalog fingerprint it was
+               validated against; entries from any other fingerprint are
+               deleted when the cache (re)loads or the fingerprint changes.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from ...lazy_imports import lazy_import
+from ..sql_fetcher_agent.result_cache import normalize_sql
+
+np = lazy_import("numpy")
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[a-z]+|[<>]=?|!=|=|≤|≥")
+_STRING_RE = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+# words that change the SQL a question needs without changing what it is about
+_QUALIFIERS = frozenset(
+    "and or not no nor without except excluding but only unless never distinct unique "
+    "before after since until between during within over under above below exactly "
+    "more less fewer greater smaller larger most least top bottom highest lowest maximum "
+    "minimum first last earliest latest newest oldest asc ascending desc descending "
+    "increasing decreasing < > <= >= = != ≤ ≥".split()
+)
+EVICT_FRACTION = 0.10
+IVF_MIN_ENTRIES = 20_000      # partition the matrix from this many entries on
+IVF_PROBES = 8                # lists scored per lookup
+IVF_KMEANS_ITERATIONS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    question     TEXT NOT NULL,
+    normalized   TEXT NOT NULL,
+    sql          TEXT NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    model        TEXT NOT NULL,
+    embedding    BLOB NOT NULL,
+    created_at   REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits         INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_normalized ON entries (normalized);
+"""
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace, drop trailing punctuation."""
+    return _SPACE_RE.sub(" ", question.strip().lower()).rstrip(" ?.!")
+
+
+def _numbers(question: str) -> tuple[str, ...]:
+    return tuple(sorted(_NUMBER_RE.findall(question)))
+
+
+def _qualifiers(question: str) -> tuple[str, ...]:
+    return tuple(sorted(w for w in _WORD_RE.findall(question.lower()) if w in _QUALIFIERS))
+
+
+def _guard(question: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """What two questions must share for one's SQL to answer the other."""
+    return _numbers(question), _qualifiers(question)
+
+
+def _mentions(question: str, text: str) -> bool:
+    return re.search(rf"(?<!\w){re.escape(text)}(?!\w)", question) is not None
+
+
+def _entities(question: str, sql: str) -> tuple[str, ...]:
+    """Lower-cased string literals of `sql` (LIKE wildcards stripped) that `question` names."""
+    question = normalize_question(question)
+    literals = (a or b for a, b in _STRING_RE.findall(sql))
+    return tuple(sorted({
+        text for text in (lit.strip("%_ ").lower() for lit in literals)
+        if text and _mentions(question, text)
+    }))
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    question: str
+    sql: str
+    similarity: float
+
+
+@dataclass
+class SemanticCacheStats:
+    lookups: int = 0
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.exact_hits + self.semantic_hits) / self.lookups if self.lookups else 0.0
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        path: str,
+        embed: Callable[[list[str]], np.ndarray],
+        model: str,
+        fingerprint: Callable[[], str],
+        threshold: float = 0.95,
+        max_entries: int = 200_000,
+        ttl_s: float = 30 * 24 * 3600,
+    ) -> None:
+        self.path = path
+        self.embed = embed
+        self.model = model
+        self.fingerprint = fingerprint
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._stats = SemanticCacheStats()
+        self._lock = threading.Lock()
+        self._loaded_fingerprint: str | None = None
+        # in-memory view: row i ↔ _ids[i]
+        self._ids: list[int] = []
+        self._sql: list[str] = []
+        self._questions: list[str] = []
+        self._guards: list[tuple[tuple[str, ...], tuple[str, ...]]] = []
+        self._entities: list[tuple[str, ...]] = []
+        self._exact: dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._centroids: np.ndarray | None = None
+        self._lists: list[list[int]] = []
+        self._indexed_size = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    # ── loading / invalidation ──────────────────────────────
+    def _ensure_loaded(self) -> None:
+        fingerprint = self.fingerprint()
+        if fingerprint == self._loaded_fingerprint:
+            return
+        cur = self._db.execute(
+            "DELETE FROM entries WHERE fingerprint != ? OR model != ? OR last_used_at < ?",
+            (fingerprint, self.model, time.time() - self.ttl_s),
+        )
+        self._stats.invalidations += cur.rowcount if self._loaded_fingerprint is not None else 0
+        rows = self._db.execute(
+            "SELECT id, question, normalized, sql, embedding FROM entries ORDER BY id"
+        ).fetchall()
+        self._reset([(r[0], r[1], r[2], r[3], np.frombuffer(r[4], dtype=np.float32)) for r in rows])
+        self._loaded_fingerprint = fingerprint
+
+    def _reset(self, rows: list[tuple]) -> None:
+        self._ids = [r[0] for r in rows]
+        self._questions = [r[1] for r in rows]
+        self._exact = {r[2]: i for i, r in enumerate(rows)}
+        self._sql = [r[3] for r in rows]
+        self._guards = [_guard(r[1]) for r in rows]
+        self._entities = [_entities(r[1], r[3]) for r in rows]
+        self._size = len(rows)
+        dim = len(rows[0][4]) if rows else 0
+        self._matrix = np.zeros((max(self._size, 1024), dim), dtype=np.float32)
+        if rows:
+            self._matrix[: self._size] = np.vstack([r[4] for r in rows])
+        self._centroids = None
+        self._maybe_partition()
+
+    def _append(self, entry_id: int, question: str, normalized: str, sql: str, vector: np.ndarray) -> None:
+        if self._matrix.shape[1] != len(vector):
+            self._matrix = np.zeros((1024, len(vector)), dtype=np.float32)
+        if self._size == len(self._matrix):
+            grown = np.zeros((len(self._matrix) * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+        self._matrix[self._size] = vector
+        self._ids.append(entry_id)
+        self._questions.append(question)
+        self._sql.append(sql)
+        self._guards.append(_guard(question))
+        self._entities.append(_entities(question, sql))
+        self._exact[normalized] = self._size
+        if self._centroids is not None:
+            self._lists[int(np.argmax(self._centroids @ vector))].append(self._size)
+        self._size += 1
+        self._maybe_partition()
+
+    # ── IVF partitioning ────────────────────────────────────
+    def _maybe_partition(self) -> None:
+        """(Re)build the k-means lists when first needed and whenever the cache doubles."""
+        if self._size < IVF_MIN_ENTRIES:
+            self._centroids = None
+            return
+        if self._centroids is not None and self._size < 2 * self._indexed_size:
+            return
+        rows = self._matrix[: self._size]
+        n_lists = int(np.sqrt(self._size))
+        rng = np.random.default_rng(0)
+        sample = rows[rng.choice(self._size, size=min(self._size, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(IVF_KMEANS_ITERATIONS):                       # spherical k-means
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        assign = np.concatenate([
+            np.argmax(rows[i:i + 16_384] @ centroids.T, axis=1)
+            for i in range(0, self._size, 16_384)
+        ])
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        self._lists = [order[bounds[c]:bounds[c + 1]].tolist() for c in range(n_lists)]
+        self._centroids = centroids.astype(np.float32)
+        self._indexed_size = self._size
+
+    def _nearest(self, vector: np.ndarray) -> tuple[int, float]:
+        """Row and cosine of the cached question closest to `vector`."""
+        if self._centroids is None:
+            scores = self._matrix[: self._size] @ vector
+            row = int(np.argmax(scores))
+            return row, float(scores[row])
+        probes = min(IVF_PROBES, len(self._centroids))
+        nearest = np.argpartition(-(self._centroids @ vector), probes - 1)[:probes]
+        rows = np.fromiter(
+            itertools.chain.from_iterable(self._lists[c] for c in nearest), dtype=np.int64
+        )
+        if not len(rows):
+            return 0, -1.0
+        scores = self._matrix[rows] @ vector
+        best = int(np.argmax(scores))
+        return int(rows[best]), float(scores[best])
+
+    def _evict(self) -> None:
+        if self._size < self.max_entries:
+            return
+        n_evict = max(1, int(self.max_entries * EVICT_FRACTION))
+        self._db.execute(
+            "DELETE FROM entries WHERE id IN (SELECT id FROM entries ORDER BY last_used_at LIMIT ?)",
+            (n_evict,),
+        )
+        self._stats.evictions += n_evict
+        self._loaded_fingerprint = None
+        self._ensure_loaded()
+
+    # ── public API ──────────────────────────────────────────
+    def get(self, question: str) -> CacheHit | None:
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        with self._lock:
+            self._ensure_loaded()
+            self._stats.lookups += 1
+            row = self._exact.get(normalized)
+            similarity = 1.0
+            if row is not None:
+                self._stats.exact_hits += 1
+            elif self._size:
+                row, similarity = self._nearest(self.embed([question])[0])
+                if similarity < self.threshold or self._guards[row] != _guard(question) \
+                        or not all(_mentions(normalized, e) for e in self._entities[row]):
+                    return None
+                self._stats.semantic_hits += 1
+            else:
+                return None
+            self._db.execute(
+                "UPDATE entries SET last_used_at = ?, hits = hits + 1 WHERE id = ?",
+                (time.time(), self._ids[row]),
+            )
+            return CacheHit(self._questions[row], self._sql[row], similarity)
+
+    def put(self, question: str, sql: str) -> None:
+        """Remember validated `sql` for `question` (no-op for an exact duplicate)."""
+        normalized = normalize_question(question)
+        if not normalized or not sql.strip():
+            return
+        vector = np.ascontiguousarray(self.embed([question])[0], dtype=np.float32)
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            if normalized in self._exact:
+                return
+            self._evict()
+            cur = self._db.execute(
+                "INSERT INTO entries (question, normalized, sql, fingerprint, model, embedding, "
+                "created_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (question, normalized, sql, self._loaded_fingerprint, self.model, vector.tobytes(), now, now),
+            )
+            self._append(cur.lastrowid, question, normalized, sql, vector)
+            self._stats.stores += 1
+
+    def invalidate_sql(self, sql: str) -> None:
+        """Drop every entry whose SQL normalises to `sql` (e.g. after it failed to run)."""
+        target = normalize_sql(sql)
+        with self._lock:
+            self._ensure_loaded()
+            ids = [i for i, s in zip(self._ids, self._sql) if normalize_sql(s) == target]
+            if ids:
+                self._db.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in ids])
+                self._stats.invalidations += len(ids)
+                self._loaded_fingerprint = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._loaded_fingerprint = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._size
+
+    def stats(self) -> SemanticCacheStats:
+        return SemanticCacheStats(**vars(self._stats))
@@ -5,37 +5,237 @@ BigQuery Fetcher Agent
       sql_query         – cleaned & ready for BigQuery
       validation_status – must equal "valid"  (case-insensitive)
 
-• Runs the query via src.connectors.bigquery_connector.fetch_data()
+• Before running, unbounded row-returning SQL is rewritten (see
+  guardrails.py): a preview LIMIT plus a separate COUNT(*) for the total, or a
+  TABLESAMPLE when the question accepts an approximate answer. The full
+  result is fetched only when the question asks for all rows (or
+  state["result_mode"] == "full"); every rewrite is reported in the chat.
 
-• Stores the DataFrame in session.state["query_result_df"] for any
-  downstream agents, **and prints the DataFrame to the chat**.
+• Runs the query via bigquery_connector.fetch_arrow_async() on the configured
+  backend (BigQuery, or in-process DuckDB for dev / CI) – repeated queries
+  are served from the two-tier result cache (see result_cache.py), and the
+  job runs off the event loop so other sessions are never stalled. If the
+  invocation is abandoned the BigQuery job is cancelled.
+
+• If BigQuery rejects the SQL with an error the repair fixers handle
+  deterministically (unqualified table, typo'd column, quoting …), the fixed
+  SQL is run once more; if SQL served by the semantic cache fails to run,
+  its cache entry is dropped so the next similar question goes through the
+  authoring chain.
+
+• Rows stream in as Arrow record batches; row count, a preview of the first
+  ECHOQL_PREVIEW_ROWS rows and per-column stats are computed batch by batch
+  (see arrow_result.py) and **printed to the chat** – the full result is never
+  rendered as text.
+
+• The same batches are encoded into a compressed CSV (gzip / zstd) or
+  Parquet file as they arrive (see result_artifact.py) and saved through
+  the ADK artifact service as `query_result_<invocation id>.<format>`
+  (`…_q<n>.<format>` for sub-query n of a planned question); the chat
+  carries the summary and that artifact handle.
+
+• Parks the Arrow table in the out-of-band result store (result_store.py)
+  and keeps only a reference in session.state["query_result"] – handle, row
+  count and schema. Downstream agents read it lazily with
+  `load_result(state["query_result"])` (`.table`, `.batches()`,
+  `.to_pandas()`). The rewrites applied and
+  the full row count (previews only) go to state["sql_rewrites"] and
+  state["query_total_rows"], the artifact filename to
+  state["query_result_artifact"].
+
+• Appends the statement – time taken, rows, bytes, and the SQL as generated
+  plus the rollups read when the optimizer rewrote it – to the executed-query
+  log the rollup advisor mines (rollups/querylog.py).
 """
 
 from __future__ import annotations
 
+import asyncio
+import os
 import re
-from typing import AsyncGenerator
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Callable, Optional
 
-import pandas as pd
 from google.genai import types
 
 from google.adk.agents import BaseAgent
 from google.adk.agents.invocation_context import InvocationContext
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
+
+from ...lazy_imports import lazy_import
+from ...rollups.querylog import QUERY_LOG_ENABLED, get_query_log
+from ...tracing import annotate, get_tracer, record_error
+from .arrow_result import ResultSummary
+from .bigquery_connector import QueryTimeoutError, fetch_arrow_async
+from .guardrails import PREVIEW, GuardedQuery, describe_total, guard, result_mode
+from .result_artifact import ArtifactWriter, new_artifact_writer
+from .result_store import QueryResult, ResultStore, result_ref
+from ..sql_repair_agent.agent import REPAIR_COUNTERS
+from ..sql_repair_agent.fixers import repair_deterministically
+
+pa = lazy_import("pyarrow")
+
+PREVIEW_ROWS = int(os.getenv("ECHOQL_PREVIEW_ROWS", "20"))
+RESULT_STORE_MEMORY_MB = int(os.getenv("ECHOQL_RESULT_STORE_MEMORY_MB", "512"))
+RESULT_STORE_DISK_MB = int(os.getenv("ECHOQL_RESULT_STORE_DISK_MB", "4096"))
+RESULT_STORE_DIR = os.getenv(
+    "ECHOQL_RESULT_STORE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "echoql", "result_store"),
+)
+
+
+@lru_cache(maxsize=1)
+def get_result_store() -> ResultStore:
+    return ResultStore(
+        max_memory_bytes=RESULT_STORE_MEMORY_MB * 1024 * 1024,
+        max_disk_bytes=RESULT_STORE_DISK_MB * 1024 * 1024,
+        spill_dir=RESULT_STORE_DIR,
+    )
+
+
+def load_result(ref: dict[str, Any]) -> QueryResult:
+    """Lazy access to a result from its session.state reference (e.g. state["query_result"])."""
+    return QueryResult(ref, get_result_store())
+
+
+def _user_question(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if content and content.parts:
+        return " ".join(p.text for p in content.parts if p.text).strip()
+    return ctx.session.state.get("user_request", "")
+
+
+def _count_charger(state, user_id: str) -> Callable[[], bool]:
+    """
+    Charges a preview's COUNT(*) to the user's scan budget before it runs; False
+    when the budget can't take it (the count is skipped). The count is priced at
+    the admitted query's estimate – it reads no more than that query. Nothing
+    to charge when the cost gate didn't price the query.
+    """
+    estimate = state.get("scan_bytes_estimate")
+
+    def charge() -> bool:
+        if not isinstance(estimate, int):
+            return True
+        from ..cost_gate_agent.agent import get_byte_budget   # lazy: the gate imports the connector
+        return get_byte_budget().try_charge(user_id, estimate).allowed
 
+    return charge
 
 
+async def _count_rows(count_sql: str) -> Optional[int]:
+    """Total rows of a previewed query; None if the count fails (the preview still stands)."""
+    try:
+        table = await fetch_arrow_async(count_sql)
+    except Exception:
+        return None
+    return int(table.column(0)[0].as_py()) if table.num_rows else None
 
 
-from .bigquery_connector import fetch_data
+@dataclass
+class Fetched:
+    plan: GuardedQuery
+    table: pa.Table
+    summary: ResultSummary
+    artifact: Optional[ArtifactWriter]
+    total: Optional[int]
 
 
+async def _run(plan: GuardedQuery, charge_count: Callable[[], bool]) -> Fetched:
+    """Run the guarded SQL, with its COUNT(*) alongside when it is a preview (and `charge_count` admits it).
+
+    Every batch goes to the streaming summary and, when artifacts are on, to
+    the artifact writer – both off the event loop.
+    """
+    summary = ResultSummary(PREVIEW_ROWS)
+    artifact = new_artifact_writer()
+
+    def on_batch(batch: pa.RecordBatch) -> None:
+        summary.update(batch)
+        if artifact is not None:
+            artifact.write(batch)
+
+    count = asyncio.ensure_future(_count_rows(plan.count_sql)) if plan.count_sql and charge_count() else None
+    try:
+        table = await fetch_arrow_async(plan.sql, on_batch=on_batch)
+    except BaseException:
+        if count is not None:
+            count.cancel()
+        raise
+    total = await count if count is not None else None
+    summary.finish(table.schema)
+    return Fetched(plan, table, summary, artifact, total)
+
+
+async def _execute(sql: str, mode: str, charge_count: Callable[[], bool]) -> Fetched:
+    """Guard `sql` for `mode` and run it; an empty block sample of a non-empty result falls back to the preview."""
+    fetched = await _run(guard(sql, mode), charge_count)
+    if fetched.plan.sampled and not fetched.summary.rows and fetched.total:
+        plan = guard(sql, PREVIEW)
+        plan.notes.insert(0, "The table sample came back empty (table smaller than a storage block); showing a preview instead.")
+        fetched = await _run(plan, charge_count)
+    return fetched
+
+
+def optimization_of(state, sql: str) -> dict | None:
+    """state["optimization"] when it describes `sql` – not a previous turn's, or SQL repaired since."""
+    optimization = state.get("optimization")
+    if isinstance(optimization, dict) and optimization.get("sql") == sql:
+        return optimization
+    return None
+
+
+def log_query(state, sql: str, seconds: float, rows: int) -> None:
+    """Append the statement that ran to the executed-query log (with how the optimizer got it there)."""
+    entry = {"sql": sql, "seconds": round(seconds, 4), "rows": rows}
+    dry_run = state.get("dry_run")
+    as_planned = isinstance(dry_run, dict) and dry_run.get("sql") == sql     # not repaired since the dry run
+    if as_planned:
+        entry["bytes"] = dry_run.get("bytes_processed")
+    optimization = optimization_of(state, sql)
+    if as_planned and optimization is not None and optimization.get("original_sql"):
+        entry["original_sql"] = optimization["original_sql"]
+        entry["bytes_before"] = optimization.get("bytes_before")
+        entry["rollups"] = optimization.get("rollups") or []
+    try:
+        get_query_log().append(entry)
+    except OSError:
+        pass                                          # the log is best-effort
+
+
+async def save_artifact(
+    ctx: InvocationContext, writer: Optional[ArtifactWriter], schema: pa.Schema, stem: str
+) -> tuple[str, int] | None:
+    """Save the result file through the artifact service; (filename, version), or None without one."""
+    if writer is None or ctx.artifact_service is None:
+        return None
+    filename = writer.filename(stem)
+    with get_tracer().span("result_artifact") as span:
+        part = await asyncio.to_thread(writer.part, schema)
+        version = await ctx.artifact_service.save_artifact(
+            app_name=ctx.app_name,
+            user_id=ctx.user_id,
+            session_id=ctx.session.id,
+            filename=filename,
+            artifact=part,
+        )
+        span.set(format=writer.format, rows=writer.rows, bytes=len(part.inline_data.data), version=version)
+    return filename, version
+
+
+def artifact_stem(ctx: InvocationContext) -> str:
+    """query_result_<invocation id>, plus the branch's last segment for a planner sub-query."""
+    stem = f"query_result_{ctx.invocation_id}"
+    return f"{stem}_{ctx.branch.rsplit('.', 1)[-1]}" if ctx.branch else stem
+
 
 class BigQueryFetcherAgent(BaseAgent):
     def __init__(self) -> None:
         super().__init__(
             name="SqlFetcherAgent",
-            description="Executes validated SQL and prints the resulting DataFrame.",
+            description="Executes validated SQL and prints a preview and column stats of the result.",
         )
 
     async def _run_async_impl(
@@ -53,11 +253,33 @@ class BigQueryFetcherAgent(BaseAgent):
         # Remove ```sql fences``` if present
         sql_query = re.sub(r'^```sql\s*|\s*```$', '', sql_query.strip(), flags=re.I)
 
-        # 2️⃣ Run the query
+        # 2️⃣ Guard the SQL (preview LIMIT + COUNT(*), or a sample, unless all rows were asked for)
+        #    and run it (one deterministic repair + retry on a cheap BigQuery error)
+        mode = result_mode(_user_question(ctx), state.get("result_mode"))
+        charge_count = _count_charger(state, ctx.user_id)
+        started = time.perf_counter()
         try:
-            df: pd.DataFrame = fetch_data(sql_query)
+            try:
+                fetched = await _execute(sql_query, mode, charge_count)
+            except QueryTimeoutError:
+                raise
+            except Exception as exc:
+                if state.get("semantic_cache_hit"):
+                    from ..semantic_cache_agent.agent import get_semantic_cache
+                    get_semantic_cache().invalidate_sql(sql_query)
+                error_class, fixed = repair_deterministically(sql_query, str(exc))
+                if not fixed:
+                    raise
+                REPAIR_COUNTERS[f"{error_class}.deterministic"] += 1
+                annotate(repair=f"{error_class}.deterministic")
+                fetched = await _execute(fixed, mode, charge_count)
+                state["sql_query"] = sql_query = fixed
         except Exception as exc:
-            err_msg = f"❌ BigQuery execution failed: {exc}"
+            if isinstance(exc, QueryTimeoutError):
+                err_msg = f"⏱️ BigQuery query timed out: {exc}"
+            else:
+                err_msg = f"❌ BigQuery execution failed: {exc}"
+            record_error(err_msg)
             yield Event(
                 invocation_id=ctx.invocation_id,
                 author=self.name,
@@ -66,16 +288,45 @@ class BigQueryFetcherAgent(BaseAgent):
             )
             return
 
-        state["query_result_df"] = df  # keep for any sibling agents
+        plan, summary, total = fetched.plan, fetched.summary, fetched.total
+        if QUERY_LOG_ENABLED:
+            await asyncio.to_thread(log_query, state, sql_query, time.perf_counter() - started, summary.rows)
+        handle = await asyncio.to_thread(get_result_store().put, fetched.table)  # may spill to disk
+        state["query_result"] = result_ref(handle, fetched.table)  # handle + metadata for sibling agents
+        notes = list(plan.notes)
+        if (total_note := describe_total(plan, summary.rows, total)) is not None:
+            notes.append(total_note)
+        rollups = (optimization_of(state, sql_query) or {}).get("rollups")
+        if rollups:
+            notes.append(f"Answered from rollup {', '.join(sorted(set(rollups)))} (a summary table kept in step "
+                         f"with its base table) – the same rows as the query as generated.")
+        state["sql_rewrites"] = notes
+        state["query_total_rows"] = total
+        annotate(rows=summary.rows, result_mode=mode, rewritten=plan.rewritten, total_rows=total)
 
-        # 3️⃣ Emit the DataFrame to the chat
-        table_text = df.to_string(index=False)
+        # 3️⃣ Save the rows as a file artifact (the chat only links to it)
+        actions = EventActions()
+        saved = await save_artifact(ctx, fetched.artifact, fetched.table.schema, artifact_stem(ctx))
+        if saved is not None:
+            filename, version = saved
+            actions.artifact_delta[filename] = version
+            state["query_result_artifact"] = filename
+
+        # 4️⃣ Emit the preview, column stats, artifact handle and any rewrites to the chat
+        text = summary.render()
+        if saved is not None:
+            size_kb = len(fetched.artifact.finish(fetched.table.schema)) / 1024
+            text += (
+                f"\n\n📎 {fetched.artifact.rows:,} rows saved as artifact `{filename}` "
+                f"(version {version}, {size_kb:,.1f} KB {fetched.artifact.description})"
+            )
+        if notes:
+            text += "\n\n" + "\n".join(f"ℹ️ {note}" for note in notes)
         yield Event(
             invocation_id=ctx.invocation_id,
             author=self.name,
             branch=ctx.branch,
-            content=types.Content(parts=[
-                types.Part(text=f"✅ Query returned **{len(df):,} rows**\n\n```\n{table_text}\n```")
-            ]),
+            content=types.Content(parts=[types.Part(text=text)]),
+            actions=actions,
         )
 sql_fetcher_agent = BigQueryFetcherAgent()
@@ -0,0 +1,125 @@
+"""
+Arrow Query Results
+───────────────────────────────────────────────────────────────────────────────
+The fetcher keeps query results as Arrow record batches end to end:
+
+• ResultSummary is fed one batch at a time while the rows stream in – row and
+  byte counts, the first `preview_rows` rows, and per-column null count,
+  min / max and (numeric columns) mean. It never holds more than the preview.
+• The batches themselves become one pyarrow Table (no copy), which the
+  fetcher parks in the result store (result_store.py); pandas conversion
+  happens only when a consumer asks for it.
+
+The chat message is rendered from the summary (preview + column stats), so a
+multi-million-row result is never turned into one giant string.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ...lazy_imports import lazy_import
+
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+
+
+def _comparable(t: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_decimal(t)
+        or pa.types.is_temporal(t) or pa.types.is_string(t) or pa.types.is_large_string(t)
+        or pa.types.is_boolean(t)
+    )
+
+
+def _numeric(t: pa.DataType) -> bool:
+    return pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_decimal(t)
+
+
+@dataclass
+class ColumnStats:
+    name: str
+    type: str
+    nulls: int = 0
+    min: Any = None
+    max: Any = None
+    sum: Optional[float] = None
+    count: int = 0                                    # non-null values
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.sum is not None and self.count else None
+
+    def update(self, column: pa.Array) -> None:
+        nulls = column.null_count
+        self.nulls += nulls
+        self.count += len(column) - nulls
+        if not _comparable(column.type) or len(column) == nulls:
+            return
+        bounds = pc.min_max(column)
+        lo, hi = bounds["min"].as_py(), bounds["max"].as_py()
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        if _numeric(column.type):
+            self.sum = (self.sum or 0.0) + float(pc.sum(column).as_py())
+
+    def describe(self) -> str:
+        parts = [f"{self.name} ({self.type})"]
+        if self.nulls:
+            parts.append(f"nulls {self.nulls:,}")
+        if self.min is not None:
+            parts.append(f"min {self.min}  max {self.max}")
+        if self.mean is not None:
+            parts.append(f"mean {self.mean:,.4g}")
+        return " · ".join(parts)
+
+
+@dataclass
+class ResultSummary:
+    preview_rows: int = 20
+    rows: int = 0
+    batches: int = 0
+    nbytes: int = 0
+    schema: Optional[pa.Schema] = None
+    columns: list[ColumnStats] = field(default_factory=list)
+    _preview: list[pa.RecordBatch] = field(default_factory=list)
+    _preview_count: int = 0
+
+    def _start(self, schema: pa.Schema) -> None:
+        self.schema = schema
+        self.columns = [ColumnStats(f.name, str(f.type)) for f in schema]
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        if self.schema is None:
+            self._start(batch.schema)
+        self.rows += batch.num_rows
+        self.batches += 1
+        self.nbytes += batch.nbytes
+        for stats, column in zip(self.columns, batch.columns):
+            stats.update(column)
+        if self._preview_count < self.preview_rows:
+            head = batch.slice(0, self.preview_rows - self._preview_count)
+            self._preview.append(head)
+            self._preview_count += head.num_rows
+
+    def finish(self, schema: pa.Schema) -> None:
+        """Record the schema of a result that produced no batches."""
+        if self.schema is None:
+            self._start(schema)
+
+    def preview(self) -> pa.Table:
+        if self.schema is None:
+            return pa.table({})
+        return pa.Table.from_batches(self._preview, schema=self.schema)
+
+    def render(self) -> str:
+        """Chat text: row count, the preview rows and one stats line per column."""
+        head = f"✅ Query returned **{self.rows:,} rows** × {len(self.columns)} columns"
+        if not self.rows:
+            return head
+        preview = self.preview().to_pandas().to_string(index=False)
+        shown = f"first {self._preview_count:,} of {self.rows:,} rows" if self._preview_count < self.rows else "all rows"
+        stats = "\n".join(f"  {c.describe()}" for c in self.columns)
+        return f"{head}\n\n```\n{preview}\n```\n_{shown}_\n\nColumns:\n{stats}"
+
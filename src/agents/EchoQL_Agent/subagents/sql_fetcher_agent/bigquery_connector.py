@@ -1,31 +1,276 @@
+"""
+Query execution for the fetcher – routes SQL to the configured connector.
+
+    ECHOQL_EXECUTION_BACKEND=bigquery   (default) BigQuery jobs, pooled clients
+    ECHOQL_EXECUTION_BACKEND=duckdb     in-process DuckDB over Mock_Data/*.csv
+                                        (ECHOQL_LOCAL_DATA_DIR to point elsewhere)
+
+Both paths share the result cache and the per-query timeout and deliver rows
+as Arrow record batches; see connectors/. `dry_run_async` compiles a statement
+on the same backend without running it (bytes it would scan, compile errors).
+"""
+
+from __future__ import annotations
+
+import asyncio
 import os
-import pandas as pd
-from google.cloud import bigquery
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable
+
+from ...lazy_imports import lazy_import
+from ...tracing import annotate, get_tracer
+from .connectors import BigQueryConnector, Connector, DryRun, DuckDBConnector, QueryTimeoutError
+from .connectors.bigquery import BQ_POOL_SIZE
+from .result_cache import ResultCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+pa = lazy_import("pyarrow")
+
+# 1) Execution backend – "bigquery" or "duckdb"
+EXECUTION_BACKEND = os.getenv("ECHOQL_EXECUTION_BACKEND", "bigquery").strip().lower()
+LOCAL_DATA_DIR = os.getenv("ECHOQL_LOCAL_DATA_DIR") or None
+
+# 2) Result cache – set ECHOQL_RESULT_CACHE=0 to always hit the backend
+RESULT_CACHE_ENABLED = os.getenv("ECHOQL_RESULT_CACHE", "1") != "0"
+RESULT_CACHE_TTL_S = float(os.getenv("ECHOQL_RESULT_CACHE_TTL_S", "900"))
+RESULT_CACHE_MEMORY_MB = int(os.getenv("ECHOQL_RESULT_CACHE_MEMORY_MB", "256"))
+RESULT_CACHE_DISK_MB = int(os.getenv("ECHOQL_RESULT_CACHE_DISK_MB", "2048"))
+RESULT_CACHE_DIR = os.getenv(
+    "ECHOQL_RESULT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "echoql", "results"),
+)
+
+# 3) Execution – bounded worker threads, per-query timeout, job polling
+BQ_MAX_WORKERS = int(os.getenv("ECHOQL_BQ_MAX_WORKERS", "16"))
+BQ_QUERY_TIMEOUT_S = float(os.getenv("ECHOQL_BQ_QUERY_TIMEOUT_S", "120"))
+BQ_POLL_INITIAL_S = 0.05
+BQ_POLL_MAX_S = 1.0
+BQ_POLL_BACKOFF = 1.25
+
+CONNECTORS: dict[str, Callable[[], Connector]] = {
+    "bigquery": BigQueryConnector,
+    "duckdb": lambda: DuckDBConnector(LOCAL_DATA_DIR),
+}
+
+
+def _default_connector() -> Connector:
+    try:
+        return CONNECTORS[EXECUTION_BACKEND]()
+    except KeyError:
+        raise ValueError(
+            f"ECHOQL_EXECUTION_BACKEND={EXECUTION_BACKEND!r}; expected one of {sorted(CONNECTORS)}"
+        ) from None
+
 
-# 1) Your GCP project ID
-GCP_PROJECT_ID = "adk-hackathon-461216"
+connector: Connector = _default_connector()
+_executor = ThreadPoolExecutor(max_workers=BQ_MAX_WORKERS, thread_name_prefix="bq-fetch")
 
-# 2) If you are not using Application Default Credentials,
-#    uncomment and set the path to your service-account JSON file:
-# os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/path/to/your-key.json"
+
+def use_connector(new: Connector) -> None:
+    """Route all queries to `new` (e.g. DuckDBConnector for offline runs)."""
+    global connector
+    connector = new
+
+
+def use_client_factory(factory: Callable[[], Any], size: int = BQ_POOL_SIZE) -> None:
+    """Run on BigQuery through clients from `factory` (e.g. a local fake) in a fresh pool."""
+    use_connector(BigQueryConnector(factory, size))
 
 
-# INITIALIZE BIGQUERY CLIENT
 def get_bq_client():
-    return bigquery.Client(project=GCP_PROJECT_ID)
+    if not isinstance(connector, BigQueryConnector):
+        raise RuntimeError(f"execution backend is {connector.name}, not BigQuery")
+    return connector.pool.shared()
+
+
+def table_last_modified(table_id: str) -> float | None:
+    """Epoch seconds of the table's last modification (None if unknown)."""
+    return connector.table_modified(table_id)
+
+
+result_cache = ResultCache(
+    ttl_s=RESULT_CACHE_TTL_S,
+    max_memory_bytes=RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+    max_disk_bytes=RESULT_CACHE_DISK_MB * 1024 * 1024,
+    cache_dir=RESULT_CACHE_DIR,
+    table_modified=table_last_modified,
+)
 
 
-def fetch_data(sql_query: str) -> pd.DataFrame:
+def fetch_arrow(sql_query: str, use_cache: bool = RESULT_CACHE_ENABLED) -> pa.Table:
     """
-    Execute the given SQL query on BigQuery and return the results as a pandas DataFrame.
+    Execute the given SQL query on the configured backend and return its rows as an Arrow table.
+
+    Identical queries (after normalisation) are served from `result_cache`
+    until their TTL runs out or one of the referenced tables changes.
+
+    This call blocks; from async code use `fetch_arrow_async` instead.
 
     Args:
         sql_query (str): A fully-qualified BigQuery SQL query string.
+        use_cache (bool): Consult and populate the result cache.
 
     Returns:
-        pd.DataFrame: The result rows as a DataFrame.
+        pa.Table: The result rows (the streamed record batches, not copied).
+    """
+    if use_cache:
+        cached = result_cache.get(sql_query)
+        if cached is not None:
+            return cached
+
+    table = connector.execute_arrow(sql_query).read_all()
+
+    if use_cache:
+        result_cache.put(sql_query, table)
+    return table
+
+
+def fetch_data(sql_query: str, use_cache: bool = RESULT_CACHE_ENABLED) -> pd.DataFrame:
+    """`fetch_arrow` converted to a pandas DataFrame."""
+    return fetch_arrow(sql_query, use_cache).to_pandas()
+
+
+# ─── async execution ────────────────────────────────────────
+async def _in_executor(fn: Callable, *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+def _job_done(job) -> bool:
+    return job.done()
+
+
+def _cancel_job(job) -> None:
+    try:
+        job.cancel()
+    except Exception:                          # best effort – the job may have finished
+        pass
+
+
+def _next_batch(reader: pa.RecordBatchReader, on_batch: Callable | None) -> pa.RecordBatch | None:
+    """Read one batch (network / engine work) and feed it to `on_batch`, off the event loop."""
+    try:
+        batch = reader.read_next_batch()
+    except StopIteration:
+        return None
+    if on_batch is not None:
+        on_batch(batch)
+    return batch
+
+
+async def _poll(
+    backend: Connector, sql_query: str, deadline: float | None, timeout_s: float | None, span
+) -> pa.RecordBatchReader:
+    job = await _in_executor(backend.submit, sql_query)
+    span.set(job_id=getattr(job, "job_id", None))
+    try:
+        async with asyncio.timeout_at(deadline):
+            delay = BQ_POLL_INITIAL_S
+            while not await _in_executor(_job_done, job):
+                await asyncio.sleep(delay)
+                delay = min(delay * BQ_POLL_BACKOFF, BQ_POLL_MAX_S)
+            reader = await _in_executor(backend.job_batches, job)
+    except TimeoutError as exc:
+        _executor.submit(_cancel_job, job)
+        raise QueryTimeoutError(
+            f"query exceeded {timeout_s:g}s timeout; job {getattr(job, 'job_id', '?')} cancelled"
+        ) from exc
+    except asyncio.CancelledError:
+        _executor.submit(_cancel_job, job)
+        raise
+    span.set(
+        bytes_processed=getattr(job, "total_bytes_processed", None),
+        slot_ms=getattr(job, "slot_millis", None),
+        bq_cache_hit=getattr(job, "cache_hit", None),
+    )
+    return reader
+
+
+async def _download(
+    reader: pa.RecordBatchReader, on_batch: Callable | None, deadline: float | None, timeout_s: float | None
+) -> list[pa.RecordBatch]:
+    """Every batch of `reader` – within what is left of the query's timeout."""
+    batches = []
+    try:
+        async with asyncio.timeout_at(deadline):
+            while (batch := await _in_executor(_next_batch, reader, on_batch)) is not None:
+                batches.append(batch)
+    except TimeoutError as exc:
+        raise QueryTimeoutError(f"query exceeded {timeout_s:g}s timeout while its rows were downloaded") from exc
+    return batches
+
+
+async def fetch_arrow_async(
+    sql_query: str,
+    timeout_s: float | None = BQ_QUERY_TIMEOUT_S,
+    use_cache: bool = RESULT_CACHE_ENABLED,
+    on_batch: Callable[[pa.RecordBatch], None] | None = None,
+) -> pa.Table:
+    """
+    Non-blocking counterpart of `fetch_arrow`.
+
+    Job-based backends (BigQuery) are submitted and polled from a bounded
+    thread pool, so the event loop keeps serving other sessions while the job
+    runs. If the job runs longer than `timeout_s`, or the awaiting task is
+    cancelled (e.g. the agent invocation is abandoned), the job is cancelled as
+    well. In-process backends run the statement in the same pool and interrupt
+    it themselves after `timeout_s`. Downloading the rows counts against the
+    same `timeout_s`, measured from submission.
+
+    Rows arrive as Arrow record batches, read one at a time off the event loop;
+    `on_batch` sees every batch as it arrives (e.g. a streaming summary). The
+    returned table is made of those same batches – nothing is copied and
+    nothing is converted to pandas.
+
+    Raises:
+        QueryTimeoutError: the query did not finish, or its rows were not
+            downloaded, within `timeout_s`.
+    """
+    if use_cache:
+        cached = await _in_executor(result_cache.get, sql_query)
+        annotate(result_cache="hit" if cached is not None else "miss")
+        if cached is not None:
+            if on_batch is not None:
+                for batch in cached.to_batches():
+                    on_batch(batch)
+            return cached
+
+    backend = connector
+    deadline = None if timeout_s is None else asyncio.get_running_loop().time() + timeout_s
+    with get_tracer().span(f"{backend.name}.query") as span:
+        if backend.polls:
+            reader = await _poll(backend, sql_query, deadline, timeout_s, span)
+        else:
+            reader = await _in_executor(backend.execute_arrow, sql_query, timeout_s)
+        batches = await _download(reader, on_batch, deadline, timeout_s)
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+        span.set(rows=table.num_rows, batches=len(batches), arrow_bytes=table.nbytes)
+
+    if use_cache:
+        await _in_executor(result_cache.put, sql_query, table)
+    return table
+
+
+async def fetch_data_async(
+    sql_query: str,
+    timeout_s: float | None = BQ_QUERY_TIMEOUT_S,
+    use_cache: bool = RESULT_CACHE_ENABLED,
+) -> pd.DataFrame:
+    """`fetch_arrow_async` converted to a pandas DataFrame."""
+    table = await fetch_arrow_async(sql_query, timeout_s, use_cache)
+    return table.to_pandas()
+
+
+async def dry_run_async(sql_query: str) -> DryRun:
+    """
+    Compile `sql_query` on the configured backend without running it.
+
+    Raises:
+        NotImplementedError: the backend has no dry run.
     """
-    bq_client = get_bq_client()
-    query_job = bq_client.query(sql_query)
-    dataframe = query_job.result().to_dataframe()
-    return dataframe
+    backend = connector
+    with get_tracer().span(f"{backend.name}.dry_run") as span:
+        result = await _in_executor(backend.dry_run, sql_query)
+        span.set(bytes_processed=result.bytes_processed, estimated=result.estimated, error=result.error)
+    return result
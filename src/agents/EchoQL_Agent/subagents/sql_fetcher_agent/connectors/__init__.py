@@ -0,0 +1,3 @@
+from .base import Connector, DryRun, QueryTimeoutError, TableMetadata
+from .bigquery import BigQueryConnector, ClientPool
+from .duckdb_local import DuckDBConnector
@@ -0,0 +1,113 @@
+"""
+Connector interface – where the fetcher's SQL actually runs.
+
+A connector executes one GoogleSQL statement and streams its rows as Arrow
+record batches (`execute_arrow`); nothing is converted to pandas unless a
+caller asks for it (`execute`). Remote engines (BigQuery) expose jobs
+instead: `polls = True`, `submit()` returns a job object with done() /
+result() / cancel() that fetch_arrow_async polls without blocking the event
+loop, and `job_batches()` streams the finished job's rows. In-process engines
+run the statement in a worker thread and enforce the timeout themselves.
+
+`dry_run()` compiles a statement without running it and reports the bytes it
+would scan (plus any error the engine finds) – the input of the cost gate.
+`run_statements()` runs DDL / DML that returns no rows (the rollup refresh),
+optionally as one transaction.
+"""
+
+from __future__ import annotations
+
+import itertools
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Sequence
+
+from ....lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+pa = lazy_import("pyarrow")
+
+ARROW_BATCH_ROWS = 65_536
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a query exceeds its timeout (the job / statement is cancelled)."""
+
+
+@dataclass(frozen=True)
+class DryRun:
+    """What a statement would cost, or why it does not compile."""
+
+    bytes_processed: int = 0
+    tables: tuple[str, ...] = ()                  # dataset-qualified tables it reads
+    error: Optional[str] = None                   # set → the engine rejected the statement
+    estimated: bool = False                       # True → sized from table statistics, not a planner
+
+
+@dataclass(frozen=True)
+class TableMetadata:
+    """What the backend knows about a table without scanning it."""
+
+    name: str
+    columns: tuple[tuple[str, str, str], ...] = ()   # (name, GoogleSQL type, description)
+    description: str = ""
+    modified: Optional[float] = None                 # epoch seconds of the last modification
+    num_rows: Optional[int] = None
+    partition_by: Optional[str] = None               # time-partitioning column (None: not known / not partitioned)
+    cluster_by: tuple[str, ...] = ()
+
+
+def reader_from_batches(
+    batches: Iterable[pa.RecordBatch], empty: Callable[[], pa.Schema]
+) -> pa.RecordBatchReader:
+    """A RecordBatchReader over a batch iterable whose schema is only known from its first batch."""
+    it = iter(batches)
+    first = next(it, None)
+    if first is None:
+        return pa.RecordBatchReader.from_batches(empty(), [])
+    return pa.RecordBatchReader.from_batches(first.schema, itertools.chain([first], it))
+
+
+class Connector(ABC):
+    name: str = "connector"
+    polls: bool = False                       # True → use submit() and poll the job
+
+    @abstractmethod
+    def execute_arrow(self, sql: str, timeout_s: Optional[float] = None) -> pa.RecordBatchReader:
+        """Run `sql` and stream its rows; the reader must be consumed (or closed) by the caller."""
+
+    def execute(self, sql: str, timeout_s: Optional[float] = None) -> pd.DataFrame:
+        """Run `sql` to completion (blocking) and return its rows as a DataFrame."""
+        return self.execute_arrow(sql, timeout_s).read_all().to_pandas()
+
+    def submit(self, sql: str) -> Any:
+        """Start `sql` and return a job with done() / result() / cancel() / job_id."""
+        raise NotImplementedError(f"{self.name} connector runs statements synchronously")
+
+    def job_batches(self, job: Any) -> pa.RecordBatchReader:
+        """Stream the rows of a finished job returned by submit()."""
+        raise NotImplementedError(f"{self.name} connector runs statements synchronously")
+
+    def dry_run(self, sql: str) -> DryRun:
+        """Compile `sql` without running it; raises NotImplementedError if the engine can't."""
+        raise NotImplementedError(f"{self.name} connector has no dry run")
+
+    def run_statements(
+        self, statements: Sequence[str], atomic: bool = False, timeout_s: Optional[float] = None
+    ) -> None:
+        """Run DDL / DML `statements` in order; `atomic` → all or none of them take effect."""
+        raise NotImplementedError(f"{self.name} connector can't run DDL / DML")
+
+    def table_modified(self, table_id: str) -> Optional[float]:
+        """Epoch seconds of the table's last modification (None if unknown)."""
+        return None
+
+    def list_tables(self, dataset: str) -> list[str]:
+        """Names of the tables in `dataset`."""
+        raise NotImplementedError(f"{self.name} connector can't list tables")
+
+    def table_metadata(self, table_id: str) -> TableMetadata:
+        """Columns, description, last modification and row count of a table – no scan."""
+        raise NotImplementedError(f"{self.name} connector has no table metadata")
@@ -0,0 +1,170 @@
+"""
+BigQuery connector – pooled clients, asynchronous jobs, dry runs.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from ....lazy_imports import lazy_import
+from ....settings import get_settings
+from .base import Connector, DryRun, QueryTimeoutError, TableMetadata, reader_from_batches
+
+pa = lazy_import("pyarrow")
+
+# 1) GCP project the queries are billed to
+GCP_PROJECT_ID = get_settings().gcp_project
+
+# 2) If you are not using Application Default Credentials,
+#    uncomment and set the path to your service-account JSON file:
+# os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/path/to/your-key.json"
+
+# 3) Pooled clients sharing keep-alive HTTP sessions
+BQ_POOL_SIZE = int(os.getenv("ECHOQL_BQ_POOL_SIZE", "4"))
+BQ_HTTP_POOL_MAXSIZE = int(os.getenv("ECHOQL_BQ_HTTP_POOL_MAXSIZE", "16"))
+
+
+# legacy SQL type names in the tables API → GoogleSQL
+_LEGACY_TYPES = {"INTEGER": "INT64", "FLOAT": "FLOAT64", "BOOLEAN": "BOOL", "RECORD": "STRUCT"}
+
+
+def _googlesql_type(field) -> str:
+    name = _LEGACY_TYPES.get(field.field_type, field.field_type)
+    return f"ARRAY<{name}>" if field.mode == "REPEATED" else name
+
+
+def _make_client():
+    """A client whose HTTP session keeps up to BQ_HTTP_POOL_MAXSIZE connections alive."""
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import bigquery
+    from requests.adapters import HTTPAdapter
+
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(
+        pool_connections=BQ_HTTP_POOL_MAXSIZE, pool_maxsize=BQ_HTTP_POOL_MAXSIZE
+    )
+    session.mount("https://", adapter)
+    return bigquery.Client(project=GCP_PROJECT_ID, credentials=credentials, _http=session)
+
+
+class ClientPool:
+    """
+    Process-wide pool of BigQuery clients.
+
+    Clients are created lazily (up to `size`) and handed out one caller at a
+    time, so every HTTP session – and its keep-alive connections – is reused
+    across queries instead of being rebuilt per call.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int) -> None:
+        self._factory = factory
+        self._size = max(1, size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        client = self._checkout()
+        try:
+            yield client
+        finally:
+            self._idle.put(client)
+
+    def shared(self) -> Any:
+        """A pooled client for short metadata calls that don't need exclusivity."""
+        with self.acquire() as client:
+            return client
+
+    def _checkout(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                return self._factory()
+        return self._idle.get()
+
+
+class BigQueryConnector(Connector):
+    name = "bigquery"
+    polls = True
+
+    def __init__(self, factory: Callable[[], Any] = _make_client, pool_size: int = BQ_POOL_SIZE) -> None:
+        self.pool = ClientPool(factory, pool_size)
+
+    def submit(self, sql: str) -> Any:
+        with self.pool.acquire() as client:
+            return client.query(sql)
+
+    def execute_arrow(self, sql: str, timeout_s: Optional[float] = None) -> pa.RecordBatchReader:
+        job = self.submit(sql)
+        try:
+            job.result(timeout=timeout_s) if timeout_s is not None else job.result()
+        except TimeoutError as exc:                   # concurrent.futures.TimeoutError on 3.11+
+            job.cancel()
+            raise QueryTimeoutError(f"query exceeded {timeout_s:g}s timeout; job {job.job_id} cancelled") from exc
+        return self.job_batches(job)
+
+    def job_batches(self, job: Any) -> pa.RecordBatchReader:
+        """Pages of the finished job as Arrow batches – never a DataFrame."""
+        rows = job.result()
+        return reader_from_batches(rows.to_arrow_iterable(), lambda: job.result().to_arrow().schema)
+
+    def dry_run(self, sql: str) -> DryRun:
+        """A dry-run job: BigQuery's own bytes estimate, and its compile errors for free."""
+        from google.api_core.exceptions import BadRequest, NotFound
+        from google.cloud import bigquery
+
+        config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        with self.pool.acquire() as client:
+            try:
+                job = client.query(sql, job_config=config)
+            except (BadRequest, NotFound) as exc:     # the statement doesn't compile
+                return DryRun(error=getattr(exc, "message", None) or str(exc))
+        tables = tuple(f"{t.dataset_id}.{t.table_id}" for t in job.referenced_tables or ())
+        return DryRun(bytes_processed=int(job.total_bytes_processed or 0), tables=tables)
+
+    def run_statements(
+        self, statements: Sequence[str], atomic: bool = False, timeout_s: Optional[float] = None
+    ) -> None:
+        """One multi-statement script job (inside BEGIN / COMMIT TRANSACTION when `atomic` – DML only)."""
+        script = ";\n".join(statements)
+        if atomic:
+            script = f"BEGIN TRANSACTION;\n{script};\nCOMMIT TRANSACTION"
+        job = self.submit(script)
+        try:
+            job.result(timeout=timeout_s) if timeout_s is not None else job.result()
+        except TimeoutError as exc:
+            job.cancel()
+            raise QueryTimeoutError(f"script exceeded {timeout_s:g}s timeout; job {job.job_id} cancelled") from exc
+
+    def table_modified(self, table_id: str) -> Optional[float]:
+        table = self.pool.shared().get_table(table_id)
+        return table.modified.timestamp() if table.modified else None
+
+    def list_tables(self, dataset: str) -> list[str]:
+        with self.pool.acquire() as client:
+            return [t.table_id for t in client.list_tables(dataset)]
+
+    def table_metadata(self, table_id: str) -> TableMetadata:
+        """From the tables.get API – metadata only, nothing is billed."""
+        with self.pool.acquire() as client:
+            table = client.get_table(table_id)
+        return TableMetadata(
+            name=table.table_id,
+            columns=tuple((f.name, _googlesql_type(f), f.description or "") for f in table.schema),
+            description=table.description or "",
+            modified=table.modified.timestamp() if table.modified else None,
+            num_rows=table.num_rows,
+            partition_by=table.time_partitioning.field if table.time_partitioning else None,
+            cluster_by=tuple(table.clustering_fields or ()),
+        )
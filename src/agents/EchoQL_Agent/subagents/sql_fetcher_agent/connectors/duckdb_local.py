@@ -0,0 +1,489 @@
+"""
+Local connector – DuckDB in-process over Mock_Data/*.csv.
+
+Every CSV in the data directory is loaded once, on first use, as table
+`<dataset>.<file stem>`. When the schema catalog types every column of a CSV
+the file is read with those types and no sniffing (~10x faster to load);
+otherwise DuckDB infers the rest. Incoming GoogleSQL is transpiled to
+DuckDB with sqlglot – DATE_TRUNC, EXTRACT, SAFE_DIVIDE, COUNTIF, SPLIT()[OFFSET],
+GENERATE_DATE_ARRAY, QUALIFY … all map – and `project.Mock_KPIs.table` paths
+are reduced to `Mock_KPIs.table`. Statements run on their own cursor, so
+concurrent sessions don't serialise; a statement that outlives its timeout is
+interrupted.
+
+Dry runs stand in for BigQuery's: the statement is bound and planned with
+EXPLAIN (so unknown names and type errors surface), and the bytes are sized
+the way BigQuery bills them – the logical size of every column the query
+reads (8 bytes per INT64 / FLOAT64 / DATE / TIMESTAMP value, 2 + UTF-8 length
+per STRING …), measured once per table. Like BigQuery, a table partitioned
+by day (catalog `partition_by`) is billed only for the partitions the query
+can read: when every scope that reads it bounds the bare partition column by
+constants in its WHERE, its bytes are scaled by the share of rows in the days
+those bounds keep (counted once per table and bounds). Tables in other
+schemas (the rollup dataset) are sized the same way, and pruned on the
+column of the PARTITION BY they were created with.
+
+`run_statements()` runs DDL / DML on the same database (in one transaction
+when atomic; DuckDB itself ignores PARTITION BY); the tables it writes count
+as modified from then on.
+
+Small and dev datasets answer in milliseconds with no job overhead, and CI /
+benchmarks can run the fetcher fully offline. Needs the `duckdb` package.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Sequence
+
+from ....lazy_imports import lazy_import
+from ....catalog import load_catalog
+from .base import ARROW_BATCH_ROWS, Connector, DryRun, QueryTimeoutError, TableMetadata
+
+pa = lazy_import("pyarrow")
+sqlglot = lazy_import("sqlglot")
+exp = lazy_import("sqlglot.expressions")
+optimizer_scope = lazy_import("sqlglot.optimizer.scope")
+
+# GoogleSQL type → DuckDB type for catalog-typed CSV columns
+_DUCKDB_TYPES = {
+    "INT64": "BIGINT",
+    "FLOAT64": "DOUBLE",
+    "NUMERIC": "DECIMAL(38, 9)",
+    "BIGNUMERIC": "DOUBLE",
+    "BOOL": "BOOLEAN",
+    "STRING": "VARCHAR",
+    "BYTES": "BLOB",
+    "DATE": "DATE",
+    "DATETIME": "TIMESTAMP",
+    "TIMESTAMP": "TIMESTAMP",
+    "TIME": "TIME",
+}
+
+# DuckDB type prefix → GoogleSQL type, for tables the catalog doesn't type
+_GOOGLESQL_TYPES = {
+    "BIGINT": "INT64", "INTEGER": "INT64", "SMALLINT": "INT64", "TINYINT": "INT64", "HUGEINT": "INT64",
+    "DOUBLE": "FLOAT64", "FLOAT": "FLOAT64", "DECIMAL": "NUMERIC", "BOOLEAN": "BOOL",
+    "VARCHAR": "STRING", "BLOB": "BYTES", "DATE": "DATE", "TIMESTAMP": "TIMESTAMP", "TIME": "TIME",
+}
+
+
+# DuckDB type prefix → BigQuery logical bytes per non-NULL value (None: variable, 2 + length)
+_LOGICAL_BYTES = {
+    "BIGINT": 8, "INTEGER": 8, "SMALLINT": 8, "TINYINT": 8, "HUGEINT": 8, "UBIGINT": 8,
+    "DOUBLE": 8, "FLOAT": 8, "DATE": 8, "TIMESTAMP": 8, "TIME": 8, "BOOLEAN": 1,
+    "DECIMAL": 16, "VARCHAR": None, "BLOB": None,
+}
+
+
+def default_data_dir() -> Optional[Path]:
+    """The nearest `Mock_Data/` directory above this package (None if there is none)."""
+    for parent in Path(__file__).resolve().parents:
+        if (parent / "Mock_Data").is_dir():
+            return parent / "Mock_Data"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def to_duckdb(sql: str, dataset: str) -> str:
+    """GoogleSQL → DuckDB SQL, with every table path reduced to `<dataset>.<table>`."""
+    tree = sqlglot.parse_one(sql, read="bigquery")
+    for table in tree.find_all(exp.Table):
+        if table.args.get("catalog"):
+            table.set("catalog", None)
+        if table.db and table.db.lower() == dataset.lower():
+            table.set("db", exp.to_identifier(dataset))
+    return tree.sql(dialect="duckdb")
+
+
+def _table_key(table, dataset: Optional[str]) -> str:
+    """`table`'s name, prefixed with its schema when that isn't `dataset` (lower-case)."""
+    if table.db and dataset is not None and table.db.lower() != dataset.lower():
+        return f"{table.db}.{table.name}".lower()
+    return table.name.lower()
+
+
+def scanned_columns(
+    sql: str, columns_of: Callable[[str], Optional[set[str]]], dataset: Optional[str] = None
+) -> dict[str, set[str]]:
+    """
+    Base table name → the columns `sql` reads from it (lower-case).
+
+    `columns_of(table)` lists a table's columns (None if unknown). `SELECT *` /
+    `t.*` read every column; COUNT(*) reads none; unqualified names count
+    against every table in scope that has them. With `dataset`, tables in any
+    other dataset are keyed `<dataset>.<table>`.
+    """
+    tree = sqlglot.parse_one(sql, read="bigquery")
+    read: dict[str, set[str]] = {}
+
+    for scope in optimizer_scope.traverse_scope(tree):
+        bases = {alias: src for alias, src in scope.sources.items() if isinstance(src, exp.Table)}
+        keys = {alias: _table_key(t, dataset) for alias, t in bases.items()}
+        known = {alias: columns_of(key) or set() for alias, key in keys.items()}
+        for key in keys.values():
+            read.setdefault(key, set())
+
+        def add(alias: str, column: str | None = None) -> None:
+            cols = known[alias] if column is None else {column.lower()} & known[alias]
+            read[keys[alias]] |= cols
+
+        def add_unqualified(column: str) -> None:
+            for alias in bases:
+                add(alias, column)
+
+        select = scope.expression
+        if isinstance(select, exp.Select):
+            for projection in select.expressions:
+                if isinstance(projection, exp.Star):
+                    for alias in bases:
+                        add(alias)
+                elif isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star):
+                    if projection.table in bases:
+                        add(projection.table)
+            for join in select.args.get("joins") or []:
+                for ident in join.args.get("using") or []:
+                    add_unqualified(ident.name)
+        for column in scope.columns:
+            if isinstance(column.this, exp.Star):
+                continue
+            if column.table:
+                if column.table in bases:
+                    add(column.table, column.name)
+            else:
+                add_unqualified(column.name)
+    return read
+
+
+def _conjuncts(condition) -> list:
+    while isinstance(condition, exp.Paren):
+        condition = condition.this
+    if isinstance(condition, exp.And):
+        return _conjuncts(condition.this) + _conjuncts(condition.expression)
+    return [condition]
+
+
+def _pruning_terms(select, alias: str, column: str, sole: bool) -> list:
+    """
+    WHERE terms of `select` that bound `alias`.`column` by constants – the
+    ones BigQuery prunes partitions on. `sole`: the table is the only source
+    in scope, so the bare column name refers to it.
+    """
+    def is_key(node) -> bool:
+        return (isinstance(node, exp.Column) and node.name.lower() == column.lower()
+                and (node.table == alias or (not node.table and sole)))
+
+    def is_constant(node) -> bool:
+        return not any(isinstance(n, (exp.Column, exp.Query, exp.AggFunc, exp.Rand)) for n in node.walk())
+
+    where = select.args.get("where") if isinstance(select, exp.Select) else None
+    terms = []
+    for term in _conjuncts(where.this) if where else ():
+        if isinstance(term, (exp.GT, exp.GTE, exp.LT, exp.LTE, exp.EQ)):
+            sides = (term.this, term.expression)
+            if any(is_key(s) for s in sides) and any(is_constant(s) for s in sides):
+                terms.append(term)
+        elif isinstance(term, exp.Between) and is_key(term.this):
+            if is_constant(term.args["low"]) and is_constant(term.args["high"]):
+                terms.append(term)
+        elif isinstance(term, exp.In) and is_key(term.this) and term.expressions:
+            if all(is_constant(e) for e in term.expressions):
+                terms.append(term)
+    return terms
+
+
+class DuckDBConnector(Connector):
+    name = "duckdb"
+    polls = False
+
+    def __init__(self, data_dir: str | Path | None = None, dataset: str | None = None) -> None:
+        self.data_dir = Path(data_dir) if data_dir else default_data_dir()
+        self.dataset = dataset or load_catalog().dataset
+        self._con = None
+        self._lock = threading.Lock()
+        self._column_bytes: dict[str, dict[str, int]] = {}
+        self._kept: dict[tuple[str, str], float] = {}
+        self._written: dict[str, float] = {}             # "<schema>.<table>" (lower-case) → last write
+        self._partitioned: dict[str, str] = {}           # table outside the dataset → its PARTITION BY column
+
+    # ─── database ───────────────────────────────────────────
+    def _read_options(self, table: str, csv: Path) -> str:
+        """read_csv options: the full column list if the catalog types every column, else type hints."""
+        known = load_catalog().table(table)
+        if known is None:
+            return ""
+        with csv.open(encoding="utf-8") as fh:
+            header = fh.readline().strip().split(",")
+        types = {}
+        for name in header:
+            column = known.column(name)
+            if column and column.type.upper() in _DUCKDB_TYPES:
+                types[name] = _DUCKDB_TYPES[column.type.upper()]
+        spec = "{%s}" % ", ".join(f"'{c}': '{t}'" for c, t in types.items())
+        if len(types) == len(header):
+            return f", auto_detect = false, columns = {spec}"
+        return f", types = {spec}" if types else ""
+
+    def _load(self):
+        import duckdb
+
+        if self.data_dir is None or not self.data_dir.is_dir():
+            raise FileNotFoundError(
+                f"local data directory not found ({self.data_dir}); set ECHOQL_LOCAL_DATA_DIR"
+            )
+        con = duckdb.connect(":memory:")
+        con.execute(f'CREATE SCHEMA "{self.dataset}"')
+        for csv in sorted(self.data_dir.glob("*.csv")):
+            con.execute(
+                f'CREATE TABLE "{self.dataset}"."{csv.stem}" AS '
+                f"SELECT * FROM read_csv(?, header = true{self._read_options(csv.stem, csv)})",
+                [str(csv)],
+            )
+        return con
+
+    def connection(self):
+        """The shared in-memory database (loaded on first use)."""
+        if self._con is None:
+            with self._lock:
+                if self._con is None:
+                    self._con = self._load()
+        return self._con
+
+    # ─── Connector ──────────────────────────────────────────
+    def execute_arrow(self, sql: str, timeout_s: Optional[float] = None) -> pa.RecordBatchReader:
+        import duckdb
+
+        query = to_duckdb(sql, self.dataset)
+        con = self.connection()
+        with self._lock:
+            cursor = con.cursor()
+        timer = threading.Timer(timeout_s, cursor.interrupt) if timeout_s else None
+        if timer:
+            timer.start()
+        try:
+            result = cursor.execute(query)
+            to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+            reader = to_reader(ARROW_BATCH_ROWS)
+        except duckdb.InterruptException as exc:
+            self._finish(cursor, timer)
+            raise QueryTimeoutError(f"query exceeded {timeout_s:g}s timeout; statement interrupted") from exc
+        except BaseException:
+            self._finish(cursor, timer)
+            raise
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            # DuckDB streams: the statement keeps running while batches are read
+            try:
+                yield from reader
+            except duckdb.InterruptException as exc:
+                raise QueryTimeoutError(f"query exceeded {timeout_s:g}s timeout; statement interrupted") from exc
+            finally:
+                self._finish(cursor, timer)
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+    @staticmethod
+    def _finish(cursor, timer: threading.Timer | None) -> None:
+        if timer:
+            timer.cancel()
+        cursor.close()
+
+    def run_statements(
+        self, statements: Sequence[str], atomic: bool = False, timeout_s: Optional[float] = None
+    ) -> None:
+        import duckdb
+
+        queries, written, partitioned = [], set(), {}
+        for sql in statements:
+            tree = sqlglot.parse_one(sql, read="bigquery")
+            target = tree.find(exp.Table)
+            if target is not None:
+                written.add(f"{target.db or self.dataset}.{target.name}".lower())
+            partition = tree.find(exp.PartitionedByProperty) if isinstance(tree, exp.Create) else None
+            if partition is not None:                 # no partitions in DuckDB: kept for the estimate only
+                if target is not None and isinstance(partition.this, (exp.Identifier, exp.Column)):
+                    partitioned[_table_key(target, self.dataset)] = partition.this.name
+                partition.pop()
+                sql = tree.sql(dialect="bigquery")
+            queries.append(to_duckdb(sql, self.dataset))
+        con = self.connection()
+        with self._lock:
+            cursor = con.cursor()
+        timer = threading.Timer(timeout_s, cursor.interrupt) if timeout_s else None
+        if timer:
+            timer.start()
+        try:
+            if atomic:
+                cursor.execute("BEGIN TRANSACTION")
+            for query in queries:
+                cursor.execute(query)
+            if atomic:
+                cursor.execute("COMMIT")
+        except BaseException as exc:
+            if atomic:
+                try:
+                    cursor.execute("ROLLBACK")
+                except duckdb.Error:
+                    pass
+            if isinstance(exc, duckdb.InterruptException):
+                raise QueryTimeoutError(f"statements exceeded {timeout_s:g}s timeout; interrupted") from exc
+            raise
+        finally:
+            self._finish(cursor, timer)
+            now = time.time()
+            with self._lock:
+                self._written.update(dict.fromkeys(written, now))
+                self._partitioned.update(partitioned)
+                self._column_bytes.clear()          # sizes and partition shares may have changed
+                self._kept.clear()
+
+    def column_bytes(self, table: str) -> Optional[dict[str, int]]:
+        """BigQuery logical bytes per column of a loaded table, `<schema>.<table>` outside the dataset
+        (None if there is no such table)."""
+        key = table.lower()
+        schema, table_name = key.split(".", 1) if "." in key else (self.dataset, key)
+        if key not in self._column_bytes:
+            con = self.connection()
+            with self._lock:
+                cursor = con.cursor()
+            try:
+                described = cursor.execute(
+                    "SELECT column_name, data_type FROM information_schema.columns "
+                    "WHERE lower(table_schema) = lower(?) AND lower(table_name) = ?",
+                    [schema, table_name],
+                ).fetchall()
+                if not described:
+                    return None
+                sizes = []
+                for name, data_type in described:
+                    width = next((w for t, w in _LOGICAL_BYTES.items() if data_type.upper().startswith(t)), 8)
+                    column = f'"{name}"'
+                    sizes.append(
+                        f"count({column}) * {width}" if width is not None
+                        else f"coalesce(sum(strlen(CAST({column} AS VARCHAR))), 0) + 2 * count({column})"
+                    )
+                totals = cursor.execute(
+                    f'SELECT {", ".join(sizes)} FROM "{schema}"."{table_name}"'
+                ).fetchone()
+            finally:
+                cursor.close()
+            self._column_bytes[key] = {name.lower(): int(n) for (name, _), n in zip(described, totals)}
+        return self._column_bytes[key]
+
+    def _kept_share(self, table: str, column: str, bounds: str) -> float:
+        """Share of `table`'s rows in the day partitions that hold a row matching `bounds`."""
+        import duckdb
+
+        if (table, bounds) not in self._kept:
+            day = f"DATE({column})"
+            path = table if "." in table else f"{self.dataset}.{table}"
+            query = to_duckdb(
+                f"SELECT COUNTIF({day} IN (SELECT {day} FROM {path} WHERE {bounds})), COUNT(*) FROM {path}",
+                self.dataset,
+            )
+            try:
+                kept, rows = self._describe(query, [])[0]
+            except duckdb.Error:
+                kept, rows = 0, 0
+            self._kept[(table, bounds)] = kept / rows if rows else 1.0
+        return self._kept[(table, bounds)]
+
+    def _partition_shares(self, sql: str) -> dict[str, float]:
+        """Partitioned table → share of its bytes `sql` reads (the largest over the scopes that read it)."""
+        catalog = load_catalog()
+        shares: dict[str, float] = {}
+        for scope in optimizer_scope.traverse_scope(sqlglot.parse_one(sql, read="bigquery")):
+            bases = {alias: src for alias, src in scope.sources.items() if isinstance(src, exp.Table)}
+            for alias, source in bases.items():
+                key = _table_key(source, self.dataset)
+                if "." in key:
+                    column = self._partitioned.get(key)
+                else:
+                    known = catalog.table(source.name)
+                    column = known.partition_by if known else None
+                if not column:
+                    continue
+                terms = _pruning_terms(scope.expression, alias, column, len(scope.sources) == 1)
+                share = 1.0
+                if terms:
+                    bounds = [t.copy() for t in terms]
+                    for ref in (c for b in bounds for c in b.find_all(exp.Column)):
+                        ref.set("table", None)
+                    bounds_sql = " AND ".join(b.sql(dialect="bigquery") for b in bounds)
+                    share = self._kept_share(key, column, bounds_sql)
+                shares[key] = max(shares.get(key, 0.0), share)
+        return shares
+
+    def dry_run(self, sql: str) -> DryRun:
+        import duckdb
+
+        try:
+            query = to_duckdb(sql, self.dataset)
+            read = scanned_columns(sql, lambda t: set(self.column_bytes(t) or ()), self.dataset)
+        except (sqlglot.ParseError, sqlglot.TokenError) as exc:
+            return DryRun(error=f"Syntax error: {str(exc).splitlines()[0]}")
+        con = self.connection()
+        with self._lock:
+            cursor = con.cursor()
+        try:
+            cursor.execute(f"EXPLAIN {query}")            # binds and plans; nothing runs
+        except duckdb.Error as exc:
+            return DryRun(error=str(exc).strip().splitlines()[0])     # drop candidate lists / caret lines
+        finally:
+            cursor.close()
+        shares = self._partition_shares(sql)
+        total = round(sum(
+            (self.column_bytes(table) or {}).get(column, 0) * shares.get(table, 1.0)
+            for table, columns in read.items() for column in columns
+        ))
+        tables = tuple(sorted(table if "." in table else f"{self.dataset}.{table}" for table in read))
+        return DryRun(bytes_processed=total, tables=tables, estimated=True)
+
+    def table_modified(self, table_id: str) -> Optional[float]:
+        """The CSV's mtime, or the last run_statements() write to the table if later."""
+        parts = table_id.split(".")
+        schema, name = (parts[-2] if len(parts) > 1 else self.dataset), parts[-1]
+        modified = self._written.get(f"{schema}.{name}".lower())
+        csv = self.data_dir / f"{name}.csv" if self.data_dir and schema.lower() == self.dataset.lower() else None
+        if csv and csv.exists():
+            modified = max(modified or 0.0, csv.stat().st_mtime)
+        return modified
+
+    def _describe(self, sql: str, params: list) -> list[tuple]:
+        con = self.connection()
+        with self._lock:
+            cursor = con.cursor()
+        try:
+            return cursor.execute(sql, params).fetchall()
+        finally:
+            cursor.close()
+
+    def list_tables(self, dataset: str) -> list[str]:
+        rows = self._describe(
+            "SELECT table_name FROM information_schema.tables WHERE lower(table_schema) = lower(?) ORDER BY 1",
+            [dataset.split(".")[-1]],
+        )
+        return [name for (name,) in rows]
+
+    def table_metadata(self, table_id: str) -> TableMetadata:
+        """Column types as loaded (catalog types where it has them); the CSV's mtime as last modification."""
+        name = table_id.split(".")[-1]
+        rows = self._describe(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE lower(table_schema) = lower(?) AND lower(table_name) = lower(?) ORDER BY ordinal_position",
+            [self.dataset, name],
+        )
+        if not rows:
+            raise LookupError(f"no table {self.dataset}.{name}")
+        known = load_catalog().table(name)
+        columns = []
+        for column, data_type in rows:
+            typed = known.column(column) if known else None
+            google_type = typed.type if typed else next(
+                (t for prefix, t in _GOOGLESQL_TYPES.items() if data_type.upper().startswith(prefix)), "STRING"
+            )
+            columns.append((column, google_type, ""))
+        return TableMetadata(name=name, columns=tuple(columns), modified=self.table_modified(name))
@@ -0,0 +1,244 @@
+"""
+Result-Size Guardrails
+───────────────────────────────────────────────────────────────────────────────
+Rewrites validated SQL before it runs so an unbounded row-returning query
+never pulls a whole table into the chat:
+
+    preview – no LIMIT on the outermost query     → LIMIT ECHOQL_ROW_LIMIT, plus
+              a separate COUNT(*) over the original query for the true total
+    sample  – approximate answer acceptable       → the preview, reading a
+              TABLESAMPLE SYSTEM (ECHOQL_SAMPLE_PERCENT) of the single base
+              table instead of its first rows
+    full    – explicitly asked for every row      → SQL runs unchanged
+
+SYSTEM sampling picks storage blocks, so a table smaller than a block can
+sample to nothing; the fetcher then falls back to the plain preview.
+
+Aggregate queries (GROUP BY, or aggregate functions in the outer SELECT – or
+an outer SELECT that only filters and projects a CTE / subquery that
+aggregates), queries that already have a LIMIT and statements whose FROM /
+JOINs read no table (SELECT 1, a SELECT of scalar subqueries, UNNEST) are
+never touched; tables that only a scalar or WHERE subquery reads don't count. The mode comes from session.state["result_mode"] when set, otherwise
+from the wording of the question. Rewrites edit the sqlglot AST; each one
+yields a note that the fetcher shows to the user.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ...lazy_imports import lazy_import
+
+sqlglot = lazy_import("sqlglot")
+exp = lazy_import("sqlglot.expressions")
+
+ROW_LIMIT = int(os.getenv("ECHOQL_ROW_LIMIT", "1000"))
+SAMPLE_PERCENT = float(os.getenv("ECHOQL_SAMPLE_PERCENT", "10"))
+
+PREVIEW = "preview"
+SAMPLE = "sample"
+FULL = "full"
+MODES = (PREVIEW, SAMPLE, FULL)
+
+_FULL_RE = re.compile(
+    r"\b(all|every|full|entire|complete|whole)\s+(the\s+)?(rows?|results?|records?|data(set)?|table|list)\b"
+    r"|\b(export|download|dump)\b|\bwithout\s+(a\s+)?limit\b|\bno\s+limit\b",
+    re.I,
+)
+_SAMPLE_RE = re.compile(r"\b(approximate(ly)?|approx|rough(ly)?|estimated?|sample[ds]?|random)\b", re.I)
+
+
+@dataclass
+class GuardedQuery:
+    """What the fetcher runs: `sql` (possibly rewritten) and, for previews, `count_sql`."""
+
+    original: str
+    sql: str
+    mode: str
+    count_sql: Optional[str] = None
+    sampled: bool = False
+    notes: list[str] = field(default_factory=list)
+
+    @property
+    def rewritten(self) -> bool:
+        return self.sql != self.original
+
+
+def result_mode(question: str, requested: str | None = None) -> str:
+    """`requested` if it is a known mode, else inferred from the question (default: preview)."""
+    if requested and requested.strip().lower() in MODES:
+        return requested.strip().lower()
+    if _FULL_RE.search(question or ""):
+        return FULL
+    if _SAMPLE_RE.search(question or ""):
+        return SAMPLE
+    return PREVIEW
+
+
+# ─── AST analysis ───────────────────────────────────────────────
+def _is_aggregate(select: exp.Select) -> bool:
+    if select.args.get("group"):
+        return True
+    for projection in select.expressions:
+        for agg in projection.find_all(exp.AggFunc):
+            # nearest enclosing window / SELECT: a window function or a scalar subquery isn't aggregation
+            if agg.find_ancestor(exp.Window, exp.Select) is select:
+                return True
+    return False
+
+
+def _branches(tree: exp.Expression) -> list[exp.Select]:
+    if isinstance(tree, exp.Union):
+        return _branches(tree.left) + _branches(tree.right)
+    if isinstance(tree, exp.Subquery):
+        return _branches(tree.this)
+    return [tree] if isinstance(tree, exp.Select) else []
+
+
+def _row_source(select: exp.Select, ctes: dict[str, exp.Expression]) -> exp.Expression | None:
+    """The query `select` only filters and projects rows of: a subquery or CTE, alone in its FROM."""
+    source = select.args.get("from_")
+    if source is None or select.args.get("joins") or select.args.get("laterals"):
+        return None
+    source = source.this
+    if isinstance(source, exp.Subquery):
+        return source.this
+    if isinstance(source, exp.Table) and not source.db:
+        return ctes.get(source.name.lower())
+    return None
+
+
+def _grouped(query: exp.Expression, ctes: dict[str, exp.Expression], seen: frozenset = frozenset()) -> bool:
+    """
+    Every branch of `query` returns one row per group: it aggregates, or passes
+    rows through from a subquery / CTE that aggregates or has a LIMIT.
+    """
+    if id(query) in seen:                             # recursive CTE
+        return False
+    seen = seen | {id(query)}
+    branches = _branches(query)
+    if not branches:
+        return False
+    for select in branches:
+        if _is_aggregate(select):
+            continue
+        source = _row_source(select, ctes)
+        if source is None or not (source.args.get("limit") or _grouped(source, ctes, seen)):
+            return False
+    return True
+
+
+def is_unbounded(tree: exp.Expression) -> bool:
+    """
+    True for a row-returning query without a LIMIT at its outermost level that
+    doesn't aggregate – `WITH a AS (… GROUP BY …) SELECT * FROM a` aggregates.
+    """
+    if not isinstance(tree, (exp.Select, exp.Union)) or tree.args.get("limit"):
+        return False
+    if not _branches(tree):
+        return False
+    ctes = {cte.alias_or_name.lower(): cte.this for cte in tree.find_all(exp.CTE)}
+    if _grouped(tree, ctes):
+        return False
+    return bool(_base_tables(tree))                   # SELECT 1, SELECT (SELECT COUNT(*) …) … are bounded
+
+
+def _base_tables(tree: exp.Expression) -> list[exp.Table]:
+    ctes = {cte.alias_or_name.lower(): cte.this for cte in tree.find_all(exp.CTE)}
+    return _row_tables(tree, ctes, frozenset())
+
+
+def _row_tables(query: exp.Expression, ctes: dict[str, exp.Expression], seen: frozenset) -> list[exp.Table]:
+    """
+    The base tables `query` reads its rows from: the FROM / JOIN tables of its
+    branches, through subqueries and CTEs in those positions.
+    """
+    tables = []
+    for select in _branches(query):
+        for source in [select.args.get("from_"), *(select.args.get("joins") or ())]:
+            source = source.this if source is not None else None
+            if isinstance(source, exp.Subquery):
+                tables += _row_tables(source.this, ctes, seen)
+            elif isinstance(source, exp.Table) and source.name:
+                cte = None if source.db else ctes.get(source.name.lower())
+                if cte is None:
+                    tables.append(source)
+                elif id(cte) not in seen:                 # recursive CTE
+                    tables += _row_tables(cte, ctes, seen | {id(cte)})
+    return tables
+
+
+# ─── rewrites ───────────────────────────────────────────────────
+def _with_limit(tree: exp.Expression, limit: int) -> exp.Expression:
+    if isinstance(tree, exp.Select):
+        return tree.copy().limit(limit)
+    return exp.select("*").from_(tree.copy().subquery("_rows")).limit(limit)
+
+
+def _count_of(tree: exp.Expression) -> exp.Expression:
+    return exp.select(exp.alias_(exp.Count(this=exp.Star()), "total_rows")).from_(
+        tree.copy().subquery("_rows")
+    )
+
+
+def _sampled(tree: exp.Expression, percent: float) -> tuple[Optional[exp.Expression], str]:
+    tables = _base_tables(tree)
+    if len(tables) != 1:
+        return None, f"reads {len(tables)} tables (a sampled join is not representative)"
+    if tables[0].args.get("sample"):
+        return None, "already sampled"
+    sampled = tree.copy()
+    target = _base_tables(sampled)[0]
+    target.set("sample", exp.TableSample(method=exp.var("SYSTEM"), percent=exp.Literal.number(f"{percent:g}")))
+    return sampled, ""
+
+
+def _table_label(table: exp.Table) -> str:
+    return ".".join(p for p in (table.db, table.name) if p)
+
+
+def guard(
+    sql: str,
+    mode: str = PREVIEW,
+    row_limit: int = ROW_LIMIT,
+    sample_percent: float = SAMPLE_PERCENT,
+) -> GuardedQuery:
+    """Apply the guardrails for `mode` to `sql`; SQL that doesn't parse or needs no guard is returned as is."""
+    plan = GuardedQuery(original=sql, sql=sql, mode=mode)
+    if mode == FULL:
+        return plan
+    try:
+        tree = sqlglot.parse_one(sql, read="bigquery")
+    except (sqlglot.ParseError, sqlglot.TokenError):
+        return plan
+    if tree is None or not is_unbounded(tree):
+        return plan
+
+    plan.count_sql = _count_of(tree).sql(dialect="bigquery")
+    if mode == SAMPLE:
+        sampled, why_not = _sampled(tree, sample_percent)
+        if sampled is not None:
+            tree, plan.sampled = sampled, True
+            label = _table_label(_base_tables(sampled)[0])
+            plan.notes.append(
+                f"Approximate answer: rows come from a {sample_percent:g}% `TABLESAMPLE SYSTEM` of `{label}`."
+            )
+        else:
+            plan.notes.append(f"Sampling skipped: the query {why_not}.")
+    plan.sql = _with_limit(tree, row_limit).sql(dialect="bigquery")
+    plan.notes.append(f"Preview only: added `LIMIT {row_limit}` to the query.")
+    return plan
+
+
+def describe_total(plan: GuardedQuery, fetched: int, total: Optional[int]) -> Optional[str]:
+    """The note that puts a preview in context once the COUNT(*) is known."""
+    if plan.count_sql is None:
+        return None
+    if total is None:
+        return "Total row count unavailable; ask for all rows to fetch the complete result."
+    if total <= fetched and plan.mode != SAMPLE:
+        return f"That is the complete result ({total:,} rows)."
+    return f"The full query returns **{total:,} rows**; ask for all rows to fetch the complete result."
@@ -0,0 +1,94 @@
+"""
+Result Artifacts
+───────────────────────────────────────────────────────────────────────────────
+The fetched rows as a downloadable file, saved through the ADK artifact
+service. ArtifactWriter is fed the same record batches as the streaming
+summary and encodes each one as it arrives – as a CSV chunk compressed into
+its own gzip member / zstd frame (concatenated members are a valid .gz /
+.zst file), or as a Parquet row group (zstd) – so the only extra memory is
+the compressed file plus one batch of CSV text; no DataFrame or CSV text of
+the whole result is ever built. Compressing per chunk also lets us pick the
+level (Arrow's compressed streams are fixed at gzip -9).
+
+    ECHOQL_RESULT_ARTIFACT = csv.gz (default) | csv.zst | parquet | off
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from google.genai import types
+
+from ...lazy_imports import lazy_import
+
+pa = lazy_import("pyarrow")
+pa_csv = lazy_import("pyarrow.csv")
+pq = lazy_import("pyarrow.parquet")
+
+# format → (CSV chunk codec + level | None for Parquet, MIME type, description)
+FORMATS: dict[str, tuple[Optional[tuple[str, int]], str, str]] = {
+    "csv.gz": (("gzip", 6), "application/gzip", "gzip CSV"),
+    "csv.zst": (("zstd", 3), "application/zstd", "zstd CSV"),
+    "parquet": (None, "application/vnd.apache.parquet", "Parquet"),
+}
+ARTIFACT_FORMAT = os.getenv("ECHOQL_RESULT_ARTIFACT", "csv.gz").strip().lower()
+PARQUET_COMPRESSION = "zstd"
+
+
+class ArtifactWriter:
+    """Encodes record batches into an in-memory compressed file, one batch at a time."""
+
+    def __init__(self, fmt: str = ARTIFACT_FORMAT) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown result artifact format {fmt!r}; expected one of {sorted(FORMATS)}")
+        self.format = fmt
+        codec, self.mime_type, self.description = FORMATS[fmt]
+        self.codec = pa.Codec(codec[0], compression_level=codec[1]) if codec else None
+        self.rows = 0
+        self._chunks: list[pa.Buffer] = []           # compressed CSV chunks
+        self._parquet: Optional[pq.ParquetWriter] = None
+        self._sink = pa.BufferOutputStream()
+        self._data: Optional[bytes] = None
+
+    def _write_csv(self, batch: pa.RecordBatch) -> None:
+        chunk = pa.BufferOutputStream()
+        pa_csv.write_csv(batch, chunk, pa_csv.WriteOptions(include_header=not self._chunks))
+        self._chunks.append(self.codec.compress(chunk.getvalue()))
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        if self.codec is not None:
+            self._write_csv(batch)
+        else:
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self._sink, batch.schema, compression=PARQUET_COMPRESSION)
+            self._parquet.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def finish(self, schema: pa.Schema) -> bytes:
+        """Close the file (a header-only file for an empty result) and return its bytes."""
+        if self._data is None:
+            if self.codec is not None:
+                if not self._chunks:
+                    self._write_csv(pa.RecordBatch.from_pylist([], schema=schema))
+                self._data = b"".join(self._chunks)
+                self._chunks = []
+            else:
+                if self._parquet is None:
+                    self._parquet = pq.ParquetWriter(self._sink, schema, compression=PARQUET_COMPRESSION)
+                self._parquet.close()
+                self._data = self._sink.getvalue().to_pybytes()
+        return self._data
+
+    def filename(self, stem: str) -> str:
+        return f"{stem}.{self.format}"
+
+    def part(self, schema: pa.Schema) -> types.Part:
+        return types.Part.from_bytes(data=self.finish(schema), mime_type=self.mime_type)
+
+
+def new_artifact_writer() -> Optional[ArtifactWriter]:
+    """A writer in the configured format, or None when artifacts are off."""
+    if ARTIFACT_FORMAT in ("", "0", "off", "none"):
+        return None
+    return ArtifactWriter(ARTIFACT_FORMAT)
@@ -0,0 +1,424 @@
+"""
+Result Cache
+───────────────────────────────────────────────────────────────────────────────
+Two-tier cache for query results (Arrow tables), keyed on *normalised* SQL so that the same
+question phrased with different whitespace, keyword casing or ```sql fences```
+hits the same entry.
+
+• Memory tier – LRU bounded by the total Arrow byte size of the cached tables.
+• Disk tier   – one Parquet file per entry plus a small JSON sidecar.
+
+An entry is served only while
+      – it is younger than the TTL, and
+      – none of the tables it reads have been modified since it was written
+        (compared against the table's `last_modified` timestamp).
+
+Hit / miss / eviction counters are exposed through `ResultCache.stats()`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from ...lazy_imports import lazy_import
+
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+
+# ─── SQL normalisation ──────────────────────────────────────
+_FENCE_RE = re.compile(r"^\s*```(?:sql)?\s*|\s*```\s*$", re.I)
+
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<comment>--[^\n]*|\#[^\n]*|/\*.*?\*/)
+    | (?P<squote>'(?:[^'\\]|\\.)*')
+    | (?P<dquote>"(?:[^"\\]|\\.)*")
+    | (?P<quoted_ident>`[^`]*`)
+    | (?P<number>\d+\.\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|\d+(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<op><>|!=|<=|>=|\|\||<<|>>|\S)
+    """,
+    re.X | re.S,
+)
+
+
+def _tokens(sql: str) -> list[tuple[str, str]]:
+    sql = _FENCE_RE.sub("", sql.strip())
+    return [
+        (m.lastgroup, m.group())
+        for m in _TOKEN_RE.finditer(sql)
+        if m.lastgroup != "comment"
+    ]
+
+
+def _canonical_number(tok: str) -> str:
+    """Strip redundant zeros without changing the literal's type."""
+    if "e" in tok.lower():
+        return tok.lower()
+    if "." in tok:
+        whole, frac = tok.split(".", 1)
+        return f"{whole.lstrip('0') or '0'}.{frac.rstrip('0') or '0'}"
+    return tok.lstrip("0") or "0"
+
+
+def _canonical_string(tok: str) -> str:
+    """Render "..." and '...' string literals identically."""
+    body = tok[1:-1]
+    if tok[0] == '"':
+        body = body.replace('\\"', '"').replace("'", "\\'")
+    return f"'{body}'"
+
+
+# words that end a FROM item rather than alias it
+_CLAUSES = {
+    "where", "group", "order", "having", "limit", "qualify", "window", "join", "inner", "left",
+    "right", "full", "cross", "on", "using", "union", "intersect", "except", "tablesample", "for",
+}
+
+
+def _table_paths(toks: list[tuple[str, str]]) -> list[tuple[int, int]]:
+    """
+    Token ranges [start, end) of the table paths after FROM / JOIN, and after
+    a comma that continues a FROM list (`FROM a x, b y`).
+    """
+    paths: list[tuple[int, int]] = []
+    i = 0
+    while i < len(toks):
+        kind, tok = toks[i]
+        if kind != "word" or tok.lower() not in ("from", "join"):
+            i += 1
+            continue
+        j = i + 1
+        while True:
+            start = j
+            while j < len(toks) and toks[j][0] in ("word", "quoted_ident"):
+                j += 1
+                if j < len(toks) and toks[j][1] == ".":
+                    j += 1
+                else:
+                    break
+            if j == start:
+                break
+            paths.append((start, j))
+            if j < len(toks) and toks[j][0] == "word" and toks[j][1].lower() == "as":
+                j += 1
+            if j < len(toks) and toks[j][0] in ("word", "quoted_ident") and toks[j][1].lower() not in _CLAUSES:
+                j += 1
+            if j < len(toks) and toks[j][1] == ",":
+                j += 1
+                continue
+            break
+        i = max(j, i + 1)
+    return paths
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Canonical form of a query used as the cache key.
+
+    Keywords and unquoted identifiers are case-folded and whitespace/comments
+    are dropped, but string literals, `backtick` identifiers and table paths
+    are kept verbatim – `WHERE name = 'Bob'` and `WHERE name = 'bob'` stay
+    distinct, and so do `Mock_KPIs.Users` and `Mock_KPIs.users` (BigQuery
+    dataset and table names are case-sensitive).
+    """
+    toks = _tokens(sql)
+    verbatim = {k for start, end in _table_paths(toks) for k in range(start, end)}
+    out: list[str] = []
+    for i, (kind, tok) in enumerate(toks):
+        if kind == "word":
+            out.append(tok if i in verbatim else tok.lower())
+        elif kind == "number":
+            out.append(_canonical_number(tok))
+        elif kind in ("squote", "dquote"):
+            out.append(_canonical_string(tok))
+        else:
+            out.append(tok)
+    while out and out[-1] == ";":
+        out.pop()
+    return " ".join(out)
+
+
+def referenced_tables(sql: str) -> set[str]:
+    """
+    Dataset-qualified tables read by `sql` (e.g. {"Mock_KPIs.mock_users"}).
+
+    Unqualified names after FROM / JOIN are CTE references and are ignored.
+    """
+    toks = _tokens(sql)
+    tables: set[str] = set()
+    for start, end in _table_paths(toks):
+        parts = [p for kind, tok in toks[start:end] if kind != "op" for p in tok.strip("`").split(".") if p]
+        if len(parts) > 1:
+            tables.add(".".join(parts))
+    return tables
+
+
+def cache_key(sql: str) -> str:
+    return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()
+
+
+# ─── Cache ──────────────────────────────────────────────────
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    invalidated: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+    puts: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    key: str
+    sql: str
+    created_at: float
+    tables: dict[str, Optional[float]] = field(default_factory=dict)
+    nbytes: int = 0
+    table: Optional[pa.Table] = None
+
+
+class ResultCache:
+    """
+    Thread-safe result cache.
+
+    Args:
+        ttl_s:            Entries older than this are never served.
+        max_memory_bytes: Byte budget of the in-memory LRU tier.
+        max_disk_bytes:   Byte budget of the Parquet tier (0 disables it).
+        cache_dir:        Where Parquet files and sidecars are written.
+        table_modified:   Callable returning a table's `last_modified` as an
+                          epoch timestamp (or None when unknown).
+        metadata_ttl_s:   How long a `table_modified` answer is trusted before
+                          asking again – keeps hits free of metadata calls.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_s: float = 900.0,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        max_disk_bytes: int = 2 * 1024 * 1024 * 1024,
+        cache_dir: str | os.PathLike | None = None,
+        table_modified: Callable[[str], Optional[float]] | None = None,
+        metadata_ttl_s: float = 30.0,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.table_modified = table_modified
+        self.metadata_ttl_s = metadata_ttl_s
+
+        self._lock = threading.RLock()
+        self._memory: OrderedDict[str, _Entry] = OrderedDict()
+        self._memory_bytes = 0
+        self._modified_seen: dict[str, tuple[float, Optional[float]]] = {}
+        self._stats = CacheStats()
+
+    # ── public API ───────────────────────────────────────────
+    def get(self, sql: str) -> Optional[pa.Table]:
+        key = cache_key(sql)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_fresh(entry):
+                    self._memory.move_to_end(key)
+                    self._stats.memory_hits += 1
+                    return entry.table
+                self._drop(key)
+
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                if self._is_fresh(entry):
+                    self._stats.disk_hits += 1
+                    self._remember(entry)
+                    return entry.table
+                self._drop(key)
+
+            self._stats.misses += 1
+            return None
+
+    def put(self, sql: str, table: pa.Table) -> None:
+        entry = _Entry(
+            key=cache_key(sql),
+            sql=sql,
+            created_at=time.time(),
+            tables={t: self._modified(t) for t in referenced_tables(sql)},
+            nbytes=table.nbytes,
+            table=table,
+        )
+        with self._lock:
+            self._stats.puts += 1
+            self._remember(entry)
+            self._write_to_disk(entry)
+
+    def invalidate_table(self, table: str) -> int:
+        """Drop every entry that reads `table`; returns the number dropped."""
+        with self._lock:
+            self._modified_seen.pop(table, None)
+            keys = [k for k, e in self._memory.items() if table in e.tables]
+            keys += [
+                meta["key"] for meta in self._disk_sidecars()
+                if table in meta.get("tables", {})
+            ]
+            for key in set(keys):
+                self._drop(key)
+                self._stats.invalidated += 1
+            return len(set(keys))
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._memory):
+                self._drop(key)
+            for meta in self._disk_sidecars():
+                self._drop(meta["key"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = asdict(self._stats)
+            out["hit_rate"] = round(self._stats.hit_rate, 4)
+            out["memory_entries"] = len(self._memory)
+            out["memory_bytes"] = self._memory_bytes
+            return out
+
+    # ── freshness ────────────────────────────────────────────
+    def _modified(self, table: str) -> Optional[float]:
+        if self.table_modified is None:
+            return None
+        now = time.monotonic()
+        seen = self._modified_seen.get(table)
+        if seen and now - seen[0] < self.metadata_ttl_s:
+            return seen[1]
+        try:
+            value = self.table_modified(table)
+        except Exception:                     # metadata lookups never break a query
+            value = None
+        self._modified_seen[table] = (now, value)
+        return value
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        if time.time() - entry.created_at > self.ttl_s:
+            self._stats.expired += 1
+            return False
+        for table, modified_then in entry.tables.items():
+            modified_now = self._modified(table)
+            if modified_then is not None and modified_now is not None \
+                    and modified_now > modified_then:
+                self._stats.invalidated += 1
+                return False
+        return True
+
+    # ── memory tier ──────────────────────────────────────────
+    def _remember(self, entry: _Entry) -> None:
+        if entry.nbytes > self.max_memory_bytes:
+            return                            # too big for RAM; disk only
+        if entry.key in self._memory:
+            self._memory_bytes -= self._memory.pop(entry.key).nbytes
+        self._memory[entry.key] = entry
+        self._memory_bytes += entry.nbytes
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self._stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.nbytes
+        if self.cache_dir is not None:
+            for path in (self._parquet_path(key), self._meta_path(key)):
+                path.unlink(missing_ok=True)
+
+    # ── disk tier ────────────────────────────────────────────
+    def _parquet_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.parquet"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _disk_sidecars(self) -> list[dict]:
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return []
+        metas = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                metas.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return metas
+
+    def _write_to_disk(self, entry: _Entry) -> None:
+        if self.cache_dir is None or self.max_disk_bytes <= 0:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._parquet_path(entry.key).with_suffix(".parquet.tmp")
+            pq.write_table(entry.table, tmp)
+            os.replace(tmp, self._parquet_path(entry.key))
+            meta = {
+                "key": entry.key,
+                "sql": entry.sql,
+                "created_at": entry.created_at,
+                "tables": entry.tables,
+                "file_bytes": self._parquet_path(entry.key).stat().st_size,
+            }
+            self._meta_path(entry.key).write_text(json.dumps(meta))
+        except Exception:                     # disk tier is best-effort
+            self._parquet_path(entry.key).with_suffix(".parquet.tmp").unlink(
+                missing_ok=True
+            )
+            return
+        self._enforce_disk_budget()
+
+    def _load_from_disk(self, key: str) -> Optional[_Entry]:
+        if self.cache_dir is None:
+            return None
+        meta_path, parquet_path = self._meta_path(key), self._parquet_path(key)
+        if not meta_path.exists() or not parquet_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+            table = pq.read_table(parquet_path)
+        except Exception:
+            self._drop(key)
+            return None
+        return _Entry(
+            key=key,
+            sql=meta["sql"],
+            created_at=meta["created_at"],
+            tables=meta.get("tables", {}),
+            nbytes=table.nbytes,
+            table=table,
+        )
+
+    def _enforce_disk_budget(self) -> None:
+        metas = sorted(self._disk_sidecars(), key=lambda m: m["created_at"])
+        total = sum(m.get("file_bytes", 0) for m in metas)
+        for meta in metas:
+            if total <= self.max_disk_bytes:
+                break
+            total -= meta.get("file_bytes", 0)
+            path = self._parquet_path(meta["key"])
+            path.unlink(missing_ok=True)
+            self._meta_path(meta["key"]).unlink(missing_ok=True)
+            self._stats.disk_evictions += 1
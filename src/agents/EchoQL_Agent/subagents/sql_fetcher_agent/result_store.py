@@ -0,0 +1,257 @@
+"""
+Result Store
+───────────────────────────────────────────────────────────────────────────────
+Query results live here, out of band, under opaque handles; session.state
+only carries a small JSON reference (handle, row count, schema), so session
+saves never serialise a table and long sessions don't grow with their
+results.
+
+• Memory tier – Arrow tables, LRU under one process-wide byte budget.
+• Spill tier  – tables evicted from memory (or too big for it) are written
+                as uncompressed Arrow IPC files and read back memory-mapped,
+                i.e. without copying; oldest files go first once the disk
+                budget is exceeded. What to evict is decided under the store
+                lock, but files are written outside it: until its file is in
+                place a spilling table is still served from memory, so one
+                large spill never stalls other sessions' reads.
+
+A handle whose data has been evicted from both tiers no longer resolves
+(`get` → None, `QueryResult.table` → ResultExpiredError).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from ...lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+pa = lazy_import("pyarrow")
+
+
+class ResultExpiredError(LookupError):
+    """The handle's result has been evicted from the store."""
+
+
+@dataclass
+class StoreStats:
+    puts: int = 0
+    memory_hits: int = 0
+    spill_hits: int = 0
+    misses: int = 0
+    spills: int = 0
+    spill_evictions: int = 0
+
+
+def result_ref(handle: str, table: pa.Table) -> dict[str, Any]:
+    """What session.state keeps for a stored result – JSON-serialisable metadata only."""
+    return {
+        "handle": handle,
+        "rows": table.num_rows,
+        "nbytes": table.nbytes,
+        "schema": [{"name": f.name, "type": str(f.type)} for f in table.schema],
+    }
+
+
+class ResultStore:
+    """
+    Thread-safe handle → Arrow table store.
+
+    Args:
+        max_memory_bytes: Byte budget of the in-memory LRU tier.
+        max_disk_bytes:   Byte budget of the spill tier (0 disables it – evicted
+                          results are then gone).
+        spill_dir:        Where Arrow IPC spill files are written.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_memory_bytes: int = 512 * 1024 * 1024,
+        max_disk_bytes: int = 4 * 1024 * 1024 * 1024,
+        spill_dir: str | os.PathLike | None = None,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+
+        self._lock = threading.RLock()
+        self._memory: OrderedDict[str, pa.Table] = OrderedDict()
+        self._memory_bytes = 0
+        self._spilling: dict[str, pa.Table] = {}      # evicted, file not written yet
+        self._stats = StoreStats()
+
+    # ── public API ───────────────────────────────────────────
+    def put(self, table: pa.Table) -> str:
+        """Store `table` (not copied) and return its handle."""
+        handle = f"res_{uuid.uuid4().hex}"
+        with self._lock:
+            self._stats.puts += 1
+            if table.nbytes > self.max_memory_bytes:
+                evicted = [(handle, table)]   # too big for RAM; disk only
+            else:
+                evicted = self._remember(handle, table)
+            if self._spill_enabled():
+                self._spilling.update(evicted)
+        if self._spill_enabled():
+            for evicted_handle, evicted_table in evicted:
+                self._spill(evicted_handle, evicted_table)
+            if evicted:
+                self._enforce_disk_budget()
+        return handle
+
+    def get(self, handle: str) -> Optional[pa.Table]:
+        """The table behind `handle` – the stored object itself, or a memory-mapped spill file."""
+        with self._lock:
+            table = self._memory.get(handle)
+            if table is not None:
+                self._memory.move_to_end(handle)
+                self._stats.memory_hits += 1
+                return table
+            table = self._spilling.get(handle)
+            if table is not None:
+                self._stats.memory_hits += 1
+                return table
+            table = self._read_spill(handle)
+            if table is not None:
+                self._stats.spill_hits += 1
+                return table
+            self._stats.misses += 1
+            return None
+
+    def discard(self, handle: str) -> None:
+        with self._lock:
+            table = self._memory.pop(handle, None)
+            if table is not None:
+                self._memory_bytes -= table.nbytes
+            self._spilling.pop(handle, None)      # an in-flight spill removes its file when done
+            if self.spill_dir is not None:
+                self._spill_path(handle).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = asdict(self._stats)
+            out["memory_entries"] = len(self._memory)
+            out["memory_bytes"] = self._memory_bytes
+            return out
+
+    # ── memory tier ──────────────────────────────────────────
+    def _remember(self, handle: str, table: pa.Table) -> list[tuple[str, pa.Table]]:
+        """Add `table` to the LRU; returns the entries evicted to make room (caller holds the lock)."""
+        self._memory[handle] = table
+        self._memory_bytes += table.nbytes
+        evicted = []
+        while self._memory_bytes > self.max_memory_bytes:
+            evicted_handle, evicted_table = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_table.nbytes
+            evicted.append((evicted_handle, evicted_table))
+        return evicted
+
+    # ── spill tier ───────────────────────────────────────────
+    def _spill_path(self, handle: str) -> Path:
+        return self.spill_dir / f"{handle}.arrow"
+
+    def _spill_enabled(self) -> bool:
+        return self.spill_dir is not None and self.max_disk_bytes > 0
+
+    def _spill(self, handle: str, table: pa.Table) -> None:
+        """Write `table`'s spill file – without the lock; `get` serves it from `_spilling` meanwhile."""
+        path = self._spill_path(handle)
+        tmp = path.with_suffix(".arrow.tmp")
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+            written = True
+        except Exception:                     # spill tier is best-effort
+            tmp.unlink(missing_ok=True)
+            written = False
+        with self._lock:
+            if self._spilling.pop(handle, None) is None:
+                path.unlink(missing_ok=True)  # discarded while it was being written
+            elif written:
+                self._stats.spills += 1
+
+    def _read_spill(self, handle: str) -> Optional[pa.Table]:
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(handle)
+        if not path.exists():
+            return None
+        try:
+            return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None
+
+    def _enforce_disk_budget(self) -> None:
+        files = []
+        for path in self.spill_dir.glob("*.arrow"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        evictions = 0
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)      # mapped readers keep their pages until closed
+            total -= size
+            evictions += 1
+        with self._lock:
+            self._stats.spill_evictions += evictions
+
+
+class QueryResult:
+    """
+    A stored result, read lazily by handle from its session.state reference.
+
+    Row count and schema come from the reference; the table is only looked
+    up (zero-copy) when `table`, `batches()` or `to_pandas()` is used.
+    """
+
+    def __init__(self, ref: dict[str, Any], store: ResultStore) -> None:
+        self.ref = ref
+        self._store = store
+        self._df: Optional[pd.DataFrame] = None
+
+    @property
+    def handle(self) -> str:
+        return self.ref["handle"]
+
+    @property
+    def num_rows(self) -> int:
+        return self.ref["rows"]
+
+    @property
+    def column_names(self) -> list[str]:
+        return [c["name"] for c in self.ref["schema"]]
+
+    @property
+    def table(self) -> pa.Table:
+        table = self._store.get(self.handle)
+        if table is None:
+            raise ResultExpiredError(f"result {self.handle} is no longer in the result store")
+        return table
+
+    def batches(self, max_rows: Optional[int] = None) -> Iterator[pa.RecordBatch]:
+        """The rows as record batches (slices of the stored table – no copy)."""
+        return iter(self.table.to_batches(max_chunksize=max_rows))
+
+    def to_pandas(self) -> pd.DataFrame:
+        """The rows as a DataFrame – converted on first call, then reused."""
+        if self._df is None:
+            self._df = self.table.to_pandas()
+        return self._df
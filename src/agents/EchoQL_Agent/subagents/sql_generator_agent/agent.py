@@ -10,15 +10,19 @@ Workflow Context:
 - Returns only raw SQL (no markdown, comments, or prose).
 
 Inputs:
-- `availability_result`: JSON string from the Data Availability Checker, containing:
-    - `user_query`: The original user question.
-    - `raw_schema_text`: Schema context for the query.
+- `availability_result`: verdict from the Data Availability Checker (dict, or its JSON text), containing:
     - `available`: Boolean indicating if the query can be answered.
+    - `tables_needed`: Tables the answer needs; their schema is rendered locally from the catalog
+      (when empty, the table retriever's top-k tables for the question are used instead).
+    - `reason`: Short explanation (shown to the user when the query cannot be answered).
+- The user question is taken from the invocation's user message.
 
 Outputs:
 - Emits an event with the generated SQL query, or an error message if generation is not possible.
 
-This agent is designed to be robust, handling missing or malformed input gracefully, and always referencing the latest BigQuery SQL documentation for accuracy.
+This agent is designed to be robust, handling missing or malformed input gracefully. GoogleSQL documentation
+comes from the vendored reference snapshot (see reference.py): only the sections relevant to the question are
+injected, and nothing is fetched over the network on the request path.
 """
 
 from google.adk.agents import BaseAgent, LlmAgent
@@ -26,19 +30,17 @@ from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events.event import Event
 from google.genai import types
 
-import json, os, re, requests, bs4
-from pathlib import Path
-from dotenv import load_dotenv
+import json, re
 
-# Config
-current_path = Path(__file__).resolve()
-for parent in current_path.parents:
-    env_file = parent / ".env"
-    if env_file.exists():
-        load_dotenv(env_file)
-        break
+from ...settings import get_settings
+from ...catalog import load_catalog
+from ...retrievers.table_retriever import get_retriever
+from ...tracing import annotate, get_tracer
+from .reference import reference_for, start_background_refresh
 
-GEMINI_MODEL = os.getenv("FAST_LLM_MODEL", "gemini-1.5-flash")
+GEMINI_MODEL = get_settings().fast_llm_model
+
+start_background_refresh()  # no-op unless ECHOQL_REFERENCE_REFRESH=1
 
 
 # Utility: Event factory
@@ -46,19 +48,22 @@ def _make_event(author: str, text: str) -> Event:
     return Event(author=author, content=types.Content(parts=[types.Part(text=text)]))
 
 
-# Helper: scrape GoogleSQL reference page
-def fetch_bigquery_reference() -> str:
-    """Return the first ~4 kB of the BigQuery Standard SQL syntax page as plain text."""
-    url = (
-        "https://cloud.google.com/bigquery/docs/reference/standard-sql/query-syntax"
-    )
-    try:
-        html = requests.get(url, timeout=15).text
-        soup = bs4.BeautifulSoup(html, "html.parser")
-        text = re.sub(r"\s+", " ", (soup.find("main") or soup).get_text(" ", strip=True))
-        return text[:4000]  # keep prompt size reasonable
-    except Exception as exc:  # never crash the agent run
-        return f"[reference-fetch-failed → {exc}]"
+def _user_question(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if content and content.parts:
+        return " ".join(p.text for p in content.parts if p.text).strip()
+    return ctx.session.state.get("user_request", "")
+
+
+def _parse_availability(raw) -> dict:
+    """The checker's verdict as a dict (accepts the dict itself or its JSON text)."""
+    if isinstance(raw, dict):
+        return raw
+    raw = re.sub(r'^\s*```(?:json)?', "", str(raw or "").strip())
+    raw = re.sub(r'\s*```$', "", raw).strip()
+    if not raw:
+        raise ValueError("availability_result missing.")
+    return json.loads(raw)
 
 
 # LLM agent that writes state["sql_query"]
@@ -78,6 +83,9 @@ _sql_llm = LlmAgent(
     - Use clear, self-documenting aliases (e.g. SELECT COUNT(*) as num_users FROM Mock_KPIs.mock_users 
         instead of SELECT COUNT(*) FROM mock_users ).
     - Obey GoogleSQL (Standard SQL) grammar exactly.
+    - Where the schema lists a column's range or values, filter with literals that exist
+        (exact spelling and case, dates inside the range).
+    - Filter dates on PARTITION columns directly (session_date >= '2024-06-01'), not on functions of them.
     - **Return raw SQL only** – no markdown, no comments, no prose.
     """,
     output_key="sql_query"
@@ -88,37 +96,37 @@ _sql_llm = LlmAgent(
 class SqlGeneratorWrapper(BaseAgent):
     name: str = "SqlGeneratorAgent"
     description: str = (
-        "Parses availability_result, fetches GoogleSQL docs, then calls the SQL LLM."
+        "Parses availability_result, selects GoogleSQL docs, then calls the SQL LLM."
     )
 
     async def _run_async_impl(self, ctx: InvocationContext):
         st = ctx.session.state
 
-        # 1) Parse availability_result emitted by the checker agent
-        raw = st.get("availability_result", "").strip()
-        raw = re.sub(r'^\s*```(?:json)?', "", raw)
-        raw = re.sub(r'\s*```$', "", raw).strip()
-
-        if not raw:
-            yield _make_event(self.name, "❌ availability_result missing.")
-            return
-
+        # 1) Read the verdict emitted by the checker agent
         try:
-            avail = json.loads(raw)
-        except json.JSONDecodeError as exc:
-            yield _make_event(self.name, f"❌ JSON parse error: {exc}")
+            avail = _parse_availability(st.get("availability_result"))
+        except (ValueError, json.JSONDecodeError) as exc:
+            yield _make_event(self.name, f"❌ {exc}")
             return
 
         if not avail.get("available"):
-            yield _make_event(
-                self.name, "❌ Query cannot be answered with current schema."
-            )
+            reason = avail.get("reason") or "Query cannot be answered with current schema."
+            yield _make_event(self.name, f"❌ {reason}")
             return
 
-        # 2) Inject prompt variables for the LLM
-        st["user_request"] = avail["user_query"]
-        st["table_context"] = avail["raw_schema_text"]
-        st["reference_docs"] = fetch_bigquery_reference()
+        # 2) Inject prompt variables for the LLM – schema comes from the local catalog
+        catalog = load_catalog()
+        question = _user_question(ctx)
+        tables = catalog.resolve(avail.get("tables_needed") or [])
+        if not tables:
+            with get_tracer().span("table_retriever"):
+                tables = get_retriever().search(question)
+        annotate(tables=list(tables))
+        st["user_request"] = question
+        st["table_context"] = catalog.render(tables, profiles=True)
+        with get_tracer().span("reference_docs") as span:
+            st["reference_docs"] = reference_for(question)
+            span.set(chars=len(st["reference_docs"]))
 
         # 3) Delegate to the LLM agent
         async for ev in _sql_llm.run_async(ctx):
@@ -0,0 +1,225 @@
+"""
+GoogleSQL Reference
+───────────────────────────────────────────────────────────────────────────────
+Vendored, versioned excerpts of the BigQuery Standard SQL reference that the
+SQL generator (and, through it, the repair agent) injects into its prompt.
+
+• The snapshot ships with the package (googlesql_reference.json) and is read
+  once per process – no network call on the request path.
+• It is split into topic sections (joins, window functions, date functions,
+  …); `reference_for(question)` returns only the sections whose keywords
+  match the question, within a character budget.
+• Set ECHOQL_REFERENCE_REFRESH=1 to re-scrape the source pages on a daemon
+  thread. The curated section text is kept; each section gets a short extract
+  of the part of its page its source URL points to (the #fragment's heading
+  and what follows it, else the page's first paragraphs). A refreshed copy is
+  written to ECHOQL_REFERENCE_CACHE and swapped in for the rest of the
+  process; if the refresh fails the vendored snapshot stays in use.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urldefrag
+
+SNAPSHOT_PATH = Path(__file__).with_name("googlesql_reference.json")
+REFRESH_ENABLED = os.getenv("ECHOQL_REFERENCE_REFRESH", "0") == "1"
+REFRESH_CACHE_PATH = Path(
+    os.getenv(
+        "ECHOQL_REFERENCE_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "echoql", "googlesql_reference.json"),
+    )
+)
+DEFAULT_MAX_CHARS = 4000          # same prompt budget as the old page scrape
+EXTRACT_CHARS = 600               # per-section extract added by a refresh
+_HEADING_RE = re.compile(r"^h([1-6])$")
+
+
+@dataclass(frozen=True)
+class Section:
+    id: str
+    title: str
+    text: str
+    keywords: tuple[str, ...]
+    source_url: str
+    always: bool = False
+    extract: str = ""
+
+    def render(self) -> str:
+        if self.extract:
+            return f"## {self.title}\n{self.text}\nFrom the docs: {self.extract}"
+        return f"## {self.title}\n{self.text}"
+
+
+@dataclass(frozen=True)
+class Reference:
+    version: str
+    sections: tuple[Section, ...]
+
+
+def _parse(raw: dict) -> Reference:
+    return Reference(
+        version=raw["version"],
+        sections=tuple(
+            Section(
+                id=s["id"],
+                title=s["title"],
+                text=s["text"],
+                keywords=tuple(k.lower() for k in s.get("keywords", [])),
+                source_url=s.get("source_url", raw.get("source", "")),
+                always=bool(s.get("always", False)),
+                extract=s.get("extract", ""),
+            )
+            for s in raw["sections"]
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def _vendored() -> Reference:
+    return _parse(json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8")))
+
+
+def _refreshed() -> Reference | None:
+    try:
+        ref = _parse(json.loads(REFRESH_CACHE_PATH.read_text(encoding="utf-8")))
+        newer = date.fromisoformat(ref.version) >= date.fromisoformat(_vendored().version)
+    except (OSError, ValueError, KeyError):
+        return None
+    return ref if newer else None
+
+
+_current: Reference | None = None
+_current_lock = threading.Lock()
+
+
+def load_reference() -> Reference:
+    """The reference in use by this process (loaded on first call only)."""
+    global _current
+    if _current is None:
+        with _current_lock:
+            if _current is None:
+                _current = _refreshed() or _vendored()
+    return _current
+
+
+# ─── section selection ──────────────────────────────────────
+def _score(section: Section, text: str) -> int:
+    return sum(
+        len(re.findall(rf"(?<![a-z0-9_]){re.escape(kw)}(?![a-z0-9_])", text))
+        for kw in section.keywords
+    )
+
+
+def select_sections(question: str, max_chars: int = DEFAULT_MAX_CHARS) -> list[Section]:
+    """
+    Sections relevant to `question`, best match first, within `max_chars`.
+
+    Sections marked `always` (the core query syntax) are included first.
+    """
+    ref = load_reference()
+    text = question.lower()
+    scored = sorted(
+        ((_score(s, text), i, s) for i, s in enumerate(ref.sections) if not s.always),
+        key=lambda t: (-t[0], t[1]),
+    )
+    chosen: list[Section] = []
+    used = 0
+    for section in [s for s in ref.sections if s.always] + [s for sc, _, s in scored if sc > 0]:
+        size = len(section.render()) + 2
+        if used + size > max_chars:
+            continue
+        chosen.append(section)
+        used += size
+    return chosen
+
+
+def reference_for(question: str, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """Prompt-ready GoogleSQL reference text for `question`."""
+    ref = load_reference()
+    body = "\n\n".join(s.render() for s in select_sections(question, max_chars))
+    return f"GoogleSQL reference (snapshot {ref.version})\n\n{body}"
+
+
+# ─── optional background refresh ────────────────────────────
+def _fragment_text(soup, fragment: str) -> str:
+    """Text of the element `#fragment` names: a heading runs until the next heading of its level or above."""
+    node = soup.find(id=fragment)
+    if node is None:
+        return ""
+    heading = _HEADING_RE.match(node.name or "")
+    if heading is None:
+        return node.get_text(" ", strip=True)
+    parts = []
+    for sibling in node.find_next_siblings():
+        level = _HEADING_RE.match(sibling.name or "")
+        if level and int(level.group(1)) <= int(heading.group(1)):
+            break
+        parts.append(sibling.get_text(" ", strip=True))
+    return " ".join(parts)
+
+
+def _scrape(html: str, fragment: str, limit: int) -> str:
+    import bs4
+
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    if fragment:
+        text = _fragment_text(soup, fragment)
+    else:                                 # body paragraphs, not the page's header and navigation
+        main = soup.find("main") or soup
+        text = " ".join(p.get_text(" ", strip=True) for p in main.find_all("p"))
+    return re.sub(r"\s+", " ", text).strip()[:limit]
+
+
+def refresh_reference() -> Reference:
+    """Re-scrape every section's source page and persist a newer snapshot."""
+    global _current
+    import requests
+
+    base = json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+    pages: dict[str, str] = {}            # sections on one page share a fetch (requests drops #fragments)
+    seen: set[str] = set()
+    for section in base["sections"]:
+        url, fragment = urldefrag(section["source_url"])
+        if url not in pages:
+            pages[url] = requests.get(url, timeout=15).text
+        extract = _scrape(pages[url], fragment, EXTRACT_CHARS)
+        if extract and extract not in seen:
+            section["extract"] = extract
+            seen.add(extract)
+    base["version"] = date.today().isoformat()
+    REFRESH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = REFRESH_CACHE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(base, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, REFRESH_CACHE_PATH)
+    ref = _parse(base)
+    with _current_lock:
+        _current = ref
+    return ref
+
+
+_refresh_thread: threading.Thread | None = None
+
+
+def start_background_refresh(force: bool = False) -> threading.Thread | None:
+    """Kick off `refresh_reference` on a daemon thread (once per process)."""
+    global _refresh_thread
+    if not (force or REFRESH_ENABLED) or _refresh_thread is not None:
+        return _refresh_thread
+
+    def _run() -> None:
+        try:
+            refresh_reference()
+        except Exception:                     # keep serving the vendored snapshot
+            pass
+
+    _refresh_thread = threading.Thread(target=_run, name="googlesql-reference-refresh", daemon=True)
+    _refresh_thread.start()
+    return _refresh_thread
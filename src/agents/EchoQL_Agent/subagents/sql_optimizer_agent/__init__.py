@@ -0,0 +1 @@
+from .agent import sql_optimizer_agent
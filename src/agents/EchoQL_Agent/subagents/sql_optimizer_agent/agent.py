@@ -0,0 +1,175 @@
+"""
+SQL Optimizer Agent
+───────────────────────────────────────────────────────────────────────────────
+Runs between SQL authoring (semantic cache → checker → generator → validator →
+repair) and the cost gate. Valid SQL goes through the rewrites in
+optimizer.py – filters pushed below joins into derived tables, partition
+column predicates made prunable, `SELECT *` in derived tables narrowed to
+the columns read – and both statements are dry-run.
+
+Before that, aggregates over a single table are rewritten onto a registered
+rollup (see rollups/) that answers them, when one is built and its base
+table hasn't changed since its last refresh. If the rollup rewrite doesn't
+pay off – or its table is gone – the optimizer's rewrites of the original
+statement are tried on their own.
+
+The rewritten SQL replaces the original only when its dry run compiles and
+scans fewer bytes; otherwise the original runs as generated. A backend
+without a dry run keeps the original too. The cost gate reuses the dry run
+of whichever statement was kept.
+
+Outputs written to session.state when the rewrite is kept:
+- "sql_query":    the rewritten SQL
+- "dry_run":      {"sql", "bytes_processed", "tables", "estimated"} of it
+- "optimization": {"sql", "original_sql", "rewrites", "rollups", "bytes_before", "bytes_after"};
+                  reset to None on every run, so it never describes an earlier statement
+
+ECHOQL_SQL_OPTIMIZER=0 turns the agent off, ECHOQL_ROLLUPS=0 only the rollup
+rewrite. OPTIMIZER_COUNTERS counts optimized / unchanged / no_gain /
+rejected / unavailable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import Counter
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.genai import types
+
+from ...catalog import load_catalog
+from ...rollups import RollupRewrite, get_rollup_registry, rewrite_to_rollups
+from ...tracing import annotate
+from ..cost_gate_agent.agent import dry_run_state
+from ..cost_gate_agent.budget import format_bytes
+from ..sql_fetcher_agent.bigquery_connector import DryRun, dry_run_async, table_last_modified
+from .optimizer import Optimization, optimize
+
+SQL_OPTIMIZER_ENABLED = os.getenv("ECHOQL_SQL_OPTIMIZER", "1") != "0"
+ROLLUPS_ENABLED = os.getenv("ECHOQL_ROLLUPS", "1") != "0"
+
+# optimized / unchanged / no_gain / rejected / unavailable
+OPTIMIZER_COUNTERS: Counter = Counter()
+
+
+async def _dry_run(state, sql: str) -> Optional[DryRun]:
+    cached = state.get("dry_run")
+    if isinstance(cached, dict) and cached.get("sql") == sql:
+        return DryRun(cached["bytes_processed"], tuple(cached["tables"]), None, cached["estimated"])
+    try:
+        return await dry_run_async(sql)
+    except Exception:                                 # no dry run on this backend / backend unreachable
+        return None
+
+
+def _rollup_rewrite(sql: str) -> RollupRewrite:
+    """`sql` onto the registered rollups that are built and current."""
+    registry = get_rollup_registry()
+    rollups = registry.rollups()
+    if not rollups:
+        return RollupRewrite(sql)
+    catalog = load_catalog()
+    modified: dict[str, Optional[float]] = {}
+
+    def last_modified(table_id: str) -> Optional[float]:
+        if table_id not in modified:
+            try:
+                modified[table_id] = table_last_modified(table_id)
+            except Exception:                         # unknown → trusted for a while only
+                modified[table_id] = None
+        return modified[table_id]
+
+    usable = [r for r in rollups if registry.usable(r, last_modified, catalog)]
+    return rewrite_to_rollups(sql, usable, catalog) if usable else RollupRewrite(sql)
+
+
+def _candidates(sql: str) -> list[tuple[Optimization, tuple[str, ...]]]:
+    """(rewrite, rollups it reads) to try in order: onto rollups first, then the optimizer's passes alone."""
+    candidates = []
+    if ROLLUPS_ENABLED:
+        rolled = _rollup_rewrite(sql)
+        if rolled.rollups:
+            result = optimize(rolled.sql)
+            rewrites = ("rollup",) * len(rolled.rollups) + result.rewrites
+            candidates.append((Optimization(result.sql, rewrites), rolled.rollups))
+    result = optimize(sql)
+    if result.rewrites:
+        candidates.append((result, ()))
+    return candidates
+
+
+class SqlOptimizerAgent(BaseAgent):
+    def __init__(self) -> None:
+        super().__init__(
+            name="SqlOptimizerAgent",
+            description="Rewrites valid SQL to scan fewer bytes: rollup tables, pushed-down filters, "
+                        "prunable partition predicates, no SELECT * in derived tables.",
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        state["optimization"] = None                  # a previous turn's (or the parent plan's) is stale
+        sql = str(state.get("sql_query") or "").strip()
+        if not SQL_OPTIMIZER_ENABLED or not sql or str(state.get("validation_status", "")).strip().lower() != "valid":
+            return
+
+        candidates = await asyncio.to_thread(_candidates, sql)     # rollup freshness may ask the backend
+        if not candidates:
+            OPTIMIZER_COUNTERS["unchanged"] += 1
+            return
+        before = await _dry_run(state, sql)
+        if before is None:
+            OPTIMIZER_COUNTERS["unavailable"] += 1
+            annotate(sql_optimizer="unavailable")
+            return
+        if before.error is None:
+            state["dry_run"] = dry_run_state(sql, before)
+
+        outcome = {}
+        for result, rollups in candidates:
+            after = await _dry_run(state, result.sql)
+            if after is None:
+                outcome = {"sql_optimizer": "unavailable"}
+            elif after.error is not None:
+                outcome = {"sql_optimizer": "rejected", "rewrites": ",".join(result.rewrites), "error": after.error}
+            elif before.error is None and after.bytes_processed >= before.bytes_processed:
+                outcome = {"sql_optimizer": "no_gain", "rewrites": ",".join(result.rewrites)}
+            else:
+                break
+        else:
+            OPTIMIZER_COUNTERS[outcome["sql_optimizer"]] += 1
+            annotate(**outcome)
+            return
+
+        state["sql_query"] = result.sql
+        state["dry_run"] = dry_run_state(result.sql, after)
+        state["optimization"] = {
+            "sql": result.sql,
+            "original_sql": sql,
+            "rewrites": list(result.rewrites),
+            "rollups": list(rollups),
+            "bytes_before": before.bytes_processed,
+            "bytes_after": after.bytes_processed,
+        }
+        OPTIMIZER_COUNTERS["optimized"] += 1
+        annotate(
+            sql_optimizer="optimized",
+            rewrites=",".join(result.rewrites),
+            rollups=",".join(rollups),
+            bytes_before=before.bytes_processed,
+            bytes_after=after.bytes_processed,
+        )
+        text = (f"⚡ Optimized SQL ({', '.join(sorted(set(result.rewrites)))}): scans "
+                f"{format_bytes(after.bytes_processed)} instead of {format_bytes(before.bytes_processed)}")
+        if rollups:
+            text += f" – reads rollup {', '.join(f'`{name}`' for name in sorted(set(rollups)))}"
+        yield Event(author=self.name, content=types.Content(parts=[types.Part(text=text)]))
+
+
+sql_optimizer_agent = SqlOptimizerAgent()
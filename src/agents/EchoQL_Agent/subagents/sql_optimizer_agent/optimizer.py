@@ -0,0 +1,404 @@
+"""
+SQL Optimizer
+───────────────────────────────────────────────────────────────────────────────
+Rewrites of a validated statement that leave its results unchanged but let
+BigQuery scan fewer bytes. Each pass edits only the nodes it rewrites:
+
+• push_filter – a WHERE term that reads a single derived table (a subquery,
+  or a CTE used once) moves into that derived table's WHERE, next to the
+  base-table scan. Not when the derived table is the nullable side of an
+  outer join, has LIMIT / DISTINCT / QUALIFY / window functions, or the term
+  reads one of its computed columns (or, under GROUP BY, a non-key column).
+• prunable_predicate – a comparison that wraps a table's partition column
+  (catalog `partition_by`) in a function becomes a comparison of the bare
+  column with a constant, which BigQuery prunes partitions on:
+      DATE(created_at) = '2024-05-01'
+          → created_at >= TIMESTAMP(CAST('2024-05-01' AS DATE))
+            AND created_at < TIMESTAMP(DATE_ADD(CAST('2024-05-01' AS DATE), INTERVAL 1 DAY))
+      DATE_DIFF(CURRENT_DATE(), session_date, DAY) <= 30
+          → session_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 30 DAY)
+      EXTRACT(YEAR FROM session_date) = 2024   → a range over 2024
+      TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), created_at, HOUR) < 24
+          → created_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 24 HOUR)
+• prune_star – `SELECT *` in a derived table over one catalog table lists
+  only the columns the enclosing query reads from it.
+
+The top-level projection is never touched, so the result columns stay the
+same. Statements the passes don't understand come back unchanged.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from ...catalog import Catalog, Table, load_catalog
+from ...lazy_imports import lazy_import
+
+sqlglot = lazy_import("sqlglot")
+exp = lazy_import("sqlglot.expressions")
+optimizer_scope = lazy_import("sqlglot.optimizer.scope")
+
+_TIME_TYPES = {"DATE", "DATETIME", "TIMESTAMP"}
+_TIMESTAMP_UNITS = {"MICROSECOND", "MILLISECOND", "SECOND", "MINUTE", "HOUR", "DAY"}
+
+
+@dataclass(frozen=True)
+class Optimization:
+    sql: str
+    rewrites: tuple[str, ...] = ()      # pass name per rewrite applied; () → sql is the input
+
+
+def optimize(sql: str, catalog: Catalog | None = None) -> Optimization:
+    """Apply every pass to `sql` (GoogleSQL)."""
+    catalog = catalog or load_catalog()
+    try:
+        tree = sqlglot.parse_one(sql, read="bigquery")
+        if not isinstance(tree, exp.Query):
+            return Optimization(sql)
+        rewrites = (
+            ["push_filter"] * _push_filters(tree)
+            + ["prunable_predicate"] * _prunable_predicates(tree, catalog)
+            + ["prune_star"] * _prune_stars(tree, catalog)
+        )
+    except sqlglot.errors.SqlglotError:
+        return Optimization(sql)
+    if not rewrites:
+        return Optimization(sql)
+    return Optimization(tree.sql(dialect="bigquery"), tuple(rewrites))
+
+
+# ─── helpers ────────────────────────────────────────────────
+def _conjuncts(condition) -> list:
+    """The AND-ed terms of a condition (looking through parentheses)."""
+    while isinstance(condition, exp.Paren):
+        condition = condition.this
+    if isinstance(condition, exp.And):
+        return _conjuncts(condition.this) + _conjuncts(condition.expression)
+    return [condition]
+
+
+def _is_constant(node) -> bool:
+    """Same value for every row: no columns, subqueries, aggregates or random numbers."""
+    return not any(
+        isinstance(n, (exp.Column, exp.Star, exp.Query, exp.AggFunc, exp.Window, exp.Rand)) for n in node.walk()
+    )
+
+
+def _base_table(column, scope, catalog: Catalog) -> Optional[Table]:
+    """The catalog table `column` reads in `scope` (None: a derived table's, unknown or ambiguous)."""
+    if column.table:
+        source = scope.sources.get(column.table)
+        return catalog.table(source.name) if isinstance(source, exp.Table) else None
+    owners = []
+    for source in scope.sources.values():
+        table = catalog.table(source.name) if isinstance(source, exp.Table) else None
+        if table is None:
+            return None                           # a derived or unknown table might have it too
+        if table.column(column.name):
+            owners.append(table)
+    return owners[0] if len(owners) == 1 else None
+
+
+# ─── push_filter ────────────────────────────────────────────
+def _push_filters(tree) -> int:
+    pushed = 0
+    while True:
+        move = next(filter(None, (_pushable(scope, tree) for scope in optimizer_scope.traverse_scope(tree))), None)
+        if move is None:
+            return pushed
+        select, term, child, inner = move
+        moved = term.copy()
+        for column in list(moved.find_all(exp.Column)):
+            column.replace(inner[column.name.lower()].copy())
+        rest = [t for t in _conjuncts(select.args["where"].this) if t is not term]
+        select.set("where", exp.Where(this=exp.and_(*rest)) if rest else None)
+        child.where(moved, copy=False)
+        pushed += 1
+
+
+def _pushable(scope, tree):
+    """(select, term, derived select, {column: inner expression}) for the first WHERE term that can move down."""
+    select = scope.expression
+    where = select.args.get("where") if isinstance(select, exp.Select) else None
+    if where is None:
+        return None
+    for term in _conjuncts(where.this):
+        columns = list(term.find_all(exp.Column))
+        qualifiers = {c.table for c in columns}
+        if not columns or len(qualifiers) != 1 or any(isinstance(c.this, exp.Star) for c in columns):
+            continue
+        if any(isinstance(n, (exp.Query, exp.AggFunc, exp.Window, exp.Rand)) for n in term.walk()):
+            continue
+        alias = qualifiers.pop() or (next(iter(scope.sources)) if len(scope.sources) == 1 else "")
+        source = scope.sources.get(alias)
+        if not isinstance(source, optimizer_scope.Scope) or not _preserved(select, alias):
+            continue
+        if source.is_cte and _references(tree, _source_name(select, alias)) != 1:
+            continue
+        inner = _inner_columns(source.expression, {c.name.lower() for c in columns})
+        if inner is not None:
+            return select, term, source.expression, inner
+    return None
+
+
+def _joined(select) -> list:
+    """The FROM source, then every joined source, with the Join node (None for FROM)."""
+    from_ = select.args.get("from_")
+    sources = [(from_.this, None)] if from_ else []
+    return sources + [(join.this, join) for join in select.args.get("joins") or []]
+
+
+def _preserved(select, alias: str) -> bool:
+    """True unless the source `alias` is on the nullable side of an outer join."""
+    joined = _joined(select)
+    for i, (source, join) in enumerate(joined):
+        if source.alias_or_name == alias:
+            if join is not None and (join.side or join.kind in ("SEMI", "ANTI")):
+                return False
+            return all(j.side not in ("RIGHT", "FULL") for _, j in joined[i + 1:])
+    return False
+
+
+def _source_name(select, alias: str) -> str:
+    return next((s.name for s, _ in _joined(select) if s.alias_or_name == alias), "")
+
+
+def _references(tree, cte: str) -> int:
+    return sum(1 for t in tree.find_all(exp.Table) if not t.db and t.name == cte)
+
+
+def _inner_columns(child, names: set[str]) -> Optional[dict]:
+    """Derived select's plain column behind each output name, if a filter on all of them can move into it."""
+    if not isinstance(child, exp.Select) or not isinstance(child.parent, (exp.Subquery, exp.CTE)):
+        return None
+    if any(child.args.get(k) for k in ("limit", "offset", "distinct", "qualify")):
+        return None
+    if any(p.find(exp.Window) for p in child.expressions):
+        return None
+    group = child.args.get("group")
+    if group is None and any(p.find(exp.AggFunc) for p in child.expressions):
+        return None
+
+    outputs, star = {}, False
+    for projection in child.expressions:
+        if isinstance(projection, exp.Star):
+            star = not any(projection.args.values()) and not child.args.get("joins")
+        else:
+            outputs[projection.alias_or_name.lower()] = projection.unalias()
+    keys = set()
+    for key in group.expressions if group else ():
+        if isinstance(key, exp.Literal) and key.is_int and 0 < int(key.name) <= len(child.expressions):
+            key = child.expressions[int(key.name) - 1].unalias()
+        elif isinstance(key, exp.Column) and not key.table and key.name.lower() in outputs:
+            key = outputs[key.name.lower()]
+        keys.add(key.sql(dialect="bigquery").lower())
+
+    inner = {}
+    for name in names:
+        column = outputs.get(name) or (exp.column(name) if star else None)
+        if not isinstance(column, exp.Column) or isinstance(column.this, exp.Star):
+            return None
+        if group and column.sql(dialect="bigquery").lower() not in keys:
+            return None
+        inner[name] = column
+    return inner
+
+
+# ─── prunable_predicate ─────────────────────────────────────
+_MIRROR = {"GT": "LT", "GTE": "LTE", "LT": "GT", "LTE": "GTE", "EQ": "EQ"}      # a op b ⇔ b mirror(op) a
+
+
+def _prunable_predicates(tree, catalog: Catalog) -> int:
+    rewritten = 0
+    for scope in optimizer_scope.traverse_scope(tree):
+        select = scope.expression
+        where = select.args.get("where") if isinstance(select, exp.Select) else None
+        if where is None:
+            continue
+        key = lambda node: _partition_key(node, scope, catalog)  # noqa: E731
+        for term in _conjuncts(where.this):
+            replacement = _prunable(term, key)
+            if replacement is not None:
+                term.replace(replacement)
+                rewritten += 1
+    return rewritten
+
+
+def _partition_key(node, scope, catalog: Catalog) -> Optional[tuple]:
+    """(column, type) if `node` is a bare reference to its table's DATE / DATETIME / TIMESTAMP partition column."""
+    if not isinstance(node, exp.Column) or isinstance(node.this, exp.Star):
+        return None
+    table = _base_table(node, scope, catalog)
+    if table is None or not table.partition_by or node.name.lower() != table.partition_by.lower():
+        return None
+    column = table.column(node.name)
+    kind = column.type.upper() if column else ""
+    return (node, kind) if kind in _TIME_TYPES else None
+
+
+def _day_of(node, key: Callable) -> Optional[tuple]:
+    """
+    (column, type) if `node` is the day of a partition column: the DATE column,
+    or DATE() / CAST(AS DATE) of one – not DATE(ts, zone), whose day is not the UTC day.
+    """
+    if (isinstance(node, exp.Date) and {k for k, v in node.args.items() if v} == {"this"}) \
+            or (isinstance(node, exp.Cast) and node.to.is_type("date")):
+        found = key(node.this)
+        return found if found and found[1] != "DATE" else None
+    found = key(node)
+    return found if found and found[1] == "DATE" else None
+
+
+def _date_value(node):
+    """`node` as a DATE constant (a string literal is cast), or None if it isn't one."""
+    if isinstance(node, exp.Literal) and node.is_string:
+        return exp.cast(node.copy(), "DATE")
+    if isinstance(node, (exp.CurrentDate, exp.Date)) or (isinstance(node, exp.Cast) and node.to.is_type("date")):
+        return node.copy() if _is_constant(node) else None
+    if isinstance(node, (exp.DateAdd, exp.DateSub, exp.DateTrunc)) and _date_value(node.this) is not None:
+        return node.copy() if _is_constant(node) else None
+    return None
+
+
+def _bound(column, kind: str, op, day):
+    """`column op day` for a DATE value `day`, in terms of the column's own type."""
+    if kind == "DATE":
+        return op(this=column.copy(), expression=day.copy())
+    col, start = column.sql(dialect="bigquery"), day.sql(dialect="bigquery")
+    after = f"DATE_ADD({start}, INTERVAL 1 DAY)"
+    start, after = f"{kind}({start})", f"{kind}({after})"
+    text = {
+        exp.GTE: f"{col} >= {start}",
+        exp.GT: f"{col} >= {after}",
+        exp.LT: f"{col} < {start}",
+        exp.LTE: f"{col} < {after}",
+        exp.EQ: f"{col} >= {start} AND {col} < {after}",
+    }[op]
+    return exp.condition(text, dialect="bigquery")
+
+
+def _integer(node) -> Optional[int]:
+    if isinstance(node, exp.Neg):
+        value = _integer(node.this)
+        return -value if value is not None else None
+    return int(node.name) if isinstance(node, exp.Literal) and node.is_int else None
+
+
+def _year_start(year: int):
+    return exp.cast(exp.Literal.string(f"{year:04d}-01-01"), "DATE")
+
+
+def _prunable(term, key: Callable):
+    """`term` rewritten so that a partition column is compared bare, or None."""
+    if isinstance(term, exp.Between):
+        day = _day_of(term.this, key)
+        low, high = _date_value(term.args["low"]), _date_value(term.args["high"])
+        if day and day[1] != "DATE" and low is not None and high is not None:
+            return exp.and_(_bound(*day, exp.GTE, low), _bound(*day, exp.LTE, high))
+        return None
+    if type(term).__name__ not in _MIRROR:
+        return None
+    op, left, right = type(term), term.this, term.expression
+    if _is_constant(left) and not _is_constant(right):
+        op, left, right = getattr(exp, _MIRROR[op.__name__]), right, left
+    if not _is_constant(right):
+        return None
+
+    day = _day_of(left, key)
+    if day and day[1] != "DATE":                                    # DATE(ts) op d
+        value = _date_value(right)
+        return _bound(*day, op, value) if value is not None else None
+
+    count = _integer(right)
+    if count is None:
+        return None
+    if isinstance(left, exp.DateDiff) and left.text("unit").upper() == "DAY":
+        days = dict(expression=exp.Literal.number(abs(count)), unit=exp.var("DAY"))
+        later, earlier = left.this, left.expression
+        if _date_value(later) is not None and (day := _day_of(earlier, key)):    # a - g op n ⇔ g op' a - n
+            shift = exp.DateSub if count >= 0 else exp.DateAdd
+            return _bound(*day, getattr(exp, _MIRROR[op.__name__]), shift(this=later.copy(), **days))
+        if _date_value(earlier) is not None and (day := _day_of(later, key)):    # g - a op n ⇔ g op a + n
+            shift = exp.DateAdd if count >= 0 else exp.DateSub
+            return _bound(*day, op, shift(this=earlier.copy(), **days))
+        return None
+    if isinstance(left, exp.Extract) and left.this.name.upper() == "YEAR" and 1 <= count <= 9998:
+        day = _day_of(left.expression, key) or key(left.expression)
+        if not day:
+            return None
+        bounds = {
+            exp.GTE: [(exp.GTE, count)],
+            exp.GT: [(exp.GTE, count + 1)],
+            exp.LT: [(exp.LT, count)],
+            exp.LTE: [(exp.LT, count + 1)],
+            exp.EQ: [(exp.GTE, count), (exp.LT, count + 1)],
+        }[op]
+        return exp.and_(*(_bound(*day, o, _year_start(y)) for o, y in bounds))
+    if isinstance(left, exp.TimestampDiff) and left.text("unit").upper() in _TIMESTAMP_UNITS and count >= 1:
+        found = key(left.expression)
+        if not found or found[1] != "TIMESTAMP" or not _is_constant(left.this) or op is exp.EQ:
+            return None
+        # TIMESTAMP_DIFF truncates: diff < n ⇔ c > now - n units, diff > n ⇔ c <= now - (n + 1) units
+        newer, shift = {exp.LT: (True, count), exp.LTE: (True, count + 1),
+                        exp.GTE: (False, count), exp.GT: (False, count + 1)}[op]
+        since = exp.TimestampSub(
+            this=left.this.copy(), expression=exp.Literal.number(shift), unit=exp.var(left.text("unit").upper())
+        )
+        return (exp.GT if newer else exp.LTE)(this=found[0].copy(), expression=since)
+    return None
+
+
+# ─── prune_star ─────────────────────────────────────────────
+def _prune_stars(tree, catalog: Catalog) -> int:
+    scopes = list(optimizer_scope.traverse_scope(tree))
+    pruned = 0
+    for scope in scopes:
+        select = scope.expression
+        if not isinstance(select, exp.Select) or not isinstance(select.parent, (exp.Subquery, exp.CTE)):
+            continue
+        if len(select.expressions) != 1 or not isinstance(select.expressions[0], exp.Star):
+            continue
+        if any(select.expressions[0].args.values()) or select.args.get("joins") or len(scope.sources) != 1:
+            continue
+        source = next(iter(scope.sources.values()))
+        table = catalog.table(source.name) if isinstance(source, exp.Table) else None
+        needed = _read_through(scope, scopes, table) if table else None
+        if not needed or len(needed) >= len(table.columns):
+            continue
+        select.set("expressions", [exp.column(c.name) for c in table.columns.values() if c.name.lower() in needed])
+        pruned += 1
+    return pruned
+
+
+def _columns_seen(scope) -> list:
+    """Columns of `scope` and of the subqueries in its expressions (they may correlate), not of derived tables."""
+    columns, stack = list(scope.columns), list(scope.subquery_scopes)
+    while stack:
+        inner = stack.pop()
+        columns += inner.columns
+        stack += inner.subquery_scopes
+    return columns
+
+
+def _read_through(target, scopes, table: Table) -> Optional[set[str]]:
+    """Columns of `table` the scopes selecting from `target` may read from it (None: all of them)."""
+    names = {c.name.lower() for c in table.columns.values()}
+    needed = set()
+    for scope in scopes:
+        aliases = {alias for alias, source in scope.sources.items() if source is target}
+        if not aliases:
+            continue
+        select = scope.expression
+        if not isinstance(select, exp.Select):
+            return None
+        for column in _columns_seen(scope):
+            if isinstance(column.this, exp.Star) and (not column.table or column.table in aliases):
+                return None
+            if not column.table or column.table in aliases:
+                needed.add(column.name.lower())
+        if any(isinstance(p, exp.Star) for p in select.expressions):
+            return None
+        for join in select.args.get("joins") or []:
+            needed |= {ident.name.lower() for ident in join.args.get("using") or []}
+    return needed & names
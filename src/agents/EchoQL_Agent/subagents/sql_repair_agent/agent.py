@@ -1,107 +1,169 @@
 """
 SQL Repair Agent
 ───────────────────────────────────────────────────────────────────────────────
-This agent is part of the Data Collection SequentialAgent pipeline.
+This agent is part of the SQL authoring SequentialAgent pipeline.
 
 Purpose:
-If the SQL Validator Agent returns an "invalid: ..." status, this agent:
-1. Regenerates the SQL query using the original user request, the invalid SQL, and the validator error.
-2. Stores the regenerated SQL back into session.state["sql_query"].
-3. Immediately re-validates the new SQL using the same validator agent.
-4. Updates session.state["validation_status"] accordingly.
+If the SQL Validator Agent returns an "invalid: ..." status, this agent runs a
+bounded repair loop:
+1. Classifies the validator error (see fixers.py).
+2. Cheap classes – unqualified table, wrong dataset, table / column typo,
+   broken quoting – are fixed deterministically against the schema catalog,
+   with no LLM call.
+3. Anything else goes to a dedicated repair LLM (original request, schema of
+   the tables in play, the invalid SQL and the validator error).
+4. Every candidate is re-validated; the loop stops when the SQL is valid, after
+   ECHOQL_REPAIR_MAX_ATTEMPTS attempts, or when the ECHOQL_REPAIR_BUDGET_S
+   latency budget is spent.
 
 If the original query was already valid, this agent does nothing.
 
 Inputs expected in session.state:
 - "sql_query":      The SQL query string generated earlier.
 - "user_request":   The user's original request prompt.
-- "validation_status": Result of the first SQLValidatorLLM step (must start with "invalid" to trigger repair).
+- "table_context":  Schema fragment the generator used (optional).
+- "validation_status": Result of the SQL Validator Agent (must start with "invalid" to trigger repair).
 
 Outputs written to session.state:
-- "sql_query":      Updated regenerated SQL if repaired.
-- "validation_status": Validation result of the retried query.
+- "sql_query":      Updated SQL if repaired.
+- "validation_status": Validation result of the last attempt.
 
-The agent emits a short confirmation event when a retry is performed.
+REPAIR_COUNTERS counts how often each path fires ("<class>.deterministic",
+"<class>.llm", "repaired", "unrepaired", "budget_exhausted").
 """
 
 # data_analysis_agent/subagents/sql_repair_agent/agent.py
 from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import Counter
 from typing import AsyncGenerator, Any
 
-from google.adk.agents import BaseAgent
+from google.adk.agents import BaseAgent, LlmAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events.event import Event
+from google.genai import types
 from pydantic import PrivateAttr
 
+from ...settings import get_settings
+from ...tracing import annotate
+from .fixers import classify_error, repair_deterministically
+
+GEMINI_MODEL = get_settings().fast_llm_model
+REPAIR_MAX_ATTEMPTS = int(os.getenv("ECHOQL_REPAIR_MAX_ATTEMPTS", "3"))
+REPAIR_BUDGET_S = float(os.getenv("ECHOQL_REPAIR_BUDGET_S", "20"))
+
+# How often each repair path fired, e.g. "column_typo.deterministic", "syntax.llm"
+REPAIR_COUNTERS: Counter = Counter()
+
+_repair_llm = LlmAgent(
+    name="SqlRepairLlm",
+    model=GEMINI_MODEL,
+    description="Rewrites an invalid BigQuery SQL statement.",
+    instruction="""
+    You are a BigQuery SQL repair agent.
+
+    • Question : {{user_request}}
+    • Schema   : {{table_context}}
+    • Invalid SQL:
+    {{sql_query}}
+    • Validator said: {{validation_status}}
+
+    INSTRUCTIONS:
+    - Fix the error the validator reported; keep everything else unchanged.
+    - All tables live in dataset Mock_KPIs – always fully-qualify (e.g. Mock_KPIs.mock_users).
+    - Obey GoogleSQL (Standard SQL) grammar exactly.
+    - **Return raw SQL only** – no markdown, no comments, no prose.
+    """,
+    output_key="sql_query",
+)
+
+
+def _make_event(author: str, text: str) -> Event:
+    return Event(author=author, content=types.Content(parts=[types.Part(text=text)]))
+
+
+def _status(state) -> str:
+    return str(state.get("validation_status", "")).strip()
+
 
 class SqlRepairAgent(BaseAgent):
-    _generator: Any = PrivateAttr()
     _validator: Any = PrivateAttr()
 
     def __init__(self) -> None:
         super().__init__(
             name="SqlRepairAgent",
-            description="Regenerates SQL if the validator reports a failure.",
+            description="Repairs SQL the validator rejected: deterministic fixes first, LLM for the rest.",
         )
-        # Lazy imports to avoid circular refs
-        from ..sql_generator_agent.agent import sql_generator_agent
+        # Lazy import to avoid circular refs
         from ..sql_validator_agent.agent import sql_validator_agent
 
-        self._generator = sql_generator_agent
         self._validator = sql_validator_agent
 
     async def _run_async_impl(
         self, ctx: InvocationContext
     ) -> AsyncGenerator[Event, None]:
-        state = ctx.session.state                     # ✅ correct attr
+        state = ctx.session.state
 
-        validation_status: str = state.get("validation_status", "")
-        if validation_status.startswith("valid"):
+        validation_status = _status(state)
+        if not validation_status or validation_status.lower().startswith("valid"):
             return                                    # nothing to do
 
-        bad_sql = state.get("sql_query", "")
-        user_request = state.get("user_request", "")
-        if not bad_sql or not user_request:
-            yield Event(
-                author=self.name,
-                content=dict(parts=[dict(text="missing sql_query or user_request")])
-            )
-            return
-
-        retry_prompt = f"""
-            The following SQL was invalid:
-
-            sql:
-            {bad_sql}
-            Validator said:
-            {validation_status}
-
-            Please regenerate a correct BigQuery SQL statement that fulfils: "{user_request}"
-            Return only SQL, no commentary.
-            """
-        async for _ in self._generator.run_async(
-            InvocationContext(
-                session=ctx.session,
-                prompt=retry_prompt,
-            )
-        ):
-            pass  # _generator already stores result in state
-
-        new_sql = state.get("sql_query", "").strip()
-        if not new_sql:
-            yield Event(
-                author=self.name,
-                content=dict(parts=[dict(text="⚠️ regeneration produced empty SQL")])
-            )
+        if not state.get("sql_query") or not state.get("user_request"):
+            yield _make_event(self.name, "missing sql_query or user_request")
             return
-
-        # Validate again
-        async for _ in self._validator.run_async(ctx):
-            pass
-
-        yield Event(
-            author=self.name,
-            content=dict(parts=[dict(text="🔄 SQL regenerated & re-validated")])
-        )
-
-sql_repair_agent = SqlRepairAgent()
\ No newline at end of file
+        state.setdefault("table_context", "")
+
+        deadline = time.monotonic() + REPAIR_BUDGET_S
+        paths: list[str] = []
+        for _ in range(REPAIR_MAX_ATTEMPTS):
+            message = _status(state)
+            error_class, fixed = repair_deterministically(state["sql_query"], message)
+            if fixed:
+                path = f"{error_class}.deterministic"
+                state["sql_query"] = fixed
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    REPAIR_COUNTERS["budget_exhausted"] += 1
+                    break
+                path = f"{classify_error(message)}.llm"
+                try:
+                    # buffered, not yielded: the deadline must not fire while the caller handles an event
+                    async with asyncio.timeout(remaining):
+                        events = [ev async for ev in _repair_llm.run_async(ctx)]
+                except TimeoutError:
+                    REPAIR_COUNTERS["budget_exhausted"] += 1
+                    break
+                repaired = next(
+                    (ev.actions.state_delta["sql_query"] for ev in reversed(events)
+                     if "sql_query" in ev.actions.state_delta),
+                    None,
+                )
+                if repaired is not None:
+                    state["sql_query"] = repaired     # output_key – the validator below reads it
+                for ev in events:                     # still carry the state delta to the runner
+                    yield ev
+            REPAIR_COUNTERS[path] += 1
+            paths.append(path)
+
+            if not str(state.get("sql_query", "")).strip():
+                state["validation_status"] = "invalid: regeneration produced empty SQL"
+                break
+            async for ev in self._validator.run_async(ctx):
+                yield ev                              # writes validation_status
+            if _status(state).lower() == "valid":
+                break
+
+        annotate(repair_paths=paths, repaired=_status(state).lower() == "valid")
+        if _status(state).lower() == "valid":
+            REPAIR_COUNTERS["repaired"] += 1
+            yield _make_event(self.name, f"🔄 SQL repaired & re-validated ({' → '.join(paths)})")
+        else:
+            REPAIR_COUNTERS["unrepaired"] += 1
+            yield _make_event(self.name, f"⚠️ Could not repair the SQL: {_status(state)}")
+
+
+sql_repair_agent = SqlRepairAgent()
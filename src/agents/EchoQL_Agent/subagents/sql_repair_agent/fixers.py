@@ -0,0 +1,197 @@
+"""
+SQL Error Classification & Deterministic Fixes
+───────────────────────────────────────────────────────────────────────────────
+Maps a validator message (`invalid: …`) or a BigQuery error to an error class,
+and repairs the cheap classes without a model call:
+
+    unqualified_table – table without `Mock_KPIs.`          → qualify it
+    unknown_dataset   – wrong / mis-cased dataset            → Mock_KPIs
+    table_typo        – table not in the catalog             → the one catalog table
+                                                               a couple of edits away
+    column_typo       – column not in the tables it reads    → the one column a couple
+                                                               of edits away (BigQuery's
+                                                               "Did you mean …?" wins)
+    quoting           – "double"/'single'-quoted or broken
+                        `backtick` table paths               → plain Mock_KPIs.table
+
+Everything else (syntax, other) is left to the LLM. A name is only replaced
+when exactly one candidate is that close – `mock_orders` is not `mock_users` –
+so a table or column that really doesn't exist reaches the user or the LLM
+repair instead of silently reading something else. Fixes edit the sqlglot
+AST, so string literals and unrelated identifiers are never touched; a fix
+only counts if it changes the SQL.
+"""
+
+from __future__ import annotations
+
+import re
+
+from ...lazy_imports import lazy_import
+from ...catalog import Catalog, load_catalog
+
+sqlglot = lazy_import("sqlglot")
+exp = lazy_import("sqlglot.expressions")
+
+UNQUALIFIED_TABLE = "unqualified_table"
+UNKNOWN_DATASET = "unknown_dataset"
+TABLE_TYPO = "table_typo"
+COLUMN_TYPO = "column_typo"
+QUOTING = "quoting"
+SYNTAX = "syntax"
+OTHER = "other"
+
+DETERMINISTIC_CLASSES = frozenset({UNQUALIFIED_TABLE, UNKNOWN_DATASET, TABLE_TYPO, COLUMN_TYPO, QUOTING})
+
+_TYPO_MAX_EDITS = 2               # 1 for names of up to 5 characters
+
+# (pattern, error class) – first match wins; validator messages and BigQuery errors side by side
+_CLASSIFIERS: list[tuple[re.Pattern, str]] = [
+    (re.compile(r"is not qualified with dataset|missing dataset while no default dataset", re.I), UNQUALIFIED_TABLE),
+    (re.compile(r"unknown dataset|Not found: Dataset", re.I), UNKNOWN_DATASET),
+    (re.compile(r"unknown table|Not found: Table", re.I), TABLE_TYPO),
+    (re.compile(r"unknown column|Unrecognized name|Name \S+ not found inside", re.I), COLUMN_TYPO),
+    (re.compile(r"unterminated quoted|Unclosed identifier|Unclosed string literal|"
+                r"Unexpected string literal|Unexpected identifier \"", re.I), QUOTING),
+    (re.compile(r"syntax error|unbalanced parentheses|unterminated comment", re.I), SYNTAX),
+]
+
+_BAD_COLUMN_RES = [
+    re.compile(r"unknown column `(?:(\w+)\.)?(\w+)`"),                 # local validator
+    re.compile(r"Unrecognized name: (\w+)"),                           # BigQuery
+    re.compile(r"Name (\w+) not found inside (\w+)"),                  # BigQuery (qualified)
+]
+_DID_YOU_MEAN_RE = re.compile(r"Did you mean (\w+)\?")
+
+
+def classify_error(message: str) -> str:
+    for pattern, error_class in _CLASSIFIERS:
+        if pattern.search(message or ""):
+            return error_class
+    return OTHER
+
+
+# ─── helpers ────────────────────────────────────────────────
+def _parse(sql: str) -> exp.Expression | None:
+    try:
+        return sqlglot.parse_one(sql, read="bigquery")
+    except (sqlglot.ParseError, sqlglot.TokenError):
+        return None
+
+
+def _render(tree: exp.Expression) -> str:
+    return tree.sql(dialect="bigquery")
+
+
+def _edits(a: str, b: str) -> int:
+    """Insertions, deletions, substitutions and adjacent transpositions turning `a` into `b`."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, prev2[j - 2] + 1)
+            cur.append(cost)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _closest(name: str, candidates) -> str | None:
+    """The candidate `name` is a typo of: unique and at most _TYPO_MAX_EDITS edits away."""
+    by_lower = {c.lower(): c for c in candidates}
+    if name.lower() in by_lower:
+        return by_lower[name.lower()]
+    limit = _TYPO_MAX_EDITS if len(name) > 5 else 1
+    distances = {c: _edits(name.lower(), c) for c in by_lower}
+    best = [c for c, d in distances.items() if d <= limit and d == min(distances.values())]
+    return by_lower[best[0]] if len(best) == 1 else None
+
+
+def _real_tables(tree: exp.Expression) -> list[exp.Table]:
+    ctes = {cte.alias_or_name for cte in tree.find_all(exp.CTE)}
+    return [t for t in tree.find_all(exp.Table) if t.name and not (not t.db and t.name in ctes)]
+
+
+# ─── fixers ─────────────────────────────────────────────────
+def _fix_tables(sql: str, catalog: Catalog) -> str | None:
+    """Qualify, re-dataset and de-typo every table reference in one pass."""
+    tree = _parse(sql)
+    if tree is None:
+        return None
+    for table in _real_tables(tree):
+        name = table.name if catalog.table(table.name) else _closest(table.name, catalog.tables)
+        if name is None:
+            continue
+        if name != table.name:
+            table.set("this", exp.to_identifier(name))
+        if table.db != catalog.dataset:
+            table.set("db", exp.to_identifier(catalog.dataset))
+    return _render(tree)
+
+
+def _fix_column(sql: str, message: str, catalog: Catalog) -> str | None:
+    bad = qualifier = None
+    for pattern in _BAD_COLUMN_RES:
+        if (m := pattern.search(message)):
+            groups = [g for g in m.groups()]
+            if pattern is _BAD_COLUMN_RES[0]:
+                qualifier, bad = groups
+            elif pattern is _BAD_COLUMN_RES[2]:
+                bad, qualifier = groups
+            else:
+                bad = groups[0]
+            break
+    if not bad:
+        return None
+    tree = _parse(sql)
+    if tree is None:
+        return None
+
+    tables = [catalog.table(t.name) for t in _real_tables(tree)]
+    if qualifier:
+        aliased = [
+            catalog.table(t.name) for t in _real_tables(tree)
+            if qualifier in (t.alias_or_name, t.name)
+        ]
+        tables = aliased or tables
+    candidates = {c.name for t in tables if t for c in t.columns.values()}
+
+    hint = _DID_YOU_MEAN_RE.search(message)
+    fixed = hint.group(1) if hint else _closest(bad, candidates)
+    if not fixed or fixed.lower() == bad.lower():
+        return None
+    for column in tree.find_all(exp.Column):
+        if column.name.lower() == bad.lower() and (not qualifier or column.table == qualifier):
+            column.set("this", exp.to_identifier(fixed))
+    return _render(tree)
+
+
+def _fix_quoting(sql: str, catalog: Catalog) -> str | None:
+    ds = re.escape(catalog.dataset)
+    q = "[`\"']"
+    # "Mock_KPIs.t" / 'project.Mock_KPIs.t' → `…`   (whole path quoted with the wrong quote)
+    sql = re.sub(rf"{q}((?:[\w-]+\.)?{ds}\.\w+){q}", r"`\1`", sql)
+    # "Mock_KPIs"."t" / `Mock_KPIs`.'t' → Mock_KPIs.t   (parts quoted separately)
+    sql = re.sub(rf"{q}({ds}){q}\s*\.\s*{q}(\w+){q}", r"\1.\2", sql)
+    if sql.count("`") % 2:
+        sql = re.sub(rf"`?((?:[\w-]+\.)?{ds}\.\w+)`?", r"\1", sql)
+    return sql
+
+
+def repair_deterministically(
+    sql: str, message: str, catalog: Catalog | None = None
+) -> tuple[str, str | None]:
+    """(error class, fixed SQL) – fixed SQL is None when no cheap fix applies."""
+    catalog = catalog or load_catalog()
+    error_class = classify_error(message)
+    if error_class not in DETERMINISTIC_CLASSES:
+        return error_class, None
+    if error_class == COLUMN_TYPO:
+        fixed = _fix_column(sql, message, catalog)
+    elif error_class == QUOTING:
+        fixed = _fix_quoting(sql, catalog)
+    else:
+        fixed = _fix_tables(sql, catalog)
+    if not fixed or fixed.strip() == sql.strip():
+        return error_class, None
+    return error_class, fixed
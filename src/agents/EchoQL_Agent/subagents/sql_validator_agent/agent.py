@@ -5,31 +5,63 @@ Description:
     validation. It checks for SQL syntax errors, unsupported clauses, and alignment with the
     BigQuery dialect. If the query is valid, it forwards it for execution. Otherwise, it returns
     detailed error feedback to the SQL Generation Agent to trigger a regeneration cycle.
+
+    The mechanical checks (parsing, Mock_KPIs qualification, table/column existence) run
+    locally – see local_validator.py. The statement is also dry-run on the execution backend
+    (a BigQuery dry-run job compiles it for free), and the LLM validator is only consulted
+    when neither gives a definitive verdict – so the common case costs no model call.
+    ECHOQL_DRY_RUN_VALIDATION=0 skips the dry run.
+
+    ECHOQL_VALIDATION_MODE=parallel (default) starts the local check and the dry run at
+    once; the first definitive verdict wins (on a tie: local, then dry run) and the other
+    paths are cancelled – except that a local "valid" waits for the dry run while the cost
+    gate is on, as the gate needs its bytes anyway (the dry run's verdict then decides and
+    is handed to the gate, so the query is compiled once). The LLM joins the race once both are inconclusive, or – with
+    ECHOQL_VALIDATION_LLM_HEDGE_MS >= 0 – as a hedge after that many ms without a verdict.
+    Its events are buffered and only replayed if it wins. A cancelled dry run may still
+    finish on its executor thread; its result is dropped. =serial runs local → dry run →
+    LLM one after another.
 """
 
-from google.adk.agents import LlmAgent
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.genai import types
 import os
-from dotenv import load_dotenv
-from pathlib import Path
 
-current_path = Path(__file__).resolve()
-for parent in current_path.parents:
-    env_file = parent / ".env"
-    if env_file.exists():
-        load_dotenv(env_file)
-        break
+from ...settings import get_settings
+from ...tracing import annotate
+from ..sql_fetcher_agent.bigquery_connector import dry_run_async
+from .local_validator import validate_sql
+
+GEMINI_MODEL = get_settings().fast_llm_model
+DRY_RUN_VALIDATION = os.getenv("ECHOQL_DRY_RUN_VALIDATION", "1") != "0"
+VALIDATION_MODE = os.getenv("ECHOQL_VALIDATION_MODE", "parallel").strip().lower()   # parallel | serial
+# parallel mode: start the LLM validator too once this many ms pass without a verdict (<0: last resort only)
+LLM_HEDGE_MS = float(os.getenv("ECHOQL_VALIDATION_LLM_HEDGE_MS", "-1"))
 
-GEMINI_MODEL = os.getenv("FAST_LLM_MODEL", "gemini-1.5-flash")
+_PRIORITY = {"local": 0, "dry_run": 1, "llm": 2}
 
-sql_validator_agent = LlmAgent(
-    name="SqlValidatorAgent",
+# How often each path decided validation_status
+# (local_valid / local_invalid / dry_run_valid / dry_run_invalid / llm_fallback),
+# and how often a path was cancelled because another one decided first (<path>_cancelled)
+VALIDATION_COUNTERS: Counter = Counter()
+
+_validator_llm = LlmAgent(
+    name="SqlValidatorLlm",
     model=GEMINI_MODEL,
     instruction="""
                 You are an expert SQL Validator Agent.
 
-                You will receive a SQL query intended to be executed on Google BigQuery: 
+                You will receive a SQL query intended to be executed on Google BigQuery:
                 {{sql_query}}
-                
+
                 Your job is to validate:
                 1. The SQL syntax (must be valid SQL).
                 2. The BigQuery dialect compatibility.
@@ -52,3 +84,134 @@ sql_validator_agent = LlmAgent(
                 """,
     output_key="validation_status",
 )
+
+
+def _make_event(author: str, text: str) -> Event:
+    return Event(author=author, content=types.Content(parts=[types.Part(text=text)]))
+
+
+@dataclass
+class _Outcome:
+    """One validation path's verdict, in the validation_status contract."""
+
+    source: str                                       # local / dry_run / llm
+    status: str                                       # valid / invalid / inconclusive
+    validation_status: str = ""
+    dry_run: Optional[dict] = None                    # → state["dry_run"] (valid dry runs)
+    events: list[Event] = field(default_factory=list)  # the LLM validator's, replayed if it wins
+
+    @property
+    def definitive(self) -> bool:
+        return self.status != "inconclusive"
+
+
+def _local_outcome(sql: str) -> _Outcome:
+    verdict = validate_sql(sql)
+    return _Outcome("local", verdict.status, verdict.as_validation_status() if verdict.definitive else "")
+
+
+async def _dry_run_outcome(sql: str) -> _Outcome:
+    try:
+        result = await dry_run_async(sql)
+    except Exception:                                 # no dry run on this backend / unreachable
+        return _Outcome("dry_run", "inconclusive")
+    if result.error is not None:
+        return _Outcome("dry_run", "invalid", f"invalid: {result.error}")
+    # Lazy import to avoid circular refs (cost gate → repair → validator)
+    from ..cost_gate_agent.agent import dry_run_state
+
+    return _Outcome("dry_run", "valid", "valid", dry_run=dry_run_state(sql, result))
+
+
+async def _llm_outcome(ctx: InvocationContext) -> _Outcome:
+    # Buffered, not yielded: a cancelled or losing LLM run must not write validation_status
+    events = [ev async for ev in _validator_llm.run_async(ctx)]
+    status = next(
+        (str(ev.actions.state_delta["validation_status"]) for ev in reversed(events)
+         if "validation_status" in ev.actions.state_delta),
+        "",
+    )
+    return _Outcome("llm", "valid" if status.strip().lower() == "valid" else "invalid", status, events=events)
+
+
+class SqlValidatorWrapper(BaseAgent):
+    name: str = "SqlValidatorAgent"
+    description: str = (
+        "Validates SQL locally against the schema catalog and with a backend dry run; "
+        "defers to the LLM only when both are inconclusive."
+    )
+
+    async def _serial(self, ctx: InvocationContext, sql: str) -> _Outcome:
+        outcome = _local_outcome(sql)
+        if not outcome.definitive and DRY_RUN_VALIDATION:
+            outcome = await _dry_run_outcome(sql)
+        if not outcome.definitive:
+            outcome = await _llm_outcome(ctx)
+        return outcome
+
+    async def _parallel(self, ctx: InvocationContext, sql: str) -> _Outcome:
+        # Lazy import to avoid circular refs (cost gate → repair → validator)
+        from ..cost_gate_agent.agent import COST_GATE_ENABLED
+
+        tasks: dict[asyncio.Task, str] = {asyncio.create_task(asyncio.to_thread(_local_outcome, sql)): "local"}
+        if DRY_RUN_VALIDATION:
+            tasks[asyncio.create_task(_dry_run_outcome(sql))] = "dry_run"
+        hedge_at = time.monotonic() + LLM_HEDGE_MS / 1000 if LLM_HEDGE_MS >= 0 else None
+        llm_started, winner, provisional = False, None, None
+        try:
+            while winner is None:
+                if not llm_started and provisional is None and (
+                    not tasks or (hedge_at is not None and time.monotonic() >= hedge_at)
+                ):
+                    tasks[asyncio.create_task(_llm_outcome(ctx))] = "llm"
+                    llm_started = True
+                timeout = (
+                    None if llm_started or provisional is not None or hedge_at is None
+                    else max(0.0, hedge_at - time.monotonic())
+                )
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                # same-tick finishers: the cheaper, more certain path wins
+                for task in sorted(done, key=lambda t: _PRIORITY[tasks[t]]):
+                    del tasks[task]
+                    outcome = task.result()
+                    if not outcome.definitive or winner is not None:
+                        continue
+                    if outcome.source == "local" and outcome.status == "valid" and COST_GATE_ENABLED \
+                            and "dry_run" in tasks.values():
+                        provisional = outcome         # the cost gate needs the dry run anyway – let it confirm
+                        continue
+                    winner = outcome
+                if winner is None and provisional is not None and "dry_run" not in tasks.values():
+                    winner = provisional              # dry run unavailable – the local verdict stands
+        finally:
+            for task, source in tasks.items():        # short-circuit: the rest are not needed
+                task.cancel()
+                VALIDATION_COUNTERS[f"{source}_cancelled"] += 1
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return winner
+
+    async def _run_async_impl(self, ctx: InvocationContext):
+        st = ctx.session.state
+        sql = st.get("sql_query", "")
+
+        if VALIDATION_MODE == "serial":
+            outcome = await self._serial(ctx, sql)
+        else:
+            outcome = await self._parallel(ctx, sql)
+
+        if outcome.source == "llm":
+            VALIDATION_COUNTERS["llm_fallback"] += 1
+            annotate(validator="llm_fallback", mode=VALIDATION_MODE)
+            for ev in outcome.events:                 # carries the validation_status state delta
+                yield ev
+            return
+
+        VALIDATION_COUNTERS[f"{outcome.source}_{outcome.status}"] += 1
+        annotate(validator=outcome.source, verdict=outcome.status, mode=VALIDATION_MODE)
+        if outcome.dry_run is not None:
+            st["dry_run"] = outcome.dry_run           # the cost gate reuses it
+        st["validation_status"] = outcome.validation_status
+        yield _make_event(self.name, st["validation_status"])
+
+
+sql_validator_agent = SqlValidatorWrapper()
@@ -0,0 +1,313 @@
+"""
+Local SQL Validator
+───────────────────────────────────────────────────────────────────────────────
+Deterministic checks that used to cost a Gemini round trip:
+
+1. The query parses as GoogleSQL (sqlglot, BigQuery dialect) and is a single
+   read-only SELECT.
+2. Every table is qualified with the `Mock_KPIs` dataset and exists in the
+   schema catalog.
+3. Every referenced column resolves against the tables / subqueries in scope –
+   to exactly one of them when unqualified – and output aliases are only
+   used where GoogleSQL allows them (GROUP BY, HAVING, ORDER BY, QUALIFY).
+
+Each check yields a definite verdict where it can. Anything the engine cannot
+decide with certainty (exotic syntax sqlglot does not parse, UNNEST'ed struct
+fields, GROUP BY shapes it cannot prove) is reported as *inconclusive* so the
+caller can defer to the LLM validator.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from ...lazy_imports import lazy_import
+from ...catalog import Catalog, load_catalog
+
+if TYPE_CHECKING:
+    from sqlglot.optimizer.scope import Scope
+
+sqlglot = lazy_import("sqlglot")
+exp = lazy_import("sqlglot.expressions")
+optimizer_scope = lazy_import("sqlglot.optimizer.scope")
+
+_FENCE_RE = re.compile(r"^\s*```(?:sql)?\s*|\s*```\s*$", re.I)
+
+# sqlglot parse errors that mirror hard GoogleSQL grammar rules (→ invalid, not inconclusive)
+_CERTAIN_PARSE_ERRORS = {
+    "Expected DISTINCT or ALL": "set operations need UNION ALL / UNION DISTINCT",
+}
+
+
+@dataclass(frozen=True)
+class Verdict:
+    status: Literal["valid", "invalid", "inconclusive"]
+    reason: str = ""
+
+    @property
+    def definitive(self) -> bool:
+        return self.status != "inconclusive"
+
+    def as_validation_status(self) -> str:
+        """Render in the `valid` / `invalid: <reason>` contract of validation_status."""
+        return "valid" if self.status == "valid" else f"invalid: {self.reason}"
+
+
+VALID = Verdict("valid")
+
+
+def _invalid(reason: str) -> Verdict:
+    return Verdict("invalid", reason)
+
+
+def _inconclusive(reason: str) -> Verdict:
+    return Verdict("inconclusive", reason)
+
+
+# ─── lexical sanity (certain syntax errors) ─────────────────
+def _lexical_problem(sql: str) -> str | None:
+    depth, i, quote = 0, 0, None
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif sql.startswith("--", i) or ch == "#":
+            nl = sql.find("\n", i)
+            i = len(sql) if nl < 0 else nl
+            continue
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            if end < 0:
+                return "unterminated comment"
+            i = end + 2
+            continue
+        elif ch in ("'", '"', "`"):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                return "unbalanced parentheses"
+        i += 1
+    if quote:
+        return "unterminated quoted literal or identifier"
+    if depth:
+        return "unbalanced parentheses"
+    return None
+
+
+# ─── scope resolution ───────────────────────────────────────
+def _cte_names(tree: exp.Expression) -> set[str]:
+    return {cte.alias_or_name for cte in tree.find_all(exp.CTE)}
+
+
+def _output_columns(scope: Scope) -> set[str] | None:
+    """Lower-cased column names a derived table / CTE exposes (None = unknown)."""
+    node = scope.expression
+    if isinstance(node, exp.SetOperation):
+        node = node.left
+        while isinstance(node, exp.SetOperation):
+            node = node.left
+    if not isinstance(node, exp.Select):
+        return None                           # UNNEST, table functions, …
+    if any(isinstance(e, exp.Star) or (isinstance(e, exp.Column) and e.is_star)
+           for e in node.expressions):
+        return None
+    return {name.lower() for name in node.named_selects}
+
+
+def _source_columns(source, catalog: Catalog) -> set[str] | None:
+    if isinstance(source, exp.Table):
+        table = catalog.table(source.name)
+        return set(table.columns) if table else None
+    if isinstance(source, optimizer_scope.Scope):
+        return _output_columns(source)
+    return None
+
+
+def _check_tables(tree: exp.Expression, catalog: Catalog) -> Verdict | None:
+    ctes = _cte_names(tree)
+    for table in tree.find_all(exp.Table):
+        if not table.name:
+            return _inconclusive("table-valued expression")
+        if not table.db:
+            if table.name in ctes:
+                continue
+            return _invalid(
+                f"table `{table.name}` is not qualified with dataset {catalog.dataset} "
+                f"(use {catalog.dataset}.{table.name})"
+            )
+        if table.db != catalog.dataset:
+            return _invalid(f"unknown dataset `{table.db}`; all tables live in {catalog.dataset}")
+        if catalog.table(table.name) is None:
+            close = [t for t in catalog.tables if t.lower() == table.name.lower()]
+            hint = f" (did you mean {catalog.dataset}.{close[0]}?)" if close else ""
+            return _invalid(f"unknown table {catalog.dataset}.{table.name}{hint}")
+    return None
+
+
+def _select_aliases(scope: Scope) -> set[str]:
+    node = scope.expression
+    return {a.lower() for a in node.named_selects} if isinstance(node, exp.Select) else set()
+
+
+def _using_columns(scope: Scope) -> set[str]:
+    node = scope.expression
+    if not isinstance(node, exp.Select):
+        return set()
+    return {c.name.lower() for join in node.args.get("joins") or () for c in join.args.get("using") or ()}
+
+
+def _unqualified_sources(name: str, scope: Scope | None, catalog: Catalog) -> int | None:
+    """
+    How many sources of the innermost scope that has column `name` provide it
+    (0: no scope does); None when an opaque source leaves that uncertain.
+    """
+    opaque = False
+    while scope is not None:
+        matches, opaque_here = 0, False
+        for source in scope.sources.values():
+            cols = _source_columns(source, catalog)
+            if cols is None:
+                opaque_here = True
+            elif name in cols:
+                matches += 1
+        if matches > 1 and name in _using_columns(scope):
+            matches = 1                       # JOIN … USING (name) merges them
+        if matches:
+            return None if opaque_here else matches
+        opaque = opaque or opaque_here
+        if scope.is_cte or scope.is_derived_table:
+            break                             # only subqueries see the enclosing query's columns
+        scope = scope.parent
+    return None if opaque else 0
+
+
+_ALIAS_CLAUSES = ("group", "having", "order", "qualify")
+
+
+def _in_alias_clause(column: exp.Column, select: exp.Expression) -> bool:
+    """`column` sits in `select`'s own GROUP BY / HAVING / ORDER BY / QUALIFY, where output aliases resolve."""
+    if not isinstance(select, exp.Select):
+        return False
+    for key in _ALIAS_CLAUSES:
+        clause = select.args.get(key)
+        if clause is not None and any(node is column for node in clause.walk()):
+            return True
+    return False
+
+
+def _check_columns(tree: exp.Expression, catalog: Catalog) -> Verdict | None:
+    pending: Verdict | None = None
+    for scope in optimizer_scope.traverse_scope(tree):
+        aliases = _select_aliases(scope)
+        for column in scope.columns:
+            name = column.name.lower()
+            if not name or column.is_star:
+                continue
+            if isinstance(scope.expression, exp.Select) \
+                    and column.find_ancestor(exp.Select) is not scope.expression:
+                continue                      # checked in the subquery's own scope
+            qualifier = column.table
+            if qualifier:
+                source = scope.sources.get(qualifier)
+                if source is None:
+                    parent = scope.parent
+                    while parent is not None and source is None:
+                        source = parent.sources.get(qualifier)
+                        parent = parent.parent
+                if source is None:
+                    pending = pending or _inconclusive(f"unresolved qualifier `{qualifier}`")
+                    continue
+                cols = _source_columns(source, catalog)
+                if cols is None:
+                    pending = pending or _inconclusive(f"opaque source `{qualifier}`")
+                elif name not in cols:
+                    where = source.name if isinstance(source, exp.Table) else qualifier
+                    return _invalid(f"unknown column `{qualifier}.{column.name}` ({where} has no column {column.name})")
+                continue
+
+            found = _unqualified_sources(name, scope, catalog)
+            if found == 1:
+                continue
+            if found is not None and found > 1:
+                return _invalid(f"column `{column.name}` is ambiguous (qualify it with its table or alias)")
+            if name in aliases and _in_alias_clause(column, scope.expression):
+                continue                      # output alias reused in GROUP BY / HAVING / ORDER BY / QUALIFY
+            if found is None:
+                pending = pending or _inconclusive(f"cannot resolve `{column.name}` through opaque source")
+                continue
+            return _invalid(f"unknown column `{column.name}`")
+    return pending
+
+
+def _check_grouping(tree: exp.Expression) -> Verdict | None:
+    """Flag (as inconclusive) aggregate queries whose grouping we cannot prove."""
+    def _key(node: exp.Expression) -> str:
+        return node.sql(dialect="bigquery").lower()
+
+    for select in tree.find_all(exp.Select):
+        group = select.args.get("group")
+        aggregates = [
+            agg for agg in select.find_all(exp.AggFunc)
+            if agg.find_ancestor(exp.Select) is select and not agg.find_ancestor(exp.Window)
+        ]
+        if not aggregates and not group:
+            continue
+        grouped = {_key(g) for g in group.expressions} if group else set()
+        for pos, projection in enumerate(select.expressions, start=1):
+            inner = projection.unalias()
+            if isinstance(inner, exp.Star):
+                return _inconclusive("SELECT * in an aggregate query")
+            if inner.find(exp.Window):
+                continue
+            if {_key(inner), projection.alias_or_name.lower(), str(pos)} & grouped:
+                continue
+            bare = [
+                c for c in inner.find_all(exp.Column)
+                if not c.find_ancestor(exp.AggFunc) and c.find_ancestor(exp.Select) is select
+            ]
+            if any(_key(c) not in grouped and c.name.lower() not in grouped for c in bare):
+                return _inconclusive(f"cannot prove `{_key(projection)}` is grouped")
+    return None
+
+
+# ─── entry point ────────────────────────────────────────────
+def validate_sql(sql: str, catalog: Catalog | None = None) -> Verdict:
+    catalog = catalog or load_catalog()
+    sql = _FENCE_RE.sub("", (sql or "").strip())
+    if not sql:
+        return _invalid("empty query")
+
+    if (problem := _lexical_problem(sql)):
+        return _invalid(problem)
+    try:
+        statements = [s for s in sqlglot.parse(sql, read="bigquery") if s is not None]
+    except sqlglot.TokenError as exc:
+        return _invalid(f"syntax error: {exc}")
+    except sqlglot.ParseError as exc:
+        first = exc.errors[0]["description"] if exc.errors else str(exc)
+        for fragment, reason in _CERTAIN_PARSE_ERRORS.items():
+            if fragment in first:
+                return _invalid(f"syntax error: {reason}")
+        return _inconclusive(f"sqlglot could not parse the query: {first}")
+
+    if len(statements) != 1:
+        return _invalid("expected exactly one SQL statement")
+    tree = statements[0]
+    if not isinstance(tree, (exp.Select, exp.SetOperation, exp.Subquery)):
+        return _invalid("only read-only SELECT queries are allowed")
+    if list(tree.find_all(exp.Command)):
+        return _inconclusive("query contains syntax sqlglot treats as an opaque command")
+
+    for check in (_check_tables, _check_columns):
+        if (verdict := check(tree, catalog)) is not None:
+            return verdict
+    return _check_grouping(tree) or VALID
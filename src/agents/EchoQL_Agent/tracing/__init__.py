@@ -0,0 +1,15 @@
+from .instrument import instrument
+from .summary import format_summary, read_spans, summarize
+from .tracer import (
+    TRACE_ENABLED,
+    JsonLinesExporter,
+    NullExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+    annotate,
+    current_span,
+    get_tracer,
+    record_error,
+    set_exporter,
+)
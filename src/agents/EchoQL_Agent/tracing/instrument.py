@@ -0,0 +1,94 @@
+"""
+ADK instrumentation
+───────────────────────────────────────────────────────────────────────────────
+`instrument(*agents)` installs span callbacks on each agent and, recursively,
+on its sub-agents:
+
+    before/after_agent_callback  → one "agent" span per agent run
+    before/after_model_callback  → one "llm" span per model call (LlmAgents),
+                                   with model name and prompt / output tokens
+
+The tracing callbacks go first in each list – ADK stops at the first callback
+that returns something, and a span must always be closed. Callbacks already
+installed are kept. LLM agents driven by a wrapper rather than listed as
+sub-agents (e.g. the SQL generator's inner LLM) must be passed explicitly.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from google.adk.agents import BaseAgent, LlmAgent
+
+from .tracer import TRACE_ENABLED, current_span, get_tracer
+
+
+def _as_list(callback: Any) -> list:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def _before_agent(callback_context):
+    get_tracer().start(callback_context.agent_name, "agent", trace_id=callback_context.invocation_id)
+    return None
+
+
+def _close(name: str, kind: str, **attrs: Any) -> None:
+    """End the innermost open span called `name`; spans left open beneath it are abandoned."""
+    tracer, span = get_tracer(), current_span()
+    while span is not None and not (span.name == name and span.kind == kind):
+        tracer.end(span, status="abandoned")
+        span = current_span()
+    if span is not None:
+        tracer.end(span, **attrs)
+
+
+def _after_agent(callback_context):
+    _close(callback_context.agent_name, "agent")
+    return None
+
+
+def _before_model(callback_context, llm_request):
+    get_tracer().start(f"llm:{callback_context.agent_name}", "llm", model=llm_request.model)
+    return None
+
+
+def _after_model(callback_context, llm_response):
+    if llm_response.partial:
+        return None
+    usage = llm_response.usage_metadata
+    attrs: dict[str, Any] = {
+        "prompt_tokens": usage.prompt_token_count if usage else None,
+        "output_tokens": usage.candidates_token_count if usage else None,
+    }
+    if llm_response.error_code:
+        attrs.update(status="error", error=f"{llm_response.error_code}: {llm_response.error_message}")
+    _close(f"llm:{callback_context.agent_name}", "llm", **attrs)
+    return None
+
+
+def _walk(agents) -> list[BaseAgent]:
+    seen, stack, found = set(), list(agents), []
+    while stack:
+        agent = stack.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        found.append(agent)
+        stack.extend(agent.sub_agents)
+    return found
+
+
+def instrument(*agents: BaseAgent) -> None:
+    """Install span callbacks on the agents and their sub-agents (idempotent)."""
+    if not TRACE_ENABLED:
+        return
+    for agent in _walk(agents):
+        if _before_agent in _as_list(agent.before_agent_callback):
+            continue
+        agent.before_agent_callback = [_before_agent, *_as_list(agent.before_agent_callback)]
+        agent.after_agent_callback = [_after_agent, *_as_list(agent.after_agent_callback)]
+        if isinstance(agent, LlmAgent):
+            agent.before_model_callback = [_before_model, *_as_list(agent.before_model_callback)]
+            agent.after_model_callback = [_after_model, *_as_list(agent.after_model_callback)]
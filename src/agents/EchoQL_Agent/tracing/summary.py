@@ -0,0 +1,76 @@
+"""
+Trace summaries – per-stage latency percentiles from a JSON-lines trace file.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# numeric attributes summed per stage when present
+_SUMMED_ATTRS = ("prompt_tokens", "output_tokens", "bytes_processed", "slot_ms", "rows")
+
+
+def read_spans(path: str | Path) -> Iterator[dict]:
+    with Path(path).open(encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:       # a torn last line from a crashed writer
+                    continue
+
+
+def _pct(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def summarize(spans: Iterable[dict], since: float | None = None) -> list[dict]:
+    """One row per (kind, name): count, errors, p50 / p95 / p99 / max ms and summed attributes."""
+    durations: dict[tuple[str, str], list[float]] = defaultdict(list)
+    errors: dict[tuple[str, str], int] = defaultdict(int)
+    totals: dict[tuple[str, str], dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for span in spans:
+        if since is not None and span["start"] < since:
+            continue
+        key = ("trace" if span["parent_id"] is None else span["kind"], span["name"])
+        if span["duration_ms"] is not None:
+            durations[key].append(span["duration_ms"])
+        if span["status"] != "ok":
+            errors[key] += 1
+        for attr in _SUMMED_ATTRS:
+            value = span["attrs"].get(attr)
+            if isinstance(value, (int, float)):
+                totals[key][attr] += value
+
+    rows = []
+    for key, values in durations.items():
+        values.sort()
+        rows.append({
+            "kind": key[0],
+            "name": key[1],
+            "count": len(values),
+            "errors": errors[key],
+            "p50": _pct(values, .50),
+            "p95": _pct(values, .95),
+            "p99": _pct(values, .99),
+            "max": values[-1],
+            **dict(totals[key]),
+        })
+    order = {"trace": 0, "agent": 1, "llm": 2}
+    rows.sort(key=lambda r: (order.get(r["kind"], 3), -r["p95"]))
+    return rows
+
+
+def format_summary(rows: list[dict]) -> str:
+    lines = [f"{'kind':<6} {'name':<38} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  extra"]
+    for r in rows:
+        extra = "  ".join(f"{a}={r[a]:,.0f}" for a in _SUMMED_ATTRS if a in r)
+        lines.append(
+            f"{r['kind']:<6} {r['name'][:38]:<38} {r['count']:>6} {r['errors']:>4} "
+            f"{r['p50']:>9.1f} {r['p95']:>9.1f} {r['p99']:>9.1f} {r['max']:>9.1f}  {extra}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,233 @@
+"""
+Tracer
+───────────────────────────────────────────────────────────────────────────────
+Lightweight spans for the agent pipeline.
+
+A span is a named, timed unit of work (an agent run, an LLM call, a BigQuery
+job) with free-form attributes. Spans nest through a context variable, so any
+code running inside an agent can attach attributes to the current span with
+`annotate(...)` or open a child span with `get_tracer().span(...)` without
+threading a handle through its call stack. The trace id is the ADK
+invocation id, so every span of one question shares it.
+
+Finished spans are handed to a pluggable exporter (`set_exporter`). The
+default JsonLinesExporter only enqueues on the caller's thread; a daemon thread
+appends the spans to a JSON-lines file in batches, so tracing can stay on under
+load. If the writer falls behind, spans are dropped (and counted) rather than
+buffered without bound.
+
+Configuration:
+    ECHOQL_TRACE=0          disable tracing (instrument() becomes a no-op)
+    ECHOQL_TRACE_PATH       JSON-lines file (default ~/.cache/echoql/traces.jsonl)
+    ECHOQL_TRACE_FLUSH_S    writer flush interval (default 1 s)
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional, Protocol
+
+TRACE_ENABLED = os.getenv("ECHOQL_TRACE", "1") != "0"
+TRACE_PATH = os.getenv(
+    "ECHOQL_TRACE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "echoql", "traces.jsonl"),
+)
+TRACE_FLUSH_S = float(os.getenv("ECHOQL_TRACE_FLUSH_S", "1"))
+TRACE_MAX_QUEUE = 100_000
+
+_span_ids = itertools.count(1)
+_ID_PREFIX = f"{os.getpid():x}"
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    kind: str                                   # agent | llm | io | …
+    trace_id: str
+    span_id: str
+    parent: Optional["Span"]
+    start: float                                # epoch seconds
+    attrs: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    duration_ms: Optional[float] = None
+    _t0: float = field(default_factory=time.perf_counter)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("echoql_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attrs: Any) -> None:
+    """Attach attributes to the current span (no-op outside a traced run)."""
+    span = _current.get()
+    if span is not None:
+        span.attrs.update(attrs)
+
+
+def record_error(message: str) -> None:
+    """Mark the current span as failed – for errors an agent reports instead of raising."""
+    span = _current.get()
+    if span is not None:
+        span.status = "error"
+        span.attrs["error"] = message[:500]
+
+
+# ─── exporters ──────────────────────────────────────────────
+class SpanExporter(Protocol):
+    def export(self, span: dict) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class NullExporter:
+    def export(self, span: dict) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per span; writes happen on a background thread."""
+
+    def __init__(
+        self, path: str | Path, flush_interval_s: float = TRACE_FLUSH_S, max_queue: int = TRACE_MAX_QUEUE
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._interval = flush_interval_s
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="echoql-trace-writer", daemon=True)
+        self._thread.start()
+
+    def export(self, span: dict) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        lines = "".join(json.dumps(s, default=str, separators=(",", ":")) + "\n" for s in batch)
+        with self._write_lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.flush()
+            except OSError:                           # keep tracing best-effort
+                pass
+
+
+# ─── tracer ─────────────────────────────────────────────────
+class Tracer:
+    def __init__(self, exporter: SpanExporter) -> None:
+        self.exporter = exporter
+
+    def start(self, name: str, kind: str, trace_id: str | None = None, **attrs: Any) -> Span:
+        """Open a span as a child of the current one and make it current."""
+        parent = _current.get()
+        span = Span(
+            name=name,
+            kind=kind,
+            trace_id=trace_id or (parent.trace_id if parent else f"{_ID_PREFIX}-{next(_span_ids):x}"),
+            span_id=f"{_ID_PREFIX}-{next(_span_ids):x}",
+            parent=parent,
+            start=time.time(),
+            attrs=attrs,
+        )
+        _current.set(span)
+        return span
+
+    def end(self, span: Span, status: str | None = None, **attrs: Any) -> None:
+        """Close the span, export it and make its parent current again."""
+        span.duration_ms = round((time.perf_counter() - span._t0) * 1000, 3)
+        if status:
+            span.status = status
+        span.attrs.update(attrs)
+        if _current.get() is span:
+            _current.set(span.parent)
+        self.exporter.export(span.to_dict())
+
+    @contextmanager
+    def span(self, name: str, kind: str = "io", **attrs: Any) -> Iterator[Span]:
+        span = self.start(name, kind, **attrs)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end(span, status="error", error=f"{type(exc).__name__}: {exc}"[:500])
+            raise
+        self.end(span)
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer (JSON-lines exporter unless tracing is disabled)."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                exporter = JsonLinesExporter(TRACE_PATH) if TRACE_ENABLED else NullExporter()
+                _tracer = Tracer(exporter)
+                atexit.register(exporter.shutdown)
+    return _tracer
+
+
+def set_exporter(exporter: SpanExporter) -> None:
+    """Route finished spans to `exporter`; the previous one is shut down."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(exporter)
+        else:
+            previous, _tracer.exporter = _tracer.exporter, exporter
+            previous.shutdown()
+    atexit.register(exporter.shutdown)
@@ -0,0 +1,3 @@
+from .bulk import LoadReport, LoadResult, Manifest, ManifestEntry, bulk_load
+from .convert import csv_to_parquet, scan_file
+from .loaders import BigQueryLoader, Loader, LocalLoader
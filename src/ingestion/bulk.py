@@ -0,0 +1,176 @@
+"""
+Bulk load – many CSVs, concurrently, skipping what is already loaded.
+
+For every file, `workers` at a time:
+
+1. Hash it (SHA-256, streamed). A file whose hash matches the manifest entry
+   of its table was loaded as it is and is skipped.
+2. With `append`, a file whose first `size` bytes hash to the manifest entry
+   – rows were only added at the end – has just its new rows converted and
+   appended. Any other change is a full reload.
+3. Convert it to Parquet with the catalog schema (convert.py) in a staging
+   directory and hand it to the loader.
+4. Record the file's hash, size and row count in the manifest, written
+   atomically after every load, so an interrupted run resumes where it
+   stopped and appended rows are never loaded twice.
+
+One file loads one table: `<dataset>.<file stem>`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.agents.EchoQL_Agent.catalog import Catalog
+
+from .convert import csv_to_parquet, scan_file
+from .loaders import Loader
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    file: str
+    sha256: str
+    size: int
+    rows: int
+    loaded_at: float
+
+
+class Manifest:
+    """Table → what was last loaded into it; a JSON file rewritten atomically on every change."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        raw = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+        self._entries = {table: ManifestEntry(**entry) for table, entry in raw.items()}
+        self._lock = threading.Lock()
+
+    def get(self, table: str) -> Optional[ManifestEntry]:
+        return self._entries.get(table)
+
+    def record(self, table: str, entry: ManifestEntry) -> None:
+        with self._lock:
+            self._entries[table] = entry
+            text = json.dumps({t: asdict(e) for t, e in sorted(self._entries.items())}, indent=2) + "\n"
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+@dataclass
+class LoadResult:
+    table: str
+    action: str                         # skipped | replaced | appended | failed
+    rows: int = 0                       # rows loaded by this run
+    bytes: int = 0                      # CSV bytes converted by this run
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadReport:
+    results: list[LoadResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def count(self, action: str) -> int:
+        return sum(r.action == action for r in self.results)
+
+    @property
+    def rows(self) -> int:
+        return sum(r.rows for r in self.results)
+
+    @property
+    def bytes(self) -> int:
+        return sum(r.bytes for r in self.results)
+
+
+def _load_one(
+    path: Path,
+    catalog: Catalog,
+    loader: Loader,
+    manifest: Manifest,
+    staging: Path,
+    append: bool,
+    partition_by: Optional[str],
+    force: bool,
+) -> LoadResult:
+    start = time.perf_counter()
+    name = path.stem
+    table = catalog.table(name)
+    if table is None:
+        return LoadResult(name, "failed", error=f"{catalog.dataset}.{name} is not in the schema catalog")
+
+    previous = None if force else manifest.get(name)
+    scan = scan_file(path, previous.size if previous and append else 0)
+    if previous and scan.sha256 == previous.sha256:
+        return LoadResult(name, "skipped", seconds=time.perf_counter() - start)
+    tail = bool(
+        append and previous and scan.size > previous.size
+        and scan.prefix_sha256 == previous.sha256 and scan.prefix_ends_line
+    )
+    offset = previous.size if tail else 0
+
+    parquet = staging / f"{name}.parquet"
+    try:
+        rows = csv_to_parquet(path, parquet, table, offset)
+        if rows or not tail:
+            loader.load(parquet, table, append=tail, partition_by=partition_by or table.partition_by)
+    finally:
+        parquet.unlink(missing_ok=True)
+    manifest.record(name, ManifestEntry(
+        file=path.name,
+        sha256=scan.sha256,
+        size=scan.size,
+        rows=rows + (previous.rows if tail else 0),
+        loaded_at=round(time.time(), 3),
+    ))
+    return LoadResult(
+        name, "appended" if tail else "replaced",
+        rows=rows, bytes=scan.size - offset, seconds=time.perf_counter() - start,
+    )
+
+
+def bulk_load(
+    files: Iterable[str | os.PathLike],
+    catalog: Catalog,
+    loader: Loader,
+    manifest: Manifest,
+    *,
+    workers: int = 4,
+    append: bool = False,
+    partition_by: Optional[dict[str, str]] = None,
+    force: bool = False,
+    staging_dir: Optional[str | os.PathLike] = None,
+) -> LoadReport:
+    """Load every CSV in `files` into its table; see the module docstring.
+
+    `partition_by` maps a table to the DATE / TIMESTAMP column it is
+    partitioned on (default: the catalog's). `force` reloads every file in full.
+    """
+    partition_by = partition_by or {}
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=staging_dir, prefix="echoql-ingest-") as staging, \
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ingest") as pool:
+        paths = [Path(p) for p in files]
+        futures = [
+            pool.submit(
+                _load_one, p, catalog, loader, manifest, Path(staging), append, partition_by.get(p.stem), force
+            )
+            for p in paths
+        ]
+        results = []
+        for path, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:                    # one bad file doesn't stop the others
+                error = (str(exc).splitlines() or [type(exc).__name__])[0]
+                results.append(LoadResult(path.stem, "failed", error=error))
+    return LoadReport(results, time.perf_counter() - start)
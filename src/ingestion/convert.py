@@ -0,0 +1,146 @@
+"""
+CSV → Parquet, streamed, typed from the schema catalog.
+
+A CSV is read in segments of SEGMENT_BYTES cut at row boundaries – newlines
+outside quotes, so a quoted field may span lines – and every segment is parsed and written as a Parquet row group before the next one is
+read, so memory stays at a few segments whatever the file size. (Arrow's
+streaming CSV reader reads ahead without bound: it held most of a 1 GB file
+in memory.) Column types come from the catalog – nothing is
+sniffed – so the Parquet file, and the table it is loaded into, have the
+types the agents were told about. Reading can start at a byte offset: the
+rows appended to a file since its last load are converted on their own.
+
+Row boundaries are found by quote parity, which holds for RFC 4180 quoting
+(fields wholly enclosed in `"`, a `"` inside one doubled). A stray `"` in the
+middle of an unquoted field breaks that: the segment then runs on to the next
+row that evens the count, and Arrow reports the malformed row.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from src.agents.EchoQL_Agent.catalog import Table
+
+HASH_CHUNK_BYTES = 8 << 20
+SEGMENT_BYTES = 16 << 20                # CSV bytes parsed at a time – one row group each
+
+# GoogleSQL type → Arrow type the CSV column is parsed as
+_ARROW_TYPES = {
+    "INT64": pa.int64(),
+    "FLOAT64": pa.float64(),
+    "NUMERIC": pa.decimal128(38, 9),
+    "BIGNUMERIC": pa.float64(),
+    "BOOL": pa.bool_(),
+    "STRING": pa.string(),
+    "BYTES": pa.binary(),
+    "DATE": pa.date32(),
+    "DATETIME": pa.timestamp("us"),
+    "TIMESTAMP": pa.timestamp("us"),    # naive in the CSV; written as UTC (see _to_utc)
+    "TIME": pa.time64("us"),
+}
+
+
+@dataclass(frozen=True)
+class FileScan:
+    sha256: str
+    size: int
+    prefix_sha256: Optional[str] = None     # hash of the first `prefix` bytes asked for
+    prefix_ends_line: bool = False          # the prefix ends on a row boundary
+
+
+def scan_file(path: Path, prefix: int = 0) -> FileScan:
+    """Content hash of `path`, plus – in the same pass – the hash of its first `prefix` bytes."""
+    digest, prefix_digest, ends_line = hashlib.sha256(), None, False
+    with open(path, "rb") as f:
+        remaining, last = prefix, b""
+        while remaining and (chunk := f.read(min(HASH_CHUNK_BYTES, remaining))):
+            digest.update(chunk)
+            remaining, last = remaining - len(chunk), chunk[-1:]
+        if prefix and not remaining:
+            prefix_digest, ends_line = digest.hexdigest(), last == b"\n"
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return FileScan(digest.hexdigest(), path.stat().st_size, prefix_digest, ends_line)
+
+
+def csv_header(path: Path) -> list[str]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def arrow_schema(table: Table, names: list[str]) -> pa.Schema:
+    """Parquet schema for a CSV with header `names`; every column must be in the catalog."""
+    fields = []
+    for name in names:
+        column = table.column(name)
+        if column is None:
+            raise ValueError(f"column {name!r} of {table.name} is not in the schema catalog")
+        if column.type not in _ARROW_TYPES:
+            raise ValueError(f"{table.name}.{name}: type {column.type} can't be loaded from CSV")
+        type_ = _ARROW_TYPES[column.type]
+        if column.type == "TIMESTAMP":
+            type_ = pa.timestamp("us", tz="UTC")
+        fields.append(pa.field(column.name, type_))
+    return pa.schema(fields)
+
+
+def _to_utc(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    columns = [
+        pc.assume_timezone(col, "UTC") if field.type != col.type else col
+        for col, field in zip(batch.columns, schema)
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _finish_row(f, segment: bytearray) -> bytearray:
+    """`segment` (starting at a row boundary) read on from `f` to the end of the row it stops in."""
+    quotes = segment.count(b'"')
+    while quotes % 2 or (segment and not segment.endswith(b"\n")):   # odd count: inside a quoted field
+        line = f.readline()
+        if not line:
+            break
+        segment += line
+        quotes += line.count(b'"')
+    return segment
+
+
+def _segments(f, size: int) -> Iterator[bytearray]:
+    """Chunks of about `size` bytes from `f`, each ending at a row boundary."""
+    while segment := bytearray(f.read(size)):
+        yield _finish_row(f, segment)
+
+
+def csv_to_parquet(path: Path, dest: Path, table: Table, offset: int = 0) -> int:
+    """Convert the rows of `path` from byte `offset` (0: all) to Parquet at `dest`; returns the row count."""
+    names = csv_header(path)
+    schema = arrow_schema(table, names)
+    read_options = pa_csv.ReadOptions(column_names=names)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: _ARROW_TYPES[table.column(name).type] for name in names},
+        strings_can_be_null=True,
+    )
+    quoted = pa_csv.ParseOptions(newlines_in_values=True)     # slower; only where a field may span lines
+    rows = 0
+    with open(path, "rb") as f, pq.ParquetWriter(dest, schema) as writer:
+        _finish_row(f, bytearray(f.readline()))                 # header – names come from csv_header
+        if offset:
+            f.seek(offset)
+        for segment in _segments(f, SEGMENT_BYTES):
+            parsed = pa_csv.read_csv(
+                pa.py_buffer(segment), read_options,
+                parse_options=quoted if b'"' in segment else None, convert_options=convert_options,
+            )
+            for batch in parsed.to_batches():
+                writer.write_batch(_to_utc(batch, schema))
+            rows += parsed.num_rows
+    return rows
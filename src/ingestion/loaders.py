@@ -0,0 +1,89 @@
+"""
+Loaders – where a converted Parquet file ends up.
+
+`BigQueryLoader` runs one load job per file with the catalog schema (no
+autodetect), WRITE_TRUNCATE for a full load and WRITE_APPEND for new rows;
+a table loaded with a partition column is created day-partitioned on it (and
+clustered as the catalog says), and appended rows land in their partitions. Clients come from the fetcher's
+ClientPool, so concurrent loads reuse HTTP sessions.
+
+`LocalLoader` is the offline stand-in: every load becomes a Parquet part
+under `<directory>/<table>/` (a full load clears the table first), after an
+optional fixed delay that stands in for the load job; partitioning is
+ignored.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from src.agents.EchoQL_Agent.catalog import Table
+
+
+class Loader(ABC):
+    name: str = "loader"
+
+    @abstractmethod
+    def load(self, parquet: Path, table: Table, *, append: bool, partition_by: Optional[str] = None) -> None:
+        """Load `parquet` into `table` – replacing its rows, or appending to them."""
+
+
+class BigQueryLoader(Loader):
+    name = "bigquery"
+
+    def __init__(
+        self,
+        project: str,
+        dataset: str,
+        factory: Optional[Callable[[], Any]] = None,
+        pool_size: int = 8,
+        timeout_s: Optional[float] = None,
+    ) -> None:
+        from google.cloud import bigquery
+
+        from src.agents.EchoQL_Agent.subagents.sql_fetcher_agent.connectors.bigquery import ClientPool
+
+        self._bigquery = bigquery
+        self._pool = ClientPool(factory or (lambda: bigquery.Client(project=project)), pool_size)
+        self.project, self.dataset, self.timeout_s = project, dataset, timeout_s
+
+    def load(self, parquet: Path, table: Table, *, append: bool, partition_by: Optional[str] = None) -> None:
+        bq = self._bigquery
+        config = bq.LoadJobConfig(
+            source_format=bq.SourceFormat.PARQUET,
+            schema=[bq.SchemaField(c.name, c.type) for c in table.columns.values()],
+            write_disposition=bq.WriteDisposition.WRITE_APPEND if append else bq.WriteDisposition.WRITE_TRUNCATE,
+        )
+        if partition_by:
+            config.time_partitioning = bq.TimePartitioning(type_=bq.TimePartitioningType.DAY, field=partition_by)
+        if table.cluster_by:
+            config.clustering_fields = list(table.cluster_by)
+        with self._pool.acquire() as client, open(parquet, "rb") as f:
+            job = client.load_table_from_file(
+                f, f"{self.project}.{self.dataset}.{table.name}", job_config=config
+            )
+        job.result(timeout=self.timeout_s)
+
+
+class LocalLoader(Loader):
+    name = "local"
+
+    def __init__(self, directory: str | os.PathLike, latency_s: float = 0.0) -> None:
+        self.directory = Path(directory)
+        self.latency_s = latency_s
+
+    def load(self, parquet: Path, table: Table, *, append: bool, partition_by: Optional[str] = None) -> None:
+        time.sleep(self.latency_s)
+        target = self.directory / table.name
+        if not append and target.exists():
+            shutil.rmtree(target)
+        target.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(parquet, target / f"part-{len(self.parts(table.name)):05d}.parquet")
+
+    def parts(self, table: str) -> list[Path]:
+        return sorted((self.directory / table).glob("part-*.parquet"))